@@ -0,0 +1,48 @@
+"""Add columnar strategy feature storage.
+
+One row per (symbol, timestamp) holding every feature in a packed float
+array, plus the table of feature-name lists the arrays are indexed by.
+Replaces the one-row-per-feature ``strategy_features`` layout for writes.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-10-20
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create strategy_feature_schemas and strategy_feature_frames tables."""
+
+    op.create_table(
+        'strategy_feature_schemas',
+        sa.Column('schema_hash', sa.String(16), nullable=False),
+        sa.Column('feature_names', postgresql.ARRAY(sa.String(64)), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('schema_hash')
+    )
+
+    op.create_table(
+        'strategy_feature_frames',
+        sa.Column('symbol', sa.String(32), nullable=False),
+        sa.Column('timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('schema_hash', sa.String(16), nullable=False),
+        sa.Column('feature_values', postgresql.ARRAY(postgresql.DOUBLE_PRECISION()), nullable=False),
+        sa.PrimaryKeyConstraint('symbol', 'timestamp')
+    )
+
+
+def downgrade():
+    """Drop columnar strategy feature tables."""
+    op.drop_table('strategy_feature_frames')
+    op.drop_table('strategy_feature_schemas')
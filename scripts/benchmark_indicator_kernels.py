@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+技术指标内核微基准
+
+对 features.kernels 中每个指标分别计时：
+1. 单序列（一个标的，默认250根K线）—— 实时信号生成的典型场景
+2. 面板（默认500个标的 × 250根K线）—— 全市场扫描/回测场景
+
+递推类指标（EMA/RSI/ATR）分别测量可用的后端：
+numba（已安装时）、NumPy逐时间向量化、纯Python循环
+
+用法:
+    python scripts/benchmark_indicator_kernels.py
+    python scripts/benchmark_indicator_kernels.py --symbols 1000 --bars 500 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+
+from longport_quant.features import kernels
+
+
+def make_data(n_symbols: int, n_bars: int, seed: int = 42):
+    """构造对齐的OHLCV矩阵（随机游走价格）"""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, n_bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    volume = rng.integers(10_000, 5_000_000, close.shape).astype(float)
+    return close, high, low, volume
+
+
+def cases(close, high, low, volume):
+    return {
+        "sma(20)": lambda: kernels.sma(close, 20),
+        "ema(20)": lambda: kernels.ema(close, 20),
+        "macd": lambda: kernels.macd(close),
+        "rsi(14)": lambda: kernels.rsi(close, 14),
+        "bollinger(20)": lambda: kernels.bollinger_bands(close, 20, 2),
+        "atr(14)": lambda: kernels.atr(high, low, close, 14),
+        "kdj(9)": lambda: kernels.kdj(high, low, close),
+        "obv": lambda: kernels.obv(close, volume),
+        "volume_ratio(5)": lambda: kernels.volume_ratio(volume),
+        "vwap": lambda: kernels.vwap(high, low, close, volume),
+    }
+
+
+def best_of(func, repeat: int) -> float:
+    func()  # 预热（numba首次调用会编译）
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def backends():
+    """(名称, NUMBA_AVAILABLE, VECTORIZE_MIN_ROWS)"""
+    available = []
+    if kernels.NUMBA_AVAILABLE:
+        available.append(("numba", True, kernels.VECTORIZE_MIN_ROWS))
+    available.append(("numpy", False, 1))
+    available.append(("python-loop", False, sys.maxsize))
+    return available
+
+
+def run(label: str, data, repeat: int) -> None:
+    print(f"\n{label}")
+    configs = backends()
+    print(f"{'指标':<18}" + "".join(f"{name:>14}" for name, *_ in configs))
+
+    original = (kernels.NUMBA_AVAILABLE, kernels.VECTORIZE_MIN_ROWS)
+    try:
+        for name in cases(*data):
+            row = f"{name:<18}"
+            for _, use_numba, min_rows in configs:
+                kernels.NUMBA_AVAILABLE, kernels.VECTORIZE_MIN_ROWS = use_numba, min_rows
+                row += f"{best_of(cases(*data)[name], repeat):>12.3f}ms"
+            print(row)
+    finally:
+        kernels.NUMBA_AVAILABLE, kernels.VECTORIZE_MIN_ROWS = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技术指标内核微基准")
+    parser.add_argument("--symbols", type=int, default=500, help="面板标的数量")
+    parser.add_argument("--bars", type=int, default=250, help="每个标的K线数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    print(f"numba: {'已安装' if kernels.NUMBA_AVAILABLE else '未安装'}")
+    panel = make_data(args.symbols, args.bars)
+    single = tuple(matrix[0] for matrix in panel)
+
+    run(f"单序列: 1 × {args.bars}", single, args.repeat)
+    run(f"面板: {args.symbols} × {args.bars}", panel, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+技术指标面板计算基准测试
+
+对比：
+1. 逐标的：calculate_batch_indicators（每个标的一个DataFrame，逐个计算）
+2. 逐标的：直接调用 TechnicalIndicators 的NumPy函数（去掉DataFrame开销）
+3. 面板：panel_indicators 对 (标的 × K线) 矩阵沿时间轴一次计算
+
+指标：SMA/EMA/RSI/MACD/布林带/ATR/OBV，并校验面板结果与逐标的结果一致
+
+用法:
+    python scripts/benchmark_panel_indicators.py
+    python scripts/benchmark_panel_indicators.py --symbols 500 --bars 250 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+import pandas as pd
+
+from longport_quant.features import panel_indicators as panel
+from longport_quant.features.technical_indicators import TechnicalIndicators, calculate_batch_indicators
+
+
+def make_panel(n_symbols: int, n_bars: int, seed: int = 42):
+    """构造对齐的OHLCV矩阵（随机游走价格）"""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, n_bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    volume = rng.integers(10_000, 5_000_000, close.shape).astype(float)
+    return close, high, low, volume
+
+
+def per_symbol_numpy(close, high, low, volume):
+    """逐标的调用 TechnicalIndicators（与面板计算相同的指标集合）"""
+    results = []
+    for c, h, lo, v in zip(close, high, low, volume, strict=True):
+        row = {f"sma_{p}": TechnicalIndicators.sma(c, p) for p in (5, 10, 20, 50)}
+        row.update({f"ema_{p}": TechnicalIndicators.ema(c, p) for p in (5, 10, 20)})
+        macd = TechnicalIndicators.macd(c)
+        row.update(macd=macd["macd"], macd_signal=macd["signal"], macd_histogram=macd["histogram"])
+        row["rsi_14"] = TechnicalIndicators.rsi(c, 14)
+        bb = TechnicalIndicators.bollinger_bands(c)
+        row.update(bb_upper=bb["upper"], bb_middle=bb["middle"], bb_lower=bb["lower"])
+        row["atr_14"] = TechnicalIndicators.atr(h, lo, c)
+        row["obv"] = TechnicalIndicators.obv(c, v)
+        results.append(row)
+    return results
+
+
+def per_symbol_batch(close, high, low, volume):
+    """现有批量接口：每个标的一个DataFrame"""
+    requests = {
+        f"S{i}": pd.DataFrame({"close": c, "high": h, "low": lo, "volume": v})
+        for i, (c, h, lo, v) in enumerate(zip(close, high, low, volume, strict=True))
+    }
+    return calculate_batch_indicators(requests, default_indicators=[
+        "sma", "ema", "macd", "rsi", "bb", "atr", "obv",
+    ])
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技术指标面板计算基准测试")
+    parser.add_argument("--symbols", type=int, default=500, help="标的数量")
+    parser.add_argument("--bars", type=int, default=250, help="每个标的K线数量")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    close, high, low, volume = make_panel(args.symbols, args.bars)
+    print(f"数据规模: {args.symbols} 个标的 × {args.bars} 根K线\n")
+
+    panel_result = panel.calculate_panel_indicators(close, high, low, volume)
+    reference = per_symbol_numpy(close, high, low, volume)
+    max_diff = 0.0
+    for key, matrix in panel_result.items():
+        expected = np.vstack([row[key] for row in reference])
+        if not np.array_equal(np.isnan(matrix), np.isnan(expected)):
+            raise SystemExit(f"❌ {key}: NaN位置不一致")
+        max_diff = max(max_diff, float(np.nanmax(np.abs(matrix - expected), initial=0.0)))
+    print(f"✅ 结果一致性: {len(panel_result)} 个指标, 最大绝对误差 {max_diff:.2e}\n")
+
+    timings = [
+        ("逐标的 calculate_batch_indicators", timeit(lambda: per_symbol_batch(close, high, low, volume), args.repeat)),
+        ("逐标的 TechnicalIndicators", timeit(lambda: per_symbol_numpy(close, high, low, volume), args.repeat)),
+        ("面板 calculate_panel_indicators", timeit(lambda: panel.calculate_panel_indicators(close, high, low, volume), args.repeat)),
+    ]
+    panel_time = timings[-1][1]
+    for name, seconds in timings:
+        print(f"{name:<36} {seconds * 1000:>10.1f} ms   {seconds / panel_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+信号队列存储结构基准测试
+
+对比：
+1. 旧结构：JSON文本直接作为ZSET成员（ZPOPMIN消费，ZRANGE全量扫描去重）
+2. 新结构：signal_id作为ZSET成员 + 信号HASH + 二级索引（json / orjson 编码）
+
+指标：发布吞吐、消费+完成吞吐、去重检查延迟、Redis内存占用
+
+用法:
+    python scripts/benchmark_signal_queue.py --signals 2000
+    python scripts/benchmark_signal_queue.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import redis.asyncio as aioredis
+from loguru import logger
+
+from longport_quant.messaging.signal_queue import SignalQueue
+
+
+def make_signal(i: int) -> dict:
+    """构造接近实盘大小的信号（含指标和原因列表）"""
+    symbol = f"{1000 + i % 400}.HK"
+    return {
+        'symbol': symbol,
+        'type': random.choice(['BUY', 'SELL', 'STRONG_BUY']),
+        'side': 'BUY',
+        'score': random.randint(40, 95),
+        'price': round(random.uniform(5, 500), 3),
+        'stop_loss': round(random.uniform(4, 450), 3),
+        'take_profit': round(random.uniform(6, 600), 3),
+        'reasons': ['RSI超卖反弹', 'MACD金叉', '放量突破布林带中轨'],
+        'indicators': {
+            'rsi': random.uniform(20, 80),
+            'bb_upper': random.uniform(100, 110),
+            'bb_middle': random.uniform(95, 105),
+            'bb_lower': random.uniform(90, 100),
+            'macd_line': random.uniform(-1, 1),
+            'macd_signal': random.uniform(-1, 1),
+            'macd_histogram': random.uniform(-1, 1),
+            'sma_20': random.uniform(95, 105),
+            'sma_50': random.uniform(95, 105),
+            'volume_ratio': random.uniform(0.5, 3),
+            'atr': random.uniform(0.5, 5),
+        },
+        'timestamp': '2025-01-02T10:30:00+08:00',
+    }
+
+
+class LegacySignalQueue:
+    """旧结构的最小复现（JSON成员），仅用于基准对比"""
+
+    def __init__(self, redis, queue_key: str):
+        self.redis = redis
+        self.queue_key = queue_key
+        self.processing_key = f"{queue_key}:processing"
+
+    async def publish_signal(self, signal: dict):
+        signal['queued_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        score = -signal['score'] + (time.time() % 1) * 0.00001
+        await self.redis.zadd(self.queue_key, {json.dumps(signal, ensure_ascii=False): score})
+
+    async def consume_signal(self):
+        result = await self.redis.zpopmin(self.queue_key, count=1)
+        if not result:
+            return None
+        signal_json, _ = result[0]
+        signal = json.loads(signal_json)
+        signal['_original_json'] = signal_json
+        await self.redis.zadd(self.processing_key, {signal_json: time.time()})
+        return signal
+
+    async def mark_signal_completed(self, signal: dict):
+        await self.redis.zrem(self.processing_key, signal['_original_json'])
+
+    async def has_pending_signal(self, symbol: str, signal_type: str = None) -> bool:
+        for key in (self.queue_key, self.processing_key):
+            for signal_json in await self.redis.zrange(key, 0, -1):
+                signal = json.loads(signal_json)
+                if signal.get('symbol') == symbol and (signal_type is None or signal.get('type') == signal_type):
+                    return True
+        return False
+
+
+async def memory_usage(redis, prefix: str):
+    """统计前缀下所有key的内存占用（字节），服务端不支持MEMORY命令时返回None"""
+    total = 0
+    try:
+        async for key in redis.scan_iter(match=f"{prefix}*", count=1000):
+            total += await redis.memory_usage(key) or 0
+    except aioredis.ResponseError:
+        return None
+    return total
+
+
+async def run_case(name: str, redis, queue, prefix: str, signals: list, dedup_checks: int) -> dict:
+    start = time.perf_counter()
+    for signal in signals:
+        await queue.publish_signal(dict(signal))
+    publish_seconds = time.perf_counter() - start
+
+    memory = await memory_usage(redis, prefix)
+
+    start = time.perf_counter()
+    for i in range(dedup_checks):
+        await queue.has_pending_signal(signals[i % len(signals)]['symbol'], 'BUY')
+    dedup_ms = (time.perf_counter() - start) / dedup_checks * 1000
+
+    start = time.perf_counter()
+    consumed = 0
+    while True:
+        signal = await queue.consume_signal()
+        if signal is None:
+            break
+        await queue.mark_signal_completed(signal)
+        consumed += 1
+    consume_seconds = time.perf_counter() - start
+
+    return {
+        'name': name,
+        'publish_per_sec': len(signals) / publish_seconds,
+        'consume_per_sec': consumed / consume_seconds if consumed else 0.0,
+        'dedup_ms': dedup_ms,
+        'memory_kb': memory / 1024 if memory is not None else None,
+    }
+
+
+async def main(redis_url: str, count: int, dedup_checks: int):
+    redis = await aioredis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    random.seed(42)
+    signals = [make_signal(i) for i in range(count)]
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+
+    try:
+        prefix = f"bench:{run_id}:legacy"
+        legacy = LegacySignalQueue(redis, prefix)
+        results.append(await run_case("旧结构(JSON成员)", redis, legacy, prefix, signals, dedup_checks))
+
+        for codec in ("json", "orjson"):
+            prefix = f"bench:{run_id}:{codec}"
+            queue = SignalQueue(
+                redis_url=redis_url,
+                queue_key=prefix,
+                processing_key=f"{prefix}:processing",
+                failed_key=f"{prefix}:failed",
+                zombie_check_interval=3600,
+                payload_codec=codec,
+            )
+            try:
+                results.append(await run_case(f"新结构({codec})", redis, queue, prefix, signals, dedup_checks))
+            finally:
+                await queue.close()
+
+    finally:
+        async for key in redis.scan_iter(match=f"bench:{run_id}:*", count=1000):
+            await redis.delete(key)
+        await redis.close()
+
+    print("\n" + "=" * 78)
+    print(f"信号数量: {count}, 去重检查次数: {dedup_checks}")
+    print("=" * 78)
+    print(f"{'结构':<20}{'发布/秒':>12}{'消费+完成/秒':>16}{'去重(ms)':>12}{'内存(KB)':>14}")
+    for r in results:
+        memory = f"{r['memory_kb']:.1f}" if r['memory_kb'] is not None else "N/A"
+        print(
+            f"{r['name']:<20}{r['publish_per_sec']:>12.0f}{r['consume_per_sec']:>16.0f}"
+            f"{r['dedup_ms']:>12.3f}{memory:>14}"
+        )
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark signal queue storage layouts")
+    parser.add_argument("--redis-url", default=None, help="Redis URL（默认读取配置）")
+    parser.add_argument("--signals", type=int, default=2000, help="信号数量")
+    parser.add_argument("--dedup-checks", type=int, default=200, help="去重检查次数")
+    args = parser.parse_args()
+
+    redis_url = args.redis_url
+    if redis_url is None:
+        from longport_quant.config import get_settings
+        redis_url = get_settings().redis_url
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    asyncio.run(main(redis_url, args.signals, args.dedup_checks))
@@ -39,18 +39,14 @@ async def cleanup_processing_queue(queue: SignalQueue):
     print("\n🔄 正在清理处理中队列...")
 
     try:
-        redis = await queue._get_redis()
-
-        # 获取所有处理中的信号
-        processing_signals = await redis.zrange(queue.processing_key, 0, -1)
-        count = len(processing_signals)
+        count = await queue.get_processing_size()
 
         if count == 0:
             print("✅ 处理中队列为空，无需清理")
             return
 
-        # 删除处理中队列
-        await redis.delete(queue.processing_key)
+        # 删除处理中队列（同时删除信号数据和索引）
+        await queue.clear_queue("processing")
 
         print(f"✅ 已清理 {count} 个处理中信号")
         logger.info(f"已清理处理中队列: {count} 个信号")
@@ -65,18 +61,14 @@ async def cleanup_failed_queue(queue: SignalQueue):
     print("\n🔄 正在清理失败队列...")
 
     try:
-        redis = await queue._get_redis()
-
-        # 获取所有失败的信号
-        failed_signals = await redis.zrange(queue.failed_key, 0, -1)
-        count = len(failed_signals)
+        count = await queue.get_failed_size()
 
         if count == 0:
             print("✅ 失败队列为空，无需清理")
             return
 
         # 删除失败队列
-        await redis.delete(queue.failed_key)
+        await queue.clear_queue("failed")
 
         print(f"✅ 已清理 {count} 个失败信号")
         logger.info(f"已清理失败队列: {count} 个信号")
@@ -91,18 +83,14 @@ async def cleanup_main_queue(queue: SignalQueue):
     print("\n🔄 正在清理主队列...")
 
     try:
-        redis = await queue._get_redis()
-
-        # 获取所有待处理的信号
-        main_signals = await redis.zrange(queue.queue_key, 0, -1)
-        count = len(main_signals)
+        count = await queue.get_queue_size()
 
         if count == 0:
             print("✅ 主队列为空，无需清理")
             return
 
-        # 删除主队列
-        await redis.delete(queue.queue_key)
+        # 删除主队列（同时删除信号数据和索引）
+        await queue.clear_queue("main")
 
         print(f"✅ 已清理 {count} 个待处理信号")
         logger.info(f"已清理主队列: {count} 个信号")
@@ -128,35 +116,14 @@ async def move_processing_to_main(queue: SignalQueue):
     print("\n🔄 正在将处理中信号移回主队列...")
 
     try:
-        redis = await queue._get_redis()
-
-        # 获取所有处理中的信号
-        processing_signals = await redis.zrange(queue.processing_key, 0, -1)
-        count = len(processing_signals)
+        count = await queue.get_processing_size()
 
         if count == 0:
             print("✅ 处理中队列为空，无需移动")
             return
 
-        moved = 0
-        for signal_json in processing_signals:
-            try:
-                signal = queue._deserialize_signal(signal_json)
-
-                # 降低优先级（因为之前处理失败了）
-                original_priority = signal.get('score', 0)
-                new_priority = original_priority - 20  # 降低20分
-
-                # 重新加入主队列
-                await queue.publish_signal(signal, priority=new_priority)
-                moved += 1
-
-            except Exception as e:
-                logger.warning(f"移动信号失败: {e}")
-                continue
-
-        # 清空处理中队列
-        await redis.delete(queue.processing_key)
+        # 逐个移回主队列并降低优先级（因为之前处理失败了），数据缺失的信号会被清理
+        moved = await queue.requeue_processing_signals(priority_penalty=20)
 
         print(f"✅ 已将 {moved}/{count} 个信号移回主队列（优先级已降低）")
         logger.info(f"已将处理中信号移回主队列: {moved} 个")
@@ -171,21 +138,26 @@ async def show_sample_signals(queue: SignalQueue, queue_name: str, limit: int =
     try:
         redis = await queue._get_redis()
 
+        # 主队列/处理中队列的成员是signal_id，信号数据需通过队列读取；失败队列成员仍为JSON
         if queue_name == "main":
-            key = queue.queue_key
             title = "待处理队列"
+            signals = await queue.get_all_signals(limit=limit)
+            total = await queue.get_queue_size()
         elif queue_name == "processing":
-            key = queue.processing_key
             title = "处理中队列"
+            signals = (await queue.get_processing_signals())[:limit]
+            total = await queue.get_processing_size()
         elif queue_name == "failed":
-            key = queue.failed_key
             title = "失败队列"
+            signals = [
+                queue._deserialize_signal(signal_json)
+                for signal_json in await redis.zrange(queue.failed_key, 0, limit - 1)
+            ]
+            total = await queue.get_failed_size()
         else:
             print(f"❌ 未知队列: {queue_name}")
             return
 
-        signals = await redis.zrange(key, 0, limit - 1, withscores=True)
-
         if not signals:
             print(f"\n✅ {title}为空")
             return
@@ -196,9 +168,8 @@ async def show_sample_signals(queue: SignalQueue, queue_name: str, limit: int =
         print(f"{'标的':<12} {'类型':<12} {'评分':<8} {'排队时间':<20}")
         print("-" * 70)
 
-        for signal_json, score in signals:
+        for signal in signals:
             try:
-                signal = queue._deserialize_signal(signal_json)
                 symbol = signal.get('symbol', 'N/A')
                 signal_type = signal.get('type', 'N/A')
                 signal_score = signal.get('score', 0)
@@ -213,7 +184,6 @@ async def show_sample_signals(queue: SignalQueue, queue_name: str, limit: int =
                 print(f"无法解析信号: {e}")
                 continue
 
-        total = await redis.zcard(key)
         if total > limit:
             print(f"\n... 还有 {total - limit} 个信号未显示")
 
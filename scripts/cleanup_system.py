@@ -108,9 +108,9 @@ async def cleanup_redis_queues():
 
     if choice == '1':
         # 清空失败队列
-        count = await signal_queue.redis.zcard(signal_queue.failed_key)
+        count = stats['failed_size']
         if count > 0:
-            await signal_queue.redis.delete(signal_queue.failed_key)
+            await signal_queue.clear_queue('failed')
             print(f"✅ 已清空失败队列 ({count} 个信号)")
         else:
             print("✅ 失败队列已经是空的")
@@ -118,9 +118,8 @@ async def cleanup_redis_queues():
     elif choice == '2':
         confirm = input("⚠️⚠️⚠️  确认清空所有队列? 输入 'DELETE ALL' 确认: ")
         if confirm == 'DELETE ALL':
-            await signal_queue.redis.delete(signal_queue.queue_key)
-            await signal_queue.redis.delete(signal_queue.processing_key)
-            await signal_queue.redis.delete(signal_queue.failed_key)
+            # 同时删除信号数据和索引
+            await signal_queue.clear_queue('all')
             print("✅ 已清空所有队列")
         else:
             print("❌ 取消清空")
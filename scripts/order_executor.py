@@ -34,23 +34,30 @@ from longport import openapi
 from longport_quant.config import get_settings
 from longport_quant.execution.client import LongportTradingClient
 from longport_quant.execution.smart_router import SmartOrderRouter, OrderRequest, ExecutionStrategy
+from longport_quant.execution.order_tracker import OrderTracker
 from longport_quant.execution.risk_assessor import RiskAssessor
+from longport_quant.execution.lanes import BuyingPowerLedger, SignalLanes, is_urgent_signal
 from longport_quant.risk.regime import RegimeClassifier
 from longport_quant.risk.rebalancer import RegimeRebalancer
 from longport_quant.risk.kelly import KellyCalculator
-from longport_quant.data.quote_client import QuoteDataClient
-from longport_quant.messaging import SignalQueue
+from longport_quant.data.market_gateway import open_quote_client
+from longport_quant.data.security_reference import SecurityReferenceService
+from longport_quant.messaging import PostTradeOutbox, SignalQueue
 from longport_quant.notifications import MultiChannelNotifier
-from longport_quant.utils import LotSizeHelper
+from longport_quant.utils import LotSizeHelper, StageTimer, gather_or_cancel
 from longport_quant.persistence.order_manager import OrderManager
 from longport_quant.persistence.stop_manager import StopLossManager
+from longport_quant.persistence.account_snapshot import AccountSnapshotService
 from longport_quant.persistence.position_manager import RedisPositionManager
 from longport_quant.persistence.db import DatabaseSessionManager
-from longport_quant.persistence.models import SecurityUniverse, SecurityStatic
-from sqlalchemy import select
 from datetime import datetime
 
 
+# 买入成交后由出库箱按顺序执行的步骤（对应 OrderExecutor._post_trade_<step>）
+# 持仓与订单记录用于防止重复开仓，在 execute_order 返回前同步完成，不进出库箱
+POST_TRADE_STEPS = ("backup_stop", "backup_profit", "stop_record", "notify")
+
+
 class InsufficientFundsError(Exception):
     """资金不足异常"""
     pass
@@ -76,7 +83,8 @@ class OrderExecutor:
             queue_key=self.settings.signal_queue_key,
             processing_key=self.settings.signal_processing_key,
             failed_key=self.settings.signal_failed_key,
-            max_retries=self.settings.signal_max_retries
+            max_retries=self.settings.signal_max_retries,
+            payload_codec=self.settings.signal_payload_codec
         )
 
         # 交易参数
@@ -101,7 +109,10 @@ class OrderExecutor:
         self.quote_client = None
         self.slack = None
         self.smart_router = None  # SmartOrderRouter for TWAP/VWAP execution
-        self.lot_size_helper = LotSizeHelper()
+        self.order_tracker = None  # 订单推送跟踪（OrderTracker）
+        self.account_snapshot = None  # 跨进程共享账户快照（AccountSnapshotService）
+        self.security_ref = None  # 证券静态数据（手数/名称，SecurityReferenceService）
+        self.lot_size_helper = LotSizeHelper()  # run() 中绑定 security_ref
         self.order_manager = OrderManager()
         self.stop_manager = StopLossManager()
 
@@ -123,13 +134,25 @@ class OrderExecutor:
             key_prefix="trading"
         )
 
+        # 🚦 并发执行：快速/普通通道 + 标的锁 + 买入资金预留
+        self.buying_power = BuyingPowerLedger(
+            hold_ttl=float(getattr(self.settings, 'buying_power_hold_ttl', 60.0))
+        )
+        self.lanes = SignalLanes(
+            handler=self._process_signal,
+            workers=self.settings.order_executor_workers,
+            fast_workers=self.settings.order_executor_fast_workers,
+            is_urgent=self._is_urgent_signal,
+        )
+        self._batch_tasks: set[asyncio.Task] = set()
+        self.outbox: PostTradeOutbox | None = None  # 成交后任务出库箱（run() 中启动）
+        self._inline_post_trade: PostTradeOutbox | None = None  # 出库箱不可用时直接执行成交后步骤（只创建一次）
+
         # 持仓追踪
         self.positions_with_stops = {}  # {symbol: {entry_price, stop_loss, take_profit}}
 
         # 【新增】账户信息缓存（避免API限流）
-        self._account_cache = None
-        self._account_cache_time = None
-        self._account_cache_ttl = 30  # 缓存30秒
+        self._account_cache_ttl = 30  # 账户快照默认有效期（settings.account_snapshot_ttl 优先）
 
         # 【新增】市场状态（Regime）管理
         self.current_regime = "RANGE"
@@ -157,12 +180,19 @@ class OrderExecutor:
 
         try:
             # 使用async with正确初始化客户端
-            async with QuoteDataClient(self.settings) as quote_client, \
+            async with open_quote_client(self.settings) as quote_client, \
                        LongportTradingClient(self.settings) as trade_client:
 
                 # 保存客户端引用
                 self.quote_client = quote_client
                 self.trade_client = trade_client
+                self.rebalancer.quote_client = quote_client
+                self.account_snapshot = AccountSnapshotService(
+                    trade_client,
+                    redis_url=self.settings.redis_url,
+                    account_id=self.account_id,
+                    ttl=float(getattr(self.settings, 'account_snapshot_ttl', self._account_cache_ttl)),
+                )
 
                 # 初始化通知（支持Slack和Discord）
                 slack_enabled = bool(getattr(self.settings, 'slack_enabled', True))
@@ -178,10 +208,38 @@ class OrderExecutor:
                 await self.position_manager.connect()
                 logger.info("✅ Redis持仓管理器已连接")
 
+                # 📮 成交后任务出库箱：备份条件单、止损记录、通知在后台完成
+                if self.settings.post_trade_outbox_enabled:
+                    self.outbox = self._build_post_trade_outbox()
+                    try:
+                        await self.outbox.recover()
+                        self.outbox.start()
+                        logger.info(f"✅ 成交后任务出库箱已启动: {self.outbox.key}")
+                    except Exception as e:
+                        logger.warning(f"⚠️ 启动出库箱失败，成交后任务将直接执行: {e}")
+                        self.outbox = None
+
                 # 🔥 初始化SmartOrderRouter（用于TWAP/VWAP算法订单）
                 db_manager = DatabaseSessionManager(self.settings.database_dsn, auto_init=True)
+
+                # 📊 证券静态数据（手数/名称）：加载信号生成器已写入Redis的缓存，首单无需额外API请求
+                self.security_ref = SecurityReferenceService(
+                    quote_client=quote_client, db=db_manager, redis_url=self.settings.redis_url
+                )
+                await self.security_ref.preload()
+                self.security_ref.start_refresh()
+                self.lot_size_helper = LotSizeHelper(reference=self.security_ref)
+
                 trade_ctx = await trade_client.get_trade_context()
-                self.smart_router = SmartOrderRouter(trade_ctx, db_manager, quote_client=quote_client, settings=self.settings)
+                # 📡 订单推送跟踪（成交等待由推送驱动，订阅失败时回退轮询）
+                self.order_tracker = OrderTracker(trade_ctx)
+                if await self.order_tracker.start():
+                    # 订单变化（提交/成交/撤单）后账户快照立即失效
+                    self.account_snapshot.attach(self.order_tracker)
+                self.smart_router = SmartOrderRouter(
+                    trade_ctx, db_manager, quote_client=quote_client, settings=self.settings,
+                    order_tracker=self.order_tracker, security_ref=self.security_ref
+                )
                 logger.info("✅ SmartOrderRouter已初始化（支持TWAP/VWAP算法订单，使用QuoteClient获取手数）")
 
                 # 🔥 启动Regime状态更新任务（可选）
@@ -237,10 +295,24 @@ class OrderExecutor:
                 logger.info(f"📊 智能优先级: 高分信号优先，止损信号立即执行")
                 logger.info("")
 
+                # 🚦 执行通道：快速通道（止损/紧急卖出）+ 普通通道（N个并发执行），同一标的串行
+                self.lanes.start()
+                logger.info(
+                    f"🚦 执行通道: 普通{self.lanes.workers['normal']}个并发, "
+                    f"快速通道{self.lanes.workers['fast']}个（止损/紧急卖出不被TWAP买单阻塞）"
+                )
+
                 while True:
                     try:
-                        # 【新批量模式】收集一批信号
-                        batch = await self._consume_batch()
+                        if self.lanes.normal_saturated:
+                            # 普通通道已满：只取队首的紧急信号，其余留在Redis队列中排序
+                            batch = await self._consume_urgent()
+                            if not batch:
+                                await self.lanes.wait_for_capacity(self.settings.order_executor_urgent_poll)
+                                continue
+                        else:
+                            # 【新批量模式】收集一批信号
+                            batch = await self._consume_batch()
 
                         if not batch:
                             # 🔥 批次为空，使用配置的休眠时间避免CPU空转
@@ -249,125 +321,7 @@ class OrderExecutor:
                             await asyncio.sleep(sleep_time)
                             continue
 
-                        logger.info(f"\n{'='*70}")
-                        logger.info(f"🚀 开始处理批次: {len(batch)}个信号")
-                        logger.info(f"{'='*70}\n")
-
-                        # 处理批次中的每个信号（按score降序）
-                        remaining_signals = []
-                        funds_exhausted = False
-
-                        for idx, signal in enumerate(batch, 1):
-                            symbol = signal.get('symbol')
-                            signal_type = signal.get('type')
-                            score = signal.get('score', 0)
-
-                            logger.info(f"\n--- [{idx}/{len(batch)}] 处理信号: {symbol} ---")
-                            logger.info(f"  类型={signal_type}, 评分={score}")
-
-                            # 执行订单（带超时保护）
-                            try:
-                                # 60秒超时保护
-                                await asyncio.wait_for(
-                                    self.execute_order(signal),
-                                    timeout=60.0
-                                )
-
-                                # 标记信号处理完成
-                                await self.signal_queue.mark_signal_completed(signal)
-                                logger.success(f"  ✅ [{idx}/{len(batch)}] {symbol} 处理完成")
-
-                            except asyncio.TimeoutError:
-                                error_msg = "订单执行超时（60秒）"
-                                logger.error(f"  ❌ {error_msg}: {symbol}")
-
-                                # 标记信号失败（会自动重试）
-                                await self.signal_queue.mark_signal_failed(
-                                    signal,
-                                    error_message=error_msg,
-                                    retry=True
-                                )
-
-                            except InsufficientFundsError as e:
-                                # 资金不足：只延迟当前信号，继续处理后续信号（可能需要更少资金）
-                                error_detail = str(e)
-                                logger.warning(f"  ⚠️ [{idx}/{len(batch)}] {symbol}: 资金不足")
-                                logger.info(f"  📋 详细原因:\n{error_detail}")
-                                logger.info(f"  💡 策略：仅延迟当前信号，继续处理后续{len(batch)-idx}个信号")
-
-                                # 🔥 检查重试次数，避免无限重试
-                                retry_count = signal.get('retry_count', 0)
-                                max_funds_retries = 3  # 资金不足最多重试3次
-
-                                if retry_count >= max_funds_retries:
-                                    logger.warning(
-                                        f"  ⚠️ {symbol}: 资金不足已重试{retry_count}次，停止重试\n"
-                                        f"     建议: 等待资金充足后手动处理，或优化持仓释放资金"
-                                    )
-                                    # 标记为失败，不再重试
-                                    await self.signal_queue.mark_signal_failed(
-                                        signal,
-                                        error_message=f"资金不足重试{retry_count}次后放弃",
-                                        retry=False  # 不再重试
-                                    )
-
-                                    # 发送最终放弃的通知
-                                    try:
-                                        await self._send_insufficient_funds_final_notification(
-                                            signal=signal,
-                                            retry_count=retry_count,
-                                            error_detail=error_detail
-                                        )
-                                    except Exception as notify_err:
-                                        logger.warning(f"  ⚠️ 发送通知失败: {notify_err}")
-                                else:
-                                    # 还可以重试
-                                    # 注释掉单独通知，避免与批次汇总通知重复
-                                    # 批次处理完成后会统一发送汇总通知，信息更简洁
-                                    # try:
-                                    #     await self._send_insufficient_funds_notification(
-                                    #         signal=signal,
-                                    #         error_detail=error_detail
-                                    #     )
-                                    # except Exception as notify_err:
-                                    #     logger.warning(f"  ⚠️ 发送资金不足通知失败: {notify_err}")
-
-                                    # 只将当前信号加入待重新入队列表
-                                    remaining_signals.append(signal)
-
-                                # 标记此信号为资金不足（用于统计）
-                                funds_exhausted = True
-                                # 不break，继续处理后续信号
-
-                            except Exception as e:
-                                error_msg = f"{type(e).__name__}: {str(e)}"
-                                logger.error(f"  ❌ 执行订单失败: {error_msg}")
-
-                                # 标记信号失败（会自动重试）
-                                await self.signal_queue.mark_signal_failed(
-                                    signal,
-                                    error_message=error_msg,
-                                    retry=True
-                                )
-
-                        # 批次处理完成后的统计
-                        logger.info(f"\n{'='*70}")
-                        if remaining_signals:
-                            logger.warning(f"⚠️ 批次处理完成: 部分信号资金不足")
-                            logger.info(f"  已处理: {len(batch)}个信号")
-                            logger.info(f"  成功/失败: {len(batch)-len(remaining_signals)}/{len(remaining_signals)}个")
-                            logger.info(f"  待重试: {len(remaining_signals)}个信号（资金不足）")
-
-                            # 重新入队资金不足的信号
-                            requeued = await self._requeue_remaining(
-                                remaining_signals,
-                                reason="资金不足"
-                            )
-                            logger.info(f"  ✅ 已重新入队: {requeued}个信号")
-                        else:
-                            logger.success(f"✅ 批次处理完成: {len(batch)}/{len(batch)}个信号全部成功")
-
-                        logger.info(f"{'='*70}\n")
+                        self._dispatch_batch(batch)
 
                     except asyncio.CancelledError:
                         logger.info("⚠️ 收到取消信号，正在退出...")
@@ -381,47 +335,215 @@ class OrderExecutor:
         except KeyboardInterrupt:
             logger.info("\n⚠️ 收到中断信号，正在退出...")
         finally:
+            # 停止执行通道（未完成的信号留在processing队列，重启时恢复）
+            await self.lanes.stop()
+            for task in list(self._batch_tasks):
+                task.cancel()
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+            if self.outbox:
+                # 未完成的成交后任务保留在Redis中，重启后继续执行
+                await self.outbox.close()
+
             # 关闭Redis连接
             await self.signal_queue.close()
             await self.position_manager.close()
+            if self.order_tracker:
+                await self.order_tracker.stop()
+            if self.account_snapshot:
+                await self.account_snapshot.close()
+            if self.security_ref:
+                await self.security_ref.close()
             logger.info("✅ 资源清理完成")
 
-    async def _get_account_with_cache(self, force_refresh: bool = False) -> Dict:
+    def _is_urgent_signal(self, signal: Dict) -> bool:
+        """止损/紧急卖出信号（或评分达到止损优先级）走快速通道"""
+        return is_urgent_signal(signal, self.settings.stop_loss_priority)
+
+    async def _consume_urgent(self) -> list[Dict]:
         """
-        获取账户信息（带缓存，避免API限流）
+        普通通道满载时只取紧急信号
 
-        Args:
-            force_refresh: 是否强制刷新缓存
+        队首不是止损/紧急卖出信号时不消费，普通信号留在Redis队列中按优先级等待。
+        查看与消费之间队首可能已被其他消费者取走，因此以实际取出的信号为准：
+        取到的不是紧急信号时它已进入processing队列，仍交给普通通道排队执行。
 
         Returns:
-            账户信息字典
+            list[Dict]: 取出的信号（最多1个），没有则为空列表
         """
-        from datetime import datetime, timedelta
+        head = await self.signal_queue.peek_signal()
+        if not head or not self._is_urgent_signal(head):
+            return []
+
+        signal = await self.signal_queue.consume_signal(
+            signal_ttl_seconds=self.settings.signal_ttl_seconds,
+            max_delay_seconds=self.settings.max_delay_seconds
+        )
+        if not signal:
+            return []
+
+        if not self._is_urgent_signal(signal):
+            logger.info(
+                f"  ↪️ 紧急信号{head.get('symbol')}已被其他消费者取走，"
+                f"取出的普通信号进入普通通道排队: {signal.get('symbol')} ({signal.get('type')})"
+            )
+            return [signal]
+
+        logger.info(
+            f"  🚨 普通通道满载，快速通道接收紧急信号: "
+            f"{signal.get('symbol')} ({signal.get('type')}, {signal.get('score', 0)}分)"
+        )
+        return [signal]
+
+    def _dispatch_batch(self, batch: list[Dict]):
+        """把批次中的信号分发到执行通道，批次结束后的统计与资金不足重新入队在后台完成"""
+        logger.info(f"\n{'='*70}")
+        logger.info(f"🚀 开始处理批次: {len(batch)}个信号")
+        logger.info(f"{'='*70}\n")
+
+        futures = []
+        for signal in batch:
+            lane = self.lanes.lane_for(signal)
+            logger.info(
+                f"  ➡️ [{lane}] {signal.get('symbol')}: "
+                f"类型={signal.get('type')}, 评分={signal.get('score', 0)}"
+            )
+            futures.append(self.lanes.submit(signal))
+
+        task = asyncio.create_task(self._finish_batch(batch, futures))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _finish_batch(self, batch: list[Dict], futures: list[asyncio.Future]):
+        """等待批次内信号全部执行完，统计结果并重新入队资金不足的信号"""
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        remaining_signals = [signal for signal, result in zip(batch, results) if result is True]
+
+        # 批次处理完成后的统计
+        logger.info(f"\n{'='*70}")
+        if remaining_signals:
+            logger.warning(f"⚠️ 批次处理完成: 部分信号资金不足")
+            logger.info(f"  已处理: {len(batch)}个信号")
+            logger.info(f"  成功/失败: {len(batch)-len(remaining_signals)}/{len(remaining_signals)}个")
+            logger.info(f"  待重试: {len(remaining_signals)}个信号（资金不足）")
+
+            # 重新入队资金不足的信号
+            try:
+                requeued = await self._requeue_remaining(
+                    remaining_signals,
+                    reason="资金不足"
+                )
+                logger.info(f"  ✅ 已重新入队: {requeued}个信号")
+            except Exception as e:
+                logger.error(f"  ❌ 重新入队失败: {e}")
+        else:
+            logger.success(f"✅ 批次处理完成: {len(batch)}/{len(batch)}个信号全部成功")
 
-        now = datetime.now()
+        logger.info(f"{'='*70}\n")
 
-        # 检查缓存是否有效
-        if not force_refresh and self._account_cache is not None and self._account_cache_time is not None:
-            cache_age = (now - self._account_cache_time).total_seconds()
-            if cache_age < self._account_cache_ttl:
-                logger.debug(f"  📦 使用账户信息缓存（{cache_age:.1f}秒前）")
-                return self._account_cache
+    async def _process_signal(self, signal: Dict) -> bool:
+        """
+        执行单个信号并更新其队列状态（由执行通道的worker在标的锁内调用）
+
+        Returns:
+            bool: True表示资金不足且需要延迟重新入队（由批次统一处理）
+        """
+        symbol = signal.get('symbol')
+        signal_type = signal.get('type')
+        score = signal.get('score', 0)
 
-        # 缓存失效或强制刷新，重新获取
+        logger.info(f"\n--- 处理信号: {symbol} ---")
+        logger.info(f"  类型={signal_type}, 评分={score}")
+
+        # 执行订单（带超时保护）
         try:
-            logger.debug(f"  🔄 刷新账户信息缓存...")
-            account = await self.trade_client.get_account()
-            self._account_cache = account
-            self._account_cache_time = now
-            logger.debug(f"  ✅ 账户信息已缓存（TTL={self._account_cache_ttl}秒）")
-            return account
+            # 60秒超时保护（等待标的锁的时间不计入）
+            await asyncio.wait_for(
+                self.execute_order(signal),
+                timeout=60.0
+            )
+
+            # 标记信号处理完成
+            await self.signal_queue.mark_signal_completed(signal)
+            logger.success(f"  ✅ {symbol} 处理完成")
+
+        except asyncio.TimeoutError:
+            error_msg = "订单执行超时（60秒）"
+            logger.error(f"  ❌ {error_msg}: {symbol}")
+
+            # 标记信号失败（会自动重试）
+            await self.signal_queue.mark_signal_failed(
+                signal,
+                error_message=error_msg,
+                retry=True
+            )
+
+        except InsufficientFundsError as e:
+            # 资金不足：只延迟当前信号，其他信号照常执行（可能需要更少资金）
+            error_detail = str(e)
+            logger.warning(f"  ⚠️ {symbol}: 资金不足")
+            logger.info(f"  📋 详细原因:\n{error_detail}")
+
+            # 🔥 检查重试次数，避免无限重试
+            retry_count = signal.get('retry_count', 0)
+            max_funds_retries = 3  # 资金不足最多重试3次
+
+            if retry_count < max_funds_retries:
+                # 还可以重试：批次结束后统一重新入队并发送汇总通知
+                return True
+
+            logger.warning(
+                f"  ⚠️ {symbol}: 资金不足已重试{retry_count}次，停止重试\n"
+                f"     建议: 等待资金充足后手动处理，或优化持仓释放资金"
+            )
+            # 标记为失败，不再重试
+            await self.signal_queue.mark_signal_failed(
+                signal,
+                error_message=f"资金不足重试{retry_count}次后放弃",
+                retry=False  # 不再重试
+            )
+
+            # 发送最终放弃的通知
+            try:
+                await self._send_insufficient_funds_final_notification(
+                    signal=signal,
+                    retry_count=retry_count,
+                    error_detail=error_detail
+                )
+            except Exception as notify_err:
+                logger.warning(f"  ⚠️ 发送通知失败: {notify_err}")
+
         except Exception as e:
-            logger.warning(f"  ⚠️ 刷新账户信息失败: {e}")
-            # 如果有旧缓存，降级使用
-            if self._account_cache is not None:
-                logger.warning(f"  ⚠️ 降级使用旧缓存")
-                return self._account_cache
-            raise
+            error_msg = f"{type(e).__name__}: {str(e)}"
+            logger.error(f"  ❌ 执行订单失败: {error_msg}")
+
+            # 标记信号失败（会自动重试）
+            await self.signal_queue.mark_signal_failed(
+                signal,
+                error_message=error_msg,
+                retry=True
+            )
+
+        return False
+
+    async def _get_account_with_cache(self, force_refresh: bool = False) -> Dict:
+        """
+        获取账户信息（带缓存，避免API限流）
+
+        与 signal_generator / rebalancer 共享同一份Redis账户快照，
+        订单推送到达时快照失效；刷新失败时降级使用旧快照。
+
+        Args:
+            force_refresh: 是否强制刷新缓存
+
+        Returns:
+            账户信息字典
+        """
+        if self.account_snapshot is None:
+            return await self.trade_client.get_account()
+        account = await self.account_snapshot.get(force_refresh=force_refresh)
+        # 快照已反映的已提交买单不再重复扣除预留
+        self.buying_power.observe(self.account_snapshot.served_version)
+        return account
 
     async def _get_hk_positions_market_value(self, account: Dict) -> float:
         """
@@ -494,12 +616,42 @@ class OrderExecutor:
 
         # 1. 区分买入和卖出
         if side == 'BUY':
-            await self._execute_buy_order(signal)
+            timer = StageTimer()
+            reservation_key = self._reservation_key(signal)
+            try:
+                await self._execute_buy_order(signal, timer=timer)
+            except BaseException:
+                # 下单失败，立即释放预留的购买力
+                self.buying_power.release(reservation_key)
+                raise
+            else:
+                await self._hold_buying_power(reservation_key)
+            finally:
+                logger.info(f"  ⏱️ {symbol} 下单阶段耗时: {timer.summary()}")
         elif side == 'SELL':
             await self._execute_sell_order(signal)
         else:
             logger.error(f"❌ 未知的订单方向: {side}")
 
+    async def _hold_buying_power(self, key: str) -> None:
+        """
+        订单已提交：保留预留的购买力，直到读到反映该订单的账户快照
+
+        主动使账户快照失效，失效后获取的快照（版本号不低于返回值）才包含这笔订单；
+        在此之前预留继续从可用资金中扣除，超时（BUYING_POWER_HOLD_TTL）后自动释放。
+        """
+        if self.account_snapshot is None:
+            # 每次都直接请求券商API，下次读取即包含该订单
+            self.buying_power.release(key)
+            return
+        version = await self.account_snapshot.invalidate()
+        self.buying_power.hold(key, version)
+
+    @staticmethod
+    def _reservation_key(signal: Dict) -> str:
+        """购买力预留的key（同一信号重试时保持不变）"""
+        return signal.get('signal_id') or f"{signal.get('symbol')}:{id(signal)}"
+
     async def _analyze_position_for_rotation(
         self,
         position: Dict,
@@ -622,16 +774,24 @@ class OrderExecutor:
         symbol: str,
         current_price: float,
         score: int,
-        account: Dict
+        account: Dict,
+        lot_size: int,
+        dynamic_budget: float,
+        broker_max_qty: int
     ) -> tuple[bool, str, Optional[float]]:
         """
         购买力预检查 - 在执行订单前判断是否有足够资金或可换仓空间
 
+        手数、动态预算和券商可买数量由调用方（已并行获取）传入，这里不再重复请求。
+
         Args:
             symbol: 股票代码
             current_price: 当前价格
             score: 信号评分
             account: 账户信息
+            lot_size: 每手股数
+            dynamic_budget: 动态预算
+            broker_max_qty: 券商允许的最大买入数量（含Fallback现金估算）
 
         Returns:
             (是否可以继续, 详细说明, 可用预算)
@@ -641,31 +801,13 @@ class OrderExecutor:
         buy_power = float(account.get("buy_power", {}).get(currency, 0))
         remaining_finance = float(account.get("remaining_finance", {}).get(currency, 0))
 
-        # 1. 获取手数
-        lot_size = await self.lot_size_helper.get_lot_size(symbol, self.quote_client)
-
-        # 2. 计算最小所需资金（买1手）
+        # 1. 计算最小所需资金（买1手）
         min_required_cash = current_price * lot_size
 
-        # 3. 计算动态预算
-        signal_dict = {
-            'symbol': symbol,
-            'price': current_price,
-            'score': score,
-            'type': 'BUY'
-        }
-        dynamic_budget = await self._calculate_dynamic_budget(account, signal_dict)
-
-        # 4. 券商端可买数量预估（避免明知无法下单仍然尝试）
-        broker_max_qty = await self._estimate_available_quantity(
-            symbol=symbol,
-            price=current_price,
-            lot_size=lot_size,
-            currency=None
-        )
+        # 2. 券商可买数量不足1手时不再尝试下单
         broker_allows_purchase = broker_max_qty >= lot_size and broker_max_qty > 0
 
-        # 5. 判断资金是否充足
+        # 3. 判断资金是否充足
         has_sufficient_funds = (
             dynamic_budget >= min_required_cash and
             (available_cash >= min_required_cash or remaining_finance >= min_required_cash)
@@ -691,7 +833,7 @@ class OrderExecutor:
                 f"     可能原因: 购买力受限、融资额度不足或待结算资金占用"
             )
 
-        # 6. 资金缺口 & 是否允许尝试轮换（使用市场专用阈值）
+        # 4. 资金缺口 & 是否允许尝试轮换（使用市场专用阈值）
         shortfall_cash = max(0.0, min_required_cash - available_cash)
         effective_power = max(available_cash, buy_power, remaining_finance)
         shortfall_power = max(0.0, min_required_cash - effective_power)
@@ -708,7 +850,7 @@ class OrderExecutor:
                 f"   • 买入力: ${buy_power:.2f}, 剩余融资: ${remaining_finance:.2f}"
             )
 
-        # 7. 🚫 港股资金分配限制检查（仅针对港股标的）
+        # 5. 🚫 港股资金分配限制检查（仅针对港股标的）
         if ".HK" in symbol:
             try:
                 # 计算当前港股持仓总市值
@@ -751,7 +893,7 @@ class OrderExecutor:
                 # 检查失败时不阻止订单，但记录警告
                 pass
 
-        # 8. 获取持仓并进行分析
+        # 6. 获取持仓并进行分析
         try:
             positions = account.get("positions") or []
             if not positions:
@@ -917,40 +1059,75 @@ class OrderExecutor:
         reason_lines.append("   💡 详细分析已发送到Slack，建议手动评估调整")
         return False, "\n".join(reason_lines), None
 
-    async def _execute_buy_order(self, signal: Dict):
-        """执行买入订单"""
+    async def _execute_buy_order(self, signal: Dict, timer: Optional[StageTimer] = None):
+        """
+        执行买入订单
+
+        下单前互不依赖的查询并行执行（账户/手数/买卖盘，随后动态预算/券商可买量），购买力预检查复用这些结果，
+        成交后的持仓与订单记录、备份条件单、止损记录和通知写入出库箱由后台worker完成。
+
+        Args:
+            signal: 信号数据
+            timer: 阶段计时器（由 execute_order 传入，用于记录各阶段耗时）
+        """
+        timer = timer or StageTimer()
         symbol = signal['symbol']
         signal_type = signal['type']
         current_price = signal.get('price', 0)
         score = signal.get('score', 0)
 
-        # 1. 获取账户信息（使用缓存）
-        try:
-            account = await self._get_account_with_cache()
-        except Exception as e:
-            logger.error(f"❌ 获取账户信息失败: {e}")
-            raise
-
-        # 2. 弱买入信号过滤
+        # 1. 弱买入信号过滤（无需任何查询）
         if signal_type == "WEAK_BUY" and score < 35:
             logger.info(f"  ⏭️ 跳过弱买入信号 (评分: {score})")
             return  # 直接返回，信号会被标记为完成
 
-        # 3. 🔥 【新增】购买力预检查 - 提前判断资金状况
-        can_proceed, check_message, suggested_budget = await self._preflight_check_buying_power(
-            symbol=symbol,
-            current_price=current_price,
-            score=score,
-            account=account
+        # 2. 并行获取账户信息（使用缓存）、手数、买卖盘
+        with timer.stage("lookups"):
+            try:
+                raw_account, lot_size, (bid_price, ask_price) = await gather_or_cancel(
+                    self._get_account_with_cache(),
+                    self.lot_size_helper.get_lot_size(symbol, self.quote_client),
+                    self._get_bid_ask(symbol),
+                )
+            except Exception as e:
+                logger.error(f"❌ 获取账户信息/手数失败: {e}")
+                raise
+        # 扣除并发执行中的买单已预留的资金，后续预算/资金检查都基于剩余额度
+        account = self.buying_power.apply(raw_account)
+
+        # 3. 计算下单价格
+        order_price = self._calculate_order_price(
+            "BUY",
+            current_price,
+            bid_price=bid_price,
+            ask_price=ask_price,
+            atr=signal.get('indicators', {}).get('atr'),
+            symbol=symbol
         )
 
+        # 4. 🔥 并行获取动态预算、券商可买数量（含Fallback现金估算），再用结果做购买力预检查
+        with timer.stage("checks"):
+            dynamic_budget, broker_max_qty_final = await gather_or_cancel(
+                self._calculate_dynamic_budget(account, signal),
+                self._broker_quantity_limit(symbol, order_price, lot_size),
+            )
+            can_proceed, check_message, suggested_budget = await self._preflight_check_buying_power(
+                symbol=symbol,
+                current_price=current_price,
+                score=score,
+                account=account,
+                lot_size=lot_size,
+                dynamic_budget=dynamic_budget,
+                broker_max_qty=broker_max_qty_final
+            )
+
         logger.info(f"  💰 购买力预检查结果:\n{check_message}")
 
         if not can_proceed:
             # 资金不足且无法换仓，直接抛出异常，避免无意义的下单尝试
             raise InsufficientFundsError(check_message)
 
-        # 4. 资金检查（保留原有逻辑以兼容）
+        # 5. 资金检查（保留原有逻辑以兼容）
         currency = "HKD" if ".HK" in symbol else "USD"
         available_cash = float(account["cash"].get(currency, 0))
         buy_power = float(account.get("buy_power", {}).get(currency, 0))
@@ -1010,13 +1187,7 @@ class OrderExecutor:
                     f"融资额度不足（剩余${remaining_finance:,.2f}，需要>$1,000）"
                 )
 
-        # 4. 计算动态预算
-        dynamic_budget = await self._calculate_dynamic_budget(account, signal)
-
-        # 5. 获取手数
-        lot_size = await self.lot_size_helper.get_lot_size(symbol, self.quote_client)
-
-        # 6. 计算购买数量
+        # 6. 计算购买数量（动态预算与手数已在上面并行获取）
         quantity = self.lot_size_helper.calculate_order_quantity(
             symbol, dynamic_budget, current_price, lot_size
         )
@@ -1084,7 +1255,8 @@ class OrderExecutor:
 
                 # 重新获取账户信息（轮换后强制刷新缓存）
                 try:
-                    account = await self._get_account_with_cache(force_refresh=True)
+                    raw_account = await self._get_account_with_cache(force_refresh=True)
+                    account = self.buying_power.apply(raw_account)
                     available_cash = float(account["cash"].get(currency, 0))
 
                     if available_cash >= required_cash:
@@ -1106,6 +1278,9 @@ class OrderExecutor:
                         num_lots = quantity // lot_size
                         required_cash = current_price * quantity
 
+                        # 轮换释放了资金，重新获取券商可买数量
+                        broker_max_qty_final = await self._broker_quantity_limit(symbol, order_price, lot_size)
+
                         logger.info(
                             f"  📊 轮换后重新计算: 预算=${dynamic_budget:.2f}, "
                             f"数量={quantity}股 ({num_lots}手), 需要${required_cash:.2f}"
@@ -1127,48 +1302,16 @@ class OrderExecutor:
                     f"资金不足且无法通过轮换释放（需要${required_cash:.2f}，可用${available_cash:.2f}）"
                 )
 
-        # 8. 获取买卖盘价格
-        bid_price, ask_price = await self._get_bid_ask(symbol)
-
-        # 9. 计算下单价格
-        order_price = self._calculate_order_price(
-            "BUY",
-            current_price,
-            bid_price=bid_price,
-            ask_price=ask_price,
-            atr=signal.get('indicators', {}).get('atr'),
-            symbol=symbol
-        )
-
-        # 9.1 券商额度终检：防止明知可买量为0仍然走下单流程
-        broker_max_qty_final = await self._estimate_available_quantity(
-            symbol=symbol,
-            price=order_price,
-            lot_size=lot_size,
-            currency=None
-        )
-
+        # 9. 券商额度终检：防止明知可买量为0仍然走下单流程（可买量已在预检查前获取）
         if broker_max_qty_final <= 0:
-            fallback_qty = await self._fallback_cash_estimate(
-                symbol=symbol,
-                price=order_price,
-                lot_size=lot_size
-            )
-
-            if fallback_qty <= 0:
-                reason_lines = [
-                    f"❌ 无法买入 {symbol}:",
-                    f"   • 券商预估可买数量为0股 (< {lot_size}股)",
-                    f"   • 订单参考价: ${order_price:.2f}",
-                    f"   • 买入力: ${buy_power:.2f}, 剩余融资: ${remaining_finance:.2f}",
-                    "   💡 建议: 归还部分融资或等待持仓结算释放购买力"
-                ]
-                raise InsufficientFundsError("\n".join(reason_lines))
-
-            logger.info(
-                f"  ✅ 使用Fallback估算替代券商可买量: {fallback_qty}股"
-            )
-            broker_max_qty_final = fallback_qty
+            reason_lines = [
+                f"❌ 无法买入 {symbol}:",
+                f"   • 券商预估可买数量为0股 (< {lot_size}股)",
+                f"   • 订单参考价: ${order_price:.2f}",
+                f"   • 买入力: ${buy_power:.2f}, 剩余融资: ${remaining_finance:.2f}",
+                "   💡 建议: 归还部分融资或等待持仓结算释放购买力"
+            ]
+            raise InsufficientFundsError("\n".join(reason_lines))
 
         if quantity > broker_max_qty_final:
             logger.warning(
@@ -1188,66 +1331,84 @@ class OrderExecutor:
                 f"券商限额不足，无法买入 {symbol}（允许0股）"
             )
 
+        # 9.1 预留购买力：检查与登记同步完成，并发买单不会同时用掉同一笔资金（账户快照反映该订单后释放）
+        capacity = max(
+            float(raw_account["cash"].get(currency, 0)),
+            float(raw_account.get("buy_power", {}).get(currency, 0)),
+            float(raw_account.get("remaining_finance", {}).get(currency, 0)),
+        )
+        reservation_cost = order_price * quantity
+        if not self.buying_power.reserve(self._reservation_key(signal), currency, reservation_cost, capacity):
+            raise InsufficientFundsError(
+                f"购买力已被并发买单占用（需要${reservation_cost:,.2f}，"
+                f"{currency}额度${capacity:,.2f}，已预留${self.buying_power.reserved(currency):,.2f}）"
+            )
+        logger.debug(
+            f"  🔒 预留购买力 {currency} ${reservation_cost:,.2f} "
+            f"(累计预留${self.buying_power.reserved(currency):,.2f})"
+        )
+
         # 10. 提交订单（分批建仓 或 TWAP策略）
         try:
-            # 🔥 根据配置选择建仓策略
-            if self.enable_staged_entry and score < 80:
-                # 启用分批建仓（仅对非极强信号）
-                logger.info(f"📊 使用分批建仓策略（信号评分{score}分）...")
+            with timer.stage("submit"):
+                # 🔥 根据配置选择建仓策略
+                if self.enable_staged_entry and score < 80:
+                    # 启用分批建仓（仅对非极强信号）
+                    logger.info(f"📊 使用分批建仓策略（信号评分{score}分）...")
 
-                # 🔒 标记执行状态（防止重复信号）
-                await self._mark_twap_execution(symbol, duration_seconds=3600)
+                    # 🔒 标记执行状态（防止重复信号）
+                    await self._mark_twap_execution(symbol, duration_seconds=3600)
 
-                try:
-                    final_quantity, final_price = await self._execute_staged_buy(
-                        signal=signal,
-                        total_budget=dynamic_budget,
-                        current_price=order_price
-                    )
+                    try:
+                        final_quantity, final_price = await self._execute_staged_buy(
+                            signal=signal,
+                            total_budget=dynamic_budget,
+                            current_price=order_price
+                        )
 
-                    if final_quantity == 0:
-                        raise Exception("分批建仓未成交")
-                finally:
-                    # 🔓 执行完成后移除标记
-                    await self._unmark_twap_execution(symbol)
+                        if final_quantity == 0:
+                            raise Exception("分批建仓未成交")
+                    finally:
+                        # 🔓 执行完成后移除标记
+                        await self._unmark_twap_execution(symbol)
 
-            else:
-                # 使用传统TWAP策略（一次性建仓，分批执行降低冲击）
-                order_request = OrderRequest(
-                    symbol=symbol,
-                    side="BUY",
-                    quantity=quantity,
-                    order_type="LIMIT",
-                    limit_price=order_price,
-                    strategy=ExecutionStrategy.TWAP,  # 使用TWAP策略
-                    urgency=5,  # 中等紧急度
-                    max_slippage=0.01,  # 允许1%滑点
-                    signal=signal,
-                    metadata={
-                        "signal_type": signal_type,
-                        "score": score,
-                        "stop_loss": signal.get('stop_loss'),
-                        "take_profit": signal.get('take_profit')
-                    }
-                )
+                else:
+                    # 使用传统TWAP策略（一次性建仓，分批执行降低冲击）
+                    order_request = OrderRequest(
+                        symbol=symbol,
+                        side="BUY",
+                        quantity=quantity,
+                        order_type="LIMIT",
+                        limit_price=order_price,
+                        strategy=ExecutionStrategy.TWAP,  # 使用TWAP策略
+                        urgency=5,  # 中等紧急度
+                        max_slippage=0.01,  # 允许1%滑点
+                        signal=signal,
+                        metadata={
+                            "signal_type": signal_type,
+                            "score": score,
+                            "stop_loss": signal.get('stop_loss'),
+                            "take_profit": signal.get('take_profit')
+                        }
+                    )
 
-                # 🔒 标记TWAP执行状态（防止重复信号，持续1小时）
-                await self._mark_twap_execution(symbol, duration_seconds=3600)
+                    # 🔒 标记TWAP执行状态（防止重复信号，持续1小时）
+                    await self._mark_twap_execution(symbol, duration_seconds=3600)
 
-                # 执行TWAP订单
-                logger.info(f"📊 使用TWAP策略执行订单（将在30分钟内分批下单）...")
-                try:
-                    execution_result = await self.smart_router.execute_order(order_request)
+                    # 执行TWAP订单
+                    logger.info(f"📊 使用TWAP策略执行订单（将在30分钟内分批下单）...")
+                    try:
+                        execution_result = await self.smart_router.execute_order(order_request)
 
-                    if not execution_result.success:
-                        raise Exception(f"订单执行失败: {execution_result.error_message}")
-                finally:
-                    # 🔓 执行完成后移除标记（无论成功或失败）
-                    await self._unmark_twap_execution(symbol)
+                        if not execution_result.success:
+                            raise Exception(f"订单执行失败: {execution_result.error_message}")
+                    finally:
+                        # 🔓 执行完成后移除标记（无论成功或失败）
+                        await self._unmark_twap_execution(symbol)
 
-                # 使用实际成交的数量和价格（不使用默认值）
-                final_price = execution_result.average_price
-                final_quantity = execution_result.filled_quantity
+                    # 使用实际成交的数量和价格（不使用默认值）
+                    final_price = execution_result.average_price
+                    final_quantity = execution_result.filled_quantity
 
             # 🔥 检查是否有实际成交
             if final_quantity == 0:
@@ -1283,39 +1444,7 @@ class OrderExecutor:
                 'child_orders': execution_result.child_orders
             }
 
-            # 🔥 【关键修复】立即更新Redis持仓（防止重复开仓）
-            # 只有实际成交时才更新持仓
-            try:
-                await self.position_manager.add_position(
-                    symbol=symbol,
-                    quantity=final_quantity,  # 使用实际成交数量
-                    cost_price=final_price,   # 使用TWAP平均价
-                    order_id=order.get('order_id', ''),
-                    notify=True  # 发布Pub/Sub通知
-                )
-                logger.info(f"  ✅ Redis持仓已更新: {symbol} (TWAP平均价: ${final_price:.2f})")
-            except Exception as e:
-                logger.error(f"  ❌ Redis持仓更新失败: {e}")
-                # 不影响订单执行，继续
-
-            # 🔥 【关键修复】保存订单记录到数据库（防止重复买入）
-            # 保存所有子订单记录
-            try:
-                # 保存父订单（主订单）
-                await self.order_manager.save_order(
-                    order_id=order.get('order_id', ''),
-                    symbol=symbol,
-                    side="BUY",
-                    quantity=final_quantity,  # 使用实际成交数量
-                    price=final_price,        # 使用TWAP平均价
-                    status="Filled" if execution_result.filled_quantity == quantity else "Partial"
-                )
-                logger.info(f"  ✅ 订单记录已保存: {order.get('order_id', '')} ({len(execution_result.child_orders)}个子订单)")
-            except Exception as e:
-                logger.error(f"  ❌ 订单记录保存失败: {e}")
-                # 不影响订单执行，继续
-
-            # 11. 记录止损止盈
+            # 11. 记录止损止盈（客户端监控）
             self.positions_with_stops[symbol] = {
                 "entry_price": current_price,
                 "stop_loss": signal.get('stop_loss'),
@@ -1323,140 +1452,29 @@ class OrderExecutor:
                 "atr": signal.get('indicators', {}).get('atr'),
             }
 
-            # 🔥 智能评估是否提交备份条件单（LIT）- 混合止损策略
-            backup_stop_order_id = None
-            backup_profit_order_id = None
-
-            if self.settings.backup_orders.enabled:
-                # 执行风险评估
-                risk_assessment = self.risk_assessor.assess(
-                    symbol=symbol,
-                    signal=signal,
-                    quantity=final_quantity,
-                    price=final_price
-                )
-
-                # 打印风险评估结果
-                logger.info(self.risk_assessor.format_assessment_log(risk_assessment))
-
-                # 根据评估结果决定是否提交备份条件单
-                if risk_assessment['should_backup']:
-                    # 🔥 低分信号保护：低于市场阈值的信号不提交备份条件单（降低探索性仓位风险）
-                    signal_score = signal.get('score', 0)
-                    min_score_threshold = self.settings.get_min_signal_score_for_symbol(symbol)
-                    if signal_score < min_score_threshold:
-                        logger.info(
-                            f"  ⏭️ 跳过备份条件单: 信号分数较低({signal_score}分 < {min_score_threshold}分市场阈值)，"
-                            f"仅依赖客户端监控止损/止盈（降低误触风险）"
-                        )
-                    else:
-                        try:
-                            stop_loss = signal.get('stop_loss')
-                            take_profit = signal.get('take_profit')
-
-                            if stop_loss and stop_loss > 0:
-                                # 🔥 智能选择：跟踪止损 vs 固定止损
-                                if self.settings.backup_orders.use_trailing_stop:
-                                    # 使用跟踪止损（TSLPPCT）- 自动跟随价格上涨锁定利润
-                                    # 🔥 修复：side应该是"BUY"表示保护多头仓位，而非"SELL"
-                                    stop_result = await self.trade_client.submit_trailing_stop(
-                                        symbol=symbol,
-                                        side="BUY",  # 修复：保护多头仓位（买入后持有）
-                                        quantity=final_quantity,
-                                        trailing_percent=self.settings.backup_orders.trailing_stop_percent,
-                                        limit_offset=self.settings.backup_orders.trailing_stop_limit_offset,
-                                        expire_days=self.settings.backup_orders.trailing_stop_expire_days,
-                                        remark=f"Trailing Stop {self.settings.backup_orders.trailing_stop_percent*100:.1f}%"
-                                    )
-                                    backup_stop_order_id = stop_result.get('order_id')
-                                    logger.success(
-                                        f"  ✅ 跟踪止损备份单已提交: {backup_stop_order_id} "
-                                        f"(跟踪{self.settings.backup_orders.trailing_stop_percent*100:.1f}%)"
-                                    )
-                                else:
-                                    # 使用固定止损（LIT）- 传统到价止损
-                                    stop_loss_float = float(stop_loss)
-                                    stop_result = await self.trade_client.submit_conditional_order(
-                                        symbol=symbol,
-                                        side="SELL",
-                                        quantity=final_quantity,
-                                        trigger_price=stop_loss_float,
-                                        limit_price=stop_loss_float * 0.995,  # 触发后以略低价格限价卖出，确保成交
-                                        remark=f"Backup Stop Loss @ ${stop_loss_float:.2f}"
-                                    )
-                                    backup_stop_order_id = stop_result.get('order_id')
-                                    logger.success(f"  ✅ 固定止损备份条件单已提交: {backup_stop_order_id}")
-
-                            if take_profit and take_profit > 0:
-                                # 🔥 智能选择：跟踪止盈 vs 固定止盈（实现"让利润奔跑"）
-                                if self.settings.backup_orders.use_trailing_profit:
-                                    # 使用跟踪止盈（TSMPCT）- 不限制上涨空间，仅在回撤时退出
-                                    # 🔥 修复：side应该是"BUY"表示保护多头仓位，而非"SELL"
-                                    profit_result = await self.trade_client.submit_trailing_profit(
-                                        symbol=symbol,
-                                        side="BUY",  # 修复：保护多头仓位（买入后持有）
-                                        quantity=final_quantity,
-                                        trailing_percent=self.settings.backup_orders.trailing_profit_percent,
-                                        limit_offset=self.settings.backup_orders.trailing_profit_limit_offset,
-                                        expire_days=self.settings.backup_orders.trailing_profit_expire_days,
-                                        remark=f"Trailing Profit {self.settings.backup_orders.trailing_profit_percent*100:.1f}%"
-                                    )
-                                    backup_profit_order_id = profit_result.get('order_id')
-                                    logger.success(
-                                        f"  ✅ 跟踪止盈备份单已提交: {backup_profit_order_id} "
-                                        f"(跟踪{self.settings.backup_orders.trailing_profit_percent*100:.1f}%)"
-                                    )
-                                else:
-                                    # 使用固定止盈（LIT）- 传统到价止盈
-                                    take_profit_float = float(take_profit)
-                                    profit_result = await self.trade_client.submit_conditional_order(
-                                        symbol=symbol,
-                                        side="SELL",
-                                        quantity=final_quantity,
-                                        trigger_price=take_profit_float,
-                                        limit_price=take_profit_float,  # 止盈使用触发价本身
-                                        remark=f"Backup Take Profit @ ${take_profit_float:.2f}"
-                                    )
-                                    backup_profit_order_id = profit_result.get('order_id')
-                                    logger.success(f"  ✅ 固定止盈备份条件单已提交: {backup_profit_order_id}")
-
-                            # 打印策略说明
-                            stop_type = "跟踪止损(TSLPPCT)" if self.settings.backup_orders.use_trailing_stop else "固定止损(LIT)"
-                            profit_type = "跟踪止盈(TSMPCT)" if self.settings.backup_orders.use_trailing_profit else "固定止盈(LIT)"
-                            logger.info(f"  📋 备份条件单策略: 客户端监控（主） + 交易所{stop_type}+{profit_type}（备份）")
+            post_trade = {
+                "symbol": symbol,
+                "signal": signal,
+                "order_id": order.get('order_id', ''),
+                "child_orders": list(order.get('child_orders') or []),
+                "quantity": quantity,
+                "filled_quantity": int(final_quantity),
+                "average_price": float(final_price),
+                "order_price": float(order_price),
+                "required_cash": float(required_cash),
+                "status": "Filled" if final_quantity == quantity else "Partial",
+            }
 
-                        except Exception as e:
-                            logger.warning(f"⚠️ 提交备份条件单失败（不影响主流程）: {e}")
-                            import traceback
-                            logger.debug(f"  详细错误: {traceback.format_exc()}")
-                            # 即使备份条件单失败，也继续保存止损设置（客户端监控仍然工作）
-                else:
-                    logger.info(f"  ℹ️ 低风险交易，依赖客户端监控（节省成本）")
-            else:
-                logger.info(f"  ⚙️ 备份条件单功能已禁用")
+            # 12. 🔥 【关键修复】立即更新Redis持仓并保存订单记录（防止重复开仓/重复买入）
+            with timer.stage("record_fill"):
+                await self._record_fill(post_trade)
 
-            # 保存到数据库（包括备份条件单ID）
-            try:
-                # 统一转换为 float 避免类型错误
-                await self.stop_manager.save_stop(
-                    symbol=symbol,
-                    entry_price=float(final_price),  # 使用实际成交均价
-                    stop_loss=float(signal.get('stop_loss')) if signal.get('stop_loss') else None,
-                    take_profit=float(signal.get('take_profit')) if signal.get('take_profit') else None,
-                    atr=float(signal.get('indicators', {}).get('atr')) if signal.get('indicators', {}).get('atr') else None,
-                    quantity=int(final_quantity),  # 转换为 int
-                    strategy='advanced_technical',
-                    backup_stop_loss_order_id=backup_stop_order_id,
-                    backup_take_profit_order_id=backup_profit_order_id
-                )
-            except Exception as e:
-                logger.warning(f"⚠️ 保存止损止盈失败: {e}")
-                import traceback
-                logger.debug(f"  详细错误: {traceback.format_exc()}")
-
-            # 12. 发送Slack通知
-            if self.slack:
-                await self._send_buy_notification(symbol, signal, order, quantity, order_price, required_cash)
+            # 13. 备份条件单、止损记录和Slack通知交给出库箱后台完成，不阻塞下一个信号
+            post_trade["backup_orders"] = self._should_submit_backup_orders(
+                symbol, signal, final_quantity, final_price
+            )
+            with timer.stage("post_trade_enqueue"):
+                await self._submit_post_trade(data=post_trade, timings=timer.as_dict())
 
         except Exception as e:
             logger.error(f"❌ 提交订单失败: {e}")
@@ -1492,6 +1510,243 @@ class OrderExecutor:
 
             raise
 
+    async def _submit_post_trade(self, data: Dict, timings: Optional[Dict[str, float]] = None):
+        """
+        把成交后的工作写入出库箱（后台worker执行）
+
+        出库箱关闭或Redis写入失败时在当前协程内直接执行（与原流程一致，不重试）。
+        """
+        if self.outbox is not None and self.settings.post_trade_outbox_enabled:
+            try:
+                job_id = await self.outbox.enqueue(POST_TRADE_STEPS, data, timings=timings)
+                logger.info(f"  📮 成交后任务已入队: {data['symbol']} (job={job_id[:8]})")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ 成交后任务入队失败，直接执行: {e}")
+
+        if self.outbox is None and self._inline_post_trade is None:
+            self._inline_post_trade = self._build_post_trade_outbox()
+        outbox = self.outbox or self._inline_post_trade
+        await outbox.run_inline(POST_TRADE_STEPS, data, timings=timings)
+
+    def _build_post_trade_outbox(self) -> PostTradeOutbox:
+        """创建出库箱并注册成交后步骤（每个账号独立的队列）"""
+        outbox = PostTradeOutbox(
+            redis_url=self.settings.redis_url,
+            key=f"trading:outbox:{self.account_id}",
+            max_attempts=self.settings.post_trade_outbox_max_attempts,
+        )
+        for step in POST_TRADE_STEPS:
+            outbox.register(step, getattr(self, f"_post_trade_{step}"))
+        return outbox
+
+    def _should_submit_backup_orders(self, symbol: str, signal: Dict, quantity: int, price: float) -> bool:
+        """智能评估是否提交备份条件单（LIT）- 混合止损策略"""
+        if not self.settings.backup_orders.enabled:
+            logger.info(f"  ⚙️ 备份条件单功能已禁用")
+            return False
+
+        # 执行风险评估
+        risk_assessment = self.risk_assessor.assess(
+            symbol=symbol,
+            signal=signal,
+            quantity=quantity,
+            price=price
+        )
+
+        # 打印风险评估结果
+        logger.info(self.risk_assessor.format_assessment_log(risk_assessment))
+
+        if not risk_assessment['should_backup']:
+            logger.info(f"  ℹ️ 低风险交易，依赖客户端监控（节省成本）")
+            return False
+
+        # 🔥 低分信号保护：低于市场阈值的信号不提交备份条件单（降低探索性仓位风险）
+        signal_score = signal.get('score', 0)
+        min_score_threshold = self.settings.get_min_signal_score_for_symbol(symbol)
+        if signal_score < min_score_threshold:
+            logger.info(
+                f"  ⏭️ 跳过备份条件单: 信号分数较低({signal_score}分 < {min_score_threshold}分市场阈值)，"
+                f"仅依赖客户端监控止损/止盈（降低误触风险）"
+            )
+            return False
+        return True
+
+    async def _record_fill(self, data: Dict):
+        """
+        成交后立即更新Redis持仓并保存订单记录（两者并发执行）
+
+        下一个信号依赖它们判断是否已持仓/已买入，所以在 execute_order 返回前完成；
+        失败只记录错误，不影响订单执行。
+        """
+        symbol = data['symbol']
+        position_result, record_result = await asyncio.gather(
+            self.position_manager.add_position(
+                symbol=symbol,
+                quantity=data['filled_quantity'],  # 使用实际成交数量
+                cost_price=data['average_price'],  # 使用TWAP平均价
+                order_id=data['order_id'],
+                notify=True  # 发布Pub/Sub通知
+            ),
+            self.order_manager.save_order(
+                order_id=data['order_id'],
+                symbol=symbol,
+                side="BUY",
+                quantity=data['filled_quantity'],  # 使用实际成交数量
+                price=data['average_price'],       # 使用TWAP平均价
+                status=data['status']
+            ),
+            return_exceptions=True,
+        )
+
+        if isinstance(position_result, BaseException) or position_result is False:
+            logger.error(f"  ❌ Redis持仓更新失败: {position_result}")
+        else:
+            logger.info(f"  ✅ Redis持仓已更新: {symbol} (TWAP平均价: ${data['average_price']:.2f})")
+
+        if isinstance(record_result, BaseException):
+            logger.error(f"  ❌ 订单记录保存失败: {record_result}")
+        else:
+            logger.info(f"  ✅ 订单记录已保存: {data['order_id']} ({len(data['child_orders'])}个子订单)")
+
+    async def _post_trade_backup_stop(self, data: Dict, results: Dict) -> Optional[str]:
+        """
+        成交后步骤：提交止损备份条件单
+
+        提交失败只记录警告、不重试（避免重复下单），客户端监控止损仍然工作。
+        """
+        signal = data['signal']
+        stop_loss = signal.get('stop_loss')
+        if not data['backup_orders'] or not stop_loss or stop_loss <= 0:
+            return None
+
+        symbol = data['symbol']
+        quantity = data['filled_quantity']
+        backup = self.settings.backup_orders
+        try:
+            # 🔥 智能选择：跟踪止损 vs 固定止损
+            if backup.use_trailing_stop:
+                # 使用跟踪止损（TSLPPCT）- 自动跟随价格上涨锁定利润
+                # 🔥 修复：side应该是"BUY"表示保护多头仓位，而非"SELL"
+                stop_result = await self.trade_client.submit_trailing_stop(
+                    symbol=symbol,
+                    side="BUY",  # 修复：保护多头仓位（买入后持有）
+                    quantity=quantity,
+                    trailing_percent=backup.trailing_stop_percent,
+                    limit_offset=backup.trailing_stop_limit_offset,
+                    expire_days=backup.trailing_stop_expire_days,
+                    remark=f"Trailing Stop {backup.trailing_stop_percent*100:.1f}%"
+                )
+                order_id = stop_result.get('order_id')
+                logger.success(
+                    f"  ✅ 跟踪止损备份单已提交: {order_id} "
+                    f"(跟踪{backup.trailing_stop_percent*100:.1f}%)"
+                )
+            else:
+                # 使用固定止损（LIT）- 传统到价止损
+                stop_loss_float = float(stop_loss)
+                stop_result = await self.trade_client.submit_conditional_order(
+                    symbol=symbol,
+                    side="SELL",
+                    quantity=quantity,
+                    trigger_price=stop_loss_float,
+                    limit_price=stop_loss_float * 0.995,  # 触发后以略低价格限价卖出，确保成交
+                    remark=f"Backup Stop Loss @ ${stop_loss_float:.2f}"
+                )
+                order_id = stop_result.get('order_id')
+                logger.success(f"  ✅ 固定止损备份条件单已提交: {order_id}")
+            return order_id
+        except Exception as e:
+            logger.warning(f"⚠️ 提交止损备份条件单失败（不影响主流程）: {e}")
+            import traceback
+            logger.debug(f"  详细错误: {traceback.format_exc()}")
+            return None
+
+    async def _post_trade_backup_profit(self, data: Dict, results: Dict) -> Optional[str]:
+        """
+        成交后步骤：提交止盈备份条件单
+
+        提交失败只记录警告、不重试（避免重复下单），客户端监控止盈仍然工作。
+        """
+        signal = data['signal']
+        take_profit = signal.get('take_profit')
+        if not data['backup_orders'] or not take_profit or take_profit <= 0:
+            return None
+
+        symbol = data['symbol']
+        quantity = data['filled_quantity']
+        backup = self.settings.backup_orders
+        try:
+            # 🔥 智能选择：跟踪止盈 vs 固定止盈（实现"让利润奔跑"）
+            if backup.use_trailing_profit:
+                # 使用跟踪止盈（TSMPCT）- 不限制上涨空间，仅在回撤时退出
+                # 🔥 修复：side应该是"BUY"表示保护多头仓位，而非"SELL"
+                profit_result = await self.trade_client.submit_trailing_profit(
+                    symbol=symbol,
+                    side="BUY",  # 修复：保护多头仓位（买入后持有）
+                    quantity=quantity,
+                    trailing_percent=backup.trailing_profit_percent,
+                    limit_offset=backup.trailing_profit_limit_offset,
+                    expire_days=backup.trailing_profit_expire_days,
+                    remark=f"Trailing Profit {backup.trailing_profit_percent*100:.1f}%"
+                )
+                order_id = profit_result.get('order_id')
+                logger.success(
+                    f"  ✅ 跟踪止盈备份单已提交: {order_id} "
+                    f"(跟踪{backup.trailing_profit_percent*100:.1f}%)"
+                )
+            else:
+                # 使用固定止盈（LIT）- 传统到价止盈
+                take_profit_float = float(take_profit)
+                profit_result = await self.trade_client.submit_conditional_order(
+                    symbol=symbol,
+                    side="SELL",
+                    quantity=quantity,
+                    trigger_price=take_profit_float,
+                    limit_price=take_profit_float,  # 止盈使用触发价本身
+                    remark=f"Backup Take Profit @ ${take_profit_float:.2f}"
+                )
+                order_id = profit_result.get('order_id')
+                logger.success(f"  ✅ 固定止盈备份条件单已提交: {order_id}")
+
+            # 打印策略说明
+            stop_type = "跟踪止损(TSLPPCT)" if backup.use_trailing_stop else "固定止损(LIT)"
+            profit_type = "跟踪止盈(TSMPCT)" if backup.use_trailing_profit else "固定止盈(LIT)"
+            logger.info(f"  📋 备份条件单策略: 客户端监控（主） + 交易所{stop_type}+{profit_type}（备份）")
+            return order_id
+        except Exception as e:
+            logger.warning(f"⚠️ 提交止盈备份条件单失败（不影响主流程）: {e}")
+            import traceback
+            logger.debug(f"  详细错误: {traceback.format_exc()}")
+            return None
+
+    async def _post_trade_stop_record(self, data: Dict, results: Dict):
+        """成交后步骤：保存止损止盈设置（包括备份条件单ID）到数据库"""
+        signal = data['signal']
+        atr = signal.get('indicators', {}).get('atr')
+        # 统一转换为 float 避免类型错误
+        await self.stop_manager.save_stop(
+            symbol=data['symbol'],
+            entry_price=float(data['average_price']),  # 使用实际成交均价
+            stop_loss=float(signal.get('stop_loss')) if signal.get('stop_loss') else None,
+            take_profit=float(signal.get('take_profit')) if signal.get('take_profit') else None,
+            atr=float(atr) if atr else None,
+            quantity=int(data['filled_quantity']),  # 转换为 int
+            strategy='advanced_technical',
+            backup_stop_loss_order_id=results.get('backup_stop'),
+            backup_take_profit_order_id=results.get('backup_profit')
+        )
+
+    async def _post_trade_notify(self, data: Dict, results: Dict):
+        """成交后步骤：发送Slack通知"""
+        if not self.slack:
+            return
+        order = {'order_id': data['order_id'], 'child_orders': data['child_orders']}
+        await self._send_buy_notification(
+            data['symbol'], data['signal'], order,
+            data['quantity'], data['order_price'], data['required_cash']
+        )
+
     async def _regime_updater(self):
         """周期性更新市场状态（牛/熊/震荡）。"""
         interval = max(3, int(getattr(self.settings, 'regime_update_interval_minutes', 10))) * 60
@@ -1659,7 +1914,7 @@ class OrderExecutor:
 
                 # 获取账户信息
                 try:
-                    account = await self.trade_client.get_account()
+                    account = await self._get_account_with_cache()
                     hkd_cash = float(account["cash"].get("HKD", 0))
                     usd_cash = float(account["cash"].get("USD", 0))
                     hkd_power = float(account.get("buy_power", {}).get("HKD", 0))
@@ -1878,7 +2133,7 @@ class OrderExecutor:
 
     async def _send_regime_daily_summary(self, res):
         try:
-            account = await self.trade_client.get_account()
+            account = await self._get_account_with_cache()
         except Exception as e:
             logger.debug(f"获取账户失败，无法发送汇总: {e}")
             return
@@ -2454,6 +2709,12 @@ class OrderExecutor:
                 return 0
 
             max_qty = max(candidates)
+
+            # 券商预估已包含已提交的订单，只扣减并发买单中尚未提交的预留
+            reserved = self.buying_power.pending("HKD" if symbol.endswith(".HK") else "USD")
+            if reserved > 0 and price > 0:
+                max_qty -= reserved / price
+
             if max_qty <= 0:
                 return 0
 
@@ -2467,6 +2728,31 @@ class OrderExecutor:
             logger.debug(f"  ⚠️ 预估最大可买数量失败: {e}")
             return 0
 
+    async def _broker_quantity_limit(self, symbol: str, price: float, lot_size: int) -> int:
+        """
+        券商允许的最大买入数量：优先使用券商预估，为0时使用Fallback现金估算
+
+        Returns:
+            int: 按手数取整后的数量，均不可用返回0
+        """
+        quantity = await self._estimate_available_quantity(
+            symbol=symbol,
+            price=price,
+            lot_size=lot_size,
+            currency=None
+        )
+        if quantity > 0:
+            return quantity
+
+        fallback_qty = await self._fallback_cash_estimate(
+            symbol=symbol,
+            price=price,
+            lot_size=lot_size
+        )
+        if fallback_qty > 0:
+            logger.info(f"  ✅ 使用Fallback估算替代券商可买量: {fallback_qty}股")
+        return fallback_qty
+
     async def _fallback_cash_estimate(
         self,
         symbol: str,
@@ -2487,7 +2773,8 @@ class OrderExecutor:
             balance = await self.trade_client.account_balance()
 
             cash_dict = balance.get("cash", {})
-            cash_available = float(cash_dict.get(currency, 0))
+            # 实时余额已包含已提交的订单，只扣减尚未提交的预留
+            cash_available = float(cash_dict.get(currency, 0)) - self.buying_power.pending(currency)
 
             # 如果没有现金，返回0
             if cash_available <= 0:
@@ -2600,27 +2887,11 @@ class OrderExecutor:
         """
         if ".HK" not in symbol:
             return None  # 仅处理港股
+        if self.security_ref is None:
+            return None
 
         try:
-            if hasattr(self, 'db') and self.db:
-                async with self.db.session() as session:
-                    # 优先查询 SecurityUniverse
-                    result = await session.execute(
-                        select(SecurityUniverse).where(SecurityUniverse.symbol == symbol)
-                    )
-                    security = result.scalar_one_or_none()
-                    if security and security.name_cn:
-                        return security.name_cn
-
-                    # 备选：查询 SecurityStatic
-                    result = await session.execute(
-                        select(SecurityStatic).where(SecurityStatic.symbol == symbol)
-                    )
-                    security_static = result.scalar_one_or_none()
-                    if security_static and security_static.name_cn:
-                        return security_static.name_cn
-
-            return None
+            return await self.security_ref.name_cn(symbol)
         except Exception as e:
             logger.debug(f"查询中文名称失败 {symbol}: {e}")
             return None
@@ -3683,7 +3954,7 @@ class OrderExecutor:
                     try:
                         # 获取账户信息
                         try:
-                            account = await self.trade_client.get_account()
+                            account = await self._get_account_with_cache()
                             currency = "HKD" if ".HK" in symbol else "USD"
                             cash = float(account["cash"].get(currency, 0))
                             power = float(account.get("buy_power", {}).get(currency, 0))
@@ -3743,7 +4014,7 @@ class OrderExecutor:
             try:
                 # 获取账户信息用于通知
                 try:
-                    account = await self.trade_client.get_account()
+                    account = await self._get_account_with_cache()
                     hkd_cash = float(account["cash"].get("HKD", 0))
                     usd_cash = float(account["cash"].get("USD", 0))
                     hkd_power = float(account.get("buy_power", {}).get("HKD", 0))
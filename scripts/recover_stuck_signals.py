@@ -51,18 +51,11 @@ async def main():
         print("="*70)
 
         # 获取processing队列中的所有信号
-        redis = await signal_queue._get_redis()
-        processing_signals = await redis.zrange(
-            signal_queue.processing_key,
-            0,
-            -1,
-            withscores=True
-        )
+        processing_signals = await signal_queue.get_processing_signals()
 
         recovered_count = 0
 
-        for signal_json, score in processing_signals:
-            signal = signal_queue._deserialize_signal(signal_json)
+        for signal in processing_signals:
             symbol = signal.get('symbol', 'N/A')
             signal_type = signal.get('type', 'N/A')
             signal_score = signal.get('score', 0)
@@ -73,7 +66,7 @@ async def main():
             print(f"  排队时间: {signal.get('queued_at', 'N/A')}")
 
             # 从processing队列移除
-            await redis.zrem(signal_queue.processing_key, signal_json)
+            await signal_queue._zrem(signal_queue.processing_key, signal['signal_id'])
 
             # 重新发布到主队列
             await signal_queue.publish_signal(signal, priority=signal_score)
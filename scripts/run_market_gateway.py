@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""行情网关：独占一条LongPort行情连接，通过Redis为其他进程提供行情。
+
+启动后，设置 MARKET_GATEWAY_ENABLED=true 的 signal_generator / order_executor /
+sync_realtime_data / rebalancer 会改为从网关读取快照、订阅推送并转发查询，
+不再各自建立行情连接。
+
+用法:
+    python scripts/run_market_gateway.py
+    python scripts/run_market_gateway.py --persist    # 同时将推送行情写入数据库
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from loguru import logger
+
+from longport_quant.config import get_settings
+from longport_quant.data.enhanced_market_data import MarketDataConfig
+from longport_quant.data.market_gateway import MarketDataGateway
+from longport_quant.persistence.db import DatabaseSessionManager
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description='LongPort 行情网关')
+    parser.add_argument('--persist', action='store_true', help='将推送行情写入数据库')
+    parser.add_argument(
+        '--stream-maxlen', type=int, default=10_000, help='每个Redis Stream保留的消息数'
+    )
+    parser.add_argument('--stats-interval', type=float, default=300.0, help='统计日志间隔（秒）')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    db = DatabaseSessionManager(settings.database_dsn) if args.persist else None
+    gateway = MarketDataGateway(
+        settings,
+        db=db,
+        market_config=MarketDataConfig(persist_to_db=args.persist, require_watchlist=False),
+        stream_maxlen=args.stream_maxlen,
+    )
+
+    task = asyncio.create_task(gateway.run_forever(stats_interval=args.stats_interval))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+
+    try:
+        await task
+    except asyncio.CancelledError:
+        logger.info("收到退出信号，行情网关关闭")
+    finally:
+        if db is not None:
+            await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -31,13 +31,16 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from longport import openapi
 from longport_quant.config import get_settings
-from longport_quant.data.quote_client import QuoteDataClient
+from longport_quant.data.market_gateway import open_quote_client
 from longport_quant.execution.client import LongportTradingClient
 from longport_quant.data.watchlist import WatchlistLoader
 from longport_quant.features.technical_indicators import TechnicalIndicators
+from longport_quant.features.streaming_indicators import StreamingBar, StreamingIndicators
 from longport_quant.messaging import SignalQueue
-from longport_quant.utils import LotSizeHelper
+from longport_quant.utils import LotSizeHelper, gather_bounded, get_api_rate_limiter, run_cpu
 from longport_quant.persistence.stop_manager import StopLossManager
+from longport_quant.persistence.account_snapshot import AccountSnapshotService
+from longport_quant.data.security_reference import SecurityReferenceService
 from longport_quant.persistence.order_manager import OrderManager
 from longport_quant.persistence.position_manager import RedisPositionManager
 from longport_quant.risk.regime import RegimeClassifier
@@ -45,8 +48,9 @@ from longport_quant.risk.kelly import KellyCalculator
 from longport_quant.risk.timezone_capital import TimeZoneCapitalManager
 from longport_quant.notifications.notifier import MultiChannelNotifier
 from longport_quant.persistence.db import DatabaseSessionManager
-from longport_quant.persistence.models import KlineDaily, SecurityUniverse, SecurityStatic
+from longport_quant.persistence.models import KlineDaily
 from longport_quant.data.kline_sync import KlineDataService
+from longport_quant.data.bar_store import DailyBarStore, DailyBars
 from sqlalchemy import select, and_
 from datetime import date
 
@@ -98,7 +102,8 @@ class SignalGenerator:
             queue_key=self.settings.signal_queue_key,
             processing_key=self.settings.signal_processing_key,
             failed_key=self.settings.signal_failed_key,
-            max_retries=self.settings.signal_max_retries
+            max_retries=self.settings.signal_max_retries,
+            payload_codec=self.settings.signal_payload_codec
         )
 
         # 港股监控列表（精选龙头股 + 高科技成长股）
@@ -203,6 +208,11 @@ class SignalGenerator:
 
         # 止损管理器（用于检查现有持仓）
         self.stop_manager = StopLossManager()
+
+        # 账户快照（与order_executor / rebalancer 通过Redis共享，run()中初始化）
+        self.account_snapshot = None
+        # 证券静态数据（手数/名称，Redis共享，run()中初始化并批量预加载监控列表）
+        self.security_ref = None
         self.lot_size_helper = LotSizeHelper()
 
         # 订单管理器（用于检查今日订单，包括pending订单）
@@ -290,6 +300,15 @@ class SignalGenerator:
                 f"✅ K线混合模式已启用: 数据库{self.db_klines_history_days}天 + API{self.api_klines_latest_days}天"
             )
 
+        # 📈 内存日线缓存（预热一次，之后由实时行情增量推进，指标计算不再访问网络）
+        self.use_bar_store = bool(getattr(self.settings, 'use_bar_store', True))
+        self.bar_store_capacity = int(getattr(self.settings, 'bar_store_capacity', 250))
+        self.bar_store = None  # 延迟初始化（在 run() 方法中，需要 quote_client）
+        self.indicator_streams: Dict[str, StreamingIndicators] = {}  # 增量指标引擎 {symbol: StreamingIndicators}
+
+        # ⚡ 并发分析：同时分析的标的数（历史K线请求共享全局API令牌桶，指标计算在线程池中执行）
+        self.analysis_concurrency = max(1, int(getattr(self.settings, 'analysis_concurrency', 8)))
+
         # 🔄 实时挪仓和紧急卖出后台任务
         self._rotation_task = None
         self._rotation_check_interval = 30  # 每30秒检查一次
@@ -322,27 +341,11 @@ class SignalGenerator:
         """
         if ".HK" not in symbol:
             return None  # 仅处理港股
+        if self.security_ref is None:
+            return None
 
         try:
-            if hasattr(self, 'db') and self.db:
-                async with self.db.session() as session:
-                    # 优先查询 SecurityUniverse
-                    result = await session.execute(
-                        select(SecurityUniverse).where(SecurityUniverse.symbol == symbol)
-                    )
-                    security = result.scalar_one_or_none()
-                    if security and security.name_cn:
-                        return security.name_cn
-
-                    # 备选：查询 SecurityStatic
-                    result = await session.execute(
-                        select(SecurityStatic).where(SecurityStatic.symbol == symbol)
-                    )
-                    security_static = result.scalar_one_or_none()
-                    if security_static and security_static.name_cn:
-                        return security_static.name_cn
-
-            return None
+            return await self.security_ref.name_cn(symbol)
         except Exception as e:
             logger.debug(f"查询中文名称失败 {symbol}: {e}")
             return None
@@ -559,6 +562,9 @@ class SignalGenerator:
         else:
             return False, 0
 
+    # TWAP执行标记（由order_executor设置）
+    TWAP_KEY_PREFIX = "trading:twap_execution:"
+
     async def _is_in_twap_execution(self, symbol: str) -> bool:
         """
         检查标的是否正在进行TWAP订单执行
@@ -571,7 +577,7 @@ class SignalGenerator:
         """
         try:
             redis = await self.signal_queue._get_redis()
-            redis_key = f"trading:twap_execution:{symbol}"
+            redis_key = f"{self.TWAP_KEY_PREFIX}{symbol}"
             result = await redis.get(redis_key)
             return result is not None
         except Exception as e:
@@ -597,6 +603,10 @@ class SignalGenerator:
         if expired:
             logger.debug(f"🧹 清理了 {len(expired)} 个过期的信号历史记录")
 
+    # 信号类型分组（买卖互斥检查）
+    BUY_SIGNAL_TYPES = ("BUY", "STRONG_BUY", "WEAK_BUY")
+    SELL_SIGNAL_TYPES = ("URGENT_SELL", "SELL", "STOP_LOSS", "TAKE_PROFIT", "SMART_TAKE_PROFIT", "EARLY_TAKE_PROFIT")
+
     async def _should_generate_signal(self, symbol: str, signal_type: str) -> tuple[bool, str]:
         """
         检查是否应该生成信号（多层去重检查）
@@ -608,25 +618,71 @@ class SignalGenerator:
         Returns:
             (bool, str): (是否应该生成, 跳过原因)
         """
+        return (await self._admit_signals([(symbol, signal_type)]))[0]
+
+    async def _admit_signals(self, candidates: List[tuple[str, str]]) -> List[tuple[bool, str]]:
+        """
+        批量准入检查：Redis状态（队列去重、买卖互斥、TWAP、持仓）一次往返取回，
+        其余内存检查逐个完成
+
+        注意：结果基于同一份Redis快照，同一批次中若对某标的发布了信号，
+        该标的后续的候选需重新调用 _should_generate_signal 检查。
+
+        Args:
+            candidates: (标的, 信号类型) 列表
+
+        Returns:
+            与candidates一一对应的 (是否应该生成, 跳过原因)
+        """
+        pending = []
+        buy_symbols = []
+        for symbol, signal_type in candidates:
+            pending.extend((symbol, t) for t in self._admission_signal_types(signal_type))
+            if signal_type in self.BUY_SIGNAL_TYPES:
+                buy_symbols.append(symbol)
+
+        state = await self.signal_queue.check_admission(
+            pending,
+            symbols=buy_symbols,
+            positions_key=self.position_manager.positions_key,
+            twap_key_prefix=self.TWAP_KEY_PREFIX,
+        )
+        return [
+            self._evaluate_admission(symbol, signal_type, state)
+            for symbol, signal_type in candidates
+        ]
+
+    def _admission_signal_types(self, signal_type: str) -> List[str]:
+        """需要检查队列中待处理信号的类型（自身 + 互斥类型，按检查顺序）"""
+        if signal_type in self.BUY_SIGNAL_TYPES:
+            return [signal_type, *self.SELL_SIGNAL_TYPES]
+        if signal_type in self.SELL_SIGNAL_TYPES:
+            return [signal_type, *self.BUY_SIGNAL_TYPES]
+        return [signal_type]
+
+    def _evaluate_admission(self, symbol: str, signal_type: str, state: Dict) -> tuple[bool, str]:
+        """根据 check_admission 的快照判断单个信号是否应该生成"""
+        pending = state['pending']
+
         # === 第1层：队列去重 ===
         # 检查队列中是否已有该标的的待处理信号
-        if await self.signal_queue.has_pending_signal(symbol, signal_type):
+        if pending.get((symbol, signal_type)):
             return False, "队列中已有该标的的待处理信号"
 
         # === 🔥 买卖信号互斥检查（防止同时存在买卖信号）===
-        if signal_type in ["BUY", "STRONG_BUY", "WEAK_BUY"]:
+        if signal_type in self.BUY_SIGNAL_TYPES:
             # 如果队列中有卖出信号，禁止生成买入信号
-            for sell_type in ["URGENT_SELL", "SELL", "STOP_LOSS", "TAKE_PROFIT", "SMART_TAKE_PROFIT", "EARLY_TAKE_PROFIT"]:
-                if await self.signal_queue.has_pending_signal(symbol, sell_type):
+            for sell_type in self.SELL_SIGNAL_TYPES:
+                if pending.get((symbol, sell_type)):
                     return False, f"队列中已有该标的的{sell_type}信号，禁止买入"
-        elif signal_type in ["SELL", "STOP_LOSS", "TAKE_PROFIT", "SMART_TAKE_PROFIT", "EARLY_TAKE_PROFIT", "URGENT_SELL"]:
+        elif signal_type in self.SELL_SIGNAL_TYPES:
             # 如果队列中有买入信号，禁止生成卖出信号
-            for buy_type in ["BUY", "STRONG_BUY", "WEAK_BUY"]:
-                if await self.signal_queue.has_pending_signal(symbol, buy_type):
+            for buy_type in self.BUY_SIGNAL_TYPES:
+                if pending.get((symbol, buy_type)):
                     return False, f"队列中已有该标的的{buy_type}信号，禁止卖出"
 
         # === BUY信号的去重与频控检查 ===
-        if signal_type in ["BUY", "STRONG_BUY", "WEAK_BUY"]:
+        if signal_type in self.BUY_SIGNAL_TYPES:
             # 全局日度买单上限（可选）
             if getattr(self.settings, 'enable_daily_trade_cap', False):
                 try:
@@ -650,7 +706,7 @@ class SignalGenerator:
             # 原因：如果某标的再次出现强买入信号，应该允许加仓（分批建仓策略）
 
             # TWAP执行检查 - 防止在TWAP订单执行期间生成重复信号
-            if await self._is_in_twap_execution(symbol):
+            if symbol in state['twap']:
                 return False, "标的正在进行TWAP订单执行"
 
             # 🚫 防止频繁交易 - 卖出后再买入冷却期检查
@@ -675,8 +731,7 @@ class SignalGenerator:
                 return False, f"信号冷却期内（还需等待{remaining:.0f}秒）"
 
             # 调试日志：记录允许买入的情况
-            has_position = await self.position_manager.has_position(symbol)
-            if has_position:
+            if symbol in state['positions']:
                 logger.debug(f"  ✅ {symbol}: 已有持仓，允许加仓")
             elif symbol in self.traded_today:
                 logger.debug(f"  ℹ️  {symbol}: 今日已买过但已卖出（或订单未成交），允许再次买入")
@@ -684,7 +739,7 @@ class SignalGenerator:
                 logger.debug(f"  ℹ️  {symbol}: 今日未买过，允许买入")
 
         # === SELL信号的去重与频控检查 ===
-        elif signal_type in ["SELL", "STOP_LOSS", "TAKE_PROFIT", "SMART_TAKE_PROFIT", "EARLY_TAKE_PROFIT", "URGENT_SELL"]:
+        elif signal_type in self.SELL_SIGNAL_TYPES:
             # 全局日度卖单上限（止损止盈不受限）
             if signal_type not in ["STOP_LOSS", "TAKE_PROFIT"] and getattr(self.settings, 'enable_daily_trade_cap', False):
                 try:
@@ -729,6 +784,20 @@ class SignalGenerator:
 
         return True, ""
 
+    async def _iter_admitted(self, signals: List[Dict]):
+        """
+        批量准入检查后逐个产出 (signal, should_generate, skip_reason)
+
+        同一批次中重复出现的标的会在产出前重新检查（前一个信号可能已发布）。
+        """
+        results = await self._admit_signals([(s['symbol'], s['type']) for s in signals])
+        seen = set()
+        for signal, (should_generate, skip_reason) in zip(signals, results):
+            if signal['symbol'] in seen:
+                should_generate, skip_reason = await self._should_generate_signal(signal['symbol'], signal['type'])
+            seen.add(signal['symbol'])
+            yield signal, should_generate, skip_reason
+
     def _should_send_slack_notification(self, notification_key: str) -> tuple[bool, str]:
         """
         检查是否应该发送Slack通知（限流机制，防止429错误）
@@ -832,6 +901,10 @@ class SignalGenerator:
             if current_price <= 0:
                 return
 
+            # 📈 每次推送都推进内存日线（O(1)，不受防抖影响）
+            if self.bar_store is not None:
+                self.bar_store.update_from_quote(symbol, quote)
+
             # 🚨 特殊处理：VIXY 恐慌指数实时监控
             if symbol == self.vixy_symbol:
                 await self._handle_vixy_update(current_price)
@@ -1344,7 +1417,7 @@ class SignalGenerator:
                                 )
                             return
 
-            # 3. 获取止损止盈设置（从数据库）
+            # 3. 获取止损止盈设置（进程内缓存，缓存不可用时回源数据库）
             # 注意：account_id 可以为空字符串，stop_manager会处理
             stops = await self.stop_manager.get_position_stops("", symbol)
 
@@ -1616,6 +1689,9 @@ class SignalGenerator:
             await self.position_manager.connect()
             logger.info("✅ Redis持仓管理器已连接")
 
+            # 🛡️ 止损止盈进程内缓存（实时止损检查不再逐笔查询数据库）
+            await self.stop_manager.start_cache()
+
             # 📊 初始化数据库连接（用于K线混合模式）
             if self.use_db_klines:
                 self.db = DatabaseSessionManager(
@@ -1630,7 +1706,7 @@ class SignalGenerator:
             slack_url = str(self.settings.slack_webhook_url) if self.settings.slack_webhook_url else None
             discord_url = str(self.settings.discord_webhook_url) if self.settings.discord_webhook_url else None
 
-            async with QuoteDataClient(self.settings) as quote_client, \
+            async with open_quote_client(self.settings) as quote_client, \
                        LongportTradingClient(self.settings) as trade_client, \
                        MultiChannelNotifier(
                            slack_webhook_url=slack_url,
@@ -1642,6 +1718,16 @@ class SignalGenerator:
                 self.quote_client = quote_client
                 self.trade_client = trade_client
                 self.slack = slack
+                self.account_snapshot = AccountSnapshotService(
+                    trade_client,
+                    redis_url=self.settings.redis_url,
+                    account_id=self.account_id,
+                    ttl=float(getattr(self.settings, 'account_snapshot_ttl', 15.0)),
+                )
+                self.security_ref = SecurityReferenceService(
+                    quote_client=quote_client, db=self.db, redis_url=self.settings.redis_url
+                )
+                self.lot_size_helper = LotSizeHelper(reference=self.security_ref)
 
                 # 📊 初始化K线同步服务（用于自动同步新持仓的历史数据）
                 if self.use_db_klines and self.db:
@@ -1652,6 +1738,17 @@ class SignalGenerator:
                     )
                     logger.info("✅ K线同步服务已初始化")
 
+                # 📈 初始化内存日线缓存
+                if self.use_bar_store:
+                    self.bar_store = DailyBarStore(
+                        kline_service=self.kline_service,
+                        quote_client=self.quote_client,
+                        capacity=self.bar_store_capacity,
+                        history_days=self.db_klines_history_days,
+                        latest_days=self.api_klines_latest_days,
+                    )
+                    logger.info(f"✅ 内存日线缓存已启用（每标的最多{self.bar_store_capacity}根）")
+
                 # 🔥 保存主事件循环引用（供WebSocket回调使用）
                 self._main_loop = asyncio.get_event_loop()
 
@@ -1674,6 +1771,10 @@ class SignalGenerator:
                 }
 
                 logger.info(f"📋 监控标的数量: {len(all_symbols)} (含 VIXY 恐慌指数)")
+
+                # 📊 一次批量加载监控列表的手数/名称（Redis > 数据库 > static_info），并写入Redis供order_executor共享
+                await self.security_ref.preload(list(all_symbols.keys()))
+                self.security_ref.start_refresh(list(all_symbols.keys()))
                 logger.info(f"⏰ 轮询间隔: {self.poll_interval}秒")
                 logger.info(f"📤 信号队列: {self.settings.signal_queue_key}")
                 logger.info("")
@@ -1713,7 +1814,7 @@ class SignalGenerator:
                         await self._update_traded_today()  # 更新买单
                         await self._update_sold_today()    # 更新卖单
                         try:
-                            account = await self.trade_client.get_account()
+                            account = await self.account_snapshot.get()
                             await self._update_current_positions(account)
 
                             # 🔥 动态更新WebSocket订阅（确保所有持仓都被监控）
@@ -1752,50 +1853,43 @@ class SignalGenerator:
                             logger.debug("   ⏭️  WebSocket模式：跳过轮询扫描信号生成（实时推送中）")
                             signals_generated = 0
                         else:
-                            # 轮询模式：逐个分析标的并生成信号
+                            # 轮询模式：并发分析标的（有界并发），候选信号统一做一次准入检查
                             signals_generated = 0
-                            for quote in quotes:
-                                try:
-                                    symbol = quote.symbol
-                                    current_price = float(quote.last_done)
-
-                                    logger.info(f"\n📊 分析 {symbol} ({all_symbols.get(symbol, {}).get('name', symbol)})")
-                                    logger.info(f"  实时行情: 价格=${current_price:.2f}, 成交量={quote.volume:,}")
-
-                                    # 检查市场是否开盘
-                                    if self.check_market_hours and not self._is_market_open(symbol):
-                                        logger.debug(f"  ⏭️  跳过 {symbol} (市场未开盘)")
-                                        continue
-
-                                    # 分析标的并生成信号
-                                    signal = await self.analyze_symbol_and_generate_signal(symbol, quote, current_price)
-
-                                    if signal:
-                                        # 检查是否应该生成信号（去重检查）
-                                        should_generate, skip_reason = await self._should_generate_signal(
-                                            signal['symbol'],
-                                            signal['type']
-                                        )
+                            scan_start = asyncio.get_running_loop().time()
+                            results = await gather_bounded(
+                                quotes,
+                                lambda quote: self._analyze_quote(quote, all_symbols),
+                                self.analysis_concurrency,
+                            )
+                            candidate_signals = []
+                            for quote, result in zip(quotes, results):
+                                if isinstance(result, Exception):
+                                    logger.error(f"  ❌ 分析标的失败 {quote.symbol}: {result}")
+                                elif result:
+                                    candidate_signals.append(result)
+                            logger.info(
+                                f"⚡ 扫描完成: {len(quotes)}个标的, 候选信号{len(candidate_signals)}个, "
+                                f"耗时{asyncio.get_running_loop().time() - scan_start:.1f}秒 (并发{self.analysis_concurrency})"
+                            )
 
-                                        if not should_generate:
-                                            logger.info(f"  ⏭️  跳过信号: {skip_reason}")
-                                            continue
-                                        # 发送信号到队列
-                                        success = await self.signal_queue.publish_signal(signal)
-                                        if success:
-                                            signals_generated += 1
-                                            # 记录信号生成时间（用于冷却期检查）
-                                            self.signal_history[signal['symbol']] = datetime.now(self.beijing_tz)
-                                            logger.success(
-                                                f"  ✅ 信号已发送到队列: {signal['type']}, "
-                                                f"评分={signal['score']}, 优先级={signal.get('priority', signal['score'])}"
-                                            )
-                                        else:
-                                            logger.error(f"  ❌ 信号发送失败: {symbol}")
-
-                                except Exception as e:
-                                    logger.error(f"  ❌ 分析标的失败 {symbol}: {e}")
+                            # 检查是否应该生成信号（去重检查，一次Redis往返）
+                            async for signal, should_generate, skip_reason in self._iter_admitted(candidate_signals):
+                                symbol = signal['symbol']
+                                if not should_generate:
+                                    logger.info(f"  ⏭️  跳过信号 ({symbol}): {skip_reason}")
                                     continue
+                                # 发送信号到队列
+                                success = await self.signal_queue.publish_signal(signal)
+                                if success:
+                                    signals_generated += 1
+                                    # 记录信号生成时间（用于冷却期检查）
+                                    self.signal_history[symbol] = datetime.now(self.beijing_tz)
+                                    logger.success(
+                                        f"  ✅ 信号已发送到队列: {symbol} {signal['type']}, "
+                                        f"评分={signal['score']}, 优先级={signal.get('priority', signal['score'])}"
+                                    )
+                                else:
+                                    logger.error(f"  ❌ 信号发送失败: {symbol}")
 
                         # 5. 🔥 获取当前市场状态（牛熊市判断）
                         try:
@@ -1853,13 +1947,8 @@ class SignalGenerator:
                             else:
                                 exit_signals = []
 
-                            for exit_signal in exit_signals:
-                                # 检查是否应该生成信号（去重检查）- 修复：exit信号也需要去重
-                                should_generate, skip_reason = await self._should_generate_signal(
-                                    exit_signal['symbol'],
-                                    exit_signal['type']
-                                )
-
+                            async for exit_signal, should_generate, skip_reason in self._iter_admitted(exit_signals):
+                                # 检查是否应该生成信号（去重检查，整批一次Redis往返）
                                 if not should_generate:
                                     logger.info(f"  ⏭️  跳过平仓信号 ({exit_signal['symbol']}): {skip_reason}")
                                     continue
@@ -1883,13 +1972,8 @@ class SignalGenerator:
                             else:
                                 add_signals = []
 
-                            for add_signal in add_signals:
-                                # 检查是否应该生成信号（去重检查）
-                                should_generate, skip_reason = await self._should_generate_signal(
-                                    add_signal['symbol'],
-                                    add_signal['type']
-                                )
-
+                            async for add_signal, should_generate, skip_reason in self._iter_admitted(add_signals):
+                                # 检查是否应该生成信号（去重检查，整批一次Redis往返）
                                 if not should_generate:
                                     logger.info(f"  ⏭️  跳过加仓信号 ({add_signal['symbol']}): {skip_reason}")
                                     continue
@@ -1943,8 +2027,29 @@ class SignalGenerator:
             # 关闭Redis连接
             await self.signal_queue.close()
             await self.position_manager.close()
+            await self.stop_manager.disconnect()
+            if self.account_snapshot:
+                await self.account_snapshot.close()
+            if self.security_ref:
+                await self.security_ref.close()
             logger.info("✅ 资源清理完成")
 
+    async def _analyze_quote(self, quote, all_symbols: Dict) -> Optional[Dict]:
+        """轮询模式下分析单个标的（供并发扫描调用）"""
+        symbol = quote.symbol
+        current_price = float(quote.last_done)
+
+        logger.info(f"\n📊 分析 {symbol} ({all_symbols.get(symbol, {}).get('name', symbol)})")
+        logger.info(f"  实时行情: 价格=${current_price:.2f}, 成交量={quote.volume:,}")
+
+        # 检查市场是否开盘
+        if self.check_market_hours and not self._is_market_open(symbol):
+            logger.debug(f"  ⏭️  跳过 {symbol} (市场未开盘)")
+            return None
+
+        # 分析标的并生成信号
+        return await self.analyze_symbol_and_generate_signal(symbol, quote, current_price)
+
     async def analyze_symbol_and_generate_signal(
         self,
         symbol: str,
@@ -1986,45 +2091,56 @@ class SignalGenerator:
                     )
                     return None
 
-            # 获取历史K线数据
-            end_date = datetime.now()
-            days_to_fetch = 100  # 获取更多数据以确保有足够的历史
-            start_date = end_date - timedelta(days=days_to_fetch)
+            # 📈 优先使用内存日线缓存（仅首次预热访问数据库/API）
+            if self.bar_store is not None:
+                bars = await self._get_daily_bars(symbol, quote)
+                if bars is None:
+                    logger.debug(f"  ❌ {symbol}: 日线缓存未就绪（历史数据不足或预热失败），跳过分析")
+                    return None
+                closes, highs, lows, volumes = bars.close, bars.high, bars.low, bars.volume
+                indicators = self._calculate_streaming_indicators(symbol, bars)
+            else:
+                indicators = None
+                # 获取历史K线数据
+                end_date = datetime.now()
+                days_to_fetch = 100  # 获取更多数据以确保有足够的历史
+                start_date = end_date - timedelta(days=days_to_fetch)
 
-            logger.debug(f"  📥 获取历史K线数据: {days_to_fetch}天 (从{start_date.date()}到{end_date.date()})")
+                logger.debug(f"  📥 获取历史K线数据: {days_to_fetch}天 (从{start_date.date()}到{end_date.date()})")
 
-            try:
-                candles = await self.quote_client.get_history_candles(
-                    symbol=symbol,
-                    period=openapi.Period.Day,
-                    adjust_type=openapi.AdjustType.NoAdjust,
-                    start=start_date,
-                    end=end_date
-                )
-                logger.debug(f"  ✅ 获取到 {len(candles) if candles else 0} 天K线数据")
-            except Exception as e:
-                logger.warning(f"  ❌ 获取K线数据失败: {e}")
-                logger.debug(f"     详细错误: {type(e).__name__}: {str(e)}")
-                return None
+                try:
+                    candles = await self._get_history_candles(
+                        symbol=symbol,
+                        period=openapi.Period.Day,
+                        adjust_type=openapi.AdjustType.NoAdjust,
+                        start=start_date,
+                        end=end_date
+                    )
+                    logger.debug(f"  ✅ 获取到 {len(candles) if candles else 0} 天K线数据")
+                except Exception as e:
+                    logger.warning(f"  ❌ 获取K线数据失败: {e}")
+                    logger.debug(f"     详细错误: {type(e).__name__}: {str(e)}")
+                    return None
 
-            if not candles or len(candles) < 30:
-                logger.warning(
-                    f"  ❌ 历史数据不足，跳过分析\n"
-                    f"     实际: {len(candles) if candles else 0}天\n"
-                    f"     需要: 至少30天"
-                )
-                return None
+                if not candles or len(candles) < 30:
+                    logger.warning(
+                        f"  ❌ 历史数据不足，跳过分析\n"
+                        f"     实际: {len(candles) if candles else 0}天\n"
+                        f"     需要: 至少30天"
+                    )
+                    return None
 
-            # 提取价格数据
-            closes = np.array([float(c.close) for c in candles])
-            highs = np.array([float(c.high) for c in candles])
-            lows = np.array([float(c.low) for c in candles])
-            volumes = np.array([c.volume for c in candles])
+                # 提取价格数据
+                closes = np.array([float(c.close) for c in candles])
+                highs = np.array([float(c.high) for c in candles])
+                lows = np.array([float(c.low) for c in candles])
+                volumes = np.array([c.volume for c in candles])
 
-            # 计算技术指标
-            logger.debug(f"  🔬 开始计算技术指标 (数据长度: {len(closes)}天)...")
-            indicators = self._calculate_all_indicators(closes, highs, lows, volumes)
-            logger.debug(f"  ✅ 技术指标计算完成")
+            # 计算技术指标（日线缓存命中时已由增量指标引擎给出）
+            if indicators is None:
+                logger.debug(f"  🔬 开始计算技术指标 (数据长度: {len(closes)}天)...")
+                indicators = await self._compute_indicators(closes, highs, lows, volumes)
+                logger.debug(f"  ✅ 技术指标计算完成")
 
             # 分析买入信号
             signal = self._analyze_buy_signals(symbol, current_price, quote, indicators, closes, highs, lows)
@@ -2069,6 +2185,17 @@ class SignalGenerator:
 
             return None
 
+    async def _get_history_candles(self, **kwargs):
+        """获取历史K线（先从全局API令牌桶取令牌，并发分析时不会超出API限频）"""
+        limiter = get_api_rate_limiter()
+        if limiter:
+            await limiter.acquire()
+        return await self.quote_client.get_history_candles(**kwargs)
+
+    async def _compute_indicators(self, closes, highs, lows, volumes):
+        """在线程池中计算技术指标（不阻塞事件循环，多个标的可并行计算）"""
+        return await run_cpu(self._calculate_all_indicators, closes, highs, lows, volumes)
+
     def _calculate_all_indicators(self, closes, highs, lows, volumes):
         """计算所有技术指标"""
         try:
@@ -2130,6 +2257,64 @@ class SignalGenerator:
                 'volume_sma': np.nan, 'atr': np.nan,
             }
 
+    def _calculate_streaming_indicators(self, symbol: str, bars: DailyBars) -> Dict:
+        """
+        使用增量指标引擎计算技术指标（与 _calculate_all_indicators 结果一致）
+
+        已完成的日线只提交一次（O(1)/根），当日未完成的K线通过 peek 计算，
+        不修改引擎状态，因此每次实时推送都无需重算整段历史。
+        """
+        try:
+            stream = self.indicator_streams.get(symbol)
+            committed = bars.dates[:-1]
+            pending = None
+
+            if stream is not None and stream.last_timestamp is not None:
+                idx = int(np.searchsorted(committed, stream.last_timestamp))
+                if idx < len(committed) and committed[idx] == stream.last_timestamp:
+                    pending = range(idx + 1, len(committed))
+
+            if pending is None:
+                # 首次计算或历史不连续（缓存重新预热）：从日线缓存重放
+                stream = StreamingIndicators(
+                    rsi_period=self.rsi_period,
+                    bb_period=self.bb_period,
+                    bb_std=self.bb_std,
+                    macd_fast=self.macd_fast,
+                    macd_slow=self.macd_slow,
+                    macd_signal=self.macd_signal,
+                )
+                self.indicator_streams[symbol] = stream
+                pending = range(len(committed))
+
+            for i in pending:
+                stream.update(StreamingBar(
+                    close=bars.close[i],
+                    high=bars.high[i],
+                    low=bars.low[i],
+                    volume=bars.volume[i],
+                    timestamp=bars.dates[i],
+                ))
+
+            indicators = stream.peek(StreamingBar(
+                close=bars.close[-1],
+                high=bars.high[-1],
+                low=bars.low[-1],
+                volume=bars.volume[-1],
+            ))
+
+            if not self.use_multi_timeframe:
+                indicators['sma_20'] = np.nan
+                indicators['sma_50'] = np.nan
+            if not self.use_adaptive_stops:
+                indicators['atr'] = np.nan
+            return indicators
+
+        except Exception as e:
+            logger.debug(f"  ⚠️ {symbol}: 增量指标计算失败，回退到批量计算 - {e}")
+            self.indicator_streams.pop(symbol, None)
+            return self._calculate_all_indicators(bars.close, bars.high, bars.low, bars.volume)
+
     def _analyze_buy_signals(self, symbol, current_price, quote, ind, closes, highs, lows):
         """
         综合分析买入信号（混合策略：逆向 + 趋势跟随）
@@ -2409,6 +2594,29 @@ class SignalGenerator:
 
         return signal
 
+    async def _get_daily_bars(self, symbol: str, quote=None) -> Optional[DailyBars]:
+        """
+        从内存日线缓存获取K线（首次访问时预热：数据库 + 一次API调用）
+
+        Args:
+            symbol: 标的代码
+            quote: 最新行情（可选，用于推进当日K线）
+
+        Returns:
+            DailyBars，缓存未启用或数据不足时返回None
+        """
+        if self.bar_store is None:
+            return None
+
+        bars = await self.bar_store.ensure(
+            symbol,
+            allow_sync=not self._is_option_symbol(symbol)
+        )
+        if bars is not None and quote is not None:
+            self.bar_store.update_from_quote(symbol, quote)
+            bars = self.bar_store.get_bars(symbol)
+        return bars
+
     async def _load_klines_from_db(self, symbol: str, days: int = 90) -> List[KlineDaily]:
         """
         从数据库加载历史K线数据
@@ -2533,6 +2741,17 @@ class SignalGenerator:
             指标字典，如果获取失败返回None
         """
         try:
+            # 📈 内存日线缓存命中时直接计算，不访问数据库/API
+            bars = await self._get_daily_bars(symbol, quote)
+            if bars is not None:
+                indicators = self._calculate_streaming_indicators(symbol, bars)
+                current_volume = quote.volume if quote.volume else 0
+                if indicators['volume_sma'] and indicators['volume_sma'] > 0:
+                    indicators['volume_ratio'] = float(current_volume) / float(indicators['volume_sma'])
+                else:
+                    indicators['volume_ratio'] = 1.0
+                return indicators
+
             # 🔥 混合模式：数据库 + API
             candles = []
 
@@ -2547,7 +2766,7 @@ class SignalGenerator:
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=self.api_klines_latest_days)
 
-                api_candles = await self.quote_client.get_history_candles(
+                api_candles = await self._get_history_candles(
                     symbol=symbol,
                     period=openapi.Period.Day,
                     adjust_type=openapi.AdjustType.NoAdjust,
@@ -2609,7 +2828,7 @@ class SignalGenerator:
                                     )
                                     end_date = datetime.now()
                                     start_date = end_date - timedelta(days=100)
-                                    candles = await self.quote_client.get_history_candles(
+                                    candles = await self._get_history_candles(
                                         symbol=symbol,
                                         period=openapi.Period.Day,
                                         adjust_type=openapi.AdjustType.NoAdjust,
@@ -2621,7 +2840,7 @@ class SignalGenerator:
                                 logger.debug(f"  ⚠️ {symbol}: 自动同步失败，回退到API模式")
                                 end_date = datetime.now()
                                 start_date = end_date - timedelta(days=100)
-                                candles = await self.quote_client.get_history_candles(
+                                candles = await self._get_history_candles(
                                     symbol=symbol,
                                     period=openapi.Period.Day,
                                     adjust_type=openapi.AdjustType.NoAdjust,
@@ -2633,7 +2852,7 @@ class SignalGenerator:
                             logger.debug(f"  ⚠️ {symbol}: 自动同步异常 ({e})，回退到API模式")
                             end_date = datetime.now()
                             start_date = end_date - timedelta(days=100)
-                            candles = await self.quote_client.get_history_candles(
+                            candles = await self._get_history_candles(
                                 symbol=symbol,
                                 period=openapi.Period.Day,
                                 adjust_type=openapi.AdjustType.NoAdjust,
@@ -2649,7 +2868,7 @@ class SignalGenerator:
                         )
                         end_date = datetime.now()
                         start_date = end_date - timedelta(days=100)
-                        candles = await self.quote_client.get_history_candles(
+                        candles = await self._get_history_candles(
                             symbol=symbol,
                             period=openapi.Period.Day,
                             adjust_type=openapi.AdjustType.NoAdjust,
@@ -2660,7 +2879,7 @@ class SignalGenerator:
                 # 纯API模式（混合模式未启用）
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=100)
-                candles = await self.quote_client.get_history_candles(
+                candles = await self._get_history_candles(
                     symbol=symbol,
                     period=openapi.Period.Day,
                     adjust_type=openapi.AdjustType.NoAdjust,
@@ -2679,7 +2898,7 @@ class SignalGenerator:
             volumes = np.array([c.volume for c in candles])
 
             # 计算技术指标
-            indicators = self._calculate_all_indicators(closes, highs, lows, volumes)
+            indicators = await self._compute_indicators(closes, highs, lows, volumes)
 
             # 添加成交量比率
             current_volume = quote.volume if quote.volume else 0
@@ -3001,386 +3220,405 @@ class SignalGenerator:
             # 创建行情字典
             quote_dict = {q.symbol: q for q in quotes}
 
-            for position in positions:
-                symbol = position["symbol"]
-                quantity = position["quantity"]
-                cost_price = position["cost_price"]
-
-                if symbol not in quote_dict:
-                    continue
+            # 有界并发检查每个持仓（历史K线请求共享全局API令牌桶）
+            checks = [(position, quote_dict[position["symbol"]]) for position in positions
+                      if position["symbol"] in quote_dict]
+            results = await gather_bounded(
+                checks,
+                lambda item: self._check_position_exit(item[0], item[1], account, regime),
+                self.analysis_concurrency,
+            )
+            for (position, _), result in zip(checks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ 检查退出信号失败 {position['symbol']}: {result}")
+                else:
+                    exit_signals.extend(result)
 
-                quote = quote_dict[symbol]
-                current_price = float(quote.last_done)
+        except Exception as e:
+            logger.error(f"❌ 检查退出信号失败: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
 
-                # 🔥 检查是否在分批止损观察期内
-                is_in_observation = False
-                partial_exit_data = None
-                if self.settings.partial_exit_enabled:
-                    try:
-                        import json
-                        partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
-                        partial_exit_str = await self.position_manager._redis.get(partial_exit_key)
-                        if partial_exit_str:
-                            partial_exit_data = json.loads(partial_exit_str)
-                            is_in_observation = True
-                            logger.info(
-                                f"  👀 {symbol}: 观察期内（部分平仓后）\n"
-                                f"     已卖出: {partial_exit_data['partial_qty']}股\n"
-                                f"     剩余: {partial_exit_data['remaining_qty']}股\n"
-                                f"     观察开始: {partial_exit_data['timestamp']}"
-                            )
-                    except Exception as e:
-                        logger.debug(f"检查观察期状态失败: {e}")
+        return exit_signals
 
-                # 检查是否有止损止盈设置
-                stops = await self.stop_manager.get_position_stops(account.get("account_id", ""), symbol)
+    async def _check_position_exit(self, position: Dict, quote, account: Dict, regime: str) -> List[Dict]:
+        """
+        检查单个持仓的止损止盈（check_exit_signals 对每个持仓并发调用）
 
-                if not stops:
-                    continue
+        Returns:
+            该持仓的平仓信号列表（可能为空）
+        """
+        exit_signals = []
 
-                # === 智能退出决策 ===
-                # 获取技术指标
-                indicators = await self._fetch_current_indicators(symbol, quote)
+        symbol = position["symbol"]
+        quantity = position["quantity"]
+        cost_price = position["cost_price"]
+        current_price = float(quote.last_done)
 
-                if indicators:
-                    # 计算智能退出评分
-                    exit_decision = self._calculate_exit_score(
-                        indicators=indicators,
-                        position=position,
-                        current_price=current_price,
-                        stops=stops,
-                        regime=regime
+        # 🔥 检查是否在分批止损观察期内
+        is_in_observation = False
+        partial_exit_data = None
+        if self.settings.partial_exit_enabled:
+            try:
+                import json
+                partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
+                partial_exit_str = await self.position_manager._redis.get(partial_exit_key)
+                if partial_exit_str:
+                    partial_exit_data = json.loads(partial_exit_str)
+                    is_in_observation = True
+                    logger.info(
+                        f"  👀 {symbol}: 观察期内（部分平仓后）\n"
+                        f"     已卖出: {partial_exit_data['partial_qty']}股\n"
+                        f"     剩余: {partial_exit_data['remaining_qty']}股\n"
+                        f"     观察开始: {partial_exit_data['timestamp']}"
                     )
+            except Exception as e:
+                logger.debug(f"检查观察期状态失败: {e}")
 
-                    action = exit_decision['action']
-                    score = exit_decision['score']
-                    reasons = exit_decision['reasons']
-                    profit_pct = exit_decision['profit_pct']
+        # 检查是否有止损止盈设置
+        stops = await self.stop_manager.get_position_stops(account.get("account_id", ""), symbol)
 
-                    # 记录决策分析
-                    logger.debug(
-                        f"  📊 {symbol}: 智能分析\n"
-                        f"     当前价=${current_price:.2f}, 成本=${cost_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                        f"     评分={score:+d}, 动作={action}\n"
-                        f"     原因: {', '.join(reasons) if reasons else '无'}"
-                    )
+        if not stops:
+            return exit_signals
 
-                    # 🔥 观察期后的趋势确认逻辑
-                    if is_in_observation and partial_exit_data:
-                        prev_score = partial_exit_data.get('exit_score', 50)
-
-                        if score >= 60:
-                            # 趋势继续恶化，清仓剩余50%
-                            logger.error(
-                                f"🔴 {symbol}: 观察期确认下跌 - 清仓剩余仓位\n"
-                                f"   评分: {prev_score} → {score} (继续恶化)\n"
-                                f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                                f"   原因: {', '.join(reasons)}"
-                            )
-                            exit_signals.append({
-                                'symbol': symbol,
-                                'type': 'FULL_EXIT_CONFIRMED',
-                                'side': 'SELL',
-                                'quantity': quantity,  # 卖出剩余全部
-                                'price': current_price,
-                                'reason': f"观察期确认下跌，清仓: {', '.join(reasons[:3])}",
-                                'score': 95,
-                                'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                                'priority': 95,
-                                'cost_price': cost_price,
-                                'entry_time': position.get('entry_time'),
-                                'indicators': indicators,
-                                'exit_score_details': reasons,
-                            })
-                            # 清除观察期状态
-                            try:
-                                partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
-                                await self.position_manager._redis.delete(partial_exit_key)
-                            except:
-                                pass
-                            continue  # 已生成清仓信号，跳过后续逻辑
-
-                        elif score < 30:
-                            # 趋势恢复，保留剩余仓位
-                            logger.success(
-                                f"✅ {symbol}: 观察期确认恢复 - 保留剩余仓位\n"
-                                f"   评分: {prev_score} → {score} (趋势恢复)\n"
-                                f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                                f"   动作: 继续持有{quantity}股"
-                            )
-                            # 清除观察期状态
-                            try:
-                                partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
-                                await self.position_manager._redis.delete(partial_exit_key)
-                            except:
-                                pass
-                            continue  # 保留仓位，跳过后续逻辑
-                        else:
-                            # 趋势不明确，继续观察
-                            logger.info(
-                                f"  ⏳ {symbol}: 观察期继续 - 趋势不明确\n"
-                                f"   评分: {prev_score} → {score}\n"
-                                f"   继续观察剩余{quantity}股"
-                            )
-                            continue  # 继续观察，跳过后续逻辑
-
-                    # 🔥 检查最小持仓时间（智能止盈也需要遵守）
-                    entry_time_str = position.get('entry_time')
-                    if (
-                        self.settings.enable_min_holding_period
-                        and entry_time_str
-                        and action in ["TAKE_PROFIT_NOW", "TAKE_PROFIT_EARLY"]
-                    ):
-                        try:
-                            entry_time = datetime.fromisoformat(entry_time_str)
-                            holding_seconds = (datetime.now(self.beijing_tz) - entry_time).total_seconds()
+        # === 智能退出决策 ===
+        # 获取技术指标
+        indicators = await self._fetch_current_indicators(symbol, quote)
 
-                            if holding_seconds < self.settings.min_holding_period:
-                                holding_minutes = holding_seconds / 60
-                                required_minutes = self.settings.min_holding_period / 60
-                                logger.info(
-                                    f"  ⏭️ {symbol}: 跳过智能止盈 - 持仓时间不足\n"
-                                    f"     持仓时长: {holding_minutes:.1f}分钟 < {required_minutes:.0f}分钟\n"
-                                    f"     评分={score:+d}, 收益={profit_pct:+.2f}%\n"
-                                    f"     原因: {', '.join(reasons[:2])}"
-                                )
-                                continue  # 跳过这个标的，检查下一个
-                        except Exception as e:
-                            logger.warning(f"  ⚠️ {symbol}: 解析entry_time失败: {e}")
+        if indicators:
+            # 计算智能退出评分
+            exit_decision = self._calculate_exit_score(
+                indicators=indicators,
+                position=position,
+                current_price=current_price,
+                stops=stops,
+                regime=regime
+            )
 
-                    # 🔥 检查最小盈利要求（避免小幅波动就卖出）
-                    if action in ["TAKE_PROFIT_NOW", "TAKE_PROFIT_EARLY"]:
-                        min_profit_pct = 3.0  # 最小3%盈利
-                        if profit_pct < min_profit_pct:
-                            logger.debug(
-                                f"  ⏭️ {symbol}: 跳过智能止盈 - 盈利不足\n"
-                                f"     当前盈利: {profit_pct:.2f}% < {min_profit_pct:.1f}%"
-                            )
-                            continue  # 跳过这个标的
+            action = exit_decision['action']
+            score = exit_decision['score']
+            reasons = exit_decision['reasons']
+            profit_pct = exit_decision['profit_pct']
 
-                    # 根据动作决定是否生成信号
-                    if action == "TAKE_PROFIT_NOW":
-                        # 立即止盈（忽略固定止盈位）
-                        logger.success(
-                            f"🎯 {symbol}: 智能止盈 (评分={score:+d})\n"
-                            f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                            f"   原因: {', '.join(reasons)}"
-                        )
-                        exit_signals.append({
-                            'symbol': symbol,
-                            'type': 'SMART_TAKE_PROFIT',
-                            'side': 'SELL',
-                            'quantity': quantity,
-                            'price': current_price,
-                            'reason': f"智能止盈: {', '.join(reasons[:3])}",  # 前3个原因
-                            'score': 95,
-                            'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                            'priority': 95,
-                            # 🔥 增强数据：供Slack通知使用
-                            'cost_price': cost_price,
-                            'entry_time': position.get('entry_time'),
-                            'indicators': indicators,  # 完整的技术指标
-                            'exit_score_details': reasons,  # 卖出评分详情
-                        })
+            # 记录决策分析
+            logger.debug(
+                f"  📊 {symbol}: 智能分析\n"
+                f"     当前价=${current_price:.2f}, 成本=${cost_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                f"     评分={score:+d}, 动作={action}\n"
+                f"     原因: {', '.join(reasons) if reasons else '无'}"
+            )
 
-                    elif action == "PARTIAL_EXIT":
-                        # 🔥 分批止损：先卖出50%仓位
-                        partial_qty = int(float(quantity) * self.settings.partial_exit_pct)
-                        if partial_qty > 0:
-                            logger.warning(
-                                f"⚠️  {symbol}: 分批止损 - 先减{int(self.settings.partial_exit_pct*100)}%仓位 (评分={score:+d})\n"
-                                f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                                f"   卖出数量: {partial_qty}/{quantity}股\n"
-                                f"   原因: {', '.join(reasons)}\n"
-                                f"   观察期: {self.settings.partial_exit_observation_minutes}分钟"
-                            )
-                            exit_signals.append({
-                                'symbol': symbol,
-                                'type': 'PARTIAL_EXIT',
-                                'side': 'SELL',
-                                'quantity': partial_qty,  # 🔥 只卖出部分仓位
-                                'price': current_price,
-                                'reason': f"分批止损({int(self.settings.partial_exit_pct*100)}%): {', '.join(reasons[:3])}",
-                                'score': 90,
-                                'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                                'priority': 90,
-                                # 🔥 增强数据：供Slack通知使用
-                                'cost_price': cost_price,
-                                'entry_time': position.get('entry_time'),
-                                'indicators': indicators,  # 完整的技术指标
-                                'exit_score_details': reasons,  # 卖出评分详情
-                                'is_partial': True,  # 标记为部分平仓
-                                'remaining_qty': int(float(quantity)) - partial_qty,
-                            })
-
-                            # 🔥 记录部分平仓状态到Redis（用于观察期判断）
-                            try:
-                                import json
-                                partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
-                                partial_exit_data = {
-                                    'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                                    'partial_qty': partial_qty,
-                                    'remaining_qty': int(float(quantity)) - partial_qty,
-                                    'exit_score': score,
-                                    'price': float(current_price),
-                                }
-                                await self.position_manager._redis.setex(
-                                    partial_exit_key,
-                                    self.settings.partial_exit_observation_minutes * 60,  # TTL = 观察期
-                                    json.dumps(partial_exit_data)
-                                )
-                            except Exception as e:
-                                logger.warning(f"记录部分平仓状态失败: {e}")
+            # 🔥 观察期后的趋势确认逻辑
+            if is_in_observation and partial_exit_data:
+                prev_score = partial_exit_data.get('exit_score', 50)
+
+                if score >= 60:
+                    # 趋势继续恶化，清仓剩余50%
+                    logger.error(
+                        f"🔴 {symbol}: 观察期确认下跌 - 清仓剩余仓位\n"
+                        f"   评分: {prev_score} → {score} (继续恶化)\n"
+                        f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                        f"   原因: {', '.join(reasons)}"
+                    )
+                    exit_signals.append({
+                        'symbol': symbol,
+                        'type': 'FULL_EXIT_CONFIRMED',
+                        'side': 'SELL',
+                        'quantity': quantity,  # 卖出剩余全部
+                        'price': current_price,
+                        'reason': f"观察期确认下跌，清仓: {', '.join(reasons[:3])}",
+                        'score': 95,
+                        'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                        'priority': 95,
+                        'cost_price': cost_price,
+                        'entry_time': position.get('entry_time'),
+                        'indicators': indicators,
+                        'exit_score_details': reasons,
+                    })
+                    # 清除观察期状态
+                    try:
+                        partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
+                        await self.position_manager._redis.delete(partial_exit_key)
+                    except:
+                        pass
+                    return exit_signals  # 已生成清仓信号，跳过后续逻辑
 
-                    elif action == "GRADUAL_EXIT":
-                        # 🔥 渐进式减仓：卖出25%仓位
-                        gradual_qty = int(quantity * 0.25)
-                        if gradual_qty > 0:
-                            logger.warning(
-                                f"📉 {symbol}: 渐进式减仓 - 先减25%仓位 (评分={score:+d})\n"
-                                f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                                f"   卖出数量: {gradual_qty}/{quantity}股\n"
-                                f"   原因: {', '.join(reasons)}\n"
-                                f"   观察期: {self.settings.partial_exit_observation_minutes}分钟"
-                            )
-                            exit_signals.append({
-                                'symbol': symbol,
-                                'type': 'GRADUAL_EXIT',
-                                'side': 'SELL',
-                                'quantity': gradual_qty,  # 🔥 只卖出25%仓位
-                                'price': current_price,
-                                'reason': f"渐进式减仓(25%): {', '.join(reasons[:3])}",
-                                'score': 85,
-                                'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                                'priority': 85,
-                                # 🔥 增强数据：供Slack通知使用
-                                'cost_price': cost_price,
-                                'entry_time': position.get('entry_time'),
-                                'indicators': indicators,  # 完整的技术指标
-                                'exit_score_details': reasons,  # 卖出评分详情
-                                'is_partial': True,  # 标记为部分平仓
-                                'remaining_qty': quantity - gradual_qty,
-                            })
-
-                            # 🔥 记录部分平仓状态到Redis（用于观察期判断）
-                            try:
-                                import json
-                                partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
-                                partial_exit_data = {
-                                    'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                                    'partial_qty': gradual_qty,
-                                    'remaining_qty': quantity - gradual_qty,
-                                    'exit_score': score,
-                                    'price': current_price,
-                                }
-                                await self.position_manager._redis.setex(
-                                    partial_exit_key,
-                                    self.settings.partial_exit_observation_minutes * 60,  # TTL = 观察期
-                                    json.dumps(partial_exit_data)
-                                )
-                            except Exception as e:
-                                logger.warning(f"记录渐进式减仓状态失败: {e}")
+                elif score < 30:
+                    # 趋势恢复，保留剩余仓位
+                    logger.success(
+                        f"✅ {symbol}: 观察期确认恢复 - 保留剩余仓位\n"
+                        f"   评分: {prev_score} → {score} (趋势恢复)\n"
+                        f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                        f"   动作: 继续持有{quantity}股"
+                    )
+                    # 清除观察期状态
+                    try:
+                        partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
+                        await self.position_manager._redis.delete(partial_exit_key)
+                    except:
+                        pass
+                    return exit_signals  # 保留仓位，跳过后续逻辑
+                else:
+                    # 趋势不明确，继续观察
+                    logger.info(
+                        f"  ⏳ {symbol}: 观察期继续 - 趋势不明确\n"
+                        f"   评分: {prev_score} → {score}\n"
+                        f"   继续观察剩余{quantity}股"
+                    )
+                    return exit_signals  # 继续观察，跳过后续逻辑
 
-                    elif action == "TAKE_PROFIT_EARLY":
-                        # 提前止盈（不等固定止盈位）
+            # 🔥 检查最小持仓时间（智能止盈也需要遵守）
+            entry_time_str = position.get('entry_time')
+            if (
+                self.settings.enable_min_holding_period
+                and entry_time_str
+                and action in ["TAKE_PROFIT_NOW", "TAKE_PROFIT_EARLY"]
+            ):
+                try:
+                    entry_time = datetime.fromisoformat(entry_time_str)
+                    holding_seconds = (datetime.now(self.beijing_tz) - entry_time).total_seconds()
+
+                    if holding_seconds < self.settings.min_holding_period:
+                        holding_minutes = holding_seconds / 60
+                        required_minutes = self.settings.min_holding_period / 60
                         logger.info(
-                            f"🎯 {symbol}: 提前止盈信号 (评分={score:+d})\n"
-                            f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                            f"   原因: {', '.join(reasons)}"
+                            f"  ⏭️ {symbol}: 跳过智能止盈 - 持仓时间不足\n"
+                            f"     持仓时长: {holding_minutes:.1f}分钟 < {required_minutes:.0f}分钟\n"
+                            f"     评分={score:+d}, 收益={profit_pct:+.2f}%\n"
+                            f"     原因: {', '.join(reasons[:2])}"
                         )
-                        exit_signals.append({
-                            'symbol': symbol,
-                            'type': 'EARLY_TAKE_PROFIT',
-                            'side': 'SELL',
-                            'quantity': quantity,
-                            'price': current_price,
-                            'reason': f"提前止盈: {', '.join(reasons[:3])}",
-                            'score': 85,
-                            'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                            'priority': 85,
-                            # 🔥 增强数据：供Slack通知使用
-                            'cost_price': cost_price,
-                            'entry_time': position.get('entry_time'),
-                            'indicators': indicators,  # 完整的技术指标
-                            'exit_score_details': reasons,  # 卖出评分详情
-                        })
-
-                    elif action in ["STRONG_HOLD", "DELAY_TAKE_PROFIT"]:
-                        # 延迟止盈（即使达到固定止盈位也不卖）
-                        if current_price >= stops.get('take_profit', float('inf')):
-                            logger.info(
-                                f"⏸️  {symbol}: 延迟止盈 (评分={score:+d})\n"
-                                f"   已达固定止盈(${stops['take_profit']:.2f})，但指标显示持有\n"
-                                f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
-                                f"   原因: {', '.join(reasons)}\n"
-                                f"   新止盈目标: ${exit_decision['adjusted_take_profit']:.2f}"
-                            )
-                            # 不生成信号，继续持有
-
-                    elif action == "STANDARD":
-                        # 使用固定止损止盈逻辑
-                        pass  # 继续执行下面的固定逻辑
+                        return exit_signals  # 跳过这个标的
+                except Exception as e:
+                    logger.warning(f"  ⚠️ {symbol}: 解析entry_time失败: {e}")
 
-                # === 固定止损止盈逻辑（保底 + 未获取指标时使用）===
-                # 即使有智能决策，固定止损仍然作为保底
+            # 🔥 检查最小盈利要求（避免小幅波动就卖出）
+            if action in ["TAKE_PROFIT_NOW", "TAKE_PROFIT_EARLY"]:
+                min_profit_pct = 3.0  # 最小3%盈利
+                if profit_pct < min_profit_pct:
+                    logger.debug(
+                        f"  ⏭️ {symbol}: 跳过智能止盈 - 盈利不足\n"
+                        f"     当前盈利: {profit_pct:.2f}% < {min_profit_pct:.1f}%"
+                    )
+                    return exit_signals  # 跳过这个标的
 
-                # 检查固定止损
-                if stops.get('stop_loss') and current_price <= stops['stop_loss']:
+            # 根据动作决定是否生成信号
+            if action == "TAKE_PROFIT_NOW":
+                # 立即止盈（忽略固定止盈位）
+                logger.success(
+                    f"🎯 {symbol}: 智能止盈 (评分={score:+d})\n"
+                    f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                    f"   原因: {', '.join(reasons)}"
+                )
+                exit_signals.append({
+                    'symbol': symbol,
+                    'type': 'SMART_TAKE_PROFIT',
+                    'side': 'SELL',
+                    'quantity': quantity,
+                    'price': current_price,
+                    'reason': f"智能止盈: {', '.join(reasons[:3])}",  # 前3个原因
+                    'score': 95,
+                    'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                    'priority': 95,
+                    # 🔥 增强数据：供Slack通知使用
+                    'cost_price': cost_price,
+                    'entry_time': position.get('entry_time'),
+                    'indicators': indicators,  # 完整的技术指标
+                    'exit_score_details': reasons,  # 卖出评分详情
+                })
+
+            elif action == "PARTIAL_EXIT":
+                # 🔥 分批止损：先卖出50%仓位
+                partial_qty = int(float(quantity) * self.settings.partial_exit_pct)
+                if partial_qty > 0:
                     logger.warning(
-                        f"🛑 {symbol}: 触发固定止损 "
-                        f"(当前=${current_price:.2f}, 止损=${stops['stop_loss']:.2f})"
+                        f"⚠️  {symbol}: 分批止损 - 先减{int(self.settings.partial_exit_pct*100)}%仓位 (评分={score:+d})\n"
+                        f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                        f"   卖出数量: {partial_qty}/{quantity}股\n"
+                        f"   原因: {', '.join(reasons)}\n"
+                        f"   观察期: {self.settings.partial_exit_observation_minutes}分钟"
                     )
                     exit_signals.append({
                         'symbol': symbol,
-                        'type': 'STOP_LOSS',
+                        'type': 'PARTIAL_EXIT',
                         'side': 'SELL',
-                        'quantity': quantity,
+                        'quantity': partial_qty,  # 🔥 只卖出部分仓位
                         'price': current_price,
-                        'reason': f"触发固定止损 (${stops['stop_loss']:.2f})",
-                        'score': 100,
+                        'reason': f"分批止损({int(self.settings.partial_exit_pct*100)}%): {', '.join(reasons[:3])}",
+                        'score': 90,
                         'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                        'priority': 100,
+                        'priority': 90,
                         # 🔥 增强数据：供Slack通知使用
                         'cost_price': cost_price,
                         'entry_time': position.get('entry_time'),
-                        'indicators': indicators if indicators else {},
+                        'indicators': indicators,  # 完整的技术指标
+                        'exit_score_details': reasons,  # 卖出评分详情
+                        'is_partial': True,  # 标记为部分平仓
+                        'remaining_qty': int(float(quantity)) - partial_qty,
                     })
 
-                # 检查固定止盈（仅在没有智能决策或决策为STANDARD时）
-                elif stops.get('take_profit') and current_price >= stops['take_profit']:
-                    # 如果有指标分析且建议持有，则不执行固定止盈
-                    if indicators:
-                        exit_decision = self._calculate_exit_score(
-                            indicators, position, current_price, stops, regime
+                    # 🔥 记录部分平仓状态到Redis（用于观察期判断）
+                    try:
+                        import json
+                        partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
+                        partial_exit_data = {
+                            'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                            'partial_qty': partial_qty,
+                            'remaining_qty': int(float(quantity)) - partial_qty,
+                            'exit_score': score,
+                            'price': float(current_price),
+                        }
+                        await self.position_manager._redis.setex(
+                            partial_exit_key,
+                            self.settings.partial_exit_observation_minutes * 60,  # TTL = 观察期
+                            json.dumps(partial_exit_data)
                         )
-                        if exit_decision['action'] in ["STRONG_HOLD", "DELAY_TAKE_PROFIT"]:
-                            # 已经在上面记录日志了，这里跳过
-                            continue
+                    except Exception as e:
+                        logger.warning(f"记录部分平仓状态失败: {e}")
 
-                    logger.info(
-                        f"🎯 {symbol}: 触发固定止盈 "
-                        f"(当前=${current_price:.2f}, 止盈=${stops['take_profit']:.2f})"
+            elif action == "GRADUAL_EXIT":
+                # 🔥 渐进式减仓：卖出25%仓位
+                gradual_qty = int(quantity * 0.25)
+                if gradual_qty > 0:
+                    logger.warning(
+                        f"📉 {symbol}: 渐进式减仓 - 先减25%仓位 (评分={score:+d})\n"
+                        f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                        f"   卖出数量: {gradual_qty}/{quantity}股\n"
+                        f"   原因: {', '.join(reasons)}\n"
+                        f"   观察期: {self.settings.partial_exit_observation_minutes}分钟"
                     )
                     exit_signals.append({
                         'symbol': symbol,
-                        'type': 'TAKE_PROFIT',
+                        'type': 'GRADUAL_EXIT',
                         'side': 'SELL',
-                        'quantity': quantity,
+                        'quantity': gradual_qty,  # 🔥 只卖出25%仓位
                         'price': current_price,
-                        'reason': f"触发固定止盈 (${stops['take_profit']:.2f})",
-                        'score': 90,
+                        'reason': f"渐进式减仓(25%): {', '.join(reasons[:3])}",
+                        'score': 85,
                         'timestamp': datetime.now(self.beijing_tz).isoformat(),
-                        'priority': 90,
+                        'priority': 85,
                         # 🔥 增强数据：供Slack通知使用
                         'cost_price': cost_price,
                         'entry_time': position.get('entry_time'),
-                        'indicators': indicators if indicators else {},
+                        'indicators': indicators,  # 完整的技术指标
+                        'exit_score_details': reasons,  # 卖出评分详情
+                        'is_partial': True,  # 标记为部分平仓
+                        'remaining_qty': quantity - gradual_qty,
                     })
 
-        except Exception as e:
-            logger.error(f"❌ 检查退出信号失败: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+                    # 🔥 记录部分平仓状态到Redis（用于观察期判断）
+                    try:
+                        import json
+                        partial_exit_key = f"partial_exit:{account.get('account_id', '')}:{symbol}"
+                        partial_exit_data = {
+                            'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                            'partial_qty': gradual_qty,
+                            'remaining_qty': quantity - gradual_qty,
+                            'exit_score': score,
+                            'price': current_price,
+                        }
+                        await self.position_manager._redis.setex(
+                            partial_exit_key,
+                            self.settings.partial_exit_observation_minutes * 60,  # TTL = 观察期
+                            json.dumps(partial_exit_data)
+                        )
+                    except Exception as e:
+                        logger.warning(f"记录渐进式减仓状态失败: {e}")
+
+            elif action == "TAKE_PROFIT_EARLY":
+                # 提前止盈（不等固定止盈位）
+                logger.info(
+                    f"🎯 {symbol}: 提前止盈信号 (评分={score:+d})\n"
+                    f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                    f"   原因: {', '.join(reasons)}"
+                )
+                exit_signals.append({
+                    'symbol': symbol,
+                    'type': 'EARLY_TAKE_PROFIT',
+                    'side': 'SELL',
+                    'quantity': quantity,
+                    'price': current_price,
+                    'reason': f"提前止盈: {', '.join(reasons[:3])}",
+                    'score': 85,
+                    'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                    'priority': 85,
+                    # 🔥 增强数据：供Slack通知使用
+                    'cost_price': cost_price,
+                    'entry_time': position.get('entry_time'),
+                    'indicators': indicators,  # 完整的技术指标
+                    'exit_score_details': reasons,  # 卖出评分详情
+                })
+
+            elif action in ["STRONG_HOLD", "DELAY_TAKE_PROFIT"]:
+                # 延迟止盈（即使达到固定止盈位也不卖）
+                if current_price >= stops.get('take_profit', float('inf')):
+                    logger.info(
+                        f"⏸️  {symbol}: 延迟止盈 (评分={score:+d})\n"
+                        f"   已达固定止盈(${stops['take_profit']:.2f})，但指标显示持有\n"
+                        f"   当前=${current_price:.2f}, 收益={profit_pct:+.2f}%\n"
+                        f"   原因: {', '.join(reasons)}\n"
+                        f"   新止盈目标: ${exit_decision['adjusted_take_profit']:.2f}"
+                    )
+                    # 不生成信号，继续持有
+
+            elif action == "STANDARD":
+                # 使用固定止损止盈逻辑
+                pass  # 继续执行下面的固定逻辑
+
+        # === 固定止损止盈逻辑（保底 + 未获取指标时使用）===
+        # 即使有智能决策，固定止损仍然作为保底
+
+        # 检查固定止损
+        if stops.get('stop_loss') and current_price <= stops['stop_loss']:
+            logger.warning(
+                f"🛑 {symbol}: 触发固定止损 "
+                f"(当前=${current_price:.2f}, 止损=${stops['stop_loss']:.2f})"
+            )
+            exit_signals.append({
+                'symbol': symbol,
+                'type': 'STOP_LOSS',
+                'side': 'SELL',
+                'quantity': quantity,
+                'price': current_price,
+                'reason': f"触发固定止损 (${stops['stop_loss']:.2f})",
+                'score': 100,
+                'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                'priority': 100,
+                # 🔥 增强数据：供Slack通知使用
+                'cost_price': cost_price,
+                'entry_time': position.get('entry_time'),
+                'indicators': indicators if indicators else {},
+            })
+
+        # 检查固定止盈（仅在没有智能决策或决策为STANDARD时）
+        elif stops.get('take_profit') and current_price >= stops['take_profit']:
+            # 如果有指标分析且建议持有，则不执行固定止盈
+            if indicators:
+                exit_decision = self._calculate_exit_score(
+                    indicators, position, current_price, stops, regime
+                )
+                if exit_decision['action'] in ["STRONG_HOLD", "DELAY_TAKE_PROFIT"]:
+                    # 已经在上面记录日志了，这里跳过
+                    return exit_signals
+
+            logger.info(
+                f"🎯 {symbol}: 触发固定止盈 "
+                f"(当前=${current_price:.2f}, 止盈=${stops['take_profit']:.2f})"
+            )
+            exit_signals.append({
+                'symbol': symbol,
+                'type': 'TAKE_PROFIT',
+                'side': 'SELL',
+                'quantity': quantity,
+                'price': current_price,
+                'reason': f"触发固定止盈 (${stops['take_profit']:.2f})",
+                'score': 90,
+                'timestamp': datetime.now(self.beijing_tz).isoformat(),
+                'priority': 90,
+                # 🔥 增强数据：供Slack通知使用
+                'cost_price': cost_price,
+                'entry_time': position.get('entry_time'),
+                'indicators': indicators if indicators else {},
+            })
 
         return exit_signals
 
@@ -3734,26 +3972,30 @@ class SignalGenerator:
             }
         """
         try:
-            # 获取K线数据
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=100)
+            # 获取K线数据（优先内存日线缓存）
+            bars = await self._get_daily_bars(symbol, self.realtime_quotes.get(symbol))
+            if bars is not None:
+                closes, highs, lows, volumes = bars.close, bars.high, bars.low, bars.volume
+            else:
+                end_date = datetime.now()
+                start_date = end_date - timedelta(days=100)
 
-            candles = await self.quote_client.get_history_candles(
-                symbol=symbol,
-                period=openapi.Period.Day,
-                adjust_type=openapi.AdjustType.NoAdjust,
-                start=start_date,
-                end=end_date
-            )
+                candles = await self._get_history_candles(
+                    symbol=symbol,
+                    period=openapi.Period.Day,
+                    adjust_type=openapi.AdjustType.NoAdjust,
+                    start=start_date,
+                    end=end_date
+                )
 
-            if not candles or len(candles) < 30:
-                return {'symbol': symbol, 'action': 'HOLD', 'reason': '数据不足', 'score': 0, 'signals': []}
+                if not candles or len(candles) < 30:
+                    return {'symbol': symbol, 'action': 'HOLD', 'reason': '数据不足', 'score': 0, 'signals': []}
 
-            # 提取数据
-            closes = np.array([float(c.close) for c in candles])
-            highs = np.array([float(c.high) for c in candles])
-            lows = np.array([float(c.low) for c in candles])
-            volumes = np.array([c.volume for c in candles])
+                # 提取数据
+                closes = np.array([float(c.close) for c in candles])
+                highs = np.array([float(c.high) for c in candles])
+                lows = np.array([float(c.low) for c in candles])
+                volumes = np.array([c.volume for c in candles])
 
             # 计算指标
             # 注意：_calculate_all_indicators 返回的是单个值，不是数组
@@ -3763,7 +4005,7 @@ class SignalGenerator:
             ema_short = TechnicalIndicators.ema(closes, 12)
             ema_long = TechnicalIndicators.ema(closes, 26)
 
-            indicators = self._calculate_all_indicators(closes, highs, lows, volumes)
+            indicators = await self._compute_indicators(closes, highs, lows, volumes)
 
             # 卖出信号分析
             sell_signals = []
@@ -3851,7 +4093,7 @@ class SignalGenerator:
         """
         try:
             # 获取账户信息
-            account = await self.trade_client.get_account()
+            account = await self.account_snapshot.get()
 
             # 获取持仓
             positions_resp = await self.trade_client.stock_positions()
@@ -5175,7 +5417,7 @@ class SignalGenerator:
 
                 # 获取账户信息和实时行情
                 try:
-                    account = await self.trade_client.get_account()
+                    account = await self.account_snapshot.get()
                 except Exception as e:
                     logger.debug(f"⏭️  无法获取账户信息，跳过实时挪仓检查: {e}")
                     account = None
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+并行参数扫描 / Walk-Forward 回测
+
+历史K线只从数据库加载一次，打包成价格面板后通过共享内存分发给进程池，
+各进程并行回测不同参数组合，最后汇总成排名表。
+
+用法:
+    # 均线交叉 fast/slow 网格，全区间
+    python scripts/sweep_backtest.py --strategy ma_crossover --symbols AAPL.US MSFT.US
+
+    # 布林带 std 网格 + walk-forward（训练1年，测试3个月）
+    python scripts/sweep_backtest.py --strategy bollinger_bands --train-days 365 --test-days 90
+
+    # 自定义网格
+    python scripts/sweep_backtest.py --strategy ma_crossover \
+        --grid fast_period=5,10 --grid slow_period=20,30,60
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pandas as pd
+from loguru import logger
+
+from longport_quant.backtest.engine import BacktestConfig
+from longport_quant.backtest.strategies import SWEEP_PRESETS
+from longport_quant.backtest.sweep import ParameterSweepRunner, walk_forward_windows
+from longport_quant.config import get_settings
+from longport_quant.persistence.db import DatabaseSessionManager
+
+
+def parse_grid(items, defaults):
+    """解析 --grid name=v1,v2 覆盖默认网格"""
+    grid = dict(defaults)
+    for item in items or []:
+        name, _, values = item.partition('=')
+        parsed = []
+        for value in values.split(','):
+            try:
+                parsed.append(int(value))
+            except ValueError:
+                parsed.append(float(value))
+        grid[name] = parsed
+    return grid
+
+
+async def load_panel(runner, symbols, start_date, end_date):
+    settings = get_settings()
+    async with DatabaseSessionManager(settings.database_dsn) as db:
+        runner.db = db
+        return await runner.load_panel(symbols, start_date, end_date)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel backtest parameter sweep')
+    # 默认参数网格见 SWEEP_PRESETS（回测版策略，规则与实盘策略一致）
+    parser.add_argument('--strategy', choices=sorted(SWEEP_PRESETS), default='ma_crossover',
+                        help='策略')
+    parser.add_argument('--symbols', nargs='+', default=['AAPL.US', 'MSFT.US', 'GOOGL.US'],
+                        help='交易标的')
+    parser.add_argument('--start-date',
+                        default=(datetime.now() - timedelta(days=3 * 365)).strftime('%Y-%m-%d'))
+    parser.add_argument('--end-date', default=datetime.now().strftime('%Y-%m-%d'))
+    parser.add_argument('--capital', type=float, default=100000.0, help='初始资金')
+    parser.add_argument('--grid', action='append', help='参数网格 name=v1,v2（可多次指定）')
+    parser.add_argument('--train-days', type=int, default=0,
+                        help='walk-forward 训练窗口天数（0=不分窗口）')
+    parser.add_argument('--test-days', type=int, default=90, help='walk-forward 测试窗口天数')
+    parser.add_argument('--step-days', type=int, default=None, help='窗口步长（默认=测试窗口）')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认CPU核数）')
+    parser.add_argument('--rank-by', default='sharpe_ratio', help='排名指标')
+    parser.add_argument('--top', type=int, default=20, help='显示前N名')
+    parser.add_argument('--output', default=None, help='结果CSV路径')
+    args = parser.parse_args()
+
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date()
+    strategy_cls, default_grid = SWEEP_PRESETS[args.strategy]
+    grid = parse_grid(args.grid, default_grid)
+
+    windows = None
+    if args.train_days:
+        windows = walk_forward_windows(
+            start_date, end_date, args.train_days, args.test_days, args.step_days
+        )
+        if not windows:
+            logger.error("❌ 回测区间不足以切分 walk-forward 窗口")
+            return
+        logger.info(f"📅 Walk-forward 窗口: {len(windows)} 个")
+
+    runner = ParameterSweepRunner(max_workers=args.workers, rank_by=args.rank_by)
+    panel = asyncio.run(load_panel(runner, args.symbols, start_date, end_date))
+    if not len(panel):
+        logger.error("❌ 没有加载到任何K线数据")
+        return
+
+    config = BacktestConfig(
+        start_date=start_date,
+        end_date=end_date,
+        initial_capital=args.capital,
+        commission_rate=0.001,
+        slippage_rate=0.0005,
+        max_position_size=0.2,
+        max_positions=5,
+    )
+    report = runner.run(panel, strategy_cls, grid, args.symbols, config, windows)
+
+    if report.ranking.empty:
+        logger.error("❌ 所有回测均失败，请检查参数")
+        return
+
+    columns = ['rank', 'params', 'windows', 'total_return', 'annual_return',
+               'sharpe_ratio', 'max_drawdown', 'win_rate', 'total_trades']
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.4f}'.format):
+        print("\n" + "=" * 100)
+        print(f"参数排名（按 {args.rank_by}{'，样本外' if windows else ''}）")
+        print("=" * 100)
+        print(report.ranking[columns].head(args.top).to_string(index=False))
+
+        if not report.selections.empty:
+            print("\n" + "=" * 100)
+            print("Walk-forward 每窗口最优参数（训练集选出，测试集表现）")
+            print("=" * 100)
+            print(report.selections.to_string(index=False))
+
+    output = args.output or f"sweep_{args.strategy}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    report.results.to_csv(output, index=False)
+    logger.info(f"💾 全部结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
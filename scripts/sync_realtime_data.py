@@ -19,7 +19,7 @@ from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import (
     RealtimeQuote, MarketDepth, CalcIndicator, KlineMinute
 )
-from longport_quant.data.quote_client import QuoteDataClient
+from longport_quant.data.market_gateway import open_quote_client
 from longport_quant.data.watchlist import WatchlistLoader
 from sqlalchemy.dialects.postgresql import insert
 from decimal import Decimal
@@ -31,8 +31,8 @@ class RealtimeDataSync:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.db = DatabaseSessionManager(settings.database_dsn)
-        self.quote_client = QuoteDataClient(settings)
-        self.quote_ctx: openapi.QuoteContext | None = None
+        # 启用行情网关时通过网关共享连接，否则直连
+        self.quote_client = open_quote_client(settings)
         self.subscribed_symbols: Set[str] = set()
         self.running = False
         self._tasks: List[asyncio.Task] = []
@@ -41,13 +41,9 @@ class RealtimeDataSync:
         """Start real-time data synchronization."""
         logger.info(f"Starting real-time sync for {len(symbols)} symbols")
 
-        async with self.db as database:
+        async with self.db as database, self.quote_client:
             self.database = database
 
-            # Initialize quote context for subscription
-            config = openapi.Config.from_env()
-            self.quote_ctx = openapi.QuoteContext(config)
-
             try:
                 # Subscribe to real-time data
                 await self._subscribe_realtime(symbols)
@@ -86,25 +82,21 @@ class RealtimeDataSync:
         if self._tasks:
             await asyncio.gather(*self._tasks, return_exceptions=True)
 
-        # Unsubscribe and cleanup
-        if self.quote_ctx:
-            try:
-                if self.subscribed_symbols:
-                    self.quote_ctx.unsubscribe(
-                        list(self.subscribed_symbols),
-                        [openapi.SubType.Quote, openapi.SubType.Depth]
-                    )
-            except:
-                pass
-            self.quote_ctx = None
+        # Unsubscribe
+        try:
+            if self.subscribed_symbols:
+                await self.quote_client.unsubscribe(
+                    list(self.subscribed_symbols),
+                    [openapi.SubType.Quote, openapi.SubType.Depth]
+                )
+        except Exception:
+            pass
+        self.subscribed_symbols.clear()
 
         logger.info("Real-time sync stopped")
 
     async def _subscribe_realtime(self, symbols: List[str]):
         """Subscribe to real-time quote and depth updates."""
-        if not self.quote_ctx:
-            return
-
         # Subscribe in batches (max 500 per request)
         batch_size = 500
         for i in range(0, len(symbols), batch_size):
@@ -112,7 +104,7 @@ class RealtimeDataSync:
 
             try:
                 # Subscribe to quote and depth
-                self.quote_ctx.subscribe(
+                await self.quote_client.subscribe(
                     batch,
                     [openapi.SubType.Quote, openapi.SubType.Depth],
                     is_first_push=True  # Get initial data immediately
@@ -125,36 +117,34 @@ class RealtimeDataSync:
 
     async def _process_realtime_quotes(self):
         """Process real-time quote updates."""
-        if not self.quote_ctx:
-            return
-
         # Get event loop for scheduling coroutines from callback
         loop = asyncio.get_event_loop()
 
-        def on_quote(_, event: openapi.PushQuote):
+        def on_quote(symbol: str, event: openapi.PushQuote):
             """Handle quote push event."""
             # Schedule coroutine in event loop from sync callback
             asyncio.run_coroutine_threadsafe(
-                self._save_realtime_quote(event),
+                self._save_realtime_quote(symbol, event),
                 loop
             )
 
         # Set callback
-        self.quote_ctx.set_on_quote(on_quote)
+        await self.quote_client.set_on_quote(on_quote)
 
         # Keep running
         while self.running:
             await asyncio.sleep(1)
 
-    async def _save_realtime_quote(self, quote: openapi.PushQuote):
+    async def _save_realtime_quote(self, symbol: str, quote: openapi.PushQuote):
         """Save real-time quote to database."""
+        prev_close = getattr(quote, 'prev_close', None)
         try:
             async with self.database.session() as session:
                 stmt = insert(RealtimeQuote).values(
-                    symbol=quote.symbol,
+                    symbol=symbol,
                     timestamp=quote.timestamp or datetime.now(),
                     last_done=Decimal(str(quote.last_done)) if quote.last_done else None,
-                    prev_close=Decimal(str(quote.prev_close)) if quote.prev_close else None,
+                    prev_close=Decimal(str(prev_close)) if prev_close else None,
                     open=Decimal(str(quote.open)) if quote.open else None,
                     high=Decimal(str(quote.high)) if quote.high else None,
                     low=Decimal(str(quote.low)) if quote.low else None,
@@ -179,7 +169,7 @@ class RealtimeDataSync:
                 await session.commit()
 
         except Exception as e:
-            logger.error(f"Failed to save quote for {quote.symbol}: {e}")
+            logger.error(f"Failed to save quote for {symbol}: {e}")
 
     async def _sync_market_depth_periodically(self, symbols: List[str], interval: int = 5):
         """Periodically sync market depth data."""
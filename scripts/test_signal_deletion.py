@@ -61,9 +61,9 @@ async def test_signal_deletion():
         assert signal is not None, "应该能消费到信号"
         print(f"  ✅ 成功消费信号: {signal.get('symbol')}")
 
-        # 验证_original_json字段存在
-        assert '_original_json' in signal, "signal应该包含_original_json字段"
-        print(f"  ✅ _original_json字段存在")
+        # 验证signal_id字段存在
+        assert 'signal_id' in signal, "signal应该包含signal_id字段"
+        print(f"  ✅ signal_id字段存在")
 
         # 4. 检查队列状态（应该移到processing）
         stats = await signal_queue.get_stats()
@@ -91,8 +91,8 @@ async def test_signal_deletion():
             print(f"✅ 测试通过！信号已成功从processing队列删除")
             print(f"="*70)
             print(f"\n💡 修复验证:")
-            print(f"  ✅ _original_json字段正确保存")
-            print(f"  ✅ mark_signal_completed()使用原始JSON删除")
+            print(f"  ✅ signal_id字段正确保存")
+            print(f"  ✅ mark_signal_completed()使用signal_id删除")
             print(f"  ✅ processing队列中的信号被正确清理")
             print(f"\n  🎉 Bug已彻底修复！")
             return True
@@ -117,7 +117,7 @@ if __name__ == "__main__":
 ║           测试信号删除修复 (Test Signal Deletion Fix)        ║
 ╠══════════════════════════════════════════════════════════════╣
 ║  测试内容:                                                     ║
-║  • 验证_original_json字段保存                                 ║
+║  • 验证signal_id字段保存                                     ║
 ║  • 验证mark_signal_completed正确删除信号                      ║
 ║  • 验证processing队列清理                                     ║
 ╚══════════════════════════════════════════════════════════════╝
@@ -12,6 +12,7 @@ from longport_quant.config import get_settings
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.data.quote_client import QuoteDataClient
 from longport_quant.data.watchlist import WatchlistLoader
+from longport_quant.features import kernels
 from sqlalchemy import text
 
 
@@ -114,13 +115,16 @@ async def calculate_signals_with_realtime(db, quote_client, symbol):
     # 计算技术指标
     signals = []
 
-    # 1. MA交叉策略
-    df['ma5'] = df['close'].rolling(window=5).mean()
-    df['ma20'] = df['close'].rolling(window=20).mean()
+    closes = df['close'].to_numpy(dtype=float)
+    df['ma5'] = kernels.sma(closes, 5)
+    df['ma20'] = kernels.sma(closes, 20)
+    df['rsi'] = kernels.rsi(closes, 14)
 
     latest = df.iloc[-1]
     prev = df.iloc[-2]
 
+    # 1. MA交叉策略
+
     if prev['ma5'] <= prev['ma20'] and latest['ma5'] > latest['ma20']:
         signals.append({
             'strategy': 'MA交叉',
@@ -135,12 +139,6 @@ async def calculate_signals_with_realtime(db, quote_client, symbol):
         })
 
     # 2. RSI策略
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-
     if latest['rsi'] < 30:
         signals.append({
             'strategy': 'RSI',
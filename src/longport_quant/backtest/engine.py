@@ -11,7 +11,8 @@ import numpy as np
 from collections import defaultdict
 
 from loguru import logger
-from longport_quant.strategy.base import Strategy, Signal
+from longport_quant.strategy.base import StrategyBase, Signal
+from longport_quant.backtest.panel import PricePanel
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import KlineDaily, KlineMinute
 from sqlalchemy import select, and_
@@ -30,6 +31,7 @@ class BacktestConfig:
     max_positions: int = 5  # Max number of concurrent positions
     use_minute_data: bool = False  # Use minute data for more accurate fills
     benchmark_symbol: Optional[str] = None  # Benchmark for comparison
+    vectorized: bool = True  # Serve market data from aligned NumPy panels
 
 
 @dataclass
@@ -95,19 +97,29 @@ class BacktestResult:
 class BacktestEngine:
     """Engine for backtesting trading strategies."""
 
-    def __init__(self, db: DatabaseSessionManager):
+    # Minimum number of bars before a symbol is handed to the strategy
+    MIN_BARS = 20
+
+    def __init__(
+        self,
+        db: Optional[DatabaseSessionManager],
+        panel: Optional[PricePanel] = None
+    ):
         """
         Initialize backtest engine.
 
         Args:
-            db: Database session manager
+            db: Database session manager (may be None when a panel is given)
+            panel: Preloaded price panel; skips database loading when set
         """
         self.db = db
         self._price_cache: Dict[str, pd.DataFrame] = {}
+        self._preloaded_panel = panel
+        self._panel: Optional[PricePanel] = None
 
     async def run_backtest(
         self,
-        strategy: Strategy,
+        strategy: StrategyBase,
         symbols: List[str],
         config: BacktestConfig
     ) -> BacktestResult:
@@ -132,11 +144,20 @@ class BacktestEngine:
         daily_returns = []
 
         # Load historical data
-        await self._load_historical_data(symbols, config)
+        if self._preloaded_panel is None:
+            await self._load_historical_data(symbols, config)
 
         # Get trading days
         trading_days = await self._get_trading_days(config.start_date, config.end_date)
 
+        # Pack all symbols into aligned arrays once; per-day lookups become slices
+        if self._preloaded_panel is not None:
+            self._panel = self._preloaded_panel.with_trading_days(trading_days)
+        elif config.vectorized:
+            self._panel = PricePanel.from_frames(self._price_cache, symbols, trading_days)
+        else:
+            self._panel = None
+
         # Simulate each trading day
         prev_capital = capital
         for current_date in trading_days:
@@ -152,7 +173,7 @@ class BacktestEngine:
 
                 # Get market data up to current date
                 market_data = self._get_market_data_until(symbol, current_date)
-                if market_data is None or len(market_data) < 20:
+                if market_data is None or len(market_data['close']) < self.MIN_BARS:
                     continue
 
                 # Generate signals
@@ -326,6 +347,9 @@ class BacktestEngine:
         current_date: date
     ) -> Optional[Dict[str, Any]]:
         """Get market data up to current date."""
+        if self._panel is not None and symbol in self._panel:
+            return self._panel.window(symbol, current_date)
+
         if symbol not in self._price_cache:
             return None
 
@@ -352,6 +376,9 @@ class BacktestEngine:
 
     def _get_current_price(self, symbol: str, current_date: date) -> float:
         """Get current price for a symbol."""
+        if self._panel is not None and symbol in self._panel:
+            return self._panel.close_asof(symbol, current_date)
+
         if symbol not in self._price_cache:
             return 0.0
 
@@ -575,6 +602,17 @@ class BacktestEngine:
         end_date: date
     ) -> Optional[float]:
         """Calculate benchmark return."""
+        if self._panel is not None and symbol in self._panel:
+            first = self._panel.bar_count(symbol, start_date - timedelta(days=1))
+            last = self._panel.bar_count(symbol, end_date)
+            if last - first < 2:
+                return None
+            closes = self._panel.window(symbol, end_date)['close']
+            return float((closes[last - 1] - closes[first]) / closes[first])
+
+        if self.db is None:
+            return None
+
         if symbol not in self._price_cache:
             # Load benchmark data if not cached
             await self._load_historical_data([symbol], BacktestConfig(start_date, end_date))
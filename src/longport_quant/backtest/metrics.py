@@ -113,7 +113,8 @@ class MetricsCalculator:
             if 'date' in equity_curve.columns:
                 equity_curve['date'] = pd.to_datetime(equity_curve['date'])
                 equity_curve.set_index('date', inplace=True)
-                monthly_returns = equity_curve['total_value'].resample('M').last().pct_change()
+                month_end = equity_curve['total_value'].resample(pd.offsets.MonthEnd()).last()
+                monthly_returns = month_end.pct_change()
                 metrics['monthly_return'] = monthly_returns.mean()
 
         return metrics
@@ -0,0 +1,260 @@
+"""Aligned NumPy price panels for vectorized multi-symbol backtests."""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from datetime import date
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class PricePanel:
+    """OHLCV history of many symbols packed into ``(n_symbols, n_bars)`` arrays.
+
+    Each symbol owns one C-contiguous row holding its bars in chronological
+    order (left-aligned, NaN/NaT padded on the right), so the history "up to
+    day ``d``" is always the prefix ``row[:bar_counts[i, d]]``. Slicing that
+    prefix is a zero-copy view, which replaces the per-day boolean mask and
+    ``.tolist()`` conversion of the row-based engine.
+
+    ``bar_counts`` is precomputed once for every trading day of the run: it is
+    the number of bars whose calendar date is on or before the trading day,
+    i.e. the same cut-off the legacy ``df.index.date <= current_date`` mask
+    applies. The arrays are marked read-only so a strategy cannot corrupt the
+    shared history by writing through a view.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        timestamps: np.ndarray,
+        fields: Dict[str, np.ndarray],
+        lengths: np.ndarray,
+        trading_days: Sequence[date],
+    ) -> None:
+        self.symbols = symbols
+        self.timestamps = timestamps
+        self.fields = fields
+        self.lengths = lengths
+        self.trading_days = list(trading_days)
+
+        self._rows = {symbol: i for i, symbol in enumerate(symbols)}
+        self._day_index = {day: i for i, day in enumerate(self.trading_days)}
+        self.bar_counts = self._count_bars(_day_ends(self.trading_days))
+
+        for array in (self.timestamps, self.lengths, self.bar_counts, *self.fields.values()):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        symbols: Iterable[str],
+        trading_days: Sequence[date],
+    ) -> "PricePanel":
+        """Build a panel from per-symbol frames indexed by timestamp.
+
+        Symbols without a frame (or with an empty one) are left out of the
+        panel; lookups for them return ``None`` just like a cache miss.
+        """
+        prepared = []
+        for symbol in dict.fromkeys(symbols):
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                continue
+            index = pd.DatetimeIndex(df.index)
+            if index.tz is not None:
+                # 与 index.date 保持一致：按本地日期截断
+                index = index.tz_localize(None)
+            order = (
+                None if index.is_monotonic_increasing
+                else np.argsort(index.values, kind="stable")
+            )
+            prepared.append((symbol, df, index, order))
+
+        n_symbols = len(prepared)
+        n_bars = max((len(item[1]) for item in prepared), default=0)
+
+        timestamps = np.full((n_symbols, n_bars), np.datetime64("NaT"), dtype="datetime64[ns]")
+        fields = {
+            name: np.full((n_symbols, n_bars), np.nan, dtype=np.float64)
+            for name in PANEL_FIELDS
+        }
+        lengths = np.zeros(n_symbols, dtype=np.int64)
+
+        for row, (_, df, index, order) in enumerate(prepared):
+            n = len(df)
+            values = index.values.astype("datetime64[ns]")
+            timestamps[row, :n] = values if order is None else values[order]
+            for name in PANEL_FIELDS:
+                column = pd.to_numeric(df[name], errors="coerce").to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+                fields[name][row, :n] = column if order is None else column[order]
+            lengths[row] = n
+
+        logger.debug(
+            f"Built price panel: {n_symbols} symbols x {n_bars} bars, "
+            f"{len(trading_days)} trading days"
+        )
+        return cls([item[0] for item in prepared], timestamps, fields, lengths, trading_days)
+
+    def with_trading_days(self, trading_days: Sequence[date]) -> "PricePanel":
+        """Same price history re-indexed for another set of trading days (no copy)."""
+        return PricePanel(self.symbols, self.timestamps, self.fields, self.lengths, trading_days)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def bar_count(self, symbol: str, current_date: date) -> int:
+        """Number of bars of ``symbol`` dated on or before ``current_date``."""
+        row = self._rows.get(symbol)
+        if row is None:
+            return 0
+        day = self._day_index.get(current_date)
+        if day is not None:
+            return int(self.bar_counts[row, day])
+        # 非回测交易日（如周末的结束日）回退到二分查找
+        end = _day_ends([current_date])
+        return int(np.searchsorted(self.timestamps[row, : self.lengths[row]], end[0], side="left"))
+
+    def window(self, symbol: str, current_date: date) -> Optional[Dict[str, np.ndarray]]:
+        """History of ``symbol`` up to ``current_date`` as zero-copy array views.
+
+        The dict has the same keys as the legacy engine's market data
+        (``timestamp``, ``open``, ``high``, ``low``, ``close``, ``volume``)
+        so strategies can keep building a DataFrame from it.
+        """
+        n = self.bar_count(symbol, current_date)
+        if n == 0:
+            return None
+        row = self._rows[symbol]
+        data = {"timestamp": self.timestamps[row, :n]}
+        for name in PANEL_FIELDS:
+            data[name] = self.fields[name][row, :n]
+        return data
+
+    def close_asof(self, symbol: str, current_date: date) -> Optional[float]:
+        """Last close of ``symbol`` on or before ``current_date`` (0.0 if none yet)."""
+        row = self._rows.get(symbol)
+        if row is None:
+            return None
+        n = self.bar_count(symbol, current_date)
+        if n == 0:
+            return 0.0
+        return float(self.fields["close"][row, n - 1])
+
+    def _count_bars(self, day_ends: np.ndarray) -> np.ndarray:
+        counts = np.zeros((len(self.symbols), len(day_ends)), dtype=np.int64)
+        for row, n in enumerate(self.lengths):
+            counts[row] = np.searchsorted(self.timestamps[row, :n], day_ends, side="left")
+        return counts
+
+
+@dataclass(frozen=True)
+class SharedPanelHandle:
+    """Picklable description of a panel living in a shared memory segment."""
+
+    name: str
+    symbols: Tuple[str, ...]
+    n_bars: int
+
+
+class SharedPricePanel:
+    """Owner of a shared memory copy of a :class:`PricePanel`.
+
+    The parent process publishes the panel once and hands :attr:`handle` to
+    worker processes, which map the same pages with :func:`attach_shared_panel`
+    instead of reloading the history from the database. Call :meth:`close`
+    (or use it as a context manager) to release the segment.
+    """
+
+    def __init__(self, panel: PricePanel) -> None:
+        n_symbols, n_bars = len(panel.symbols), panel.timestamps.shape[1] if panel.symbols else 0
+        size = max(_segment_size(n_symbols, n_bars), 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.handle = SharedPanelHandle(self._shm.name, tuple(panel.symbols), n_bars)
+
+        timestamps, fields, lengths = _map_segment(self._shm, n_symbols, n_bars)
+        timestamps[:] = panel.timestamps
+        for name in PANEL_FIELDS:
+            fields[name][:] = panel.fields[name]
+        lengths[:] = panel.lengths
+        # 释放本地视图，否则关闭共享内存时会报 BufferError
+        del timestamps, fields, lengths
+
+        logger.debug(
+            f"Published price panel to shared memory {self._shm.name} ({self._shm.size} bytes)"
+        )
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "SharedPricePanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach_shared_panel(
+    handle: SharedPanelHandle,
+    trading_days: Sequence[date] = (),
+) -> Tuple[shared_memory.SharedMemory, PricePanel]:
+    """Map a published panel without copying it.
+
+    The returned segment must stay referenced for as long as the panel is in
+    use; the publishing process remains responsible for unlinking it.
+    """
+    # Worker processes share the publisher's resource tracker, so attaching
+    # (which registers the segment again before 3.13) does not take ownership
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=handle.name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=handle.name)
+
+    timestamps, fields, lengths = _map_segment(shm, len(handle.symbols), handle.n_bars)
+    return shm, PricePanel(list(handle.symbols), timestamps, fields, lengths, trading_days)
+
+
+def _segment_size(n_symbols: int, n_bars: int) -> int:
+    # timestamps(int64) + OHLCV(float64) + lengths(int64)
+    return 8 * (n_symbols * n_bars * (1 + len(PANEL_FIELDS)) + n_symbols)
+
+
+def _map_segment(
+    shm: shared_memory.SharedMemory,
+    n_symbols: int,
+    n_bars: int,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """Lay the panel arrays out back to back over a shared memory buffer."""
+    block = n_symbols * n_bars * 8
+    shape = (n_symbols, n_bars)
+    timestamps = np.ndarray(shape, dtype="datetime64[ns]", buffer=shm.buf, offset=0)
+    fields = {
+        name: np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=block * (i + 1))
+        for i, name in enumerate(PANEL_FIELDS)
+    }
+    lengths = np.ndarray((n_symbols,), dtype=np.int64, buffer=shm.buf,
+                         offset=block * (1 + len(PANEL_FIELDS)))
+    return timestamps, fields, lengths
+
+
+def _day_ends(days: Sequence[date]) -> np.ndarray:
+    """Midnight after each day, so ``ts < end`` is equivalent to ``ts.date() <= day``."""
+    return (np.asarray(days, dtype="datetime64[D]") + 1).astype("datetime64[ns]")
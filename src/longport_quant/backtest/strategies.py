@@ -0,0 +1,152 @@
+"""Parameterised strategies that run under :class:`BacktestEngine`.
+
+The engine only needs ``name`` and ``generate_signals(symbol, market_data)``
+returning objects with ``signal_type`` / ``stop_loss`` / ``take_profit``.
+The live strategies in :mod:`longport_quant.strategies` are wired to the
+order router and the database, so the sweep runner uses these instead:
+they apply the same entry/exit rules to the bars handed in by the engine,
+are constructed from keyword parameters only and can be pickled into
+worker processes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from longport_quant.features.technical_indicators import TechnicalIndicators
+
+
+@dataclass
+class BacktestSignal:
+    """Signal consumed by :class:`BacktestEngine`."""
+
+    symbol: str
+    signal_type: str
+    price: float
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _closes(market_data: Dict[str, Any]) -> np.ndarray:
+    return np.asarray(market_data["close"], dtype=np.float64)
+
+
+class MovingAverageCrossoverBacktest:
+    """Golden cross buys / death cross sells, as in ``MovingAverageCrossoverStrategy``."""
+
+    name = "MA_Crossover"
+
+    def __init__(
+        self,
+        fast_period: int = 5,
+        slow_period: int = 20,
+        min_data_points: int = 50,
+        stop_loss: float = 0.05,
+        take_profit: float = 0.15,
+    ):
+        if fast_period >= slow_period:
+            raise ValueError("Fast period must be less than slow period")
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.min_data_points = min_data_points
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    async def generate_signals(
+        self, symbol: str, market_data: Dict[str, Any]
+    ) -> List[BacktestSignal]:
+        close = _closes(market_data)
+        if len(close) < max(self.min_data_points, self.slow_period + 1):
+            return []
+
+        fast = TechnicalIndicators.sma(close, self.fast_period)
+        slow = TechnicalIndicators.sma(close, self.slow_period)
+        if np.isnan(fast[-2:]).any() or np.isnan(slow[-2:]).any():
+            return []
+
+        price = float(close[-1])
+        metadata = {"ma_fast": float(fast[-1]), "ma_slow": float(slow[-1])}
+        if fast[-2] <= slow[-2] and fast[-1] > slow[-1]:
+            return [BacktestSignal(
+                symbol, "BUY", price,
+                stop_loss=price * (1 - self.stop_loss),
+                take_profit=price * (1 + self.take_profit),
+                metadata={**metadata, "crossover_type": "golden_cross"},
+            )]
+        if fast[-2] >= slow[-2] and fast[-1] < slow[-1]:
+            return [BacktestSignal(
+                symbol, "SELL", price, metadata={**metadata, "crossover_type": "death_cross"}
+            )]
+        return []
+
+
+class BollingerBandsBacktest:
+    """Lower-band touch buys / upper-band touch sells, as in ``BollingerBandsStrategy``."""
+
+    name = "Bollinger_Bands"
+
+    def __init__(
+        self,
+        period: int = 20,
+        std_dev: float = 2.0,
+        min_data_points: int = 50,
+    ):
+        self.period = period
+        self.std_dev = std_dev
+        self.min_data_points = max(min_data_points, period + 10)
+
+    async def generate_signals(
+        self, symbol: str, market_data: Dict[str, Any]
+    ) -> List[BacktestSignal]:
+        close = _closes(market_data)
+        if len(close) < self.min_data_points:
+            return []
+
+        bands = TechnicalIndicators.bollinger_bands(close, period=self.period, num_std=self.std_dev)
+        upper, middle, lower = bands["upper"], bands["middle"], bands["lower"]
+        if np.isnan(upper[-2:]).any():
+            return []
+
+        price = float(close[-1])
+        metadata = {
+            "bb_upper": float(upper[-1]),
+            "bb_middle": float(middle[-1]),
+            "bb_lower": float(lower[-1]),
+        }
+        if close[-1] <= lower[-1] and close[-2] > lower[-2]:
+            return [BacktestSignal(
+                symbol, "BUY", price,
+                stop_loss=float(lower[-1] * 0.98),  # Just below lower band
+                take_profit=float(middle[-1]),  # Target middle band
+                metadata={**metadata, "pattern": "lower_band_bounce"},
+            )]
+        if close[-1] >= upper[-1] and close[-2] < upper[-2]:
+            return [BacktestSignal(
+                symbol, "SELL", price, metadata={**metadata, "pattern": "upper_band_reversal"}
+            )]
+        return []
+
+
+# Default sweep grids per strategy: name -> (strategy class, parameter grid)
+SWEEP_PRESETS: Dict[str, Tuple[type, Dict[str, List[Any]]]] = {
+    "ma_crossover": (MovingAverageCrossoverBacktest, {
+        "fast_period": [5, 10, 15],
+        "slow_period": [20, 30, 50, 60],
+    }),
+    "bollinger_bands": (BollingerBandsBacktest, {
+        "period": [15, 20, 30],
+        "std_dev": [1.5, 2.0, 2.5, 3.0],
+    }),
+}
+
+
+__all__ = [
+    "SWEEP_PRESETS",
+    "BacktestSignal",
+    "BollingerBandsBacktest",
+    "MovingAverageCrossoverBacktest",
+]
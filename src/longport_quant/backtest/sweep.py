@@ -0,0 +1,354 @@
+"""Parallel parameter sweeps and walk-forward analysis for backtests."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from loguru import logger
+
+from longport_quant.backtest.engine import BacktestConfig, BacktestEngine
+from longport_quant.backtest.metrics import MetricsCalculator
+from longport_quant.backtest.panel import (
+    PricePanel,
+    SharedPanelHandle,
+    SharedPricePanel,
+    attach_shared_panel,
+)
+from longport_quant.persistence.db import DatabaseSessionManager
+
+
+# Metrics copied from each run into the results table
+RESULT_METRICS = (
+    "total_return",
+    "annual_return",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "win_rate",
+    "profit_factor",
+    "total_trades",
+)
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    """One in-sample (train) / out-of-sample (test) split."""
+
+    train_start: date
+    train_end: date
+    test_start: date
+    test_end: date
+
+    @property
+    def label(self) -> str:
+        return f"{self.test_start:%Y-%m-%d}~{self.test_end:%Y-%m-%d}"
+
+
+@dataclass(frozen=True)
+class SweepTask:
+    """A single backtest run executed by a worker process."""
+
+    strategy_cls: type
+    params: Tuple[Tuple[str, Any], ...]
+    symbols: Tuple[str, ...]
+    config: BacktestConfig
+    phase: str  # "train" / "test" / "full"
+    window: str
+
+
+@dataclass
+class SweepReport:
+    """Aggregated sweep output."""
+
+    results: pd.DataFrame = field(default_factory=pd.DataFrame)  # one row per run
+    ranking: pd.DataFrame = field(default_factory=pd.DataFrame)  # one row per parameter set
+    selections: pd.DataFrame = field(default_factory=pd.DataFrame)  # best train params per window
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a parameter grid, e.g. ``{"fast_period": [5, 10]}``."""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    combos = itertools.product(*(grid[k] for k in keys))
+    return [dict(zip(keys, values, strict=True)) for values in combos]
+
+
+def walk_forward_windows(
+    start_date: date,
+    end_date: date,
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None,
+) -> List[WalkForwardWindow]:
+    """Rolling train/test windows covering ``[start_date, end_date]``.
+
+    Windows advance by ``step_days`` (defaults to ``test_days``, i.e.
+    back-to-back out-of-sample periods). A trailing test period shorter than
+    ``test_days`` is dropped.
+    """
+    step = timedelta(days=step_days or test_days)
+    windows = []
+    train_start = start_date
+    while True:
+        train_end = train_start + timedelta(days=train_days - 1)
+        test_start = train_end + timedelta(days=1)
+        test_end = test_start + timedelta(days=test_days - 1)
+        if test_end > end_date:
+            break
+        windows.append(WalkForwardWindow(train_start, train_end, test_start, test_end))
+        train_start += step
+    return windows
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+# 每个 worker 进程只 attach 一次共享内存
+_worker_panel: Optional[PricePanel] = None
+_worker_shm = None
+
+
+def _init_worker(handle: SharedPanelHandle) -> None:
+    global _worker_panel, _worker_shm
+    logger.remove()
+    _worker_shm, _worker_panel = attach_shared_panel(handle)
+
+
+def _run_task(task: SweepTask) -> Dict[str, Any]:
+    return _execute(task, _worker_panel)
+
+
+def _execute(task: SweepTask, panel: PricePanel) -> Dict[str, Any]:
+    """Run one backtest against ``panel`` and flatten its metrics into a row."""
+    params = dict(task.params)
+    row: Dict[str, Any] = {
+        **params,
+        "params": _format_params(params),
+        "phase": task.phase,
+        "window": task.window,
+        "start_date": task.config.start_date,
+        "end_date": task.config.end_date,
+        "error": None,
+    }
+
+    try:
+        strategy = task.strategy_cls(**params)
+        engine = BacktestEngine(None, panel=panel)
+        result = asyncio.run(engine.run_backtest(strategy, list(task.symbols), task.config))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    metrics = {
+        "total_return": result.total_return,
+        "win_rate": result.win_rate,
+        "profit_factor": result.profit_factor,
+        "total_trades": result.total_trades,
+        "max_drawdown": result.max_drawdown,
+        "sharpe_ratio": result.sharpe_ratio,
+    }
+    if result.equity_curve is not None and not result.equity_curve.empty:
+        equity = result.equity_curve.copy()
+        metrics.update(
+            MetricsCalculator.calculate_returns_metrics(equity, task.config.initial_capital)
+        )
+        metrics.update(MetricsCalculator.calculate_risk_metrics(equity))
+
+    for key in RESULT_METRICS:
+        row[key] = float(metrics.get(key, 0.0) or 0.0)
+    return row
+
+
+def _format_params(params: Dict[str, Any]) -> str:
+    return ", ".join(f"{k}={v}" for k, v in params.items())
+
+
+# ---------------------------------------------------------------------------
+# Driver side
+# ---------------------------------------------------------------------------
+
+
+class ParameterSweepRunner:
+    """Fan a strategy parameter grid out over a process pool.
+
+    The price history is loaded once in the parent, packed into a
+    :class:`PricePanel` and published through shared memory; every worker
+    maps the same pages and runs :class:`BacktestEngine` against it, so no
+    worker touches the database.
+    """
+
+    def __init__(
+        self,
+        db: Optional[DatabaseSessionManager] = None,
+        max_workers: Optional[int] = None,
+        rank_by: str = "sharpe_ratio",
+    ):
+        """
+        Initialize sweep runner.
+
+        Args:
+            db: Database session manager used by :meth:`load_panel`
+            max_workers: Worker processes (defaults to the CPU count; 1 runs inline)
+            rank_by: Result column used to rank parameter sets (higher is better)
+        """
+        self.db = db
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.rank_by = rank_by
+
+    async def load_panel(
+        self,
+        symbols: Sequence[str],
+        start_date: date,
+        end_date: date,
+        use_minute_data: bool = False,
+    ) -> PricePanel:
+        """Load the history for all symbols in a single query."""
+        engine = BacktestEngine(self.db)
+        config = BacktestConfig(
+            start_date=start_date, end_date=end_date, use_minute_data=use_minute_data
+        )
+        await engine._load_historical_data(list(symbols), config)
+        return PricePanel.from_frames(engine._price_cache, symbols, [])
+
+    def run(
+        self,
+        panel: PricePanel,
+        strategy_cls: type,
+        grid: Dict[str, Sequence[Any]],
+        symbols: Sequence[str],
+        config: BacktestConfig,
+        windows: Optional[Sequence[WalkForwardWindow]] = None,
+    ) -> SweepReport:
+        """
+        Run every parameter set over the full period or each walk-forward window.
+
+        Args:
+            panel: Price history for ``symbols`` (see :meth:`load_panel`)
+            strategy_cls: Strategy class, constructed as ``strategy_cls(**params)``
+            grid: Parameter grid expanded with :func:`expand_grid`
+            symbols: Symbols to trade
+            config: Base backtest config; dates are overridden per window
+            windows: Walk-forward windows; ``None`` runs ``config``'s full period
+
+        Returns:
+            SweepReport with raw results, the ranked table and window selections
+        """
+        tasks = self._build_tasks(strategy_cls, expand_grid(grid), symbols, config, windows)
+        logger.info(f"🚀 参数扫描: {len(tasks)} 次回测, {self.max_workers} 个进程")
+
+        rows = self._execute_tasks(panel, tasks)
+        errors = [r for r in rows if r["error"]]
+        if errors:
+            first = errors[0]
+            logger.warning(
+                f"⚠️ {len(errors)} 次回测失败，例如 [{first['params']}]: {first['error']}"
+            )
+
+        results = pd.DataFrame(rows)
+        report = SweepReport(results=results)
+        ok = results[results["error"].isna()] if not results.empty else results
+        if ok.empty:
+            return report
+
+        report.ranking = self._rank(ok)
+        if windows:
+            report.selections = self._select(ok)
+        logger.info(f"✅ 参数扫描完成: 最优参数 [{report.ranking.iloc[0]['params']}]")
+        return report
+
+    def _build_tasks(
+        self,
+        strategy_cls: type,
+        param_sets: List[Dict[str, Any]],
+        symbols: Sequence[str],
+        config: BacktestConfig,
+        windows: Optional[Sequence[WalkForwardWindow]],
+    ) -> List[SweepTask]:
+        # Workers always read the shared panel
+        config = replace(config, vectorized=True)
+        periods: List[Tuple[str, str, date, date]] = []
+        if windows:
+            for w in windows:
+                periods.append(("train", w.label, w.train_start, w.train_end))
+                periods.append(("test", w.label, w.test_start, w.test_end))
+        else:
+            periods.append(("full", "full", config.start_date, config.end_date))
+
+        return [
+            SweepTask(
+                strategy_cls=strategy_cls,
+                params=tuple(params.items()),
+                symbols=tuple(symbols),
+                config=replace(config, start_date=start, end_date=end),
+                phase=phase,
+                window=label,
+            )
+            for phase, label, start, end in periods
+            for params in param_sets
+        ]
+
+    def _execute_tasks(self, panel: PricePanel, tasks: List[SweepTask]) -> List[Dict[str, Any]]:
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            return [_execute(task, panel) for task in tasks]
+
+        rows = []
+        with SharedPricePanel(panel) as shared:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(shared.handle,),
+            ) as pool:
+                futures = [pool.submit(_run_task, task) for task in tasks]
+                for i, future in enumerate(as_completed(futures), 1):
+                    rows.append(future.result())
+                    if i % 50 == 0 or i == len(futures):
+                        logger.info(f"📊 回测进度: {i}/{len(futures)}")
+        return rows
+
+    def _rank(self, results: pd.DataFrame) -> pd.DataFrame:
+        """One row per parameter set, ranked on out-of-sample results when available."""
+        phase = "test" if (results["phase"] == "test").any() else "full"
+        scored = results[results["phase"] == phase]
+        param_cols = [c for c in scored.columns if c not in RESULT_METRICS
+                      and c not in ("params", "phase", "window", "start_date", "end_date", "error")]
+
+        agg = dict.fromkeys(RESULT_METRICS, "mean")
+        agg["total_trades"] = "sum"
+        ranking = scored.groupby("params", sort=False).agg({
+            **dict.fromkeys(param_cols, "first"),
+            **agg,
+            "window": "count",
+        }).rename(columns={"window": "windows"})
+
+        ranking = ranking.sort_values(self.rank_by, ascending=False).reset_index()
+        ranking.insert(0, "rank", range(1, len(ranking) + 1))
+        return ranking
+
+    def _select(self, results: pd.DataFrame) -> pd.DataFrame:
+        """Pick the best in-sample parameters per window and report their out-of-sample run."""
+        rows = []
+        for window, group in results.groupby("window", sort=True):
+            train = group[group["phase"] == "train"]
+            test = group[group["phase"] == "test"].set_index("params")
+            if train.empty:
+                continue
+            best = train.sort_values(self.rank_by, ascending=False).iloc[0]
+            row = {
+                "window": window,
+                "params": best["params"],
+                f"train_{self.rank_by}": best[self.rank_by],
+            }
+            if best["params"] in test.index:
+                oos = test.loc[best["params"]]
+                row.update({f"test_{key}": oos[key] for key in RESULT_METRICS})
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -91,14 +91,21 @@ class Settings(BaseSettings):
         alias="DATABASE_DSN",
     )
     redis_url: str = Field("redis://localhost:6379/0", alias="REDIS_URL")
+    account_snapshot_ttl: float = Field(15.0, alias="ACCOUNT_SNAPSHOT_TTL")  # 跨进程共享账户快照有效期（秒），订单变化时提前失效
 
     # 信号队列配置（用于解耦信号生成和订单执行）
     signal_queue_key: str = Field("trading:signals", alias="SIGNAL_QUEUE_KEY")
     signal_processing_key: str = Field("trading:signals:processing", alias="SIGNAL_PROCESSING_KEY")
     signal_failed_key: str = Field("trading:signals:failed", alias="SIGNAL_FAILED_KEY")
     signal_max_retries: int = Field(3, alias="SIGNAL_MAX_RETRIES")
+    signal_payload_codec: str = Field("json", alias="SIGNAL_PAYLOAD_CODEC")  # 信号数据编码: json / orjson
     signal_queue_max_size: int = Field(1000, alias="SIGNAL_QUEUE_MAX_SIZE")
-    order_executor_workers: int = Field(1, alias="ORDER_EXECUTOR_WORKERS")
+    order_executor_workers: int = Field(2, alias="ORDER_EXECUTOR_WORKERS")  # 普通通道并发执行数
+    order_executor_fast_workers: int = Field(1, alias="ORDER_EXECUTOR_FAST_WORKERS")  # 快速通道（止损/紧急卖出）执行数
+    order_executor_urgent_poll: float = Field(0.5, alias="ORDER_EXECUTOR_URGENT_POLL")  # 普通通道满载时检查紧急信号的间隔（秒）
+    buying_power_hold_ttl: float = Field(60.0, alias="BUYING_POWER_HOLD_TTL")  # 已提交买单的资金预留最长保留时间（秒），账户快照更新后提前释放
+    post_trade_outbox_enabled: bool = Field(True, alias="POST_TRADE_OUTBOX_ENABLED")  # 成交后工作（备份条件单、止损记录、通知）交给后台出库箱
+    post_trade_outbox_max_attempts: int = Field(5, alias="POST_TRADE_OUTBOX_MAX_ATTEMPTS")  # 出库箱任务最多执行次数
 
     # 批量信号处理配置（智能混合模式 - 高分信号优先）
     signal_batch_window: float = Field(15.0, alias="SIGNAL_BATCH_WINDOW")  # 等待15秒收集信号
@@ -417,6 +424,20 @@ class Settings(BaseSettings):
     # 从API获取的最新天数（推荐3天，确保实时性）
     api_klines_latest_days: int = Field(3, alias="API_KLINES_LATEST_DAYS")
 
+    # 启用内存日线缓存（每个标的只预热一次，之后由实时推送增量更新，不再重复拉取历史K线）
+    use_bar_store: bool = Field(True, alias="USE_BAR_STORE")
+
+    # 每个标的在内存中保留的日线数量
+    bar_store_capacity: int = Field(250, alias="BAR_STORE_CAPACITY")
+
+    # 轮询扫描/止损检查时同时分析的标的数（历史K线请求共享全局API令牌桶限速）
+    analysis_concurrency: int = Field(8, alias="ANALYSIS_CONCURRENCY")
+
+    # 行情网关：由 scripts/run_market_gateway.py 独占一条LongPort行情连接，其他进程通过Redis读取
+    market_gateway_enabled: bool = Field(False, alias="MARKET_GATEWAY_ENABLED")
+    market_gateway_prefix: str = Field("market:gateway", alias="MARKET_GATEWAY_PREFIX")
+    market_gateway_timeout: float = Field(10.0, alias="MARKET_GATEWAY_TIMEOUT")  # 网关请求超时（秒）
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
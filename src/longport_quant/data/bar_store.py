@@ -0,0 +1,421 @@
+"""Rolling in-memory daily bar store for realtime signal evaluation."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+import numpy as np
+from loguru import logger
+from longport import openapi
+
+from longport_quant.utils.market_hours import MarketHours
+from longport_quant.utils.rate_limit import get_api_rate_limiter
+
+if TYPE_CHECKING:
+    from longport_quant.data.kline_sync import KlineDataService
+    from longport_quant.data.quote_client import QuoteDataClient
+
+
+# Row layout of the OHLCV matrix kept by each ring
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(5)
+
+
+@dataclass(frozen=True)
+class DailyBars:
+    """Chronological daily OHLCV arrays for one symbol.
+
+    The arrays are views into the store's ring buffer: they are valid until the
+    next update for the same symbol, so callers should consume (or copy) them
+    right away instead of keeping references around.
+    """
+
+    symbol: str
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def last_date(self) -> Optional[date]:
+        if not len(self.dates):
+            return None
+        return self.dates[-1].astype("datetime64[D]").item()
+
+
+class _BarRing:
+    """Fixed-capacity ring of daily bars that always exposes a contiguous window.
+
+    Storage is twice the capacity; when the write cursor reaches the end the most
+    recent ``capacity - 1`` bars are moved back to the front. Appends are
+    amortised O(1) and reads never need to stitch two segments together.
+    """
+
+    __slots__ = ("capacity", "_values", "_dates", "_end", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._values = np.full((5, capacity * 2), np.nan, dtype=np.float64)
+        self._dates = np.zeros(capacity * 2, dtype="datetime64[D]")
+        self._end = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_date(self) -> Optional[np.datetime64]:
+        if not self._size:
+            return None
+        return self._dates[self._end - 1]
+
+    def append(self, day: np.datetime64, row: tuple[float, float, float, float, float]) -> None:
+        if self._end == self._values.shape[1]:
+            keep = self.capacity - 1
+            self._values[:, :keep] = self._values[:, self._end - keep:self._end]
+            self._dates[:keep] = self._dates[self._end - keep:self._end]
+            self._end = keep
+            self._size = min(self._size, keep)
+
+        self._values[:, self._end] = row
+        self._dates[self._end] = day
+        self._end += 1
+        self._size = min(self._size + 1, self.capacity)
+
+    def replace_last(self, row: tuple[float, float, float, float, float]) -> None:
+        self._values[:, self._end - 1] = row
+
+    def window(self, symbol: str) -> DailyBars:
+        start = self._end - self._size
+        values = self._values[:, start:self._end]
+        return DailyBars(
+            symbol=symbol,
+            dates=self._dates[start:self._end],
+            open=values[_OPEN],
+            high=values[_HIGH],
+            low=values[_LOW],
+            close=values[_CLOSE],
+            volume=values[_VOLUME],
+        )
+
+
+def _to_float(value: object) -> float:
+    if value is None:
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _candle_date(candle: object) -> Optional[date]:
+    """Extract the trading date from an API candle or a ``KlineDaily`` row."""
+
+    trade_date = getattr(candle, "trade_date", None)
+    if isinstance(trade_date, date):
+        return trade_date
+    timestamp = getattr(candle, "timestamp", None)
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
+    return None
+
+
+def _quote_trade_date(symbol: str, timestamp: object) -> date:
+    """Map a quote timestamp onto the trading date of the symbol's market."""
+
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.now()
+
+    if symbol.endswith(".US"):
+        return timestamp.astimezone(MarketHours.US_TZ).date()
+    if symbol.endswith(".HK"):
+        return timestamp.astimezone(MarketHours.HK_TZ).date()
+    return timestamp.date()
+
+
+class DailyBarStore:
+    """Per-symbol rolling daily bars, warmed once and advanced from quote pushes.
+
+    Warm-up reads ``kline_daily`` through :class:`KlineDataService` and tops it
+    up with a single API call for the most recent days (or one longer API call
+    when the database has too little history). After that every pushed quote
+    updates the current day's bar in place, so indicator evaluation on the
+    realtime path never touches the network.
+    """
+
+    def __init__(
+        self,
+        kline_service: Optional["KlineDataService"] = None,
+        quote_client: Optional["QuoteDataClient"] = None,
+        *,
+        capacity: int = 250,
+        history_days: int = 90,
+        latest_days: int = 3,
+        fallback_days: int = 100,
+        min_bars: int = 30,
+        retry_after: float = 60.0,
+        adjust_type: openapi.AdjustType = openapi.AdjustType.NoAdjust,
+    ) -> None:
+        """
+        Args:
+            kline_service: Source of persisted daily K-lines (optional)
+            quote_client: Quote client used for the one-off API top-up
+            capacity: Maximum number of bars kept per symbol
+            history_days: Calendar days loaded from the database
+            latest_days: Calendar days fetched from the API on top of the database
+            fallback_days: Calendar days fetched from the API when the database is short
+            min_bars: Minimum bars required before a symbol counts as warm
+            retry_after: Seconds to wait before retrying a failed warm-up
+            adjust_type: Price adjustment used for API candles
+        """
+        self._kline_service = kline_service
+        self._quote_client = quote_client
+        self.capacity = max(capacity, min_bars)
+        self.history_days = history_days
+        self.latest_days = latest_days
+        self.fallback_days = fallback_days
+        self.min_bars = min_bars
+        self.retry_after = retry_after
+        self.adjust_type = adjust_type
+
+        self._rings: Dict[str, _BarRing] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._stats = {"warmups": 0, "api_calls": 0, "quote_updates": 0, "new_bars": 0}
+
+    def __contains__(self, symbol: str) -> bool:
+        ring = self._rings.get(symbol)
+        return ring is not None and len(ring) >= self.min_bars
+
+    def symbols(self) -> List[str]:
+        return list(self._rings.keys())
+
+    def get_bars(self, symbol: str) -> Optional[DailyBars]:
+        """Return the cached bars for *symbol*, or ``None`` if it is not warm."""
+
+        ring = self._rings.get(symbol)
+        if ring is None or len(ring) < self.min_bars:
+            return None
+        return ring.window(symbol)
+
+    def seed(self, symbol: str, candles: Iterable[object]) -> int:
+        """Replace the bars of *symbol* with *candles* (API candles or ``KlineDaily`` rows)."""
+
+        by_date: Dict[date, object] = {}
+        for candle in candles:
+            trade_date = _candle_date(candle)
+            if trade_date is not None:
+                by_date[trade_date] = candle
+
+        ring = _BarRing(self.capacity)
+        for trade_date in sorted(by_date)[-self.capacity:]:
+            candle = by_date[trade_date]
+            ring.append(
+                np.datetime64(trade_date, "D"),
+                (
+                    _to_float(getattr(candle, "open", None)),
+                    _to_float(getattr(candle, "high", None)),
+                    _to_float(getattr(candle, "low", None)),
+                    _to_float(getattr(candle, "close", None)),
+                    _to_float(getattr(candle, "volume", None)),
+                ),
+            )
+
+        self._rings[symbol] = ring
+        self._failed_until.pop(symbol, None)
+        return len(ring)
+
+    def update_from_quote(self, symbol: str, quote: object) -> bool:
+        """Advance the current day's bar from a quote push (``PushQuote`` or ``SecurityQuote``).
+
+        Returns ``True`` when the store changed. Quotes for symbols that were
+        never warmed are ignored; the next :meth:`ensure` picks them up.
+        """
+
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return False
+
+        last_done = _to_float(getattr(quote, "last_done", None))
+        if not last_done > 0:
+            return False
+
+        open_ = _to_float(getattr(quote, "open", None))
+        high = _to_float(getattr(quote, "high", None))
+        low = _to_float(getattr(quote, "low", None))
+        volume = _to_float(getattr(quote, "volume", None))
+        trade_day = np.datetime64(
+            _quote_trade_date(symbol, getattr(quote, "timestamp", None)), "D"
+        )
+
+        last_day = ring.last_date
+        if last_day is not None and trade_day < last_day:
+            return False
+
+        if last_day is not None and trade_day == last_day:
+            current = ring.window(symbol)
+            open_ = open_ if open_ > 0 else current.open[-1]
+            high = max(high if high > 0 else last_done, current.high[-1], last_done)
+            low_candidates = [v for v in (low, current.low[-1], last_done) if v > 0]
+            low = min(low_candidates) if low_candidates else last_done
+            if not volume >= 0:
+                volume = current.volume[-1]
+            ring.replace_last((open_, high, low, last_done, volume))
+        else:
+            ring.append(
+                trade_day,
+                (
+                    open_ if open_ > 0 else last_done,
+                    max(high, last_done) if high > 0 else last_done,
+                    min(low, last_done) if low > 0 else last_done,
+                    last_done,
+                    volume if volume >= 0 else 0.0,
+                ),
+            )
+            self._stats["new_bars"] += 1
+
+        self._stats["quote_updates"] += 1
+        return True
+
+    def evict(self, symbol: str) -> None:
+        self._rings.pop(symbol, None)
+        self._failed_until.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "symbols": len(self._rings)}
+
+    async def ensure(self, symbol: str, allow_sync: bool = True) -> Optional[DailyBars]:
+        """Return bars for *symbol*, warming it first if needed.
+
+        Only the first call for a symbol does I/O; concurrent callers share the
+        same warm-up through a per-symbol lock.
+        """
+
+        bars = self.get_bars(symbol)
+        if bars is not None:
+            return bars
+
+        if time.monotonic() < self._failed_until.get(symbol, 0.0):
+            return None
+
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            bars = self.get_bars(symbol)
+            if bars is not None:
+                return bars
+
+            db_rows = await self._load_db_history([symbol])
+            await self._warm_symbol(symbol, db_rows.get(symbol, []), allow_sync)
+            return self.get_bars(symbol)
+
+    async def warm_up(self, symbols: Iterable[str], concurrency: int = 4) -> Dict[str, int]:
+        """Warm many symbols with one database query and one API call per symbol."""
+
+        pending = [s for s in dict.fromkeys(symbols) if s not in self]
+        if not pending:
+            return {}
+
+        db_rows = await self._load_db_history(pending)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        results: Dict[str, int] = {}
+
+        async def _warm(symbol: str) -> None:
+            async with semaphore:
+                lock = self._locks.setdefault(symbol, asyncio.Lock())
+                async with lock:
+                    if symbol not in self:
+                        await self._warm_symbol(symbol, db_rows.get(symbol, []), True)
+                ring = self._rings.get(symbol)
+                results[symbol] = len(ring) if ring else 0
+
+        await asyncio.gather(*(_warm(symbol) for symbol in pending))
+        logger.info(
+            "Daily bar store warmed {}/{} symbols",
+            sum(1 for count in results.values() if count >= self.min_bars),
+            len(pending),
+        )
+        return results
+
+    async def _load_db_history(self, symbols: List[str]) -> Dict[str, List[object]]:
+        if self._kline_service is None:
+            return {}
+        end_date = date.today()
+        start_date = end_date - timedelta(days=self.history_days)
+        try:
+            return await self._kline_service.load_daily_klines(symbols, start_date, end_date)
+        except Exception as exc:
+            logger.warning(f"Failed to load daily bars from database: {exc}")
+            return {}
+
+    async def _warm_symbol(self, symbol: str, db_rows: List[object], allow_sync: bool) -> None:
+        self._stats["warmups"] += 1
+        try:
+            if len(db_rows) < self.min_bars and allow_sync and self._kline_service is not None:
+                # 数据库数据不足：同步一次历史（同步本身即为唯一一次API调用）
+                synced = await self._sync_history(symbol)
+                if synced:
+                    db_rows = (await self._load_db_history([symbol])).get(symbol, [])
+                    if len(db_rows) >= self.min_bars:
+                        self.seed(symbol, db_rows)
+                        logger.debug(f"  📊 {symbol}: bar store seeded from synced history ({len(db_rows)} bars)")
+                        return
+
+            if len(db_rows) >= self.min_bars:
+                api_days = self.latest_days
+            else:
+                api_days = self.fallback_days
+
+            api_candles = await self._fetch_api_candles(symbol, api_days)
+            count = self.seed(symbol, list(db_rows) + list(api_candles or []))
+            if count < self.min_bars:
+                logger.debug(f"  ⚠️ {symbol}: only {count} daily bars available, not cached")
+                self._failed_until[symbol] = time.monotonic() + self.retry_after
+            else:
+                logger.debug(
+                    f"  📊 {symbol}: bar store warmed - DB {len(db_rows)} + API {len(api_candles or [])} → {count}"
+                )
+        except Exception as exc:
+            logger.warning(f"  ⚠️ {symbol}: bar store warm-up failed - {exc}")
+            self._rings.pop(symbol, None)
+            self._failed_until[symbol] = time.monotonic() + self.retry_after
+
+    async def _sync_history(self, symbol: str) -> bool:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=self.fallback_days)
+        self._stats["api_calls"] += 1
+        results = await self._kline_service.sync_daily_klines(
+            symbols=[symbol],
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return results.get(symbol, 0) > 0
+
+    async def _fetch_api_candles(self, symbol: str, days: int) -> List[openapi.Candlestick]:
+        if self._quote_client is None:
+            return []
+        end = datetime.now()
+        start = end - timedelta(days=days)
+        limiter = get_api_rate_limiter()
+        if limiter:
+            await limiter.acquire()
+        self._stats["api_calls"] += 1
+        return await self._quote_client.get_history_candles(
+            symbol=symbol,
+            period=openapi.Period.Day,
+            adjust_type=self.adjust_type,
+            start=start,
+            end=end,
+        )
+
+
+__all__ = ["DailyBarStore", "DailyBars"]
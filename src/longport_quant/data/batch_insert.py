@@ -3,20 +3,25 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Dict, Generic, Iterable, Iterator,
+    List, Optional, Sequence, Sized, Tuple, TypeVar, Union,
+)
 
-import pandas as pd
 from loguru import logger
 from sqlalchemy import Table, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from longport_quant.persistence.bulk_copy import copy_records, get_driver_connection
 from longport_quant.persistence.db import DatabaseSessionManager
 
 
 T = TypeVar("T")
+RecordSource = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
 
 
 @dataclass
@@ -63,7 +68,7 @@ class BatchInsertService(Generic[T]):
     async def bulk_insert_klines_optimized(
         self,
         table_name: str,
-        records: List[Dict[str, Any]],
+        records: RecordSource,
         conflict_columns: List[str]
     ) -> Dict[str, int]:
         """
@@ -71,25 +76,29 @@ class BatchInsertService(Generic[T]):
 
         Args:
             table_name: Name of the target table
-            records: List of records to insert
+            records: Records to insert (list, generator or async generator)
             conflict_columns: Columns that define uniqueness
 
         Returns:
             Dictionary with insert statistics
         """
-        if not records:
+        sized = isinstance(records, Sized)
+        if sized and not records:
             logger.warning("No records to insert")
             return self._stats
 
-        logger.info(f"Starting bulk insert of {len(records)} records into {table_name}")
+        size_hint = len(records) if sized else "streamed"
+        logger.info(f"Starting bulk insert of {size_hint} records into {table_name}")
         start_time = datetime.now()
 
         # Choose strategy based on data size and configuration
-        if self.config.use_copy_from and len(records) > 5000:
-            # Use COPY for large datasets
-            result = await self._bulk_copy_from(table_name, records)
+        if self.config.use_copy_from and (not sized or len(records) > 5000):
+            # Use COPY for large datasets and streams of unknown size
+            result = await self._bulk_copy_from(table_name, records, conflict_columns)
         else:
             # Use batch insert for smaller datasets
+            if not isinstance(records, list):
+                records = [record async for record in records] if isinstance(records, AsyncIterable) else list(records)
             result = await self._batch_insert_on_conflict(
                 table_name, records, conflict_columns
             )
@@ -97,7 +106,7 @@ class BatchInsertService(Generic[T]):
         # Update statistics
         elapsed = (datetime.now() - start_time).total_seconds()
         if elapsed > 0:
-            self._stats["avg_records_per_second"] = len(records) / elapsed
+            self._stats["avg_records_per_second"] = result.get("processed", 0) / elapsed
         self._stats["last_batch_time"] = datetime.now()
 
         logger.info(
@@ -241,61 +250,104 @@ class BatchInsertService(Generic[T]):
     async def _bulk_copy_from(
         self,
         table_name: str,
-        records: List[Dict[str, Any]]
+        records: RecordSource,
+        conflict_columns: Sequence[str],
+        columns: Optional[Sequence[str]] = None
     ) -> Dict[str, int]:
         """
-        Use PostgreSQL COPY for ultra-fast bulk inserts.
-        Note: This doesn't handle conflicts, suitable for initial loads.
-        """
-        if not records:
-            return {"processed": 0}
-
-        try:
-            # Convert to DataFrame for easier CSV generation
-            df = pd.DataFrame(records)
+        Stream records into PostgreSQL with binary COPY.
 
-            # Create temporary CSV
-            import tempfile
-            import csv
+        Records are converted to tuples lazily and handed straight to asyncpg's
+        ``copy_records_to_table``, so neither a DataFrame nor a temporary file
+        is built. With ``conflict_action`` "update"/"ignore" the rows go through
+        a temp staging table and are merged on ``conflict_columns``; with
+        "error" they are copied directly into the target table.
 
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as tmp_file:
-                df.to_csv(tmp_file, index=False, quoting=csv.QUOTE_MINIMAL)
-                tmp_path = tmp_file.name
-
-            async with self.db.session() as session:
-                async with session.begin():
-                    # Use raw connection for COPY command
-                    conn = await session.connection()
-                    raw_conn = await conn.get_raw_connection()
+        Args:
+            table_name: Target table
+            records: Dicts (list, generator or async generator)
+            conflict_columns: Columns that define uniqueness
+            columns: Column order; defaults to the keys of the first record
 
-                    # Get column names
-                    columns = ", ".join(df.columns)
+        Returns:
+            Dictionary with processed/written counts
+        """
+        rows, columns = await self._open_record_stream(records, columns)
+        if rows is None:
+            return {"processed": 0}
 
-                    # Execute COPY command
-                    copy_sql = f"""
-                        COPY {table_name} ({columns})
-                        FROM STDIN WITH CSV HEADER
-                    """
+        streamed = 0
 
-                    # Read file and execute COPY
-                    with open(tmp_path, 'r') as f:
-                        await raw_conn.driver_connection.copy_expert(copy_sql, f)
+        def count(row):
+            nonlocal streamed
+            streamed += 1
+            return row
 
-                    self._stats["total_inserted"] += len(records)
+        if isinstance(rows, AsyncIterator):
+            async def tuples():
+                async for record in rows:
+                    yield count(tuple(record.get(c) for c in columns))
+            source = tuples()
+        else:
+            source = (count(tuple(record.get(c) for c in columns)) for record in rows)
 
-            # Clean up temp file
-            import os
-            os.unlink(tmp_path)
+        if self.config.conflict_action == "update":
+            merge_on, update_columns = conflict_columns, None
+        elif self.config.conflict_action == "ignore":
+            merge_on, update_columns = conflict_columns, []
+        else:
+            merge_on, update_columns = (), None
 
-            logger.info(f"Successfully copied {len(records)} records using COPY")
-            return {"processed": len(records)}
+        try:
+            async with self.db.session() as session:
+                async with session.begin():
+                    conn = await get_driver_connection(session)
+                    written = await copy_records(
+                        conn, table_name, columns, source,
+                        conflict_columns=merge_on, update_columns=update_columns
+                    )
 
         except Exception as e:
-            logger.error(f"COPY failed, falling back to batch insert: {e}")
-            # Fallback to regular batch insert
-            return await self._batch_insert_on_conflict(
-                table_name, records, ["symbol", "trade_date"]
-            )
+            if isinstance(records, Sequence):
+                logger.error(f"COPY failed, falling back to batch insert: {e}")
+                return await self._batch_insert_on_conflict(
+                    table_name, list(records), list(conflict_columns)
+                )
+            # A partially consumed stream cannot be replayed
+            logger.error(f"COPY into {table_name} failed after {streamed} streamed records: {e}")
+            self._stats["total_errors"] += streamed
+            return {"processed": 0, "errors": streamed}
+
+        self._stats["total_inserted"] += written
+        self._stats["total_skipped"] += max(0, streamed - written)
+        logger.info(f"Successfully copied {streamed} records into {table_name} using COPY ({written} written)")
+        return {"processed": streamed, "written": written}
+
+    @staticmethod
+    async def _open_record_stream(
+        records: RecordSource,
+        columns: Optional[Sequence[str]]
+    ) -> Tuple[Optional[Union[Iterator, AsyncIterator]], List[str]]:
+        """Peek the first record (for column names) without materializing the rest."""
+        if isinstance(records, AsyncIterable):
+            iterator = records.__aiter__()
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                return None, []
+
+            async def chained():
+                yield first
+                async for record in iterator:
+                    yield record
+
+            return chained(), list(columns or first.keys())
+
+        iterator = iter(records)
+        first = next(iterator, None)
+        if first is None:
+            return None, []
+        return itertools.chain([first], iterator), list(columns or first.keys())
 
     async def parallel_insert(
         self,
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -17,7 +18,9 @@ from longport import OpenApiException, openapi
 
 from longport_quant.config.sdk import build_sdk_config
 from longport_quant.config.settings import Settings, get_settings
+from longport_quant.data.quote_client import QuoteDataClient
 from longport_quant.data.watchlist import Watchlist, WatchlistLoader
+from longport_quant.persistence.bulk_copy import copy_records, get_driver_connection
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import (
     MarketDepth,
@@ -25,8 +28,8 @@ from longport_quant.persistence.models import (
     TradeTick,
 )
 from longport_quant.utils.events import EventBus
+from longport_quant.utils.sdk_executor import sdk_call
 from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
 
 
 class DataType(Enum):
@@ -49,9 +52,12 @@ class MarketDataConfig:
     persist_to_db: bool = True
     queue_size: int = 10000
     batch_size: int = 100
+    max_batch_size: int = 5000  # rows per COPY when draining a backlog
     flush_interval: float = 1.0  # seconds
     reconnect_delay: float = 5.0  # seconds
     max_reconnect_attempts: int = 10
+    # False: connect even with an empty watchlist (symbols added later)
+    require_watchlist: bool = True
 
 
 @dataclass
@@ -67,22 +73,56 @@ class ConnectionStatus:
 
 
 class PersistenceQueue:
-    """Queue for persisting market data to database."""
+    """Queue for persisting market data to database.
+
+    Items are written with binary COPY into per-connection staging tables and
+    merged into the target tables with one set-based statement per batch.
+    The flush loop wakes up as soon as a full batch is waiting and keeps
+    draining until every queue is empty, so a busy open is absorbed instead
+    of overflowing the bounded deques. Queues take turns one
+    ``max_batch_size`` chunk at a time, so a steady stream of quotes cannot
+    starve depth and trade persistence.
+    """
+
+    QUOTE_COLUMNS = (
+        "symbol", "timestamp", "last_done", "prev_close", "open", "high", "low",
+        "volume", "turnover", "bid_price", "ask_price", "bid_volume", "ask_volume",
+        "trade_status",
+    )
+    DEPTH_COLUMNS = ("symbol", "timestamp", "position", "side", "price", "volume", "broker_count")
+    TRADE_COLUMNS = ("symbol", "price", "volume", "timestamp", "direction", "trade_type")
 
     def __init__(
         self,
         db: DatabaseSessionManager,
         batch_size: int = 100,
         flush_interval: float = 1.0,
+        queue_size: int = 10000,
+        max_batch_size: int = 5000,
     ):
         self._db = db
         self._batch_size = batch_size
+        self._max_batch_size = max(batch_size, max_batch_size)
         self._flush_interval = flush_interval
+        # Items are stored as (enqueue monotonic time, data) to measure lag
         self._queues: Dict[str, deque] = {
-            DataType.QUOTE.value: deque(maxlen=10000),
-            DataType.DEPTH.value: deque(maxlen=10000),
-            DataType.TRADE.value: deque(maxlen=10000),
+            DataType.QUOTE.value: deque(maxlen=queue_size),
+            DataType.DEPTH.value: deque(maxlen=queue_size),
+            DataType.TRADE.value: deque(maxlen=queue_size),
         }
+        self._stats: Dict[str, Dict[str, float]] = {
+            key: {
+                "enqueued": 0,
+                "persisted": 0,
+                "dropped": 0,
+                "failed_batches": 0,
+                "lag_seconds": 0.0,
+                "max_lag_seconds": 0.0,
+            }
+            for key in self._queues
+        }
+        self._reported_drops: Dict[str, int] = dict.fromkeys(self._queues, 0)
+        self._wakeup = asyncio.Event()
         self._running = False
         self._flush_task: Optional[asyncio.Task] = None
 
@@ -108,36 +148,65 @@ class PersistenceQueue:
 
     async def enqueue(self, data_type: DataType, data: Dict[str, Any]):
         """Add data to the queue."""
-        if data_type.value in self._queues:
-            self._queues[data_type.value].append(data)
+        queue = self._queues.get(data_type.value)
+        if queue is None:
+            return
+
+        stats = self._stats[data_type.value]
+        if len(queue) == queue.maxlen:
+            # deque evicts the oldest item
+            stats["dropped"] += 1
+        queue.append((time.monotonic(), data))
+        stats["enqueued"] += 1
+
+        if len(queue) >= self._batch_size:
+            self._wakeup.set()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per data type counters: enqueued/persisted/dropped, failed batches and lag."""
+        return {
+            key: {**stats, "pending": len(self._queues[key])}
+            for key, stats in self._stats.items()
+        }
 
     async def _flush_loop(self):
-        """Periodically flush queues to database."""
+        """Flush queues whenever a batch is ready or the interval elapses."""
         while self._running:
             try:
-                await asyncio.sleep(self._flush_interval)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
                 await self._flush_all()
             except Exception as e:
                 logger.error(f"Error in flush loop: {e}")
 
     async def _flush_all(self):
-        """Flush all queues to database."""
+        """Flush all queues to database, one bounded batch per queue per round."""
+        pending = [data_type for data_type in DataType if data_type.value in self._queues]
+        while pending:
+            pending = [data_type for data_type in pending if await self._flush_batch(data_type)]
+
         for data_type in DataType:
             if data_type.value in self._queues:
-                await self._flush_queue(data_type)
+                self._report_drops(data_type)
 
-    async def _flush_queue(self, data_type: DataType):
-        """Flush a specific queue to database."""
+    async def _flush_batch(self, data_type: DataType) -> bool:
+        """Write one COPY-sized chunk of a queue; return True if it should get another turn."""
         queue = self._queues[data_type.value]
+        stats = self._stats[data_type.value]
         if not queue:
-            return
+            return False
 
-        batch = []
-        while queue and len(batch) < self._batch_size:
-            batch.append(queue.popleft())
+        now = time.monotonic()
+        lag = now - queue[0][0]
+        stats["lag_seconds"] = lag
+        stats["max_lag_seconds"] = max(stats["max_lag_seconds"], lag)
 
-        if not batch:
-            return
+        size = min(len(queue), self._max_batch_size)
+        entries = [queue.popleft() for _ in range(size)]
+        batch = [data for _, data in entries]
 
         try:
             async with self._db.session() as session:
@@ -149,123 +218,104 @@ class PersistenceQueue:
                     await self._persist_trades(session, batch)
 
                 await session.commit()
-                logger.debug(f"Flushed {len(batch)} {data_type.value} records")
+
+            stats["persisted"] += len(batch)
+            logger.debug(
+                f"Flushed {len(batch)} {data_type.value} records "
+                f"in {time.monotonic() - now:.3f}s (lag {lag:.2f}s, pending {len(queue)})"
+            )
+            return bool(queue)
 
         except Exception as e:
+            stats["failed_batches"] += 1
             logger.error(f"Error persisting {data_type.value} data: {e}")
-            # Re-queue failed items
-            for item in reversed(batch):
-                self._queues[data_type.value].appendleft(item)
+            # Re-queue failed items; anything pushed past maxlen is lost
+            overflow = max(0, len(queue) + len(entries) - queue.maxlen)
+            stats["dropped"] += overflow
+            for entry in reversed(entries[: len(entries) - overflow]):
+                queue.appendleft(entry)
+            return False
+
+    def _report_drops(self, data_type: DataType):
+        """Warn once per flush when a queue has dropped records since the last report."""
+        stats = self._stats[data_type.value]
+        if stats["dropped"] > self._reported_drops[data_type.value]:
+            logger.warning(
+                f"⚠️ {data_type.value} 持久化队列溢出, 累计丢弃 {int(stats['dropped'])} 条 "
+                f"(最大延迟 {stats['max_lag_seconds']:.2f}s)"
+            )
+            self._reported_drops[data_type.value] = stats["dropped"]
 
     async def _persist_quotes(self, session, quotes: List[Dict]):
         """Persist quote data."""
-        for quote in quotes:
-            timestamp = quote.get("timestamp", datetime.now())
-            stmt = insert(RealtimeQuote).values(
-                symbol=quote["symbol"],
-                timestamp=timestamp,
-                last_done=self._to_decimal(quote.get("last_price")),
-                prev_close=self._to_decimal(quote.get("prev_close")),
-                open=self._to_decimal(quote.get("open")),
-                high=self._to_decimal(quote.get("high")),
-                low=self._to_decimal(quote.get("low")),
-                volume=quote.get("volume"),
-                turnover=self._to_decimal(quote.get("turnover")),
-                bid_price=self._to_decimal(quote.get("bid_price")),
-                ask_price=self._to_decimal(quote.get("ask_price")),
-                bid_volume=quote.get("bid_size"),
-                ask_volume=quote.get("ask_size"),
-                trade_status=quote.get("trade_status"),
-            )
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[RealtimeQuote.symbol, RealtimeQuote.timestamp],
-                set_={
-                    "last_done": stmt.excluded.last_done,
-                    "prev_close": stmt.excluded.prev_close,
-                    "open": stmt.excluded.open,
-                    "high": stmt.excluded.high,
-                    "low": stmt.excluded.low,
-                    "volume": stmt.excluded.volume,
-                    "turnover": stmt.excluded.turnover,
-                    "bid_price": stmt.excluded.bid_price,
-                    "ask_price": stmt.excluded.ask_price,
-                    "bid_volume": stmt.excluded.bid_volume,
-                    "ask_volume": stmt.excluded.ask_volume,
-                    "trade_status": stmt.excluded.trade_status,
-                },
+        records = (
+            (
+                quote["symbol"],
+                quote.get("timestamp") or datetime.now(),
+                self._to_decimal(quote.get("last_price")),
+                self._to_decimal(quote.get("prev_close")),
+                self._to_decimal(quote.get("open")),
+                self._to_decimal(quote.get("high")),
+                self._to_decimal(quote.get("low")),
+                quote.get("volume"),
+                self._to_decimal(quote.get("turnover")),
+                self._to_decimal(quote.get("bid_price")),
+                self._to_decimal(quote.get("ask_price")),
+                quote.get("bid_size"),
+                quote.get("ask_size"),
+                quote.get("trade_status"),
             )
-            await session.execute(stmt)
+            for quote in quotes
+        )
+        conn = await get_driver_connection(session)
+        await copy_records(
+            conn,
+            RealtimeQuote.__tablename__,
+            self.QUOTE_COLUMNS,
+            records,
+            conflict_columns=("symbol", "timestamp"),
+        )
 
     async def _persist_depths(self, session, depths: List[Dict]):
         """Persist market depth data."""
-        for depth in depths:
-            timestamp = depth.get("timestamp", datetime.now())
-
-            bids = self._zip_depth_levels(depth.get("bid_prices", []), depth.get("bid_sizes", []))
-            asks = self._zip_depth_levels(depth.get("ask_prices", []), depth.get("ask_sizes", []))
-
-            for position, price, size in bids:
-                stmt = insert(MarketDepth).values(
-                    symbol=depth["symbol"],
-                    timestamp=timestamp,
-                    position=position,
-                    side="BID",
-                    price=self._to_decimal(price),
-                    volume=size,
-                    broker_count=None,
-                )
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=[
-                        MarketDepth.symbol,
-                        MarketDepth.timestamp,
-                        MarketDepth.position,
-                        MarketDepth.side,
-                    ],
-                    set_={
-                        "price": stmt.excluded.price,
-                        "volume": stmt.excluded.volume,
-                        "broker_count": stmt.excluded.broker_count,
-                    },
-                )
-                await session.execute(stmt)
-
-            for position, price, size in asks:
-                stmt = insert(MarketDepth).values(
-                    symbol=depth["symbol"],
-                    timestamp=timestamp,
-                    position=position,
-                    side="ASK",
-                    price=self._to_decimal(price),
-                    volume=size,
-                    broker_count=None,
-                )
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=[
-                        MarketDepth.symbol,
-                        MarketDepth.timestamp,
-                        MarketDepth.position,
-                        MarketDepth.side,
-                    ],
-                    set_={
-                        "price": stmt.excluded.price,
-                        "volume": stmt.excluded.volume,
-                        "broker_count": stmt.excluded.broker_count,
-                    },
-                )
-                await session.execute(stmt)
+
+        def rows():
+            for depth in depths:
+                timestamp = depth.get("timestamp") or datetime.now()
+                for side, prices, sizes in (
+                    ("BID", depth.get("bid_prices", []), depth.get("bid_sizes", [])),
+                    ("ASK", depth.get("ask_prices", []), depth.get("ask_sizes", [])),
+                ):
+                    for position, price, size in self._zip_depth_levels(prices, sizes):
+                        yield (
+                            depth["symbol"], timestamp, position, side,
+                            self._to_decimal(price), size, None,
+                        )
+
+        conn = await get_driver_connection(session)
+        await copy_records(
+            conn,
+            MarketDepth.__tablename__,
+            self.DEPTH_COLUMNS,
+            rows(),
+            conflict_columns=("symbol", "timestamp", "position", "side"),
+        )
 
     async def _persist_trades(self, session, trades: List[Dict]):
-        """Persist trade tick data."""
-        for trade in trades:
-            stmt = insert(TradeTick).values(
-                symbol=trade["symbol"],
-                price=self._to_decimal(trade.get("price")),
-                volume=trade.get("volume"),
-                timestamp=trade.get("timestamp", datetime.now()),
-                direction=trade.get("direction", "neutral"),
-                trade_type=trade.get("trade_type", "auto"),
+        """Persist trade tick data (append-only, copied straight into the table)."""
+        records = (
+            (
+                trade["symbol"],
+                self._to_decimal(trade.get("price")),
+                trade.get("volume"),
+                trade.get("timestamp") or datetime.now(),
+                trade.get("direction", "neutral"),
+                trade.get("trade_type", "auto"),
             )
-            await session.execute(stmt)
+            for trade in trades
+        )
+        conn = await get_driver_connection(session)
+        await copy_records(conn, TradeTick.__tablename__, self.TRADE_COLUMNS, records)
 
     @staticmethod
     def _to_decimal(value: Any) -> Optional[Decimal]:
@@ -299,10 +349,13 @@ class EnhancedMarketDataService:
         settings: Settings,
         db: DatabaseSessionManager,
         config: MarketDataConfig | None = None,
+        quote_client: Optional[QuoteDataClient] = None,
     ):
         self._settings = settings
         self._db = db
         self._config = config or MarketDataConfig()
+        self._quote_client = quote_client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._sdk_config: Optional[openapi.Config] = None
         self._quote_ctx: Optional[openapi.QuoteContext] = None
         self._event_bus = EventBus()
@@ -313,6 +366,7 @@ class EnhancedMarketDataService:
         self._running = False
         self._reconnect_task: Optional[asyncio.Task] = None
         self._subscribed_types: Set[openapi.SubType] = set()
+        self._extra_symbols: Set[str] = set()
 
     async def __aenter__(self) -> "EnhancedMarketDataService":
         """Async context manager entry."""
@@ -328,10 +382,11 @@ class EnhancedMarketDataService:
         """Start the market data service."""
         logger.info("Starting enhanced market data service")
         self._running = True
+        self._loop = asyncio.get_running_loop()
 
         # Load watchlist
         self._watchlist = self._watchlist_loader.load()
-        if not self._watchlist.items:
+        if not self._watchlist.items and self._config.require_watchlist:
             logger.warning("Watchlist is empty; no data will be streamed")
             return
 
@@ -341,6 +396,8 @@ class EnhancedMarketDataService:
                 self._db,
                 batch_size=self._config.batch_size,
                 flush_interval=self._config.flush_interval,
+                queue_size=self._config.queue_size,
+                max_batch_size=self._config.max_batch_size,
             )
             await self._persistence_queue.start()
 
@@ -376,13 +433,17 @@ class EnhancedMarketDataService:
     async def _connect(self) -> bool:
         """Connect to market data feed."""
         try:
-            # Build SDK config
-            self._sdk_config = build_sdk_config(self._settings)
-
-            # Create quote context
-            self._quote_ctx = await asyncio.to_thread(
-                openapi.QuoteContext, self._sdk_config
-            )
+            if self._quote_client is not None:
+                # Share the caller's connection instead of opening another one
+                self._quote_ctx = await self._quote_client.context()
+            else:
+                # Build SDK config
+                self._sdk_config = build_sdk_config(self._settings)
+
+                # Create quote context
+                self._quote_ctx = await sdk_call(
+                    "quote.connect", openapi.QuoteContext, self._sdk_config
+                )
 
             # Set up callbacks
             self._setup_callbacks()
@@ -427,7 +488,7 @@ class EnhancedMarketDataService:
             try:
                 await asyncio.sleep(30)  # Check every 30 seconds
 
-                if not self._status.connected and self._watchlist and self._watchlist.items:
+                if not self._status.connected and self._all_symbols():
                     self._status.reconnect_attempts += 1
 
                     if self._status.reconnect_attempts <= self._config.max_reconnect_attempts:
@@ -477,7 +538,7 @@ class EnhancedMarketDataService:
         if not self._quote_ctx or not self._watchlist:
             return
 
-        symbols = self._watchlist.symbols()
+        symbols = self._all_symbols()
         sub_types = []
 
         if self._config.enable_quote:
@@ -493,12 +554,17 @@ class EnhancedMarketDataService:
             logger.warning("No data types enabled for subscription")
             return
 
+        if not symbols:
+            # 无标的时只记录订阅类型，供 add_symbols 使用
+            self._subscribed_types = set(sub_types)
+            return
+
         try:
             logger.info(
                 f"Subscribing to {len(symbols)} symbols for {len(sub_types)} data types"
             )
-            await asyncio.to_thread(
-                self._quote_ctx.subscribe, symbols, sub_types, True
+            await sdk_call(
+                "quote.subscribe", self._quote_ctx.subscribe, symbols, sub_types, True
             )
             self._subscribed_types = set(sub_types)
 
@@ -512,9 +578,9 @@ class EnhancedMarketDataService:
             return
 
         try:
-            symbols = self._watchlist.symbols()
-            await asyncio.to_thread(
-                self._quote_ctx.unsubscribe,
+            symbols = self._all_symbols()
+            await sdk_call(
+                "quote.unsubscribe", self._quote_ctx.unsubscribe,
                 symbols,
                 list(self._subscribed_types),
             )
@@ -523,6 +589,15 @@ class EnhancedMarketDataService:
         except OpenApiException as e:
             logger.warning(f"Unsubscribe failed: {e}")
 
+    @staticmethod
+    def _event_time(value) -> datetime:
+        """Push timestamps arrive as datetime from the SDK (epoch millis in older payloads)."""
+        if isinstance(value, datetime):
+            return value
+        if value:
+            return datetime.fromtimestamp(value / 1000)
+        return datetime.now()
+
     def _handle_quote(self, symbol: str, event: openapi.PushQuote) -> None:
         """Handle quote push event."""
         if not self._running:
@@ -539,7 +614,8 @@ class EnhancedMarketDataService:
             quote_data = {
                 "symbol": symbol,
                 "last_price": float(event.last_done) if hasattr(event, "last_done") and event.last_done else None,
-                "prev_close": float(event.previous_close) if hasattr(event, "previous_close") and event.previous_close else None,
+                # PushQuote has no previous close; consumers take it from a static quote
+                "prev_close": None,
                 "open": float(event.open) if hasattr(event, "open") and event.open else None,
                 "high": float(event.high) if hasattr(event, "high") and event.high else None,
                 "low": float(event.low) if hasattr(event, "low") and event.low else None,
@@ -550,13 +626,11 @@ class EnhancedMarketDataService:
                 "ask_price": float(event.ask_price) if hasattr(event, "ask_price") and event.ask_price else None,
                 "ask_size": int(event.ask_size) if hasattr(event, "ask_size") and event.ask_size else None,
                 "trade_status": getattr(event, "trade_status", None),
-                "timestamp": datetime.fromtimestamp(event.timestamp / 1000) if hasattr(event, "timestamp") and event.timestamp else datetime.now(),
+                "timestamp": self._event_time(getattr(event, "timestamp", None)),
             }
 
             # Publish event
-            asyncio.create_task(
-                self._publish_and_persist(DataType.QUOTE, quote_data)
-            )
+            self._dispatch(self._publish_and_persist(DataType.QUOTE, quote_data))
 
         except Exception as e:
             logger.error(f"Error handling quote for {symbol}: {e}")
@@ -609,9 +683,7 @@ class EnhancedMarketDataService:
             }
 
             # Publish event
-            asyncio.create_task(
-                self._publish_and_persist(DataType.DEPTH, depth_data)
-            )
+            self._dispatch(self._publish_and_persist(DataType.DEPTH, depth_data))
 
         except Exception as e:
             logger.error(f"Error handling depth for {symbol}: {e}")
@@ -637,15 +709,13 @@ class EnhancedMarketDataService:
                     "symbol": symbol,
                     "price": float(trade.price) if hasattr(trade, "price") and trade.price else None,
                     "volume": int(trade.volume) if hasattr(trade, "volume") and trade.volume else None,
-                    "timestamp": datetime.fromtimestamp(trade.timestamp / 1000) if hasattr(trade, "timestamp") and trade.timestamp else datetime.now(),
+                    "timestamp": self._event_time(getattr(trade, "timestamp", None)),
                     "direction": direction,
                     "trade_type": direction,
                 }
 
                 # Publish event
-                asyncio.create_task(
-                    self._publish_and_persist(DataType.TRADE, trade_data)
-                )
+                self._dispatch(self._publish_and_persist(DataType.TRADE, trade_data))
 
         except Exception as e:
             logger.error(f"Error handling trades for {symbol}: {e}")
@@ -671,13 +741,31 @@ class EnhancedMarketDataService:
             }
 
             # Publish event (no persistence for broker data)
-            asyncio.create_task(
-                self._event_bus.publish(DataType.BROKER.value, broker_data)
-            )
+            self._dispatch(self._event_bus.publish(DataType.BROKER.value, broker_data))
 
         except Exception as e:
             logger.error(f"Error handling brokers for {symbol}: {e}")
 
+    def _all_symbols(self) -> List[str]:
+        """Watchlist symbols plus those added at runtime via :meth:`add_symbols`."""
+        symbols = list(self._watchlist.symbols()) if self._watchlist else []
+        return symbols + sorted(self._extra_symbols.difference(symbols))
+
+    def _dispatch(self, coro: Awaitable[None]) -> None:
+        """Schedule ``coro`` on the service loop; SDK callbacks arrive on SDK threads."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
     async def _publish_and_persist(self, data_type: DataType, data: Dict[str, Any]):
         """Publish event and persist to database."""
         # Publish to event bus
@@ -729,6 +817,12 @@ class EnhancedMarketDataService:
         """Get current connection status."""
         return self._status
 
+    def get_persistence_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get persistence queue counters (empty when persistence is disabled)."""
+        if not self._persistence_queue:
+            return {}
+        return self._persistence_queue.get_stats()
+
     async def add_symbols(self, symbols: List[str]):
         """Add symbols to subscription."""
         if not self._quote_ctx or not symbols:
@@ -737,9 +831,10 @@ class EnhancedMarketDataService:
         try:
             sub_types = list(self._subscribed_types)
             if sub_types:
-                await asyncio.to_thread(
-                    self._quote_ctx.subscribe, symbols, sub_types, False
+                await sdk_call(
+                    "quote.subscribe", self._quote_ctx.subscribe, symbols, sub_types, False
                 )
+                self._extra_symbols.update(symbols)
                 logger.info(f"Added {len(symbols)} symbols to subscription")
 
         except OpenApiException as e:
@@ -753,9 +848,10 @@ class EnhancedMarketDataService:
         try:
             sub_types = list(self._subscribed_types)
             if sub_types:
-                await asyncio.to_thread(
-                    self._quote_ctx.unsubscribe, symbols, sub_types
+                await sdk_call(
+                    "quote.unsubscribe", self._quote_ctx.unsubscribe, symbols, sub_types
                 )
+                self._extra_symbols.difference_update(symbols)
                 logger.info(f"Removed {len(symbols)} symbols from subscription")
 
         except OpenApiException as e:
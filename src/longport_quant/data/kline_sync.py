@@ -5,11 +5,11 @@ from __future__ import annotations
 import asyncio
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
 from longport import OpenApiException, openapi
-from sqlalchemy import select, text
+from sqlalchemy import func, select, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -20,6 +20,7 @@ from longport_quant.data.batch_insert import BatchConfig, BatchInsertService
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import KlineDaily, KlineMinute, SecurityStatic
 from longport_quant.utils import ProgressTracker
+from longport_quant.utils.rate_limit import get_api_rate_limiter, load_api_limits
 
 
 class KlineDataService:
@@ -438,6 +439,40 @@ class KlineDataService:
             row = result.scalar_one_or_none()
             return row if row else None
 
+    async def load_daily_klines(
+        self,
+        symbols: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> Dict[str, List[KlineDaily]]:
+        """
+        Load persisted daily K-lines for many symbols with a single query.
+
+        Args:
+            symbols: Symbols to load
+            start_date: First trade date (inclusive)
+            end_date: Last trade date (inclusive)
+
+        Returns:
+            Mapping of symbol to K-lines in ascending date order
+        """
+        results: Dict[str, List[KlineDaily]] = {symbol: [] for symbol in symbols}
+        if not symbols:
+            return results
+
+        async with self.db.session() as session:
+            stmt = select(KlineDaily).where(
+                KlineDaily.symbol.in_(symbols),
+                KlineDaily.trade_date >= start_date,
+                KlineDaily.trade_date <= end_date,
+            ).order_by(KlineDaily.symbol, KlineDaily.trade_date.asc())
+
+            result = await session.execute(stmt)
+            for kline in result.scalars().all():
+                results.setdefault(kline.symbol, []).append(kline)
+
+        return results
+
     async def _bulk_upsert_daily_klines(self, symbol: str, candles: List[openapi.Candlestick]) -> int:
         """Bulk insert or update daily K-line data."""
         processed = 0
@@ -824,16 +859,18 @@ class KlineDataService:
         symbols: List[str],
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        use_parallel: bool = True
+        use_parallel: bool = True,
+        max_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Optimized daily K-line sync using batch processing.
+        Optimized daily K-line sync using concurrent fetches and batch processing.
 
         Args:
             symbols: List of symbol codes
-            start_date: Start date for sync
+            start_date: Start date for sync (defaults to each symbol's last synced date)
             end_date: End date for sync
             use_parallel: Use parallel processing for large datasets
+            max_concurrency: Concurrent fetches (defaults to ``configs/api_limits.yml``)
 
         Returns:
             Sync statistics
@@ -844,91 +881,55 @@ class KlineDataService:
             return {"total": 0, "errors": 0}
 
         normalized_start, normalized_end = self._normalize_date_range(start_date, end_date)
-        all_records = []
-        failed_symbols = []
-
-        # Collect all records first
-        for symbol in sanitized_symbols:
-            try:
-                last_date = await self._get_last_daily_sync_date(symbol)
-                sync_start = normalized_start or last_date or date(2020, 1, 1)
-
-                if sync_start >= normalized_end:
-                    logger.info(f"{symbol} already up to date")
-                    continue
-
-                logger.info(f"Fetching {symbol} from {sync_start} to {normalized_end}")
 
-                candles = await self.quote_client.get_history_candles(
-                    symbol=symbol,
-                    period=openapi.Period.Day,
-                    adjust_type=openapi.AdjustType.Forward,
-                    start=datetime.combine(sync_start, datetime.min.time()),
-                    end=datetime.combine(normalized_end, datetime.max.time())
-                )
+        # One query for every watermark instead of one per symbol
+        last_dates = {} if normalized_start else await self._get_last_daily_sync_dates(sanitized_symbols)
 
-                # Convert to batch records
-                for candle in candles:
-                    try:
-                        insert_values, _ = self._prepare_daily_upsert(symbol, candle)
-                        all_records.append(insert_values)
-                    except ValueError as e:
-                        logger.debug(f"Skipping invalid candle: {e}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Failed to fetch {symbol}: {e}")
-                failed_symbols.append(symbol)
-
-        if not all_records:
-            logger.info("No records to sync")
-            return {
-                "total": 0,
-                "symbols_processed": len(sanitized_symbols) - len(failed_symbols),
-                "symbols_failed": len(failed_symbols)
-            }
-
-        # Use optimized batch insert
-        logger.info(f"Batch inserting {len(all_records)} daily K-line records")
-
-        if use_parallel and len(all_records) > 10000:
-            # Use parallel processing for large datasets
-            result = await self.batch_service.parallel_insert(
-                "kline_daily",
-                all_records,
-                ["symbol", "trade_date"],
-                num_workers=4
-            )
-        else:
-            # Use standard batch insert
-            result = await self.batch_service.bulk_insert_klines_optimized(
-                "kline_daily",
-                all_records,
-                ["symbol", "trade_date"]
-            )
-
-        # Add symbol statistics
-        result["symbols_processed"] = len(sanitized_symbols) - len(failed_symbols)
-        result["symbols_failed"] = len(failed_symbols)
-        result["failed_symbols"] = failed_symbols
-
-        return result
+        jobs = []
+        for symbol in sanitized_symbols:
+            sync_start = normalized_start or last_dates.get(symbol) or date(2020, 1, 1)
+            if sync_start >= normalized_end:
+                logger.info(f"{symbol} already up to date")
+                continue
+            jobs.append((symbol, {
+                "period": openapi.Period.Day,
+                "adjust_type": openapi.AdjustType.ForwardAdjust,
+                "start": datetime.combine(sync_start, datetime.min.time()),
+                "end": datetime.combine(normalized_end, datetime.max.time()),
+            }))
+
+        def prepare(symbol: str, candle: openapi.Candlestick) -> Dict[str, object]:
+            insert_values, _ = self._prepare_daily_upsert(symbol, candle)
+            return insert_values
+
+        return await self._run_sync_pipeline(
+            jobs,
+            prepare,
+            table_name="kline_daily",
+            conflict_columns=["symbol", "trade_date"],
+            symbol_count=len(sanitized_symbols),
+            use_parallel=use_parallel,
+            parallel_threshold=10000,
+            max_concurrency=max_concurrency or self._sync_concurrency("daily_klines"),
+        )
 
     async def sync_minute_klines_optimized(
         self,
         symbols: List[str],
         interval: int = 1,
         days_back: int = 30,
-        use_parallel: bool = True
+        use_parallel: bool = True,
+        max_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Optimized minute K-line sync using batch processing.
+        Optimized minute K-line sync using concurrent fetches and batch processing.
 
         Args:
             symbols: List of symbol codes
             interval: Minute interval (1, 5, 15, 30, 60)
             days_back: Number of days to sync back
             use_parallel: Use parallel processing
+            max_concurrency: Concurrent fetches (defaults to ``configs/api_limits.yml``)
 
         Returns:
             Sync statistics
@@ -939,8 +940,6 @@ class KlineDataService:
 
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
-        all_records = []
-        failed_symbols = []
 
         # Map interval to period
         period_map = {
@@ -952,59 +951,155 @@ class KlineDataService:
         }
         period = period_map.get(interval, openapi.Period.Min_1)
 
-        # Collect all records
-        for symbol in sanitized_symbols:
-            try:
-                logger.info(f"Fetching {interval}min K-lines for {symbol}")
+        jobs = [
+            (symbol, {
+                "period": period,
+                "adjust_type": openapi.AdjustType.ForwardAdjust,
+                "start": start_date,
+                "end": end_date,
+            })
+            for symbol in sanitized_symbols
+        ]
+
+        def prepare(symbol: str, candle: openapi.Candlestick) -> Dict[str, object]:
+            insert_values, _ = self._prepare_minute_upsert(symbol, candle)
+            insert_values["interval"] = interval
+            return insert_values
+
+        return await self._run_sync_pipeline(
+            jobs,
+            prepare,
+            table_name="kline_minute",
+            conflict_columns=["symbol", "timestamp"],
+            symbol_count=len(sanitized_symbols),
+            use_parallel=use_parallel,
+            parallel_threshold=50000,
+            max_concurrency=max_concurrency or self._sync_concurrency("minute_klines"),
+        )
 
-                candles = await self.quote_client.get_history_candles(
-                    symbol=symbol,
-                    period=period,
-                    adjust_type=openapi.AdjustType.Forward,
-                    start=start_date,
-                    end=end_date
-                )
+    async def _get_last_daily_sync_dates(self, symbols: List[str]) -> Dict[str, date]:
+        """Get the last synced daily K-line date of many symbols in one query."""
+        if not symbols:
+            return {}
+
+        async with self.db.session() as session:
+            stmt = (
+                select(KlineDaily.symbol, func.max(KlineDaily.trade_date))
+                .where(KlineDaily.symbol.in_(symbols))
+                .group_by(KlineDaily.symbol)
+            )
+            result = await session.execute(stmt)
+            return {symbol: last_date for symbol, last_date in result.all() if last_date}
 
-                # Convert to batch records
-                for candle in candles:
+    @staticmethod
+    def _sync_concurrency(kind: str) -> int:
+        """Concurrent fetchers for a sync kind from ``sync_limits`` in the API limits."""
+        limits = load_api_limits().get("sync_limits", {}).get(kind, {})
+        return max(1, int(limits.get("max_concurrent_requests", 1)))
+
+    async def _run_sync_pipeline(
+        self,
+        jobs: List[Tuple[str, Dict[str, Any]]],
+        prepare: Callable[[str, openapi.Candlestick], Dict[str, object]],
+        table_name: str,
+        conflict_columns: List[str],
+        symbol_count: int,
+        use_parallel: bool,
+        parallel_threshold: int,
+        max_concurrency: int,
+    ) -> Dict[str, Any]:
+        """
+        Fetch candles with bounded concurrency and stream them to the bulk writer.
+
+        Every history request first takes a token from the process-wide API rate
+        limiter. Prepared records are handed to a single writer task through a
+        bounded queue and flushed in ``chunk_size`` batches, so database writes
+        overlap with the fetches still in flight.
+        """
+        limiter = get_api_rate_limiter()
+        pending = iter(jobs)
+        records_queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, max_concurrency * 2))
+        failed_symbols: List[str] = []
+        chunk_size = max(1, self.batch_config.chunk_size)
+        write_stats = {"processed": 0, "records": 0, "chunks": 0, "failed": 0}
+
+        async def fetcher() -> None:
+            for symbol, params in pending:
+                try:
+                    if limiter:
+                        await limiter.acquire()
+                    logger.info(f"Fetching {symbol} from {params['start']} to {params['end']}")
+                    candles = await self.quote_client.get_history_candles(symbol=symbol, **params)
+                except Exception as e:
+                    logger.error(f"Failed to fetch {symbol}: {e}")
+                    failed_symbols.append(symbol)
+                    continue
+
+                records = []
+                for candle in candles or []:
                     try:
-                        insert_values, _ = self._prepare_minute_upsert(symbol, candle)
-                        insert_values["interval"] = interval
-                        all_records.append(insert_values)
+                        records.append(prepare(symbol, candle))
                     except ValueError as e:
                         logger.debug(f"Skipping invalid candle: {e}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Failed to fetch {symbol}: {e}")
-                failed_symbols.append(symbol)
-
-        if not all_records:
-            return {
-                "total": 0,
-                "symbols_processed": len(sanitized_symbols) - len(failed_symbols),
-                "symbols_failed": len(failed_symbols)
-            }
-
-        # Use optimized batch insert
-        logger.info(f"Batch inserting {len(all_records)} minute K-line records")
-
-        if use_parallel and len(all_records) > 50000:
-            result = await self.batch_service.parallel_insert(
-                "kline_minute",
-                all_records,
-                ["symbol", "timestamp"],
-                num_workers=4
-            )
-        else:
-            result = await self.batch_service.bulk_insert_klines_optimized(
-                "kline_minute",
-                all_records,
-                ["symbol", "timestamp"]
-            )
+                if records:
+                    await records_queue.put(records)
 
-        result["symbols_processed"] = len(sanitized_symbols) - len(failed_symbols)
-        result["symbols_failed"] = len(failed_symbols)
-        result["failed_symbols"] = failed_symbols
+        async def flush(buffer: List[Dict[str, object]]) -> None:
+            if use_parallel and len(buffer) > parallel_threshold:
+                result = await self.batch_service.parallel_insert(
+                    table_name, buffer, conflict_columns, num_workers=4
+                )
+            else:
+                result = await self.batch_service.bulk_insert_klines_optimized(
+                    table_name, buffer, conflict_columns
+                )
+            write_stats["processed"] += (result or {}).get("processed", len(buffer))
+            write_stats["records"] += len(buffer)
+            write_stats["chunks"] += 1
 
-        return result
+        async def safe_flush(buffer: List[Dict[str, object]]) -> None:
+            # 写入失败不能让 writer 退出，否则 fetcher 会阻塞在已满的队列上
+            logger.info(f"Batch inserting {len(buffer)} {table_name} records")
+            try:
+                await flush(buffer)
+            except Exception as e:
+                logger.error(f"Failed to write {len(buffer)} {table_name} records: {e}")
+                write_stats["failed"] += len(buffer)
+
+        async def writer() -> None:
+            buffer: List[Dict[str, object]] = []
+            while True:
+                records = await records_queue.get()
+                if records is None:
+                    break
+                buffer.extend(records)
+                if len(buffer) >= chunk_size:
+                    await safe_flush(buffer)
+                    buffer = []
+            if buffer:
+                await safe_flush(buffer)
+
+        writer_task = asyncio.create_task(writer())
+        try:
+            await asyncio.gather(*(fetcher() for _ in range(max(1, min(max_concurrency, len(jobs))))))
+        finally:
+            await records_queue.put(None)
+        await writer_task
+
+        summary = {
+            "symbols_processed": symbol_count - len(failed_symbols),
+            "symbols_failed": len(failed_symbols),
+            "failed_symbols": failed_symbols,
+        }
+        if not write_stats["records"]:
+            logger.info("No records to sync")
+            return {"total": 0, **summary}
+
+        return {
+            **self.batch_service.get_statistics(),
+            "processed": write_stats["processed"],
+            "total": write_stats["records"],
+            "chunks": write_stats["chunks"],
+            "write_failed": write_stats["failed"],
+            **summary,
+        }
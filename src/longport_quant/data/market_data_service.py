@@ -13,6 +13,7 @@ from longport_quant.config.sdk import build_sdk_config
 from longport_quant.config.settings import Settings
 from longport_quant.data.watchlist import Watchlist, WatchlistLoader
 from longport_quant.utils.events import EventBus
+from longport_quant.utils.sdk_executor import sdk_call
 
 
 QuoteHandler = Callable[[dict], Awaitable[None]]
@@ -43,7 +44,7 @@ class MarketDataService:
         config = self._config or build_sdk_config(self._settings)
         self._config = config
         try:
-            self._quote_ctx = await asyncio.to_thread(openapi.QuoteContext, config)
+            self._quote_ctx = await sdk_call("quote.connect", openapi.QuoteContext, config)
         except OpenApiException as exc:  # pragma: no cover - network errors
             logger.error("Failed to initialise QuoteContext: {}", exc)
             raise
@@ -59,8 +60,8 @@ class MarketDataService:
         self._running = False
         if self._quote_ctx and self._watchlist and self._watchlist.items:
             try:
-                await asyncio.to_thread(
-                    self._quote_ctx.unsubscribe,
+                await sdk_call(
+                    "quote.unsubscribe", self._quote_ctx.unsubscribe,
                     self._watchlist.symbols(),
                     [openapi.SubType.Quote],
                 )
@@ -76,8 +77,8 @@ class MarketDataService:
             "Subscribing to {} symbols via QuoteContext in one batch", len(symbols)
         )
         try:
-            await asyncio.to_thread(
-                self._quote_ctx.subscribe,
+            await sdk_call(
+                "quote.subscribe", self._quote_ctx.subscribe,
                 symbols,
                 [openapi.SubType.Quote],
                 True,
@@ -0,0 +1,770 @@
+"""Local market-data gateway: one LongPort quote connection shared by every process.
+
+:class:`MarketDataGateway` (run by ``scripts/run_market_gateway.py``) owns the
+only upstream ``QuoteContext``. On top of :class:`EnhancedMarketDataService`
+it publishes normalized quote/depth/trade pushes to Redis Streams, keeps the
+latest quote and depth per symbol in Redis hashes, and answers every other
+``QuoteDataClient`` call (history candles, static info, ...) over a Redis
+request list. Quote pushes carry no previous close, so the gateway seeds it
+from a static quote when a symbol is subscribed (and again on a new day).
+
+:class:`GatewayQuoteClient` is the drop-in client used by the signal
+generator, order executor, realtime sync and rebalancer when
+``MARKET_GATEWAY_ENABLED`` is set; :func:`open_quote_client` picks the
+right implementation.
+
+Redis layout (``<prefix>`` defaults to ``market:gateway``)::
+
+    <prefix>:stream:{quote,depth,trade}   XADD  {"data": <json>}
+    <prefix>:snapshot:{quote,depth}       HASH  symbol -> <json>
+    <prefix>:symbols                      SET   symbols requested by consumers
+    <prefix>:requests                     LIST  RPC requests
+    <prefix>:reply:<id>                   LIST  RPC reply (short TTL)
+    <prefix>:heartbeat                    STR   present while the gateway runs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+from longport import openapi
+
+from longport_quant.config.settings import Settings
+from longport_quant.data.enhanced_market_data import (
+    DataType,
+    EnhancedMarketDataService,
+    MarketDataConfig,
+)
+from longport_quant.data.quote_client import QuoteDataClient
+from longport_quant.utils.sdk_executor import get_sdk_executor
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is a core dependency
+    aioredis = None
+
+
+GATEWAY_PREFIX = "market:gateway"
+
+# 可通过网关转发的 QuoteDataClient 只读方法
+RPC_METHODS = frozenset({
+    "get_static_info",
+    "get_realtime_quote",
+    "get_option_quote",
+    "get_warrant_quote",
+    "get_depth",
+    "get_brokers",
+    "get_participants",
+    "get_trades",
+    "get_intraday",
+    "get_candlesticks",
+    "get_history_candles",
+    "get_history_candles_by_offset",
+    "get_option_expirations",
+    "get_option_chain",
+    "get_warrant_issuers",
+    "filter_warrants",
+    "get_trading_session",
+    "get_trading_days",
+    "get_capital_flow",
+    "get_capital_distribution",
+    "get_calc_index",
+    "get_market_temperature",
+    "get_history_market_temperature",
+    "list_securities",
+    "get_quote_level",
+    "get_quote_package_details",
+})
+
+STREAM_TYPES = (DataType.QUOTE, DataType.DEPTH, DataType.TRADE)
+SNAPSHOT_TYPES = (DataType.QUOTE, DataType.DEPTH)
+
+
+# ==================== 序列化 ====================
+
+class WireObject(SimpleNamespace):
+    """Attribute-access stand-in for SDK objects received from the gateway."""
+
+
+def _enum_name(value: Any) -> Optional[str]:
+    """``"Period.Day"`` for SDK enum members, else ``None``."""
+    text = str(value)
+    cls_name, _, member = text.partition(".")
+    if cls_name != type(value).__name__ or not member:
+        return None
+    try:
+        return text if getattr(type(value), member) == value else None
+    except Exception:
+        return None
+
+
+def to_wire(value: Any, _depth: int = 0) -> Any:
+    """JSON-safe representation of SDK results/arguments (Decimal, datetime, enums, objects)."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return {"__d": str(value)}
+    if isinstance(value, datetime):
+        return {"__dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date": value.isoformat()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_wire(v, _depth + 1) for v in value]
+    if isinstance(value, dict):
+        return {str(k): to_wire(v, _depth + 1) for k, v in value.items()}
+    enum_name = _enum_name(value)
+    if enum_name is not None:
+        return {"__enum": enum_name}
+    if _depth > 8:
+        return str(value)
+
+    attrs = {}
+    for name in dir(value):
+        if name.startswith("_"):
+            continue
+        try:
+            attr = getattr(value, name)
+        except Exception:
+            continue
+        if callable(attr):
+            continue
+        attrs[name] = to_wire(attr, _depth + 1)
+    return {"__obj": attrs}
+
+
+def from_wire(value: Any) -> Any:
+    """Inverse of :func:`to_wire`; SDK objects come back as :class:`WireObject`."""
+    if isinstance(value, list):
+        return [from_wire(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__d" in value:
+        return Decimal(value["__d"])
+    if "__dt" in value:
+        return datetime.fromisoformat(value["__dt"])
+    if "__date" in value:
+        return date.fromisoformat(value["__date"])
+    if "__enum" in value:
+        cls_name, _, member = value["__enum"].partition(".")
+        return getattr(getattr(openapi, cls_name, None), member, value["__enum"])
+    if "__obj" in value:
+        return WireObject(**{k: from_wire(v) for k, v in value["__obj"].items()})
+    return {k: from_wire(v) for k, v in value.items()}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _dec(value: Any) -> Optional[Decimal]:
+    return None if value is None else Decimal(str(value))
+
+
+def _ts(value: Any) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _day(value: Any) -> Optional[date]:
+    value = _ts(value)
+    return value.date() if isinstance(value, datetime) else None
+
+
+def quote_from_snapshot(data: Dict[str, Any]) -> WireObject:
+    """SecurityQuote/PushQuote-shaped object from a normalized quote."""
+    return WireObject(
+        symbol=data.get("symbol"),
+        last_done=_dec(data.get("last_price")),
+        prev_close=_dec(data.get("prev_close")),
+        open=_dec(data.get("open")),
+        high=_dec(data.get("high")),
+        low=_dec(data.get("low")),
+        volume=data.get("volume") or 0,
+        turnover=_dec(data.get("turnover")),
+        timestamp=_ts(data.get("timestamp")),
+        trade_status=data.get("trade_status"),
+        current_volume=None,
+        current_turnover=None,
+    )
+
+
+def depth_from_snapshot(data: Dict[str, Any]) -> WireObject:
+    """SecurityDepth-shaped object (``bids``/``asks`` of price levels) from a normalized depth."""
+
+    def levels(prices, sizes):
+        return [
+            WireObject(position=i + 1, price=_dec(price), volume=int(size), order_num=0)
+            # 价格与数量档位数可能不一致（与 PersistenceQueue 一样只取配对的档位）
+            for i, (price, size) in enumerate(zip(prices or [], sizes or [], strict=False))
+        ]
+
+    return WireObject(
+        symbol=data.get("symbol"),
+        bids=levels(data.get("bid_prices"), data.get("bid_sizes")),
+        asks=levels(data.get("ask_prices"), data.get("ask_sizes")),
+    )
+
+
+def trade_from_stream(data: Dict[str, Any]) -> WireObject:
+    """PushTrade-shaped object from a normalized trade."""
+    return WireObject(
+        price=_dec(data.get("price")),
+        volume=data.get("volume") or 0,
+        timestamp=_ts(data.get("timestamp")),
+        trade_type=data.get("trade_type"),
+        direction=data.get("direction"),
+    )
+
+
+class GatewayError(RuntimeError):
+    """A request the gateway answered with an error, or did not answer in time."""
+
+
+def _keys(prefix: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        stream={t: f"{prefix}:stream:{t.value}" for t in STREAM_TYPES},
+        snapshot={t: f"{prefix}:snapshot:{t.value}" for t in SNAPSHOT_TYPES},
+        symbols=f"{prefix}:symbols",
+        requests=f"{prefix}:requests",
+        reply=f"{prefix}:reply:",
+        heartbeat=f"{prefix}:heartbeat",
+    )
+
+
+# ==================== 网关进程 ====================
+
+class MarketDataGateway:
+    """Owns the upstream quote connection and fans it out through Redis."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        db=None,
+        redis_url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        market_config: Optional[MarketDataConfig] = None,
+        stream_maxlen: int = 10_000,
+        max_inflight: int = 16,
+        heartbeat_ttl: int = 15,
+        symbol_poll_interval: float = 2.0,
+    ):
+        self.settings = settings
+        self.db = db
+        self.redis_url = redis_url or settings.redis_url
+        self.prefix = prefix or getattr(settings, "market_gateway_prefix", GATEWAY_PREFIX)
+        self.keys = _keys(self.prefix)
+        self.market_config = market_config or MarketDataConfig(
+            persist_to_db=db is not None, require_watchlist=False
+        )
+        self.stream_maxlen = stream_maxlen
+        self.heartbeat_ttl = heartbeat_ttl
+        self.symbol_poll_interval = symbol_poll_interval
+
+        self.quote_client: Optional[QuoteDataClient] = None
+        self.service: Optional[EnhancedMarketDataService] = None
+        self._redis = None
+        self._semaphore = asyncio.Semaphore(max(1, max_inflight))
+        self._tasks: List[asyncio.Task] = []
+        self._inflight: Set[asyncio.Task] = set()
+        self._symbols: Set[str] = set()
+        self._running = False
+        self._stats = {"published": 0, "requests": 0, "errors": 0}
+        # PushQuote 不带昨收价：订阅时用静态行情补齐，symbol -> (昨收价, 行情日期)
+        self._prev_close: Dict[str, tuple] = {}
+        self._seed_attempts: Dict[str, float] = {}
+        self._seed_tasks: Set[asyncio.Task] = set()
+        self.prev_close_retry = 60.0
+
+    async def start(self) -> None:
+        logger.info(f"🛰️ 启动行情网关 (prefix={self.prefix})")
+        if self._redis is None:
+            self._redis = await aioredis.from_url(
+                self.redis_url, encoding="utf-8", decode_responses=True
+            )
+        # 上次运行留下的快照可能已过期
+        await self._redis.delete(*self.keys.snapshot.values())
+
+        if self.quote_client is None:
+            self.quote_client = QuoteDataClient(self.settings)
+        self.service = EnhancedMarketDataService(
+            self.settings, self.db, self.market_config, quote_client=self.quote_client
+        )
+        for data_type in STREAM_TYPES:
+            self.service.subscribe(data_type, self._publisher(data_type))
+
+        self._running = True
+        await self._heartbeat()
+        await self.service.start()
+        self._symbols = set(self.service._all_symbols())
+        await self.seed_prev_close(self._symbols)
+        self._tasks = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._rpc_loop()),
+            asyncio.create_task(self._symbol_loop()),
+        ]
+        logger.success(f"✅ 行情网关已启动，已订阅 {len(self._symbols)} 个标的")
+
+    async def stop(self) -> None:
+        self._running = False
+        pending = self._tasks + list(self._inflight) + list(self._seed_tasks)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        self._seed_tasks.clear()
+        if self.service is not None:
+            await self.service.stop()
+        if self.quote_client is not None:
+            await self.quote_client.__aexit__(None, None, None)
+        if self._redis is not None:
+            await self._redis.delete(self.keys.heartbeat, *self.keys.snapshot.values())
+            await self._redis.close()
+            self._redis = None
+        logger.info("行情网关已停止")
+
+    async def __aenter__(self) -> "MarketDataGateway":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def run_forever(self, stats_interval: float = 300.0) -> None:
+        """Start, then keep serving until cancelled; logs counters periodically."""
+        await self.start()
+        try:
+            while self._running:
+                await asyncio.sleep(stats_interval)
+                logger.info(f"📊 行情网关统计: {self.get_stats()}")
+        finally:
+            await self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {**self._stats, "symbols": len(self._symbols)}
+        if hasattr(self.quote_client, "cache_stats"):
+            stats["quote_cache"] = self.quote_client.cache_stats()
+        executor = get_sdk_executor()
+        if executor is not None:
+            stats["sdk_executor"] = executor.get_stats()
+        return stats
+
+    # === 推送 → Redis ===
+
+    def _publisher(self, data_type: DataType) -> Callable[[Dict[str, Any]], Any]:
+        async def publish(data: Dict[str, Any]) -> None:
+            await self.publish(data_type, data)
+        return publish
+
+    async def publish(self, data_type: DataType, data: Dict[str, Any]) -> None:
+        """Append a normalized event to its stream and refresh the symbol's snapshot."""
+        try:
+            if data_type is DataType.QUOTE:
+                data = self._with_prev_close(data)
+            payload = json.dumps(data, default=_json_default, ensure_ascii=False)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.xadd(self.keys.stream[data_type], {"data": payload},
+                      maxlen=self.stream_maxlen, approximate=True)
+            if data_type in self.keys.snapshot:
+                pipe.hset(self.keys.snapshot[data_type], data["symbol"], payload)
+            await pipe.execute()
+            self._stats["published"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.debug(f"发布{data_type.value}失败 {data.get('symbol')}: {e}")
+
+    # === 昨收价 ===
+
+    async def seed_prev_close(self, symbols: Iterable[str]) -> None:
+        """Record each symbol's previous close from a static quote (pushes don't carry it)."""
+        symbols = sorted(symbols)
+        if not symbols:
+            return
+        try:
+            quotes = await self.quote_client.get_realtime_quote(symbols)
+        except Exception as e:
+            logger.warning(f"获取昨收价失败 {symbols[:10]}: {e}")
+            return
+        for quote in quotes or []:
+            prev_close = getattr(quote, "prev_close", None)
+            if prev_close is not None:
+                day = _day(getattr(quote, "timestamp", None))
+                self._prev_close[quote.symbol] = (prev_close, day)
+
+    def _with_prev_close(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """``data`` with the seeded previous close (re-seeded once pushes move to a new day)."""
+        symbol = data.get("symbol")
+        if data.get("prev_close") is not None or not symbol:
+            return data
+        seeded = self._prev_close.get(symbol)
+        day = _day(data.get("timestamp"))
+        if seeded is not None and (day is None or seeded[1] is None or day <= seeded[1]):
+            return {**data, "prev_close": seeded[0]}
+        # 未补齐或已跨日：后台重新获取（每个标的限频），期间快照不带昨收价（客户端改走RPC）
+        now = time.monotonic()
+        if now - self._seed_attempts.get(symbol, float("-inf")) >= self.prev_close_retry:
+            self._seed_attempts[symbol] = now
+            task = asyncio.create_task(self.seed_prev_close([symbol]))
+            self._seed_tasks.add(task)
+            task.add_done_callback(self._seed_tasks.discard)
+        return data
+
+    # === 心跳 / 订阅同步 ===
+
+    async def _heartbeat(self) -> None:
+        await self._redis.set(
+            self.keys.heartbeat, datetime.now().isoformat(), ex=self.heartbeat_ttl
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        while self._running:
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.warning(f"网关心跳失败: {e}")
+            await asyncio.sleep(max(1.0, self.heartbeat_ttl / 3))
+
+    async def sync_symbols(self) -> List[str]:
+        """Subscribe symbols consumers added to the shared set since the last check."""
+        requested = await self._redis.smembers(self.keys.symbols)
+        new = sorted(set(requested) - self._symbols)
+        if new:
+            await self.service.add_symbols(new)
+            self._symbols.update(new)
+            await self.seed_prev_close(new)
+            logger.info(f"📡 网关新增订阅 {len(new)} 个标的: {new[:10]}")
+        return new
+
+    async def _symbol_loop(self) -> None:
+        while self._running:
+            try:
+                await self.sync_symbols()
+            except Exception as e:
+                logger.warning(f"同步订阅标的失败: {e}")
+            await asyncio.sleep(self.symbol_poll_interval)
+
+    # === RPC ===
+
+    async def _rpc_loop(self) -> None:
+        while self._running:
+            try:
+                item = await self._redis.brpop(self.keys.requests, timeout=1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"读取网关请求失败: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not item:
+                continue
+
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self.handle_request(item[1]))
+            self._inflight.add(task)
+            task.add_done_callback(self._request_done)
+
+    def _request_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._semaphore.release()
+
+    async def handle_request(self, raw: str) -> None:
+        """Execute one serialized ``QuoteDataClient`` call and push its reply."""
+        self._stats["requests"] += 1
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            self._stats["errors"] += 1
+            return
+
+        method = request.get("method")
+        try:
+            if method not in RPC_METHODS:
+                raise GatewayError(f"method not allowed: {method}")
+            args = from_wire(request.get("args", []))
+            kwargs = from_wire(request.get("kwargs", {}))
+            result = await getattr(self.quote_client, method)(*args, **kwargs)
+            reply = {"ok": True, "result": to_wire(result)}
+        except Exception as e:
+            self._stats["errors"] += 1
+            reply = {"ok": False, "error": str(e), "type": type(e).__name__}
+
+        key = self.keys.reply + request["id"]
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.lpush(key, json.dumps(reply, ensure_ascii=False))
+        pipe.expire(key, 30)
+        await pipe.execute()
+
+
+# ==================== 客户端 ====================
+
+class GatewayQuoteClient:
+    """Drop-in :class:`QuoteDataClient` backed by :class:`MarketDataGateway`.
+
+    Realtime quotes and depth for subscribed symbols are read from the
+    gateway's snapshots; every other call is forwarded to the gateway.
+    ``subscribe`` + ``set_on_quote``/``set_on_depth``/``set_on_trades``
+    deliver pushes from the gateway streams with the SDK callback signature.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        self._settings = settings
+        self.redis_url = redis_url or settings.redis_url
+        self.prefix = prefix or getattr(settings, "market_gateway_prefix", GATEWAY_PREFIX)
+        self.timeout = timeout or getattr(settings, "market_gateway_timeout", 10.0)
+        self.keys = _keys(self.prefix)
+        self._redis = None
+        self._callbacks: Dict[DataType, Callable] = {}
+        self._subscribed: Dict[DataType, Set[str]] = {t: set() for t in STREAM_TYPES}
+        self._first_push: Dict[DataType, Set[str]] = {t: set() for t in STREAM_TYPES}
+        self._reader: Optional[asyncio.Task] = None
+        self._reading = False
+        self.block_ms = 500
+
+    async def __aenter__(self) -> "GatewayQuoteClient":
+        await self._get_redis()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            # 等待当前阻塞读取结束（最长 block_ms），不在命令中途取消连接
+            self._reading = False
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _get_redis(self):
+        if self._redis is None:
+            self._redis = await aioredis.from_url(
+                self.redis_url, encoding="utf-8", decode_responses=True
+            )
+        return self._redis
+
+    def __getattr__(self, name: str):
+        if name in RPC_METHODS:
+            async def call(*args, **kwargs):
+                return await self._call(name, *args, **kwargs)
+            call.__name__ = name
+            return call
+        raise AttributeError(name)
+
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        redis = await self._get_redis()
+        request_id = uuid.uuid4().hex
+        request = {
+            "id": request_id,
+            "method": method,
+            "args": to_wire(list(args)),
+            "kwargs": to_wire(kwargs),
+        }
+        await redis.lpush(self.keys.requests, json.dumps(request, ensure_ascii=False))
+
+        item = await redis.brpop(self.keys.reply + request_id, timeout=self.timeout)
+        if not item:
+            raise GatewayError(f"行情网关未在{self.timeout}s内响应 {method}（网关是否在运行？）")
+        reply = json.loads(item[1])
+        if not reply.get("ok"):
+            raise GatewayError(f"{method} 失败: {reply.get('type')}: {reply.get('error')}")
+        return from_wire(reply.get("result"))
+
+    async def _snapshots(
+        self, data_type: DataType, symbols: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Cached snapshots while the gateway heartbeat is alive."""
+        redis = await self._get_redis()
+        pipe = redis.pipeline(transaction=False)
+        pipe.exists(self.keys.heartbeat)
+        pipe.hmget(self.keys.snapshot[data_type], symbols)
+        alive, values = await pipe.execute()
+        if not alive:
+            return {}
+        return {s: json.loads(v) for s, v in zip(symbols, values, strict=True) if v}
+
+    # === 快照读取 ===
+
+    async def get_realtime_quote(self, symbols: List[str]) -> List[WireObject]:
+        symbols = list(symbols)
+        if not symbols:
+            return []
+        # 缺少昨收价的快照（网关尚未补齐）改走RPC，与 SecurityQuote 保持一致
+        cached = {
+            symbol: data
+            for symbol, data in (await self._snapshots(DataType.QUOTE, symbols)).items()
+            if data.get("prev_close") is not None
+        }
+        missing = [s for s in symbols if s not in cached]
+        fetched = {}
+        if missing:
+            for quote in await self._call("get_realtime_quote", missing) or []:
+                fetched[quote.symbol] = quote
+        result = []
+        for symbol in symbols:
+            if symbol in cached:
+                result.append(quote_from_snapshot(cached[symbol]))
+            elif symbol in fetched:
+                result.append(fetched[symbol])
+        return result
+
+    async def get_depth(self, symbol: str):
+        cached = await self._snapshots(DataType.DEPTH, [symbol])
+        if symbol in cached:
+            return depth_from_snapshot(cached[symbol])
+        return await self._call("get_depth", symbol)
+
+    # === 订阅推送 ===
+
+    async def subscribe(
+        self,
+        symbols: List[str],
+        sub_types: List[openapi.SubType],
+        is_first_push: bool = False,
+    ) -> None:
+        symbols = list(symbols)
+        redis = await self._get_redis()
+        if symbols:
+            await redis.sadd(self.keys.symbols, *symbols)
+        for data_type in self._types_for(sub_types):
+            self._subscribed[data_type].update(symbols)
+            if is_first_push and data_type in SNAPSHOT_TYPES:
+                self._first_push[data_type].update(symbols)
+        await self._start_reader()
+
+    async def unsubscribe(self, symbols: List[str], sub_types: List[openapi.SubType]) -> None:
+        # 网关上的订阅可能被其他进程共享，这里只停止本地分发
+        for data_type in self._types_for(sub_types):
+            self._subscribed[data_type].difference_update(symbols)
+
+    async def subscriptions(self) -> List[WireObject]:
+        symbols = sorted(set().union(*self._subscribed.values()))
+        return [
+            WireObject(
+                symbol=s, sub_types=[t.value for t in STREAM_TYPES if s in self._subscribed[t]]
+            )
+            for s in symbols
+        ]
+
+    async def set_on_quote(self, callback) -> None:
+        await self._set_callback(DataType.QUOTE, callback)
+
+    async def set_on_depth(self, callback) -> None:
+        await self._set_callback(DataType.DEPTH, callback)
+
+    async def set_on_trades(self, callback) -> None:
+        await self._set_callback(DataType.TRADE, callback)
+
+    async def _set_callback(self, data_type: DataType, callback) -> None:
+        self._callbacks[data_type] = callback
+        await self._start_reader()
+
+    @staticmethod
+    def _types_for(sub_types: Iterable[openapi.SubType]) -> List[DataType]:
+        mapping = {
+            str(openapi.SubType.Quote): DataType.QUOTE,
+            str(openapi.SubType.Depth): DataType.DEPTH,
+            str(openapi.SubType.Trade): DataType.TRADE,
+        }
+        return [mapping[str(t)] for t in sub_types if str(t) in mapping]
+
+    async def _start_reader(self) -> None:
+        await self._deliver_first_push()
+        if self._reader is None and self._callbacks:
+            redis = await self._get_redis()
+            # 只分发订阅之后的新消息
+            last_ids = {}
+            for data_type in STREAM_TYPES:
+                entries = await redis.xrevrange(self.keys.stream[data_type], count=1)
+                last_ids[self.keys.stream[data_type]] = entries[0][0] if entries else "0-0"
+            self._reading = True
+            self._reader = asyncio.create_task(self._read_loop(last_ids))
+
+    async def _deliver_first_push(self) -> None:
+        for data_type in SNAPSHOT_TYPES:
+            callback = self._callbacks.get(data_type)
+            pending = self._first_push[data_type]
+            if callback is None or not pending:
+                continue
+            symbols = sorted(pending)
+            pending.clear()
+            for symbol, data in (await self._snapshots(data_type, symbols)).items():
+                self._dispatch(data_type, symbol, data)
+
+    async def _read_loop(self, last_ids: Dict[str, str]) -> None:
+        redis = await self._get_redis()
+        type_by_stream = {key: data_type for data_type, key in self.keys.stream.items()}
+        while self._reading:
+            try:
+                streams = {
+                    k: v for k, v in last_ids.items() if type_by_stream[k] in self._callbacks
+                }
+                response = await redis.xread(streams, count=500, block=self.block_ms)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"读取网关行情流失败: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for stream, entries in response or []:
+                data_type = type_by_stream[stream]
+                for entry_id, fields in entries:
+                    last_ids[stream] = entry_id
+                    try:
+                        data = json.loads(fields["data"])
+                    except (KeyError, ValueError):
+                        continue
+                    symbol = data.get("symbol")
+                    if symbol in self._subscribed[data_type]:
+                        self._dispatch(data_type, symbol, data)
+
+    def _dispatch(self, data_type: DataType, symbol: str, data: Dict[str, Any]) -> None:
+        callback = self._callbacks.get(data_type)
+        if callback is None:
+            return
+        try:
+            if data_type is DataType.QUOTE:
+                callback(symbol, quote_from_snapshot(data))
+            elif data_type is DataType.DEPTH:
+                callback(symbol, depth_from_snapshot(data))
+            else:
+                callback(symbol, [trade_from_stream(data)])
+        except Exception as e:
+            logger.debug(f"处理网关推送失败 {symbol}: {e}")
+
+
+def open_quote_client(settings: Settings):
+    """``GatewayQuoteClient`` when ``MARKET_GATEWAY_ENABLED``, else a direct ``QuoteDataClient``."""
+    if getattr(settings, "market_gateway_enabled", False):
+        return GatewayQuoteClient(settings)
+    return QuoteDataClient(settings)
+
+
+__all__ = [
+    "GATEWAY_PREFIX",
+    "GatewayError",
+    "GatewayQuoteClient",
+    "MarketDataGateway",
+    "WireObject",
+    "from_wire",
+    "open_quote_client",
+    "to_wire",
+]
@@ -0,0 +1,273 @@
+"""Request coalescing and short-TTL response caching for quote endpoints.
+
+Used by :class:`~longport_quant.data.quote_client.QuoteDataClient`:
+
+* :class:`SingleFlightCache` - identical concurrent requests (same endpoint
+  and arguments) share one SDK call, and the result is kept for the
+  endpoint's TTL.
+* :class:`QuoteBatcher` - concurrent ``get_realtime_quote`` calls are merged
+  into one multi-symbol request, with a per-symbol TTL cache.
+
+TTLs are configured per endpoint in the ``quote_cache`` section of
+``configs/api_limits.yml``; a TTL of 0 keeps coalescing but disables caching.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from longport_quant.utils.rate_limit import load_api_limits
+
+
+# 默认TTL（秒），可被 configs/api_limits.yml 的 quote_cache.ttl 覆盖
+DEFAULT_TTLS: Dict[str, float] = {
+    "realtime_quote": 1.0,
+    "depth": 0.0,
+    "candlesticks": 5.0,
+    "history_candles": 60.0,
+    "history_candles_by_offset": 60.0,
+    "intraday": 5.0,
+    "static_info": 3600.0,
+    "calc_index": 5.0,
+    "trading_session": 3600.0,
+    "trading_days": 3600.0,
+}
+
+
+def _new_stats() -> Dict[str, int]:
+    return {"hits": 0, "misses": 0, "coalesced": 0}
+
+
+def request_key(*args: Any, **kwargs: Any) -> Tuple[str, ...]:
+    """Cache key for SDK arguments (SDK enums are not hashable, so use ``str``)."""
+    parts = [_key_part(a) for a in args]
+    parts.extend(f"{k}={_key_part(v)}" for k, v in sorted(kwargs.items()))
+    return tuple(parts)
+
+
+def _key_part(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return "[" + ",".join(_key_part(v) for v in value) + "]"
+    return str(value)
+
+
+def _copy(value: Any) -> Any:
+    # 缓存结果被多个调用方共享，列表返回副本以免调用方原地修改
+    return list(value) if isinstance(value, list) else value
+
+
+class SingleFlightCache:
+    """Per-endpoint single-flight execution with a TTL result cache."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(_new_stats)
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Cached value, the result of an identical in-flight call, or ``await fetch()``."""
+        if not self.enabled:
+            return await fetch()
+
+        cache_key = (endpoint, key)
+        stats = self.stats[endpoint]
+
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                stats["hits"] += 1
+                return _copy(value)
+            del self._entries[cache_key]
+
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            stats["coalesced"] += 1
+            await asyncio.wait({pending})
+            if pending.cancelled():
+                # 发起请求的协程被取消，由本调用方重新发起
+                return await self.get_or_fetch(endpoint, key, fetch)
+            return _copy(pending.result())
+
+        stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 无其他等待者时避免 "exception never retrieved"
+            raise
+        else:
+            future.set_result(value)
+            self._store(endpoint, cache_key, value)
+            return _copy(value)
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def _store(self, endpoint: str, cache_key: Tuple[str, Hashable], value: Any) -> None:
+        ttl = self.ttls.get(endpoint, 0.0)
+        if ttl <= 0 or value is None or (isinstance(value, list) and not value):
+            return
+        if len(self._entries) >= self.max_entries:
+            self.purge_expired()
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[cache_key] = (self._clock() + ttl, value)
+
+    def purge_expired(self) -> None:
+        now = self._clock()
+        for cache_key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[cache_key]
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """Drop cached values (for one endpoint, or all)."""
+        if endpoint is None:
+            self._entries.clear()
+        else:
+            for cache_key in [k for k in self._entries if k[0] == endpoint]:
+                del self._entries[cache_key]
+
+
+class QuoteBatcher:
+    """Merges concurrent realtime-quote requests into multi-symbol SDK calls.
+
+    Symbols requested within ``window`` seconds of each other are fetched
+    together (at most ``max_batch`` per call); fresh quotes are served from a
+    per-symbol cache for ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Awaitable[List[Any]]],
+        ttl: float = 1.0,
+        window: float = 0.005,
+        max_batch: int = 500,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self.ttl = ttl
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.enabled = enabled
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {**_new_stats(), "requests": 0}
+
+    async def get(self, symbols: Iterable[str]) -> List[Any]:
+        """Quotes for ``symbols`` in request order (symbols without a quote are skipped)."""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return []
+        if not self.enabled:
+            self.stats["requests"] += 1
+            return await self._fetch(symbols)
+
+        now = self._clock()
+        found: Dict[str, Any] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for symbol in symbols:
+            entry = self._entries.get(symbol)
+            if entry is not None and entry[0] > now:
+                self.stats["hits"] += 1
+                found[symbol] = entry[1]
+            elif symbol in self._inflight or symbol in self._pending:
+                self.stats["coalesced"] += 1
+                waiting[symbol] = self._inflight.get(symbol) or self._pending[symbol]
+            else:
+                self.stats["misses"] += 1
+                waiting[symbol] = self._enqueue(symbol)
+
+        if waiting:
+            results = await asyncio.gather(
+                *(asyncio.shield(f) for f in waiting.values()), return_exceptions=True
+            )
+            for symbol, result in zip(waiting, results):
+                if isinstance(result, BaseException):
+                    logger.debug(f"获取实时行情失败 {symbol}: {result}")
+                elif result is not None:
+                    found[symbol] = result
+
+        return [found[s] for s in symbols if s in found]
+
+    def _enqueue(self, symbol: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[symbol] = future
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+        return future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        pending, self._pending = self._pending, {}
+        self._inflight.update(pending)
+
+        symbols = list(pending)
+        batches = [symbols[i:i + self.max_batch] for i in range(0, len(symbols), self.max_batch)]
+        await asyncio.gather(*(self._fetch_batch(batch, pending) for batch in batches))
+
+    async def _fetch_batch(self, batch: List[str], futures: Dict[str, asyncio.Future]) -> None:
+        self.stats["requests"] += 1
+        quotes: List[Any] = []
+        try:
+            quotes = await self._fetch(batch) or []
+        except Exception as e:
+            logger.debug(f"批量实时行情请求失败 ({len(batch)}个标的): {e}")
+        finally:
+            # 无论成功与否都要唤醒等待者；失败的标的不缓存
+            by_symbol = {getattr(q, "symbol", None): q for q in quotes}
+            expires_at = self._clock() + self.ttl
+            for symbol in batch:
+                quote = by_symbol.get(symbol)
+                if quote is not None and self.ttl > 0:
+                    self._entries[symbol] = (expires_at, quote)
+                future = futures[symbol]
+                if not future.done():
+                    future.set_result(quote)
+                self._inflight.pop(symbol, None)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
+def load_cache_config() -> Dict[str, Any]:
+    """``quote_cache`` section of ``configs/api_limits.yml`` (empty when absent)."""
+    return load_api_limits().get("quote_cache") or {}
+
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "QuoteBatcher",
+    "SingleFlightCache",
+    "load_cache_config",
+    "request_key",
+]
@@ -4,24 +4,57 @@ from __future__ import annotations
 
 import asyncio
 from datetime import date, datetime
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from loguru import logger
 from longport import OpenApiException, openapi
 
 from longport_quant.config.sdk import build_sdk_config
 from longport_quant.config.settings import Settings
+from longport_quant.data.quote_cache import (
+    QuoteBatcher,
+    SingleFlightCache,
+    load_cache_config,
+    request_key,
+)
+from longport_quant.utils.sdk_executor import sdk_call
+
+
+def _as_date(value: Optional[date]) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
 
 
 class QuoteDataClient:
-    """Thread-safe asynchronous facade for quote-related SDK methods."""
+    """Thread-safe asynchronous facade for quote-related SDK methods.
 
-    def __init__(self, settings: Settings, config: openapi.Config | None = None) -> None:
+    Identical concurrent requests share one SDK call and results are cached
+    for a short per-endpoint TTL; concurrent ``get_realtime_quote`` calls are
+    merged into one multi-symbol request (see ``quote_cache`` in
+    ``configs/api_limits.yml``).
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        config: openapi.Config | None = None,
+        cache_config: Optional[Dict[str, Any]] = None,
+    ) -> None:
         self._settings = settings
         self._config = config
         self._ctx: openapi.QuoteContext | None = None
         self._lock = asyncio.Lock()
 
+        cache_config = load_cache_config() if cache_config is None else cache_config
+        enabled = bool(cache_config.get("enabled", True))
+        self._cache = SingleFlightCache(ttls=cache_config.get("ttl"), enabled=enabled)
+        self._quote_batcher = QuoteBatcher(
+            self._fetch_realtime_quote,
+            ttl=self._cache.ttls["realtime_quote"],
+            window=float(cache_config.get("batch_window_ms", 5)) / 1000,
+            max_batch=int(cache_config.get("max_batch_symbols", 500)),
+            enabled=enabled,
+        )
+
     async def __aenter__(self) -> "QuoteDataClient":
         await self._ensure_context()
         return self
@@ -32,12 +65,13 @@ class QuoteDataClient:
             try:
                 # 尝试取消所有订阅（如果有的话）
                 try:
-                    subs = await asyncio.to_thread(self._ctx.subscriptions)
+                    subs = await sdk_call("quote.subscriptions", self._ctx.subscriptions)
                     if subs:
                         logger.debug(f"Unsubscribing {len(subs)} subscriptions before closing QuoteContext")
                         for sub in subs:
                             try:
-                                await asyncio.to_thread(
+                                await sdk_call(
+                                    "quote.unsubscribe",
                                     self._ctx.unsubscribe,
                                     [sub.symbol],
                                     [sub.sub_types[0]] if sub.sub_types else []
@@ -62,13 +96,18 @@ class QuoteDataClient:
                 self._ctx = None
 
     async def get_static_info(self, symbols: List[str]) -> List[openapi.SecurityStaticInfo]:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.static_info, symbols)
+        return await self._cached("static_info", "static_info", symbols)
 
     async def get_realtime_quote(self, symbols: List[str]) -> List[openapi.SecurityQuote]:
         """
         获取实时行情
 
+        同时发起的请求合并为一次多标的请求，结果按标的短时缓存。
+        """
+        return await self._quote_batcher.get(symbols)
+
+    async def _fetch_realtime_quote(self, symbols: List[str]) -> List[openapi.SecurityQuote]:
+        """
         注意: realtime_quote方法在某些情况下返回空列表
         因此改用quote方法作为备选
         """
@@ -76,7 +115,7 @@ class QuoteDataClient:
 
         # 尝试使用realtime_quote
         try:
-            quotes = await asyncio.to_thread(ctx.realtime_quote, symbols)
+            quotes = await sdk_call("quote.realtime_quote", ctx.realtime_quote, symbols)
             if quotes:
                 return quotes
         except Exception as e:
@@ -84,7 +123,7 @@ class QuoteDataClient:
 
         # 备选方案：使用quote方法
         try:
-            quotes = await asyncio.to_thread(ctx.quote, symbols)
+            quotes = await sdk_call("quote.quote", ctx.quote, symbols)
             return quotes if quotes else []
         except Exception as e:
             logger.error(f"quote方法也失败: {e}")
@@ -92,31 +131,29 @@ class QuoteDataClient:
 
     async def get_option_quote(self, symbols: List[str]) -> List[openapi.OptionQuote]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.option_quote, symbols)
+        return await sdk_call("quote.option_quote", ctx.option_quote, symbols)
 
     async def get_warrant_quote(self, symbols: List[str]) -> List[openapi.WarrantQuote]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.warrant_quote, symbols)
+        return await sdk_call("quote.warrant_quote", ctx.warrant_quote, symbols)
 
     async def get_depth(self, symbol: str) -> openapi.SecurityDepth:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.realtime_depth, symbol)
+        return await self._cached("depth", "realtime_depth", symbol)
 
     async def get_brokers(self, symbol: str) -> openapi.SecurityBrokers:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.realtime_brokers, symbol)
+        return await sdk_call("quote.realtime_brokers", ctx.realtime_brokers, symbol)
 
     async def get_participants(self) -> openapi.ParticipantInfo:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.participants)
+        return await sdk_call("quote.participants", ctx.participants)
 
     async def get_trades(self, symbol: str, count: int = 100) -> List[openapi.Trade]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.realtime_trades, symbol, count)
+        return await sdk_call("quote.realtime_trades", ctx.realtime_trades, symbol, count)
 
     async def get_intraday(self, symbol: str) -> openapi.IntradayLine:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.intraday, symbol)
+        return await self._cached("intraday", "intraday", symbol)
 
     async def get_candlesticks(
         self,
@@ -125,14 +162,7 @@ class QuoteDataClient:
         count: int,
         adjust_type: openapi.AdjustType,
     ) -> List[openapi.Candlestick]:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(
-            ctx.candlesticks,
-            symbol,
-            period,
-            count,
-            adjust_type,
-        )
+        return await self._cached("candlesticks", "candlesticks", symbol, period, count, adjust_type)
 
     async def get_history_candles(
         self,
@@ -142,14 +172,10 @@ class QuoteDataClient:
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
     ) -> List[openapi.Candlestick]:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(
-            ctx.history_candlesticks_by_date,
-            symbol,
-            period,
-            adjust_type,
-            start,
-            end,
+        # 按日期查询的接口只看日期：去掉时间部分，end=datetime.now() 的调用才能命中缓存/合并
+        return await self._cached(
+            "history_candles", "history_candlesticks_by_date",
+            symbol, period, adjust_type, _as_date(start), _as_date(end),
         )
 
     async def get_history_candles_by_offset(
@@ -173,27 +199,22 @@ class QuoteDataClient:
         Returns:
             K线列表
         """
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(
-            ctx.history_candlesticks_by_offset,
-            symbol,
-            period,
-            adjust_type,
-            forward,
-            count,
+        return await self._cached(
+            "history_candles_by_offset", "history_candlesticks_by_offset",
+            symbol, period, adjust_type, forward, count,
         )
 
     async def get_option_expirations(self, symbol: str) -> List[date]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.option_chain_expiry_date_list, symbol)
+        return await sdk_call("quote.option_chain_expiry_date_list", ctx.option_chain_expiry_date_list, symbol)
 
     async def get_option_chain(self, symbol: str, expiry_date: date) -> List[openapi.OptionQuote]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.option_chain_info_by_date, symbol, expiry_date)
+        return await sdk_call("quote.option_chain_info_by_date", ctx.option_chain_info_by_date, symbol, expiry_date)
 
     async def get_warrant_issuers(self) -> openapi.IssuerInfo:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.warrant_issuers)
+        return await sdk_call("quote.warrant_issuers", ctx.warrant_issuers)
 
     async def filter_warrants(
         self,
@@ -203,11 +224,10 @@ class QuoteDataClient:
         **filters,
     ) -> openapi.WarrantInfo:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.warrant_list, symbol, sort_by, sort_order, **filters)
+        return await sdk_call("quote.warrant_list", ctx.warrant_list, symbol, sort_by, sort_order, **filters)
 
     async def get_trading_session(self) -> openapi.TradingSessionInfo:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.trading_session)
+        return await self._cached("trading_session", "trading_session")
 
     async def get_trading_days(
         self,
@@ -215,24 +235,22 @@ class QuoteDataClient:
         begin: date,
         end: date,
     ) -> openapi.MarketTradingDays:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.trading_days, market, begin, end)
+        return await self._cached("trading_days", "trading_days", market, begin, end)
 
     async def get_capital_flow(self, symbol: str) -> openapi.CapitalFlowLine:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.capital_flow, symbol)
+        return await sdk_call("quote.capital_flow", ctx.capital_flow, symbol)
 
     async def get_capital_distribution(self, symbol: str) -> openapi.CapitalDistributionResponse:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.capital_distribution, symbol)
+        return await sdk_call("quote.capital_distribution", ctx.capital_distribution, symbol)
 
     async def get_calc_index(self, symbols: List[str], indexes: List[openapi.CalcIndex]) -> List[openapi.SecurityCalcIndex]:
-        ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.calc_indexes, symbols, indexes)
+        return await self._cached("calc_index", "calc_indexes", symbols, indexes)
 
     async def get_market_temperature(self, market: openapi.Market) -> openapi.MarketTemperature:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.market_temperature, market)
+        return await sdk_call("quote.market_temperature", ctx.market_temperature, market)
 
     async def get_history_market_temperature(
         self,
@@ -241,7 +259,7 @@ class QuoteDataClient:
         end_date: date,
     ) -> openapi.HistoryMarketTemperatureResponse:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.history_market_temperature, market, start_date, end_date)
+        return await sdk_call("quote.history_market_temperature", ctx.history_market_temperature, market, start_date, end_date)
 
     async def list_securities(
         self,
@@ -253,7 +271,7 @@ class QuoteDataClient:
         market_param = self._normalise_market(market)
         category_param = self._normalise_security_list_category(category)
 
-        return await asyncio.to_thread(ctx.security_list, market_param, category_param)
+        return await sdk_call("quote.security_list", ctx.security_list, market_param, category_param)
 
     @staticmethod
     def _normalise_market(market: openapi.Market | str) -> openapi.Market:
@@ -293,15 +311,15 @@ class QuoteDataClient:
         securities: Iterable[openapi.WatchlistSecurity] | None = None,
     ) -> openapi.WatchlistGroup:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.create_watchlist_group, name, securities)
+        return await sdk_call("quote.create_watchlist_group", ctx.create_watchlist_group, name, securities)
 
     async def delete_watchlist_group(self, group_id: int, purge: bool = False) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.delete_watchlist_group, group_id, purge)
+        await sdk_call("quote.delete_watchlist_group", ctx.delete_watchlist_group, group_id, purge)
 
     async def list_watchlist_groups(self) -> List[openapi.WatchlistGroup]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.watchlist)
+        return await sdk_call("quote.watchlist", ctx.watchlist)
 
     async def update_watchlist_group(
         self,
@@ -311,7 +329,8 @@ class QuoteDataClient:
         mode: openapi.SecuritiesUpdateMode | None = None,
     ) -> openapi.WatchlistGroup:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(
+        return await sdk_call(
+            "quote.update_watchlist_group",
             ctx.update_watchlist_group,
             group_id,
             name,
@@ -326,35 +345,35 @@ class QuoteDataClient:
         is_first_push: bool = False,
     ) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.subscribe, symbols, sub_types, is_first_push)
+        await sdk_call("quote.subscribe", ctx.subscribe, symbols, sub_types, is_first_push)
 
     async def unsubscribe(self, symbols: List[str], sub_types: List[openapi.SubType]) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.unsubscribe, symbols, sub_types)
+        await sdk_call("quote.unsubscribe", ctx.unsubscribe, symbols, sub_types)
 
     async def subscriptions(self) -> List[openapi.Subscription]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.subscriptions)
+        return await sdk_call("quote.subscriptions", ctx.subscriptions)
 
     async def set_on_quote(self, callback):
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_quote, callback)
+        await sdk_call("quote.set_on_quote", ctx.set_on_quote, callback)
 
     async def set_on_depth(self, callback):
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_depth, callback)
+        await sdk_call("quote.set_on_depth", ctx.set_on_depth, callback)
 
     async def set_on_brokers(self, callback):
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_brokers, callback)
+        await sdk_call("quote.set_on_brokers", ctx.set_on_brokers, callback)
 
     async def set_on_trades(self, callback):
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_trades, callback)
+        await sdk_call("quote.set_on_trades", ctx.set_on_trades, callback)
 
     async def set_on_candlestick(self, callback):
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_candlestick, callback)
+        await sdk_call("quote.set_on_candlestick", ctx.set_on_candlestick, callback)
 
     async def subscribe_candlesticks(
         self,
@@ -362,7 +381,7 @@ class QuoteDataClient:
         period: openapi.Period,
     ) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.subscribe_candlesticks, symbol, period)
+        await sdk_call("quote.subscribe_candlesticks", ctx.subscribe_candlesticks, symbol, period)
 
     async def unsubscribe_candlesticks(
         self,
@@ -370,26 +389,51 @@ class QuoteDataClient:
         period: openapi.Period,
     ) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.unsubscribe_candlesticks, symbol, period)
+        await sdk_call("quote.unsubscribe_candlesticks", ctx.unsubscribe_candlesticks, symbol, period)
 
     async def get_quote_level(self) -> str:
         ctx = await self._ensure_context()
-        level = await asyncio.to_thread(lambda: ctx.quote_level)
+        level = await sdk_call("quote.quote_level", lambda: ctx.quote_level)
         return str(level)
 
     async def get_quote_package_details(self) -> List[dict]:
         ctx = await self._ensure_context()
-        details = await asyncio.to_thread(ctx.quote_package_details)
+        details = await sdk_call("quote.quote_package_details", ctx.quote_package_details)
         # Convert to dict list for easier handling
         return [{"name": d.name, "description": d.description} for d in details] if details else []
 
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit / miss / coalesced counters per endpoint (``realtime_quote`` also counts SDK requests)."""
+        stats = {endpoint: dict(counts) for endpoint, counts in self._cache.stats.items()}
+        stats["realtime_quote"] = dict(self._quote_batcher.stats)
+        return stats
+
+    def invalidate_cache(self, endpoint: Optional[str] = None) -> None:
+        """Drop cached responses (for one endpoint, or all)."""
+        self._cache.invalidate(endpoint)
+        if endpoint in (None, "realtime_quote"):
+            self._quote_batcher.invalidate()
+
+    async def _cached(self, endpoint: str, method: str, *args: Any) -> Any:
+        """Call ``QuoteContext.<method>(*args)`` through the single-flight cache."""
+
+        async def fetch() -> Any:
+            ctx = await self._ensure_context()
+            return await sdk_call(f"quote.{method}", getattr(ctx, method), *args)
+
+        return await self._cache.get_or_fetch(endpoint, request_key(*args), fetch)
+
+    async def context(self) -> openapi.QuoteContext:
+        """Underlying QuoteContext (created on first use), for services sharing this connection."""
+        return await self._ensure_context()
+
     async def _ensure_context(self) -> openapi.QuoteContext:
         async with self._lock:
             if self._ctx is None:
                 config = self._config or build_sdk_config(self._settings)
                 self._config = config
                 logger.debug("Initialising QuoteContext for data client")
-                self._ctx = await asyncio.to_thread(openapi.QuoteContext, config)
+                self._ctx = await sdk_call("quote.connect", openapi.QuoteContext, config)
         return self._ctx
 
 
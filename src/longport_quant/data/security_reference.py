@@ -0,0 +1,380 @@
+"""Security reference data (lot size, names, exchange) shared across processes."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from longport_quant.persistence.models import SecurityStatic, SecurityUniverse
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is a core dependency
+    aioredis = None
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    """Epoch seconds of a ``security_static.updated_at`` value (naive values are UTC)."""
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def default_lot_size(symbol: str) -> int:
+    """Market default board lot when nothing better is known."""
+    return 1 if symbol.endswith(".US") else 100
+
+
+@dataclass(frozen=True)
+class SecurityRef:
+    """Reference data for one symbol."""
+
+    symbol: str
+    lot_size: int
+    name_cn: Optional[str] = None
+    name_en: Optional[str] = None
+    exchange: Optional[str] = None
+    currency: Optional[str] = None
+    board: Optional[str] = None
+    updated_at: float = 0.0  # epoch seconds of the last API/DB load
+
+    @classmethod
+    def from_static_info(cls, info) -> Optional["SecurityRef"]:
+        symbol = getattr(info, "symbol", None)
+        lot_size = int(getattr(info, "lot_size", 0) or getattr(info, "board_lot", 0) or 0)
+        if not symbol or lot_size <= 0:
+            return None
+        board = getattr(info, "board", None)
+        return cls(
+            symbol=symbol,
+            lot_size=lot_size,
+            name_cn=getattr(info, "name_cn", None) or None,
+            name_en=getattr(info, "name_en", None) or None,
+            exchange=getattr(info, "exchange", None) or None,
+            currency=getattr(info, "currency", None) or None,
+            board=str(board) if board is not None else None,
+            updated_at=time.time(),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "SecurityRef":
+        return cls(**json.loads(raw))
+
+
+class SecurityReferenceService:
+    """Lot sizes and names for every traded symbol, loaded in bulk.
+
+    Lookups are served from memory. Misses are resolved as a batch: Redis
+    hash first (shared by all processes and surviving restarts), then the
+    ``security_static`` table, then a single ``static_info`` call per
+    ``batch_size`` symbols. API results are written back to Redis and
+    ``security_static``; symbols the API does not know are not retried for
+    ``miss_ttl`` seconds. Entries older than ``max_age`` are refreshed by
+    :meth:`start_refresh` in the background, never on the lookup path.
+    """
+
+    def __init__(
+        self,
+        quote_client=None,
+        db=None,
+        redis_url: Optional[str] = None,
+        redis_key: str = "trading:security_ref",
+        max_age: float = 24 * 3600,
+        batch_size: int = 500,
+        miss_ttl: float = 600.0,
+    ) -> None:
+        self.quote_client = quote_client
+        self.db = db
+        self.redis_url = redis_url
+        self.redis_key = redis_key
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.miss_ttl = miss_ttl
+
+        self._refs: Dict[str, SecurityRef] = {}
+        self._misses: Dict[str, float] = {}  # 无静态数据的标的 -> 下次允许重试的时间
+        self._redis = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stats = {"api_calls": 0, "api_symbols": 0, "db_loads": 0, "redis_loads": 0}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._refs
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "cached": len(self._refs)}
+
+    async def _get_redis(self):
+        if self.redis_url and aioredis is not None and self._redis is None:
+            self._redis = await aioredis.from_url(
+                self.redis_url, encoding="utf-8", decode_responses=True
+            )
+        return self._redis
+
+    async def close(self) -> None:
+        await self.stop_refresh()
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    # === 查询 ===
+
+    async def get_many(self, symbols: Iterable[str]) -> Dict[str, SecurityRef]:
+        """Reference data for ``symbols`` (unknown symbols are omitted)."""
+        symbols = list(dict.fromkeys(symbols))
+        now = time.monotonic()
+        missing = [s for s in symbols if s not in self._refs and self._misses.get(s, 0) <= now]
+        if missing:
+            await self._load(missing)
+        return {s: self._refs[s] for s in symbols if s in self._refs}
+
+    async def get(self, symbol: str) -> Optional[SecurityRef]:
+        return (await self.get_many([symbol])).get(symbol)
+
+    async def lot_sizes(self, symbols: Iterable[str]) -> Dict[str, int]:
+        """Board lots for ``symbols``, falling back to the market default."""
+        symbols = list(symbols)
+        refs = await self.get_many(symbols)
+        return {s: refs[s].lot_size if s in refs else default_lot_size(s) for s in symbols}
+
+    async def lot_size(self, symbol: str) -> int:
+        ref = await self.get(symbol)
+        if ref is None:
+            lot = default_lot_size(symbol)
+            logger.warning(f"⚠️ {symbol} 无静态数据，使用默认手数: {lot}股/手")
+            return lot
+        return ref.lot_size
+
+    def cached_lot_size(self, symbol: str) -> Optional[int]:
+        """Board lot if already in memory (no I/O)."""
+        ref = self._refs.get(symbol)
+        return ref.lot_size if ref else None
+
+    async def name_cn(self, symbol: str) -> Optional[str]:
+        ref = await self.get(symbol)
+        return ref.name_cn if ref else None
+
+    # === 加载 ===
+
+    async def preload(self, symbols: Optional[Sequence[str]] = None) -> int:
+        """Load ``symbols`` (or everything cached in Redis) into memory.
+
+        Returns the number of symbols now in memory.
+        """
+        if symbols is None:
+            await self._load_all_from_redis()
+        else:
+            await self.get_many(symbols)
+        logger.info(f"✅ 证券静态数据已加载: {len(self._refs)} 个标的")
+        return len(self._refs)
+
+    async def _load(self, symbols: List[str]) -> None:
+        async with self._lock:
+            # 等锁期间可能已被其他协程加载
+            missing = [s for s in symbols if s not in self._refs]
+            if missing:
+                missing = await self._load_from_redis(missing)
+            if missing:
+                missing = await self._load_from_db(missing)
+            if missing:
+                missing = await self._load_from_api(missing)
+            retry_at = time.monotonic() + self.miss_ttl
+            for symbol in missing:
+                self._misses[symbol] = retry_at
+
+    async def _load_all_from_redis(self) -> None:
+        try:
+            client = await self._get_redis()
+            if client is None:
+                return
+            for raw in (await client.hgetall(self.redis_key)).values():
+                ref = SecurityRef.from_json(raw)
+                self._refs.setdefault(ref.symbol, ref)
+            self._stats["redis_loads"] += 1
+        except Exception as e:
+            logger.debug(f"读取证券静态数据缓存失败: {e}")
+
+    async def _load_from_redis(self, symbols: List[str]) -> List[str]:
+        try:
+            client = await self._get_redis()
+            if client is None:
+                return symbols
+            values = await client.hmget(self.redis_key, symbols)
+            self._stats["redis_loads"] += 1
+        except Exception as e:
+            logger.debug(f"读取证券静态数据缓存失败: {e}")
+            return symbols
+
+        missing = []
+        for symbol, raw in zip(symbols, values, strict=True):
+            if raw:
+                self._refs[symbol] = SecurityRef.from_json(raw)
+            else:
+                missing.append(symbol)
+        return missing
+
+    async def _load_from_db(self, symbols: List[str]) -> List[str]:
+        if self.db is None:
+            return symbols
+        try:
+            async with self.db.session() as session:
+                statics = (await session.execute(
+                    select(SecurityStatic).where(SecurityStatic.symbol.in_(symbols))
+                )).scalars().all()
+                universe_names = dict((await session.execute(
+                    select(SecurityUniverse.symbol, SecurityUniverse.name_cn)
+                    .where(SecurityUniverse.symbol.in_(symbols))
+                )).all())
+            self._stats["db_loads"] += 1
+        except Exception as e:
+            logger.debug(f"数据库查询证券静态数据失败: {e}")
+            return symbols
+
+        loaded = {}
+        for row in statics:
+            if not row.lot_size or row.lot_size <= 0:
+                continue
+            loaded[row.symbol] = SecurityRef(
+                symbol=row.symbol,
+                lot_size=int(row.lot_size),
+                # 中文名优先使用 SecurityUniverse
+                name_cn=universe_names.get(row.symbol) or row.name_cn,
+                name_en=row.name_en,
+                exchange=row.exchange,
+                currency=row.currency,
+                board=row.board,
+                updated_at=_epoch(row.updated_at),
+            )
+        if loaded:
+            self._refs.update(loaded)
+            await self._write_redis(loaded.values())
+        return [s for s in symbols if s not in loaded]
+
+    async def _load_from_api(self, symbols: List[str]) -> List[str]:
+        """Fetch ``symbols`` with one ``static_info`` call per batch; returns still-missing."""
+        if self.quote_client is None:
+            return symbols
+
+        loaded: Dict[str, SecurityRef] = {}
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            try:
+                infos = await self.quote_client.get_static_info(batch)
+            except Exception as e:
+                logger.warning(
+                    f"⚠️ 获取证券静态数据失败({len(batch)}个标的): {type(e).__name__}: {e}"
+                )
+                continue
+            self._stats["api_calls"] += 1
+            self._stats["api_symbols"] += len(batch)
+            for info in infos or []:
+                ref = SecurityRef.from_static_info(info)
+                if ref is not None:
+                    loaded[ref.symbol] = ref
+
+        if loaded:
+            self._refs.update(loaded)
+            for symbol in loaded:
+                self._misses.pop(symbol, None)
+            logger.debug(f"📊 API获取证券静态数据: {len(loaded)}/{len(symbols)} 个标的")
+            await self._write_redis(loaded.values())
+            await self._write_db(loaded.values())
+        return [s for s in symbols if s not in loaded]
+
+    async def _write_redis(self, refs: Iterable[SecurityRef]) -> None:
+        mapping = {ref.symbol: ref.to_json() for ref in refs}
+        if not mapping:
+            return
+        try:
+            client = await self._get_redis()
+            if client is not None:
+                await client.hset(self.redis_key, mapping=mapping)
+        except Exception as e:
+            logger.debug(f"写入证券静态数据缓存失败: {e}")
+
+    async def _write_db(self, refs: Iterable[SecurityRef]) -> None:
+        """Upsert the reference columns into ``security_static`` (fundamentals untouched)."""
+        if self.db is None:
+            return
+        rows = [
+            {
+                "symbol": ref.symbol,
+                "name_cn": ref.name_cn,
+                "name_en": ref.name_en,
+                "exchange": ref.exchange,
+                "currency": ref.currency,
+                "lot_size": ref.lot_size,
+                "board": ref.board,
+                "updated_at": datetime.utcnow(),
+            }
+            for ref in refs
+        ]
+        if not rows:
+            return
+        stmt = insert(SecurityStatic).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol"],
+            set_={c: stmt.excluded[c] for c in rows[0] if c != "symbol"},
+        )
+        try:
+            async with self.db.session() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as e:
+            logger.debug(f"写入security_static失败: {e}")
+
+    # === 后台刷新 ===
+
+    async def refresh_stale(self, symbols: Optional[Sequence[str]] = None) -> int:
+        """Re-fetch entries older than ``max_age`` from the API. Returns refreshed count."""
+        cutoff = time.time() - self.max_age
+        candidates = symbols if symbols is not None else list(self._refs)
+        stale = [s for s in candidates if s not in self._refs or self._refs[s].updated_at < cutoff]
+        if not stale:
+            return 0
+        remaining = await self._load_from_api(stale)
+        refreshed = len(stale) - len(remaining)
+        if refreshed:
+            logger.info(f"🔄 证券静态数据已刷新: {refreshed} 个标的")
+        return refreshed
+
+    def start_refresh(
+        self, symbols: Optional[Sequence[str]] = None, interval: float = 3600.0
+    ) -> None:
+        """Periodically refresh stale entries in the background."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def _loop():
+            while True:
+                try:
+                    await self.refresh_stale(symbols)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️ 刷新证券静态数据失败: {e}")
+                await asyncio.sleep(interval)
+
+        self._refresh_task = asyncio.create_task(_loop())
+
+    async def stop_refresh(self) -> None:
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -1,7 +1,17 @@
 """Order execution layer."""
 
 from .client import LongportTradingClient
+from .lanes import BuyingPowerLedger, SignalLanes, SymbolLocks
 from .order_router import OrderRouter
+from .order_tracker import OrderState, OrderTracker
 
-__all__ = ["LongportTradingClient", "OrderRouter"]
+__all__ = [
+    "BuyingPowerLedger",
+    "LongportTradingClient",
+    "OrderRouter",
+    "OrderState",
+    "OrderTracker",
+    "SignalLanes",
+    "SymbolLocks",
+]
 
@@ -12,6 +12,7 @@ from longport import OpenApiException, openapi
 
 from longport_quant.config.settings import Settings
 from longport_quant.config.sdk import build_sdk_config
+from longport_quant.utils.sdk_executor import sdk_call
 
 
 class LongportTradingClient:
@@ -22,6 +23,7 @@ class LongportTradingClient:
         self._config = config or build_sdk_config(settings)
         self._trade_ctx: openapi.TradeContext | None = None
         self._context_lock = asyncio.Lock()
+        self._account_currencies: set = set()  # 已知的账户币种（fetch_account复用）
 
     async def __aenter__(self) -> "LongportTradingClient":
         await self._ensure_context()
@@ -49,7 +51,8 @@ class LongportTradingClient:
     async def submit_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
         ctx = await self._ensure_context()
         try:
-            response = await asyncio.to_thread(
+            response = await sdk_call(
+                "trade.submit_order",
                 ctx.submit_order,
                 order["symbol"],
                 self._resolve_order_type(order),
@@ -116,7 +119,8 @@ class LongportTradingClient:
             if limit_price is None:
                 limit_price = trigger_price
 
-            response = await asyncio.to_thread(
+            response = await sdk_call(
+                "trade.submit_order",
                 ctx.submit_order,
                 symbol,
                 openapi.OrderType.LIT,  # Limit If Touched
@@ -193,7 +197,8 @@ class LongportTradingClient:
             # 使用TSLPPCT订单类型
             # 注意：对于止损单，side应该表示原始仓位方向而不是止损触发后的操作方向
             # 例如：持有多头仓位时，side=Buy表示这是保护多头仓位的止损单
-            response = await asyncio.to_thread(
+            response = await sdk_call(
+                "trade.submit_order",
                 ctx.submit_order,
                 symbol,
                 openapi.OrderType.TSLPPCT,  # Trailing Stop Loss Percent
@@ -275,7 +280,8 @@ class LongportTradingClient:
             # 使用TSMPCT订单类型
             # 注意：对于止盈单，side应该表示原始仓位方向而不是止盈触发后的操作方向
             # 例如：持有多头仓位时，side=Buy表示这是保护多头仓位的止盈单
-            response = await asyncio.to_thread(
+            response = await sdk_call(
+                "trade.submit_order",
                 ctx.submit_order,
                 symbol,
                 openapi.OrderType.TSMPCT,  # Trailing Stop Market Percent (for profit)
@@ -306,7 +312,7 @@ class LongportTradingClient:
     async def cancel_order(self, order_id: str) -> Dict[str, Any]:
         ctx = await self._ensure_context()
         try:
-            await asyncio.to_thread(ctx.cancel_order, order_id)
+            await sdk_call("trade.cancel_order", ctx.cancel_order, order_id)
         except OpenApiException as exc:  # pragma: no cover - network errors
             logger.error("Trade API cancel failed: {}", exc)
             raise
@@ -378,7 +384,7 @@ class LongportTradingClient:
 
     async def account_balance(self, currency: str | None = None) -> List[openapi.AccountBalance]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.account_balance, currency)
+        return await sdk_call("trade.account_balance", ctx.account_balance, currency)
 
     async def get_positions(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
@@ -424,25 +430,25 @@ class LongportTradingClient:
         **kwargs: Any,
     ) -> List[openapi.CashFlow]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.cash_flow, start_at, end_at, **kwargs)
+        return await sdk_call("trade.cash_flow", ctx.cash_flow, start_at, end_at, **kwargs)
 
     async def fund_positions(
         self,
         symbols: Optional[List[str]] = None,
     ) -> openapi.FundPositionsResponse:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.fund_positions, symbols)
+        return await sdk_call("trade.fund_positions", ctx.fund_positions, symbols)
 
     async def stock_positions(
         self,
         symbols: Optional[List[str]] = None,
     ) -> openapi.StockPositionsResponse:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.stock_positions, symbols)
+        return await sdk_call("trade.stock_positions", ctx.stock_positions, symbols)
 
     async def margin_ratio(self, symbol: str) -> openapi.MarginRatio:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.margin_ratio, symbol)
+        return await sdk_call("trade.margin_ratio", ctx.margin_ratio, symbol)
 
     async def estimate_max_purchase_quantity(
         self,
@@ -455,7 +461,8 @@ class LongportTradingClient:
         fractional_shares: bool = False,
     ) -> openapi.EstimateMaxPurchaseQuantityResponse:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(
+        return await sdk_call(
+            "trade.estimate_max_purchase_quantity",
             ctx.estimate_max_purchase_quantity,
             symbol,
             order_type,
@@ -476,7 +483,8 @@ class LongportTradingClient:
         end_at: datetime | None = None,
     ) -> List[openapi.OrderHistoryDetail]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(
+        return await sdk_call(
+            "trade.history_orders",
             ctx.history_orders,
             symbol,
             status,
@@ -495,7 +503,8 @@ class LongportTradingClient:
         order_id: str | None = None,
     ) -> List[openapi.OrderDetail]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(
+        return await sdk_call(
+            "trade.today_orders",
             ctx.today_orders,
             symbol,
             status,
@@ -506,7 +515,7 @@ class LongportTradingClient:
 
     async def order_detail(self, order_id: str) -> openapi.OrderDetail:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.order_detail, order_id)
+        return await sdk_call("trade.order_detail", ctx.order_detail, order_id)
 
     async def history_executions(
         self,
@@ -515,7 +524,7 @@ class LongportTradingClient:
         end_at: datetime | None = None,
     ) -> List[openapi.Execution]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.history_executions, symbol, start_at, end_at)
+        return await sdk_call("trade.history_executions", ctx.history_executions, symbol, start_at, end_at)
 
     async def today_executions(
         self,
@@ -523,7 +532,7 @@ class LongportTradingClient:
         order_id: str | None = None,
     ) -> List[openapi.Execution]:
         ctx = await self._ensure_context()
-        return await asyncio.to_thread(ctx.today_executions, symbol, order_id)
+        return await sdk_call("trade.today_executions", ctx.today_executions, symbol, order_id)
 
     async def replace_order(
         self,
@@ -538,7 +547,8 @@ class LongportTradingClient:
     ) -> Dict[str, Any]:
         ctx = await self._ensure_context()
         try:
-            await asyncio.to_thread(
+            await sdk_call(
+                "trade.replace_order",
                 ctx.replace_order,
                 order_id,
                 quantity,
@@ -556,23 +566,23 @@ class LongportTradingClient:
 
     async def set_on_order_changed(self, callback) -> None:
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.set_on_order_changed, callback)
+        await sdk_call("trade.set_on_order_changed", ctx.set_on_order_changed, callback)
 
     async def subscribe_orders(self) -> None:
         """订阅订单更新推送"""
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.subscribe, [openapi.TopicType.Private])
+        await sdk_call("trade.subscribe", ctx.subscribe, [openapi.TopicType.Private])
 
     async def unsubscribe_orders(self) -> None:
         """取消订阅订单更新推送"""
         ctx = await self._ensure_context()
-        await asyncio.to_thread(ctx.unsubscribe, [openapi.TopicType.Private])
+        await sdk_call("trade.unsubscribe", ctx.unsubscribe, [openapi.TopicType.Private])
 
     async def _ensure_context(self) -> openapi.TradeContext:
         async with self._context_lock:
             if self._trade_ctx is None:
                 logger.info("Initialising Longport TradeContext")
-                self._trade_ctx = await asyncio.to_thread(openapi.TradeContext, self._config)
+                self._trade_ctx = await sdk_call("trade.connect", openapi.TradeContext, self._config)
         return self._trade_ctx
 
     async def get_trade_context(self) -> openapi.TradeContext:
@@ -584,113 +594,10 @@ class LongportTradingClient:
 
         Returns:
             包含cash, buy_power, net_assets, positions等信息的字典
+            （失败时返回全0账户，需要区分失败请使用 fetch_account）
         """
         try:
-            balances = await self.account_balance()
-            positions_resp = await self.stock_positions()
-
-            cash = {}
-            buy_power = {}
-            net_assets = {}
-            remaining_finance = {}  # 剩余融资额度
-
-            # 先收集所有币种（从 cash_infos）
-            all_currencies = set()
-            for balance in balances:
-                if hasattr(balance, 'cash_infos') and balance.cash_infos:
-                    for cash_info in balance.cash_infos:
-                        all_currencies.add(cash_info.currency)
-
-            # 为每个币种获取详细信息
-            for currency in all_currencies:
-                # 获取该币种的购买力和净资产
-                currency_balance = await self.account_balance(currency)
-                if currency_balance and len(currency_balance) > 0:
-                    balance = currency_balance[0]
-
-                    # 获取购买力（仅供参考，不作为下单依据）
-                    buy_power[currency] = float(balance.buy_power) if hasattr(balance, 'buy_power') else 0
-
-                    # 获取净资产
-                    net_assets[currency] = float(balance.net_assets) if hasattr(balance, 'net_assets') else 0
-
-                    # 获取详细现金信息
-                    actual_cash = 0
-                    withdraw_cash_amount = 0
-                    frozen_cash_amount = 0
-
-                    if hasattr(balance, 'cash_infos') and balance.cash_infos:
-                        for cash_info in balance.cash_infos:
-                            if cash_info.currency == currency:
-                                # 可用现金（可能未扣除挂单冻结）
-                                actual_cash = float(cash_info.available_cash)
-
-                                # 获取可提现金（已扣除所有冻结，最准确）
-                                if hasattr(cash_info, 'withdraw_cash'):
-                                    withdraw_cash_amount = float(cash_info.withdraw_cash)
-
-                                # 获取冻结资金（挂单占用）
-                                if hasattr(cash_info, 'frozen_cash'):
-                                    frozen_cash_amount = float(cash_info.frozen_cash)
-                                break
-
-                    # 获取融资额度信息
-                    remaining_finance_amt = 0
-                    if hasattr(balance, 'remaining_finance_amount'):
-                        remaining_finance_amt = float(balance.remaining_finance_amount)
-                        remaining_finance[currency] = remaining_finance_amt
-
-                    # 选择合适的可用资金
-                    # 1. 如果 available_cash 为负数（使用了融资），则使用 buy_power
-                    # 2. 否则使用 available_cash（已扣除冻结资金）
-                    if actual_cash < 0:
-                        # 账户使用了融资，现金为负数，使用购买力
-                        cash[currency] = buy_power[currency]
-                        logger.debug(
-                            f"{currency} 账户使用融资: "
-                            f"欠款=${actual_cash:,.2f}, "
-                            f"购买力=${buy_power[currency]:,.2f}"
-                        )
-                    else:
-                        # 正常情况，使用可用现金
-                        cash[currency] = actual_cash
-
-                    # 记录资金详情（用于调试）
-                    if withdraw_cash_amount != actual_cash or frozen_cash_amount > 0:
-                        logger.debug(
-                            f"{currency} 资金详情: "
-                            f"可用=${actual_cash:,.2f}, "
-                            f"可提=${withdraw_cash_amount:,.2f}, "
-                            f"冻结=${frozen_cash_amount:,.2f}, "
-                            f"购买力=${buy_power[currency]:,.2f}"
-                        )
-
-                    # 注意：不再使用 buy_power 作为可用资金，因为它可能包含已用完的融资额度
-                    # 如果需要使用融资，应该单独判断 remaining_finance 是否足够
-
-            # 获取持仓信息
-            positions = []
-            for channel in positions_resp.channels:
-                for pos in channel.positions:
-                    positions.append({
-                        "symbol": pos.symbol,
-                        "quantity": pos.quantity,
-                        "available_quantity": pos.available_quantity,
-                        "cost_price": float(pos.cost_price) if pos.cost_price else 0,
-                        "currency": pos.currency,
-                        "market": pos.market
-                    })
-
-            return {
-                "account_id": "",  # LongPort API不直接提供account_id
-                "cash": cash,
-                "buy_power": buy_power,
-                "net_assets": net_assets,
-                "remaining_finance": remaining_finance,  # 剩余可用融资额度
-                "positions": positions,
-                "position_count": len(positions)
-            }
-
+            return await self.fetch_account()
         except Exception as e:
             logger.error(f"获取账户信息失败: {e}")
             return {
@@ -703,6 +610,134 @@ class LongportTradingClient:
                 "position_count": 0
             }
 
+    async def fetch_account(self) -> Dict[str, Any]:
+        """
+        获取账户信息（失败时抛出异常）
+
+        各币种余额与持仓并发查询：首次调用先查询一次总余额以确定币种，
+        之后直接复用已知币种，一轮并发请求即可完成。
+        """
+        currencies = self._account_currencies
+        if not currencies:
+            balances = await self.account_balance()
+            currencies = self._collect_currencies(balances)
+
+        ordered = sorted(currencies)
+        positions_resp, *currency_balances = await asyncio.gather(
+            self.stock_positions(),
+            *(self.account_balance(currency) for currency in ordered),
+        )
+
+        cash = {}
+        buy_power = {}
+        net_assets = {}
+        remaining_finance = {}  # 剩余融资额度
+
+        seen_currencies = set(ordered)
+        for currency, currency_balance in zip(ordered, currency_balances):
+            if currency_balance and len(currency_balance) > 0:
+                balance = currency_balance[0]
+                seen_currencies |= self._collect_currencies(currency_balance)
+                self._summarize_balance(currency, balance, cash, buy_power, net_assets, remaining_finance)
+        # 新出现的币种下次一并查询
+        self._account_currencies = seen_currencies
+
+        # 获取持仓信息
+        positions = []
+        for channel in positions_resp.channels:
+            for pos in channel.positions:
+                positions.append({
+                    "symbol": pos.symbol,
+                    "quantity": pos.quantity,
+                    "available_quantity": pos.available_quantity,
+                    "cost_price": float(pos.cost_price) if pos.cost_price else 0,
+                    "currency": pos.currency,
+                    "market": pos.market
+                })
+
+        return {
+            "account_id": "",  # LongPort API不直接提供account_id
+            "cash": cash,
+            "buy_power": buy_power,
+            "net_assets": net_assets,
+            "remaining_finance": remaining_finance,  # 剩余可用融资额度
+            "positions": positions,
+            "position_count": len(positions)
+        }
+
+    @staticmethod
+    def _collect_currencies(balances) -> set:
+        """余额列表中出现的全部币种（来自 cash_infos）"""
+        currencies = set()
+        for balance in balances or []:
+            if hasattr(balance, 'cash_infos') and balance.cash_infos:
+                for cash_info in balance.cash_infos:
+                    currencies.add(cash_info.currency)
+        return currencies
+
+    @staticmethod
+    def _summarize_balance(currency, balance, cash, buy_power, net_assets, remaining_finance) -> None:
+        """把单个币种的余额汇总进 cash / buy_power / net_assets / remaining_finance"""
+        # 获取购买力（仅供参考，不作为下单依据）
+        buy_power[currency] = float(balance.buy_power) if hasattr(balance, 'buy_power') else 0
+
+        # 获取净资产
+        net_assets[currency] = float(balance.net_assets) if hasattr(balance, 'net_assets') else 0
+
+        # 获取详细现金信息
+        actual_cash = 0
+        withdraw_cash_amount = 0
+        frozen_cash_amount = 0
+
+        if hasattr(balance, 'cash_infos') and balance.cash_infos:
+            for cash_info in balance.cash_infos:
+                if cash_info.currency == currency:
+                    # 可用现金（可能未扣除挂单冻结）
+                    actual_cash = float(cash_info.available_cash)
+
+                    # 获取可提现金（已扣除所有冻结，最准确）
+                    if hasattr(cash_info, 'withdraw_cash'):
+                        withdraw_cash_amount = float(cash_info.withdraw_cash)
+
+                    # 获取冻结资金（挂单占用）
+                    if hasattr(cash_info, 'frozen_cash'):
+                        frozen_cash_amount = float(cash_info.frozen_cash)
+                    break
+
+        # 获取融资额度信息
+        remaining_finance_amt = 0
+        if hasattr(balance, 'remaining_finance_amount'):
+            remaining_finance_amt = float(balance.remaining_finance_amount)
+            remaining_finance[currency] = remaining_finance_amt
+
+        # 选择合适的可用资金
+        # 1. 如果 available_cash 为负数（使用了融资），则使用 buy_power
+        # 2. 否则使用 available_cash（已扣除冻结资金）
+        if actual_cash < 0:
+            # 账户使用了融资，现金为负数，使用购买力
+            cash[currency] = buy_power[currency]
+            logger.debug(
+                f"{currency} 账户使用融资: "
+                f"欠款=${actual_cash:,.2f}, "
+                f"购买力=${buy_power[currency]:,.2f}"
+            )
+        else:
+            # 正常情况，使用可用现金
+            cash[currency] = actual_cash
+
+        # 记录资金详情（用于调试）
+        if withdraw_cash_amount != actual_cash or frozen_cash_amount > 0:
+            logger.debug(
+                f"{currency} 资金详情: "
+                f"可用=${actual_cash:,.2f}, "
+                f"可提=${withdraw_cash_amount:,.2f}, "
+                f"冻结=${frozen_cash_amount:,.2f}, "
+                f"购买力=${buy_power[currency]:,.2f}"
+            )
+
+        # 注意：不再使用 buy_power 作为可用资金，因为它可能包含已用完的融资额度
+        # 如果需要使用融资，应该单独判断 remaining_finance 是否足够
+
     def _resolve_side(self, side: str | None) -> openapi.OrderSide:
         if not side:
             raise ValueError("Order side not provided")
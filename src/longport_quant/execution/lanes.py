@@ -0,0 +1,287 @@
+"""Concurrent signal execution for the order executor.
+
+* :class:`SignalLanes` - a fast lane for exits that must not wait
+  (``STOP_LOSS`` / ``HARD_STOP_LOSS`` / ``URGENT_SELL``) and a normal lane,
+  each with its own workers, so a long TWAP buy never holds up a stop-loss.
+* :class:`SymbolLocks` - one async lock per symbol, shared by both lanes:
+  orders for the same symbol never run concurrently.
+* :class:`BuyingPowerLedger` - buying power reserved by in-flight buys, so
+  concurrent buys size themselves against what is actually left.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from copy import deepcopy
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# 走快速通道的信号类型（止损/紧急卖出）
+URGENT_SIGNAL_TYPES = frozenset({"STOP_LOSS", "HARD_STOP_LOSS", "URGENT_SELL"})
+
+# 买入预留会扣减的账户资金字段
+_FUND_FIELDS = ("cash", "buy_power", "remaining_finance")
+
+
+def is_urgent_signal(signal: Dict, stop_loss_priority: Optional[float] = None) -> bool:
+    """Whether ``signal`` belongs in the fast lane (urgent type, or score at stop-loss priority)."""
+    if signal.get("type") in URGENT_SIGNAL_TYPES:
+        return True
+    if stop_loss_priority is None:
+        return False
+    try:
+        return float(signal.get("score") or 0) >= stop_loss_priority
+    except (TypeError, ValueError):
+        return False
+
+
+class SymbolLocks:
+    """Lazily created per-symbol ``asyncio.Lock`` objects, dropped once nobody uses them."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, symbol: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        self._users[symbol] = self._users.get(symbol, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[symbol] -= 1
+            if self._users[symbol] == 0:
+                del self._users[symbol]
+                del self._locks[symbol]
+
+    def locked(self, symbol: str) -> bool:
+        lock = self._locks.get(symbol)
+        return lock is not None and lock.locked()
+
+
+class BuyingPowerLedger:
+    """Buying power held by buys that have been sized but not yet filled.
+
+    :meth:`reserve` checks and records in one synchronous step, so two buys
+    running on the same event loop can never both claim the last of the
+    funds. A failed buy releases its reservation straight away; a submitted
+    one is kept by :meth:`hold` until an account snapshot of the given
+    version (i.e. fetched after the order) is seen via :meth:`observe`, or
+    ``hold_ttl`` seconds pass. Held amounts only apply to cached snapshots
+    (:meth:`apply`); live broker figures already count submitted orders, so
+    they should only be reduced by :meth:`pending`.
+    """
+
+    def __init__(self, hold_ttl: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.hold_ttl = hold_ttl
+        self._clock = clock
+        self._reservations: Dict[str, Tuple[str, float]] = {}
+        self._holds: Dict[str, Tuple[Optional[int], float]] = {}  # key -> (快照版本, 截止时间)
+
+    def reserved(self, currency: str) -> float:
+        self._expire()
+        return sum(amount for ccy, amount in self._reservations.values() if ccy == currency)
+
+    def pending(self, currency: str) -> float:
+        """Reserved by buys not yet submitted: the part live broker figures don't include yet."""
+        self._expire()
+        return sum(
+            amount for key, (ccy, amount) in self._reservations.items()
+            if ccy == currency and key not in self._holds
+        )
+
+    def reserve(self, key: str, currency: str, amount: float, capacity: float) -> bool:
+        """Reserve ``amount`` under ``key`` if it fits in ``capacity`` minus other reservations."""
+        self.release(key)
+        if amount > capacity - self.reserved(currency) + 1e-6:
+            return False
+        self._reservations[key] = (currency, float(amount))
+        return True
+
+    def release(self, key: str) -> Optional[float]:
+        self._holds.pop(key, None)
+        entry = self._reservations.pop(key, None)
+        return entry[1] if entry else None
+
+    def hold(self, key: str, version: Optional[int]) -> None:
+        """Keep ``key`` reserved after its order was submitted.
+
+        It is released by :meth:`observe` once a snapshot of ``version`` or
+        later is in use (``None``: only the TTL applies), or after ``hold_ttl``.
+        """
+        if key in self._reservations:
+            self._holds[key] = (version, self._clock() + self.hold_ttl)
+
+    def observe(self, version: Optional[int]) -> None:
+        """The account snapshot in use has ``version``: drop holds it already reflects."""
+        if version is None:
+            return
+        for key, (held_version, _) in list(self._holds.items()):
+            if held_version is not None and version >= held_version:
+                self.release(key)
+
+    def _expire(self) -> None:
+        now = self._clock()
+        for key, (_, deadline) in list(self._holds.items()):
+            if deadline <= now:
+                self.release(key)
+
+    def apply(self, account: Dict) -> Dict:
+        """Copy of ``account`` with reservations deducted from its cash/buying-power fields."""
+        self._expire()
+        if not self._reservations:
+            return account
+        adjusted = deepcopy(account)
+        for currency in {ccy for ccy, _ in self._reservations.values()}:
+            reserved = self.reserved(currency)
+            for field in _FUND_FIELDS:
+                funds = adjusted.get(field)
+                if isinstance(funds, dict) and currency in funds:
+                    funds[currency] = float(funds[currency]) - reserved
+        return adjusted
+
+    def snapshot(self) -> Dict[str, float]:
+        self._expire()
+        totals: Dict[str, float] = {}
+        for currency, amount in self._reservations.values():
+            totals[currency] = totals.get(currency, 0.0) + amount
+        return totals
+
+
+class SignalLanes:
+    """Fast and normal execution lanes with their own worker pools.
+
+    ``handler(signal)`` runs under the signal's symbol lock. Within a lane the
+    highest score is picked first. :meth:`submit` returns a future resolved
+    with the handler's result (or exception).
+    """
+
+    FAST = "fast"
+    NORMAL = "normal"
+
+    def __init__(
+        self,
+        handler: Callable[[Dict], Awaitable[Any]],
+        workers: int = 1,
+        fast_workers: int = 1,
+        is_urgent: Callable[[Dict], bool] = is_urgent_signal,
+        locks: Optional[SymbolLocks] = None,
+    ) -> None:
+        self._handler = handler
+        self._is_urgent = is_urgent
+        self.locks = locks or SymbolLocks()
+        self.workers = {self.FAST: max(1, int(fast_workers)), self.NORMAL: max(1, int(workers))}
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._busy = {self.FAST: 0, self.NORMAL: 0}
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._capacity: Optional[asyncio.Event] = None
+        self.stats = {lane: {"submitted": 0, "completed": 0, "failed": 0} for lane in self.workers}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._capacity = asyncio.Event()
+        for lane, count in self.workers.items():
+            queue = self._queues.setdefault(lane, asyncio.PriorityQueue())
+            for i in range(count):
+                task = asyncio.create_task(self._worker(lane, queue), name=f"order-{lane}-{i}")
+                self._tasks.append(task)
+
+    async def stop(self) -> None:
+        """Cancel the workers.
+
+        Queued signals stay in the Redis processing queue and are recovered on restart.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._queues.values():
+            while not queue.empty():
+                *_, future = queue.get_nowait()
+                future.cancel()
+
+    def lane_for(self, signal: Dict) -> str:
+        return self.FAST if self._is_urgent(signal) else self.NORMAL
+
+    def submit(self, signal: Dict) -> asyncio.Future:
+        lane = self.lane_for(signal)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            score = -float(signal.get("score") or 0)
+        except (TypeError, ValueError):
+            score = 0.0
+        queue = self._queues.setdefault(lane, asyncio.PriorityQueue())
+        queue.put_nowait((score, next(self._seq), signal, future))
+        self.stats[lane]["submitted"] += 1
+        return future
+
+    @property
+    def normal_saturated(self) -> bool:
+        """Normal lane has a backlog or every normal worker is busy."""
+        queue = self._queues.get(self.NORMAL)
+        backlog = queue.qsize() if queue is not None else 0
+        return backlog > 0 or self._busy[self.NORMAL] >= self.workers[self.NORMAL]
+
+    async def wait_for_capacity(self, timeout: float) -> None:
+        """Wait until a worker finishes a signal (or ``timeout`` elapses)."""
+        if self._capacity is None:
+            await asyncio.sleep(timeout)
+            return
+        self._capacity.clear()
+        try:
+            await asyncio.wait_for(self._capacity.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            lane: {
+                **counts,
+                "workers": self.workers[lane],
+                "busy": self._busy[lane],
+                "queued": self._queues[lane].qsize() if lane in self._queues else 0,
+            }
+            for lane, counts in self.stats.items()
+        }
+
+    async def _worker(self, lane: str, queue: asyncio.PriorityQueue) -> None:
+        while True:
+            _, _, signal, future = await queue.get()
+            self._busy[lane] += 1
+            try:
+                async with self.locks.hold(signal.get("symbol", "")):
+                    result = await self._handler(signal)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.stats[lane]["failed"] += 1
+                logger.error(f"❌ [{lane}] 处理信号异常 {signal.get('symbol')}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.stats[lane]["completed"] += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._busy[lane] -= 1
+                queue.task_done()
+                if self._capacity is not None:
+                    self._capacity.set()
+
+
+__all__ = [
+    "URGENT_SIGNAL_TYPES",
+    "BuyingPowerLedger",
+    "SignalLanes",
+    "SymbolLocks",
+    "is_urgent_signal",
+]
@@ -0,0 +1,279 @@
+"""Event-driven order state tracking from trade push notifications."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from longport.openapi import TopicType
+
+from longport_quant.utils.sdk_executor import sdk_call
+
+
+# 终态：订单不会再有成交变化
+TERMINAL_STATUSES = frozenset({"Filled", "Canceled", "Rejected", "Expired", "PartialWithdrawal"})
+PARTIAL_STATUSES = frozenset({"PartialFilled"})
+
+OrderPredicate = Callable[["OrderState"], bool]
+OrderListener = Callable[["OrderState"], None]
+
+
+def status_name(status: Any) -> str:
+    """``OrderStatus.Filled`` -> ``"Filled"`` (also accepts plain strings)."""
+    return str(status).rsplit(".", 1)[-1]
+
+
+@dataclass
+class OrderState:
+    """Latest known state of one order."""
+
+    order_id: str
+    symbol: str = ""
+    status: str = "Unknown"
+    quantity: int = 0
+    executed_quantity: int = 0
+    executed_price: float = 0.0
+    msg: str = ""
+    updated_at: float = 0.0  # time.monotonic() of the last update
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    @property
+    def is_filled(self) -> bool:
+        return self.status == "Filled"
+
+    @property
+    def is_partially_filled(self) -> bool:
+        return self.status in PARTIAL_STATUSES or (
+            self.executed_quantity > 0 and self.status != "Filled"
+        )
+
+
+class OrderTracker:
+    """In-memory order book kept current by the ``TopicType.Private`` push.
+
+    Subscribes once per trade context and fans every order change out to any
+    number of waiters (``wait``/``wait_for_terminal``) and listeners. Pushes
+    arrive on an SDK thread and are applied on the event loop, so the book is
+    only ever touched from one thread. Updates that arrive before anyone waits
+    on an order (a fill can beat ``submit_order``'s return) are kept in the
+    book. Terminal orders are evicted oldest-first past ``max_orders``.
+    """
+
+    def __init__(self, trade_context, max_orders: int = 5000):
+        self.trade_context = trade_context
+        self.max_orders = max_orders
+        self._orders: "OrderedDict[str, OrderState]" = OrderedDict()
+        self._waiters: Dict[str, List[Tuple[OrderPredicate, asyncio.Future]]] = {}
+        self._listeners: Set[OrderListener] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active = False
+        self._stats = {"pushes": 0, "reconciles": 0}
+
+    @property
+    def active(self) -> bool:
+        """True once subscribed to order pushes."""
+        return self._active
+
+    async def start(self) -> bool:
+        """Register the push callback and subscribe to private (order) pushes."""
+        if self._active:
+            return True
+        self._loop = asyncio.get_running_loop()
+        try:
+            await sdk_call("trade.set_on_order_changed", self.trade_context.set_on_order_changed, self._on_push)
+            await sdk_call("trade.subscribe", self.trade_context.subscribe, [TopicType.Private])
+        except Exception as e:
+            logger.warning(f"⚠️ 订阅订单推送失败，将使用轮询查询订单状态: {e}")
+            return False
+        self._active = True
+        logger.info("✅ 订单推送已订阅（事件驱动成交跟踪）")
+        return True
+
+    async def stop(self) -> None:
+        """Unsubscribe and release all waiters."""
+        if self._active:
+            self._active = False
+            try:
+                await sdk_call("trade.unsubscribe", self.trade_context.unsubscribe, [TopicType.Private])
+            except Exception as e:
+                logger.debug(f"取消订单推送订阅失败: {e}")
+        for waiters in self._waiters.values():
+            for _, future in waiters:
+                if not future.done():
+                    future.cancel()
+        self._waiters.clear()
+
+    def add_listener(self, callback: OrderListener) -> None:
+        """Call ``callback(state)`` on the event loop for every order update."""
+        self._listeners.add(callback)
+
+    def remove_listener(self, callback: OrderListener) -> None:
+        self._listeners.discard(callback)
+
+    def get(self, order_id: str) -> Optional[OrderState]:
+        return self._orders.get(order_id)
+
+    def live_orders(self) -> List[OrderState]:
+        """Orders that have not reached a terminal status."""
+        return [state for state in self._orders.values() if not state.is_terminal]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "orders": len(self._orders),
+            "live": len(self.live_orders()),
+            "waiters": sum(len(w) for w in self._waiters.values()),
+        }
+
+    # === 更新 ===
+
+    def _on_push(self, event) -> None:
+        """SDK push callback (runs on the SDK thread)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._apply_push, event)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _apply_push(self, event) -> None:
+        self._stats["pushes"] += 1
+        self.record(event, quantity_field="submitted_quantity")
+
+    def record(self, order, quantity_field: str = "quantity") -> OrderState:
+        """Merge a push event or ``order_detail`` result into the book."""
+        order_id = str(order.order_id)
+        state = self._orders.get(order_id)
+        if state is None:
+            state = OrderState(order_id=order_id)
+            self._orders[order_id] = state
+        else:
+            self._orders.move_to_end(order_id)
+
+        state.symbol = str(getattr(order, "symbol", state.symbol) or state.symbol)
+        state.status = status_name(getattr(order, "status", state.status))
+        quantity = getattr(order, quantity_field, None)
+        if quantity is not None:
+            state.quantity = int(quantity)
+        executed = getattr(order, "executed_quantity", None)
+        if executed is not None:
+            state.executed_quantity = int(executed)
+        price = getattr(order, "executed_price", None)
+        if price:
+            state.executed_price = float(price)
+        state.msg = str(getattr(order, "msg", "") or "")
+        state.updated_at = time.monotonic()
+
+        self._notify(state)
+        self._evict()
+        return state
+
+    def _notify(self, state: OrderState) -> None:
+        waiters = self._waiters.get(state.order_id)
+        if waiters:
+            remaining = []
+            for predicate, future in waiters:
+                if future.done():
+                    continue
+                if predicate(state):
+                    future.set_result(state)
+                else:
+                    remaining.append((predicate, future))
+            if remaining:
+                self._waiters[state.order_id] = remaining
+            else:
+                del self._waiters[state.order_id]
+
+        for callback in list(self._listeners):
+            try:
+                callback(state)
+            except Exception as e:
+                logger.warning(f"⚠️ 订单监听回调失败: {e}")
+
+    def _evict(self) -> None:
+        if len(self._orders) <= self.max_orders:
+            return
+        for order_id in list(self._orders):
+            if len(self._orders) <= self.max_orders:
+                break
+            state = self._orders[order_id]
+            if state.is_terminal and order_id not in self._waiters:
+                del self._orders[order_id]
+
+    # === 等待 ===
+
+    async def wait(
+        self,
+        order_id: str,
+        predicate: OrderPredicate,
+        timeout: Optional[float] = None,
+    ) -> Optional[OrderState]:
+        """Wait until the order's state satisfies ``predicate``.
+
+        Returns the matching state, or ``None`` on timeout.
+        """
+        state = self._orders.get(order_id)
+        if state is not None and predicate(state):
+            return state
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (predicate, future)
+        self._waiters.setdefault(order_id, []).append(entry)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(order_id)
+            if waiters and entry in waiters:
+                waiters.remove(entry)
+                if not waiters:
+                    del self._waiters[order_id]
+
+    async def wait_for_terminal(
+        self,
+        order_id: str,
+        timeout: float,
+        reconcile: Optional[Callable[[str], Awaitable[Any]]] = None,
+        reconcile_interval: float = 5.0,
+    ) -> Optional[OrderState]:
+        """Wait for a fill / cancel / reject, with an optional polling safety net.
+
+        Every ``reconcile_interval`` seconds without a terminal push,
+        ``reconcile(order_id)`` (e.g. an ``order_detail`` query) is awaited and
+        its result merged into the book, so a dropped push costs a few seconds
+        rather than the whole timeout.
+
+        Returns the terminal state, or the latest known state (possibly
+        ``None``) on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._orders.get(order_id)
+
+            wait_time = min(remaining, reconcile_interval) if reconcile else remaining
+            state = await self.wait(order_id, lambda s: s.is_terminal, timeout=wait_time)
+            if state is not None:
+                return state
+
+            if reconcile and time.monotonic() < deadline:
+                try:
+                    order = await reconcile(order_id)
+                    self._stats["reconciles"] += 1
+                    if order is not None:
+                        state = self.record(order)
+                        if state.is_terminal:
+                            return state
+                except Exception as e:
+                    logger.debug(f"订单{order_id}补偿查询失败: {e}")
@@ -12,9 +12,18 @@ import math
 
 from loguru import logger
 from longport.openapi import TradeContext, OrderSide, OrderType, TimeInForceType
+from longport_quant.execution.order_tracker import (
+    PARTIAL_STATUSES,
+    TERMINAL_STATUSES,
+    OrderState,
+    OrderTracker,
+    status_name,
+)
 from longport_quant.persistence.db import DatabaseSessionManager
+from longport_quant.data.security_reference import SecurityReferenceService
 from longport_quant.persistence.models import OrderRecord, FillRecord, RealtimeQuote
 from longport_quant.common.types import Signal
+from longport_quant.utils.sdk_executor import sdk_call
 from sqlalchemy import select, and_
 from sqlalchemy.dialects.postgresql import insert
 
@@ -81,7 +90,9 @@ class SmartOrderRouter:
         trade_context: TradeContext,
         db: DatabaseSessionManager,
         quote_client = None,
-        settings = None
+        settings = None,
+        order_tracker: Optional[OrderTracker] = None,
+        security_ref: Optional[SecurityReferenceService] = None
     ):
         """
         Initialize smart order router.
@@ -91,8 +102,14 @@ class SmartOrderRouter:
             db: Database session manager
             quote_client: Optional QuoteDataClient for fetching tick size info
             settings: Optional Settings instance for safety controls
+            order_tracker: Optional started OrderTracker; fills are then awaited
+                from order pushes and order_detail polling is only a fallback
+            security_ref: Optional SecurityReferenceService; lot sizes are then
+                read from the shared preloaded cache (Redis > DB > batched API)
         """
         self.trade_context = trade_context
+        self.order_tracker = order_tracker
+        self.security_ref = security_ref
         self.db = db
         self.quote_client = quote_client
         self._settings = settings  # Fixed: use _settings to match usage in code
@@ -174,7 +191,7 @@ class SmartOrderRouter:
         """
         获取股票的手数（买卖单位/Board Lot）
 
-        查询优先级: 缓存 > API > 数据库 > 默认值
+        查询优先级: 缓存 > 证券静态数据服务(若配置) / API > 数据库 > 默认值
 
         Args:
             symbol: 股票代码
@@ -188,8 +205,16 @@ class SmartOrderRouter:
 
         lot_size = None
 
+        # 优先使用共享的证券静态数据服务（已依次查询Redis、数据库、API）
+        if self.security_ref is not None:
+            ref = await self.security_ref.get(symbol)
+            if ref is not None:
+                self._lot_size_cache[symbol] = ref.lot_size
+                logger.debug(f"  📊 {symbol} 手数(静态数据): {ref.lot_size}股/手")
+                return ref.lot_size
+
         # 尝试从API获取
-        if self.quote_client:
+        elif self.quote_client:
             try:
                 static_info = await self.quote_client.get_static_info([symbol])
                 if static_info and len(static_info) > 0:
@@ -216,7 +241,7 @@ class SmartOrderRouter:
             logger.debug(f"  ℹ️ SmartOrderRouter未配置quote_client，将尝试数据库")
 
         # 🔥 新增：尝试从数据库查询
-        if lot_size is None and self.db:
+        if lot_size is None and self.db and self.security_ref is None:
             try:
                 from sqlalchemy import select
                 from longport_quant.persistence.models import SecurityStatic
@@ -297,7 +322,8 @@ class SmartOrderRouter:
             currency = "HKD" if symbol.endswith(".HK") else "USD"
 
             # 使用trade_context获取账户余额（指定币种）
-            balance_resp = await asyncio.to_thread(
+            balance_resp = await sdk_call(
+                "trade.account_balance",
                 self.trade_context.account_balance,
                 currency  # 只获取指定币种的余额
             )
@@ -320,7 +346,8 @@ class SmartOrderRouter:
                         break
 
             # 获取所有币种的余额信息（用于诊断）
-            all_balances_resp = await asyncio.to_thread(
+            all_balances_resp = await sdk_call(
+                "trade.account_balance",
                 self.trade_context.account_balance
             )
 
@@ -535,7 +562,7 @@ class SmartOrderRouter:
         """
         try:
             # 获取今日订单
-            today_orders = await asyncio.to_thread(self.trade_context.today_orders)
+            today_orders = await sdk_call("trade.today_orders", self.trade_context.today_orders)
 
             # 过滤出该标的的pending卖单
             pending_sell_qty = 0
@@ -580,7 +607,7 @@ class SmartOrderRouter:
         if request.side == "SELL":
             try:
                 # 获取实际持仓
-                positions = await asyncio.to_thread(self.trade_context.stock_positions)
+                positions = await sdk_call("trade.stock_positions", self.trade_context.stock_positions)
                 position = next((p for p in positions if p.symbol == request.symbol), None)
 
                 if not position:
@@ -779,9 +806,10 @@ class SmartOrderRouter:
             # Submit market order
             order_side = OrderSide.Buy if request.side == "BUY" else OrderSide.Sell
 
-            # Wrap synchronous SDK call with asyncio.to_thread
+            # Run the blocking SDK call on the prioritised SDK executor
             # 正确的参数顺序: symbol, order_type, side, quantity, time_in_force, price, ...
-            resp = await asyncio.to_thread(
+            resp = await sdk_call(
+                "trade.submit_order",
                 self.trade_context.submit_order,
                 request.symbol,
                 OrderType.MO,  # order_type: Market Order
@@ -874,7 +902,8 @@ class SmartOrderRouter:
                 try:
                     # 使用已校正的限价作为估算价格（float更兼容该接口）
                     est_price = float(limit_price)
-                    resp = await asyncio.to_thread(
+                    resp = await sdk_call(
+                        "trade.estimate_max_purchase_quantity",
                         self.trade_context.estimate_max_purchase_quantity,
                         request.symbol,
                         OrderType.LO,
@@ -959,10 +988,11 @@ class SmartOrderRouter:
             logger.debug(f"  🔢 最终提交价格(Decimal): {price_decimal}")
             logger.debug(f"  📦 最终提交数量: {request.quantity}股 ({request.quantity // final_lot_size}手)")
 
-            # Wrap synchronous SDK call with asyncio.to_thread
+            # Run the blocking SDK call on the prioritised SDK executor
             # 正确的参数顺序: symbol, order_type, side, quantity, time_in_force, price, ...
             # 注意：outside_rth参数已移除，因为不是所有SDK版本都支持
-            resp = await asyncio.to_thread(
+            resp = await sdk_call(
+                "trade.submit_order",
                 self.trade_context.submit_order,
                 request.symbol,
                 OrderType.LO,  # order_type: Limit Order
@@ -1043,7 +1073,8 @@ class SmartOrderRouter:
 
                     logger.info(f"  💰 重试订单参数: {request.side} {adjusted_quantity}股 @ ${limit_price:.2f}")
 
-                    resp = await asyncio.to_thread(
+                    resp = await sdk_call(
+                        "trade.submit_order",
                         self.trade_context.submit_order,
                         request.symbol,
                         OrderType.LO,
@@ -1113,7 +1144,8 @@ class SmartOrderRouter:
 
                     # 重试提交订单
                     order_side = OrderSide.Buy if request.side == "BUY" else OrderSide.Sell
-                    resp = await asyncio.to_thread(
+                    resp = await sdk_call(
+                        "trade.submit_order",
                         self.trade_context.submit_order,
                         request.symbol,
                         OrderType.LO,
@@ -1520,10 +1552,57 @@ class SmartOrderRouter:
         order_id: str,
         timeout: int = 30
     ) -> Tuple[int, float]:
-        """Wait for order to be filled."""
+        """Wait for order to be filled.
+
+        Uses the order push tracker when it is subscribed, otherwise polls
+        ``order_detail`` once per second.
+        """
+        if self.order_tracker is not None and self.order_tracker.active:
+            return await self._wait_for_fill_event(order_id, timeout)
+        return await self._poll_for_fill(order_id, timeout)
+
+    async def _wait_for_fill_event(self, order_id: str, timeout: int) -> Tuple[int, float]:
+        """Wait for a terminal order push (order_detail only as a periodic safety net)."""
+        logger.info(f"  ⏳ 等待订单推送: {order_id}, 超时={timeout}秒")
+
+        state = await self.order_tracker.wait_for_terminal(
+            order_id,
+            timeout=timeout,
+            reconcile=lambda oid: sdk_call("trade.order_detail", self.trade_context.order_detail, oid),
+        )
+        return self._fill_result(order_id, state, timeout)
+
+    def _fill_result(self, order_id: str, state: Optional[OrderState], timeout: int) -> Tuple[int, float]:
+        """Map a tracked order state to (filled_quantity, average_price)."""
+        if state is None:
+            logger.warning(f"  ⏰ 订单等待超时({timeout}秒): {order_id}, 未收到任何订单状态")
+            return 0, 0.0
+
+        if state.is_filled:
+            logger.info(f"  ✅ 订单已完全成交: {state.executed_quantity}股 @ ${state.executed_price:.2f}")
+            return state.executed_quantity, state.executed_price
+
+        if state.is_terminal:
+            logger.warning(f"  ❌ 订单异常状态: {state.status}")
+            if state.msg:
+                logger.warning(f"  ❌ 拒绝原因: {state.msg}")
+            if state.executed_quantity > 0:
+                # 部分成交后撤单/过期：已成交部分仍有效
+                logger.info(f"  ⚠️ 已部分成交: {state.executed_quantity}股 @ ${state.executed_price:.2f}")
+                return state.executed_quantity, state.executed_price
+            return 0, 0.0
+
+        logger.warning(f"  ⏰ 订单等待超时({timeout}秒): {order_id}, 状态={state.status}")
+        if state.executed_quantity > 0:
+            logger.info(f"  ⚠️ 超时但有部分成交: {state.executed_quantity}股 @ ${state.executed_price:.2f}")
+            return state.executed_quantity, state.executed_price
+        return 0, 0.0
+
+    async def _poll_for_fill(self, order_id: str, timeout: int) -> Tuple[int, float]:
+        """Poll ``order_detail`` until the order is filled (fallback without pushes)."""
         start_time = datetime.now()
         filled_quantity = 0
-        total_value = 0.0
+        filled_price = 0.0
         poll_count = 0
 
         logger.info(f"  ⏳ 开始监控订单成交: {order_id}, 超时={timeout}秒")
@@ -1534,7 +1613,7 @@ class SmartOrderRouter:
 
                 # 🔥 直接通过 order_id 查询订单（精确查询，避免多账号混淆）
                 # 使用 order_detail 而不是 today_orders，确保查询的是当前账号的订单
-                order = await asyncio.to_thread(self.trade_context.order_detail, order_id)
+                order = await sdk_call("trade.order_detail", self.trade_context.order_detail, order_id)
 
                 # 🔥 记录订单状态（每5秒记录一次）
                 # Use correct attribute names: executed_quantity, executed_price
@@ -1546,10 +1625,10 @@ class SmartOrderRouter:
                         f"price=${order.price}"
                     )
 
-                # Convert status to string for comparison
-                status_str = str(order.status)
+                # OrderStatus.Filled -> "Filled"（注意 PartialFilled 也包含 "Filled"）
+                status_str = status_name(order.status)
 
-                if "Filled" in status_str and "Partially" not in status_str:
+                if status_str == "Filled":
                     # Fully filled
                     # 转换为 int 避免 Decimal 类型错误
                     filled_quantity = int(order.executed_quantity)
@@ -1559,14 +1638,15 @@ class SmartOrderRouter:
                         logger.info(f"  ✅ 订单已完全成交: {filled_quantity}股 @ ${avg_price:.2f}")
                         return filled_quantity, avg_price
 
-                elif "PartiallyFilled" in status_str or "Partially" in status_str:
+                elif status_str in PARTIAL_STATUSES:
                     # Partially filled - continue waiting
                     # 转换为 int 避免 Decimal 类型错误
                     filled_quantity = int(order.executed_quantity)
+                    filled_price = float(order.executed_price or 0)
                     if poll_count % 5 == 0:
                         logger.info(f"  ⏳ 订单部分成交: {filled_quantity}股，继续等待...")
 
-                elif any(x in status_str for x in ["Rejected", "Cancelled", "Expired"]):
+                elif status_str in TERMINAL_STATUSES:
                     logger.warning(f"  ❌ 订单异常状态: {status_str}")
                     # Log the rejection reason if available
                     if hasattr(order, 'msg') and order.msg:
@@ -1582,9 +1662,15 @@ class SmartOrderRouter:
                         logger.debug(f"  📊 订单所有属性: {order_attrs}")
                     except Exception as e:
                         logger.debug(f"  ⚠️ 无法获取订单属性: {e}")
+                    executed_quantity = int(order.executed_quantity or 0)
+                    if executed_quantity > 0:
+                        # 部分成交后撤单/过期：已成交部分仍有效（与推送路径一致）
+                        executed_price = float(order.executed_price or 0)
+                        logger.info(f"  ⚠️ 已部分成交: {executed_quantity}股 @ ${executed_price:.2f}")
+                        return executed_quantity, executed_price
                     return 0, 0.0
 
-                elif "NewStatus" in status_str or "Pending" in status_str:
+                elif status_str in ("New", "WaitToNew", "NotReported") or "Pending" in status_str:
                     # Order is pending, continue waiting
                     if poll_count % 10 == 1:
                         logger.debug(f"  ⏳ 订单等待成交中: {status_str}")
@@ -1602,7 +1688,7 @@ class SmartOrderRouter:
 
         # 返回部分成交数量（如果有）
         if filled_quantity > 0:
-            avg_price = total_value / filled_quantity
+            avg_price = filled_price
             logger.info(f"  ⚠️ 超时但有部分成交: {filled_quantity}股 @ ${avg_price:.2f}")
             return filled_quantity, avg_price
 
@@ -1705,7 +1791,7 @@ class SmartOrderRouter:
         """Cancel an active order."""
         try:
             # Wrap synchronous SDK call
-            await asyncio.to_thread(self.trade_context.cancel_order, order_id)
+            await sdk_call("trade.cancel_order", self.trade_context.cancel_order, order_id)
 
             # Remove from active orders
             self._active_orders.pop(order_id, None)
@@ -1727,7 +1813,8 @@ class SmartOrderRouter:
         try:
             # Note: Longport SDK uses replace_order, not modify_order
             # Wrap synchronous SDK call
-            await asyncio.to_thread(
+            await sdk_call(
+                "trade.replace_order",
                 self.trade_context.replace_order,
                 order_id,
                 new_quantity,
@@ -4,8 +4,12 @@ from longport_quant.features.technical_indicators import (
     TechnicalIndicators,
     calculate_indicators,
 )
+from longport_quant.features.streaming_indicators import StreamingIndicators
+from longport_quant.features.panel_indicators import calculate_panel_indicators
 
 __all__ = [
     "TechnicalIndicators",
     "calculate_indicators",
-]
\ No newline at end of file
+    "StreamingIndicators",
+    "calculate_panel_indicators",
+]
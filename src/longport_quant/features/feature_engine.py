@@ -14,11 +14,21 @@ from loguru import logger
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import (
     KlineDaily, KlineMinute, RealtimeQuote,
-    MarketDepth, CalcIndicator, StrategyFeature
+    MarketDepth, CalcIndicator
 )
+from longport_quant.features.feature_store import FeatureStore, normalize_features
 from longport_quant.features.technical_indicators import TechnicalIndicators
-from sqlalchemy import select, and_, delete
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import select, and_
+
+
+# Running totals that depend on where the loaded window starts
+CUMULATIVE_FEATURES = ('obv', 'obv_ma', 'adl')
+
+
+def _as_utc(value: datetime) -> pd.Timestamp:
+    """Timestamp in UTC; naive values are taken as UTC (as the feature store does)."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
 
 
 @dataclass
@@ -54,6 +64,10 @@ class FeatureConfig:
     cache_enabled: bool = True
     cache_ttl: int = 3600  # seconds
 
+    # Incremental computation
+    incremental: bool = True
+    lookback_bars: int = 300  # warm-up bars reloaded before the watermark (>= longest window, 252)
+
 
 class FeatureEngine:
     """Engine for calculating and managing trading features."""
@@ -68,6 +82,7 @@ class FeatureEngine:
         """
         self.db = db
         self.config = config or FeatureConfig()
+        self.store = FeatureStore(db)
         self._cache: Dict[str, pd.DataFrame] = {}
         self._cache_timestamps: Dict[str, datetime] = {}
 
@@ -76,25 +91,40 @@ class FeatureEngine:
         symbol: str,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        data_frequency: str = 'daily'
+        data_frequency: str = 'daily',
+        full_recompute: bool = False
     ) -> pd.DataFrame:
         """
         Calculate all features for a symbol.
 
+        When features are stored, only bars after the symbol's watermark (its
+        last stored feature timestamp) are computed: the ``lookback_bars``
+        bars before the watermark are reloaded as warm-up and the new rows are
+        appended to the store. The first run for a symbol recomputes the whole
+        range, as does ``full_recompute=True``.
+
         Args:
             symbol: Symbol to calculate features for
             start_date: Start date for calculation
             end_date: End date for calculation
             data_frequency: 'daily' or 'minute'
+            full_recompute: Ignore the watermark and recompute the whole range
 
         Returns:
             DataFrame with calculated features
         """
+        if self.config.incremental and self.config.store_to_db and not full_recompute:
+            watermark = await self.store.last_timestamp(symbol)
+            if watermark is not None:
+                return await self._calculate_incremental(
+                    symbol, start_date, end_date, data_frequency, watermark
+                )
+
         logger.info(f"Calculating features for {symbol} from {start_date} to {end_date}")
 
         # Check cache
         cache_key = f"{symbol}_{data_frequency}_{start_date}_{end_date}"
-        if self.config.cache_enabled and cache_key in self._cache:
+        if self.config.cache_enabled and not full_recompute and cache_key in self._cache:
             if self._is_cache_valid(cache_key):
                 logger.debug(f"Using cached features for {symbol}")
                 return self._cache[cache_key]
@@ -106,7 +136,80 @@ class FeatureEngine:
             logger.warning(f"No data available for {symbol}")
             return pd.DataFrame()
 
-        # Calculate features
+        features = await self._compute_feature_frame(symbol, df)
+
+        # Store to database
+        if self.config.store_to_db:
+            await self._store_features(symbol, features)
+
+        # Update cache
+        if self.config.cache_enabled:
+            self._cache[cache_key] = features
+            self._cache_timestamps[cache_key] = datetime.now()
+
+        logger.info(f"Calculated {len(features.columns)} features for {symbol}")
+        return features
+
+    async def _calculate_incremental(
+        self,
+        symbol: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        frequency: str,
+        watermark: datetime
+    ) -> pd.DataFrame:
+        """Compute and append features for bars after ``watermark``, then return the stored range."""
+        watermark_ts = _as_utc(watermark)
+        df = await self._load_recent_market_data(
+            symbol, frequency, watermark, end_date, self.config.lookback_bars
+        )
+
+        if df is not None and not df.empty:
+            features = normalize_features(await self._compute_feature_frame(symbol, df))
+            new_rows = features[features.index > watermark_ts]
+            if not new_rows.empty:
+                new_rows = await self._anchor_cumulative_features(symbol, features, new_rows, watermark_ts)
+                await self._store_features(symbol, new_rows)
+                logger.info(f"Appended features for {len(new_rows)} new bars of {symbol} after {watermark_ts}")
+            else:
+                logger.debug(f"No new bars for {symbol} after {watermark_ts}")
+
+        start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+        end = datetime.combine(end_date, datetime.max.time()) if end_date else None
+        return await self.store.read(
+            symbol,
+            start=_as_utc(start) if start else None,
+            end=_as_utc(end) if end else None,
+        )
+
+    async def _anchor_cumulative_features(
+        self,
+        symbol: str,
+        window: pd.DataFrame,
+        new_rows: pd.DataFrame,
+        watermark: pd.Timestamp
+    ) -> pd.DataFrame:
+        """Shift running totals (OBV, ADL) so they continue from the stored values.
+
+        Cumulative features computed over the reloaded window start from zero
+        at its first bar; adding ``stored - window`` at the watermark makes the
+        appended rows identical to a full-history computation.
+        """
+        columns = [c for c in CUMULATIVE_FEATURES if c in new_rows.columns]
+        if not columns or watermark not in window.index:
+            return new_rows
+
+        stored = await self.store.read(symbol, columns, start=watermark, end=watermark)
+        if stored.empty:
+            return new_rows
+
+        offset = stored.iloc[-1] - window.loc[watermark, columns]
+        new_rows = new_rows.copy()
+        new_rows[columns] = new_rows[columns] + offset.fillna(0)
+        return new_rows
+
+    async def _compute_feature_frame(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Calculate every enabled feature family over ``df``."""
         features = pd.DataFrame(index=df.index)
 
         # Price features
@@ -142,16 +245,6 @@ class FeatureEngine:
             if not microstructure_features.empty:
                 features = pd.concat([features, microstructure_features], axis=1)
 
-        # Store to database
-        if self.config.store_to_db:
-            await self._store_features(symbol, features)
-
-        # Update cache
-        if self.config.cache_enabled:
-            self._cache[cache_key] = features
-            self._cache_timestamps[cache_key] = datetime.now()
-
-        logger.info(f"Calculated {len(features.columns)} features for {symbol}")
         return features
 
     def _calculate_price_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -297,9 +390,9 @@ class FeatureEngine:
         features['rsi_oversold'] = (features['rsi_14'] < 30).astype(int)
         features['rsi_overbought'] = (features['rsi_14'] > 70).astype(int)
 
-        # Stochastic
-        stoch_result = TechnicalIndicators.stochastic(
-            df['high'].values, df['low'].values, df['close'].values
+        # Stochastic (KDJ的K/D即14周期随机指标)
+        stoch_result = TechnicalIndicators.kdj(
+            df['high'].values, df['low'].values, df['close'].values, 14, 3
         )
         features['stoch_k'] = stoch_result['k']
         features['stoch_d'] = stoch_result['d']
@@ -309,14 +402,15 @@ class FeatureEngine:
         features['bb_upper'] = bb_result['upper']
         features['bb_middle'] = bb_result['middle']
         features['bb_lower'] = bb_result['lower']
-        features['bb_width'] = bb_result['width']
-        features['bb_percent'] = bb_result['percent']
-
-        # Williams %R
-        features['williams_r'] = TechnicalIndicators.williams_r(
-            df['high'].values, df['low'].values, df['close'].values
+        features['bb_width'] = (bb_result['upper'] - bb_result['lower']) / bb_result['middle']
+        band_range = bb_result['upper'] - bb_result['lower']
+        features['bb_percent'] = (df['close'].values - bb_result['lower']) / np.where(
+            band_range != 0, band_range, np.nan
         )
 
+        # Williams %R（与随机指标K值相差100）
+        features['williams_r'] = stoch_result['k'] - 100
+
         return features
 
     async def _calculate_microstructure_features(
@@ -479,22 +573,7 @@ class FeatureEngine:
                 ).order_by(KlineDaily.trade_date)
 
                 result = await session.execute(stmt)
-                klines = result.scalars().all()
-
-                if klines:
-                    df = pd.DataFrame([
-                        {
-                            'timestamp': k.trade_date,
-                            'open': float(k.open),
-                            'high': float(k.high),
-                            'low': float(k.low),
-                            'close': float(k.close),
-                            'volume': k.volume
-                        }
-                        for k in klines
-                    ])
-                    df.set_index('timestamp', inplace=True)
-                    return df
+                return self._klines_to_frame(result.scalars().all(), 'trade_date')
 
             elif frequency == 'minute':
                 stmt = select(KlineMinute).where(
@@ -506,75 +585,80 @@ class FeatureEngine:
                 ).order_by(KlineMinute.timestamp)
 
                 result = await session.execute(stmt)
-                klines = result.scalars().all()
-
-                if klines:
-                    df = pd.DataFrame([
-                        {
-                            'timestamp': k.timestamp,
-                            'open': float(k.open),
-                            'high': float(k.high),
-                            'low': float(k.low),
-                            'close': float(k.close),
-                            'volume': k.volume
-                        }
-                        for k in klines
-                    ])
-                    df.set_index('timestamp', inplace=True)
-                    return df
+                return self._klines_to_frame(result.scalars().all(), 'timestamp')
 
         return None
 
+    async def _load_recent_market_data(
+        self,
+        symbol: str,
+        frequency: str,
+        watermark: datetime,
+        end_date: Optional[date],
+        lookback: int
+    ) -> Optional[pd.DataFrame]:
+        """Load the ``lookback`` bars up to ``watermark`` plus every bar after it."""
+        if frequency == 'daily':
+            model, time_col = KlineDaily, KlineDaily.trade_date
+            after = _as_utc(watermark).date()
+            upper = end_date
+            time_attr = 'trade_date'
+        elif frequency == 'minute':
+            model, time_col = KlineMinute, KlineMinute.timestamp
+            # kline_minute.timestamp is a naive (UTC) column
+            after = _as_utc(watermark).replace(tzinfo=None).to_pydatetime()
+            upper = datetime.combine(end_date, datetime.max.time()) if end_date else None
+            time_attr = 'timestamp'
+        else:
+            return None
+
+        async with self.db.session() as session:
+            new_stmt = select(model).where(
+                and_(
+                    model.symbol == symbol,
+                    time_col > after,
+                    time_col <= upper if upper else True
+                )
+            ).order_by(time_col)
+            new_bars = (await session.execute(new_stmt)).scalars().all()
+            if not new_bars:
+                return None
+
+            warmup_stmt = select(model).where(
+                and_(model.symbol == symbol, time_col <= after)
+            ).order_by(time_col.desc()).limit(lookback)
+            warmup = (await session.execute(warmup_stmt)).scalars().all()
+
+        return self._klines_to_frame(list(reversed(warmup)) + list(new_bars), time_attr)
+
+    @staticmethod
+    def _klines_to_frame(klines: List[Any], time_attr: str) -> Optional[pd.DataFrame]:
+        """OHLCV DataFrame indexed by ``timestamp`` from kline ORM rows."""
+        if not klines:
+            return None
+
+        df = pd.DataFrame([
+            {
+                'timestamp': getattr(k, time_attr),
+                'open': float(k.open),
+                'high': float(k.high),
+                'low': float(k.low),
+                'close': float(k.close),
+                'volume': k.volume
+            }
+            for k in klines
+        ])
+        df.set_index('timestamp', inplace=True)
+        return df
+
     async def _store_features(self, symbol: str, features: pd.DataFrame) -> None:
-        """Store calculated features to database."""
+        """Store calculated features to the columnar feature store."""
         if features.empty:
             return
 
         try:
-            async with self.db.session() as session:
-                # Delete existing features for the same period
-                if not features.index.empty:
-                    min_time = features.index.min()
-                    max_time = features.index.max()
-
-                    delete_stmt = delete(StrategyFeature).where(
-                        and_(
-                            StrategyFeature.symbol == symbol,
-                            StrategyFeature.timestamp >= min_time,
-                            StrategyFeature.timestamp <= max_time
-                        )
-                    )
-                    await session.execute(delete_stmt)
-
-                # Prepare feature records
-                records = []
-                for timestamp, row in features.iterrows():
-                    for feature_name, value in row.items():
-                        if pd.notna(value):
-                            records.append({
-                                'symbol': symbol,
-                                'timestamp': timestamp,
-                                'feature_name': feature_name,
-                                'value': float(value),
-                                'meta_data': {}
-                            })
-
-                # Batch insert
-                if records:
-                    # Insert in batches of 1000
-                    batch_size = 1000
-                    for i in range(0, len(records), batch_size):
-                        batch = records[i:i + batch_size]
-                        stmt = insert(StrategyFeature).values(batch)
-                        stmt = stmt.on_conflict_do_update(
-                            index_elements=['symbol', 'timestamp', 'feature_name'],
-                            set_={'value': stmt.excluded.value}
-                        )
-                        await session.execute(stmt)
-
-                    await session.commit()
-                    logger.info(f"Stored {len(records)} feature values for {symbol}")
-
+            written = await self.store.write(symbol, features)
+            logger.info(f"Stored {written} feature rows ({len(features.columns)} features) for {symbol}")
         except Exception as e:
             logger.error(f"Error storing features: {e}")
 
@@ -590,7 +674,8 @@ class FeatureEngine:
         self,
         symbols: List[str],
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        full_recompute: bool = False
     ) -> Dict[str, pd.DataFrame]:
         """
         Calculate features for multiple symbols in batch.
@@ -599,6 +684,7 @@ class FeatureEngine:
             symbols: List of symbols
             start_date: Start date
             end_date: End date
+            full_recompute: Recompute the whole range instead of appending new bars
 
         Returns:
             Dictionary mapping symbols to feature DataFrames
@@ -608,7 +694,9 @@ class FeatureEngine:
         # Process in parallel
         tasks = []
         for symbol in symbols:
-            task = self.calculate_features(symbol, start_date, end_date)
+            task = self.calculate_features(
+                symbol, start_date, end_date, full_recompute=full_recompute
+            )
             tasks.append(task)
 
         feature_dfs = await asyncio.gather(*tasks, return_exceptions=True)
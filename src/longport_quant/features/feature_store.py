@@ -0,0 +1,231 @@
+"""Columnar storage for calculated strategy features.
+
+Each (symbol, timestamp) is one row in ``strategy_feature_frames`` whose
+``feature_values`` array holds every feature of that bar. The feature names
+the array is indexed by live once in ``strategy_feature_schemas`` under a
+hash of the ordered name list, so adding or reordering features simply
+starts a new schema.
+
+Writes go through binary COPY plus a single merge per call; reads select
+only the requested array elements (``feature_values[i]``) in SQL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import and_, distinct, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from longport_quant.persistence.bulk_copy import copy_records, get_driver_connection
+from longport_quant.persistence.db import DatabaseSessionManager
+from longport_quant.persistence.models import StrategyFeatureFrame, StrategyFeatureSchema
+
+
+FRAME_COLUMNS = ("symbol", "timestamp", "schema_hash", "feature_values")
+
+
+def schema_hash(feature_names: Sequence[str]) -> str:
+    """Stable 16-character id for an ordered list of feature names."""
+    return hashlib.sha1("\x1f".join(feature_names).encode()).hexdigest()[:16]
+
+
+def _utc_index(index: pd.Index) -> pd.DatetimeIndex:
+    """Dates/naive datetimes are taken as UTC, matching how asyncpg stores them."""
+    index = pd.DatetimeIndex(pd.to_datetime(index))
+    return index.tz_localize("UTC") if index.tz is None else index
+
+
+def normalize_features(features: pd.DataFrame) -> pd.DataFrame:
+    """Float matrix on a sorted, de-duplicated UTC index with string column names."""
+    frame = features.copy()
+    frame.index = _utc_index(frame.index)
+    frame.columns = [str(c) for c in frame.columns]
+    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+    return frame.apply(pd.to_numeric, errors="coerce").astype(float)
+
+
+def frame_records(
+    symbol: str, features: pd.DataFrame, feature_hash: str
+) -> Iterator[Tuple[str, datetime, str, List[float]]]:
+    """COPY tuples for a normalized feature frame; all-NaN bars are skipped."""
+    matrix = features.to_numpy(dtype=float)
+    keep = ~np.isnan(matrix).all(axis=1)
+    for timestamp, values in zip(features.index[keep], matrix[keep], strict=True):
+        yield symbol, timestamp.to_pydatetime(), feature_hash, values.tolist()
+
+
+class FeatureStore:
+    """Bulk write, incremental append and column-projected reads of features."""
+
+    def __init__(self, db: DatabaseSessionManager):
+        self.db = db
+        self._schemas: Dict[str, Tuple[str, ...]] = {}
+
+    async def write(self, symbol: str, features: pd.DataFrame) -> int:
+        """Upsert every bar of ``features`` (index = timestamp, columns = features).
+
+        Returns:
+            Number of rows written
+        """
+        if features is None or features.empty:
+            return 0
+
+        features = normalize_features(features)
+        names = tuple(features.columns)
+        feature_hash = schema_hash(names)
+
+        async with self.db.session() as session:
+            if feature_hash not in self._schemas:
+                stmt = insert(StrategyFeatureSchema).values(
+                    schema_hash=feature_hash, feature_names=list(names)
+                ).on_conflict_do_nothing(index_elements=["schema_hash"])
+                await session.execute(stmt)
+
+            conn = await get_driver_connection(session)
+            written = await copy_records(
+                conn,
+                StrategyFeatureFrame.__tablename__,
+                FRAME_COLUMNS,
+                frame_records(symbol, features, feature_hash),
+                conflict_columns=("symbol", "timestamp"),
+            )
+            await session.commit()
+
+        self._schemas[feature_hash] = names
+        logger.debug(f"Stored {written} feature rows ({len(names)} features) for {symbol}")
+        return written
+
+    async def append(self, symbol: str, features: pd.DataFrame) -> int:
+        """Write only the bars newer than the last stored timestamp of ``symbol``."""
+        if features is None or features.empty:
+            return 0
+
+        last = await self.last_timestamp(symbol)
+        if last is not None:
+            last = pd.Timestamp(last)
+            if last.tzinfo is None:
+                last = last.tz_localize("UTC")
+            features = features[_utc_index(features.index) > last]
+        return await self.write(symbol, features)
+
+    async def last_timestamp(self, symbol: str) -> Optional[datetime]:
+        """Latest stored bar for ``symbol`` (``None`` if nothing is stored)."""
+        async with self.db.session() as session:
+            stmt = select(func.max(StrategyFeatureFrame.timestamp)).where(
+                StrategyFeatureFrame.symbol == symbol
+            )
+            return (await session.execute(stmt)).scalar()
+
+    async def read(
+        self,
+        symbol: str,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Load stored features for ``symbol``.
+
+        Args:
+            symbol: Symbol to read
+            columns: Features to return (``None`` = every stored feature);
+                unknown names come back as NaN columns
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (inclusive)
+            limit: Keep only the latest ``limit`` bars
+
+        Returns:
+            DataFrame indexed by timestamp (ascending), one column per feature
+        """
+        conditions = [StrategyFeatureFrame.symbol == symbol]
+        if start is not None:
+            conditions.append(StrategyFeatureFrame.timestamp >= start)
+        if end is not None:
+            conditions.append(StrategyFeatureFrame.timestamp <= end)
+
+        frames = []
+        async with self.db.session() as session:
+            hashes = (
+                await session.execute(
+                    select(distinct(StrategyFeatureFrame.schema_hash)).where(and_(*conditions))
+                )
+            ).scalars().all()
+            await self._load_schemas(session, hashes)
+
+            for feature_hash in hashes:
+                names = self._schemas.get(feature_hash)
+                if not names:
+                    continue
+                stmt = self.projection_query(feature_hash, names, columns, conditions, limit)
+                if stmt is None:
+                    continue
+                rows = (await session.execute(stmt)).all()
+                frames.append(self._rows_to_frame(rows, names, columns))
+
+        if not frames:
+            return pd.DataFrame(columns=list(columns or []))
+
+        result = pd.concat(frames).sort_index()
+        if columns is not None:
+            result = result.reindex(columns=list(columns))
+        if limit:
+            result = result.iloc[-limit:]
+        return result
+
+    @staticmethod
+    def projection_query(
+        feature_hash: str,
+        names: Sequence[str],
+        columns: Optional[Sequence[str]],
+        conditions: list,
+        limit: Optional[int] = None,
+    ):
+        """SELECT of the timestamp plus only the requested array elements."""
+        if columns is None:
+            selected = [StrategyFeatureFrame.feature_values]
+        else:
+            positions = {name: i + 1 for i, name in enumerate(names)}  # PostgreSQL数组下标从1开始
+            selected = [
+                StrategyFeatureFrame.feature_values[positions[c]] for c in columns if c in positions
+            ]
+            if not selected:
+                return None
+
+        stmt = select(StrategyFeatureFrame.timestamp, *selected).where(
+            and_(*conditions, StrategyFeatureFrame.schema_hash == feature_hash)
+        )
+        if limit:
+            stmt = stmt.order_by(StrategyFeatureFrame.timestamp.desc()).limit(limit)
+        return stmt
+
+    @staticmethod
+    def _rows_to_frame(
+        rows, names: Sequence[str], columns: Optional[Sequence[str]]
+    ) -> pd.DataFrame:
+        index = pd.DatetimeIndex([row[0] for row in rows], name="timestamp")
+        if columns is None:
+            values = [row[1] for row in rows]
+            return pd.DataFrame(values, index=index, columns=list(names), dtype=float)
+        present = [c for c in columns if c in names]
+        return pd.DataFrame([row[1:] for row in rows], index=index, columns=present, dtype=float)
+
+    async def _load_schemas(self, session, hashes: Sequence[str]) -> None:
+        missing = [h for h in hashes if h not in self._schemas]
+        if not missing:
+            return
+        result = await session.execute(
+            select(StrategyFeatureSchema.schema_hash, StrategyFeatureSchema.feature_names).where(
+                StrategyFeatureSchema.schema_hash.in_(missing)
+            )
+        )
+        for feature_hash, feature_names in result.all():
+            self._schemas[feature_hash] = tuple(feature_names)
+
+
+__all__ = ["FeatureStore", "normalize_features", "schema_hash"]
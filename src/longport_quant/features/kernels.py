@@ -0,0 +1,317 @@
+"""Indicator kernels shared by every indicator API in the project.
+
+:class:`~longport_quant.features.technical_indicators.TechnicalIndicators`,
+:mod:`~longport_quant.features.panel_indicators`, the legacy
+``indicators.technical`` helpers and the strategies all compute through
+these functions, so a given series produces the same numbers everywhere.
+
+Each kernel accepts a 1-D series or a 2-D ``(symbols, bars)`` panel and
+works along the last axis; the output has the input's shape. Windowed
+indicators (SMA, Bollinger, KDJ) are fully vectorised. The recursive ones
+(EMA, Wilder smoothing for RSI/ATR) are compiled with numba when it is
+installed; otherwise a few series run as a plain loop and larger panels
+loop over time once with every row updated together.
+
+Semantics (warm-up NaNs, SMA-seeded EMA, gap handling) follow the original
+NumPy implementations and are pinned by golden values in
+``tests/test_kernels.py``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+
+# 无numba时，行数达到该值后改为按时间循环、所有行一起向量化更新
+VECTORIZE_MIN_ROWS = 8
+
+
+def _as_2d(values) -> Tuple[np.ndarray, bool]:
+    """Return ``(float 2-D array, was_1d)``."""
+    array = np.asarray(values, dtype=float)
+    if array.ndim == 1:
+        return array[np.newaxis, :], True
+    if array.ndim != 2:
+        raise ValueError(f"expected a series or a (symbols, bars) matrix, got shape {array.shape}")
+    return array, False
+
+
+def _restore(array: np.ndarray, was_1d: bool) -> np.ndarray:
+    return array[0] if was_1d else array
+
+
+# ==================== 递推内核（可由numba编译） ====================
+
+def _ema_loop(prices, start, alpha, out):
+    """EMA recursion per row from its seeded ``out[r, start[r]]``; NaN inputs are skipped."""
+    n_rows, n_bars = prices.shape
+    for r in range(n_rows):
+        s = start[r]
+        if s >= n_bars:
+            continue
+        last = out[r, s]
+        for t in range(s + 1, n_bars):
+            x = prices[r, t]
+            if x != x:
+                continue
+            last = alpha * x + (1 - alpha) * last
+            out[r, t] = last
+
+
+def _wilder_loop(values, period, out):
+    """Wilder smoothing from the seeded column ``out[:, period - 1]``."""
+    n_rows, n_bars = values.shape
+    for r in range(n_rows):
+        for t in range(period, n_bars):
+            out[r, t] = (out[r, t - 1] * (period - 1) + values[r, t]) / period
+
+
+def _ema_vectorized(prices, start, alpha, out):
+    n_bars = prices.shape[1]
+    valid = ~np.isnan(prices)
+    last = out[np.arange(len(start)), np.minimum(start, n_bars - 1)].copy()
+    first = int(start.min()) + 1 if len(start) else n_bars
+    for t in range(first, n_bars):
+        active = (t > start) & valid[:, t]
+        if not active.any():
+            continue
+        value = alpha * prices[active, t] + (1 - alpha) * last[active]
+        out[active, t] = value
+        last[active] = value
+
+
+def _wilder_vectorized(values, period, out):
+    for t in range(period, values.shape[1]):
+        out[:, t] = (out[:, t - 1] * (period - 1) + values[:, t]) / period
+
+
+if NUMBA_AVAILABLE:
+    _ema_loop_jit = numba.njit(cache=True, nogil=True)(_ema_loop)
+    _wilder_loop_jit = numba.njit(cache=True, nogil=True)(_wilder_loop)
+
+
+def _run_ema(prices, start, alpha, out) -> None:
+    if NUMBA_AVAILABLE:
+        _ema_loop_jit(prices, start, alpha, out)
+    elif prices.shape[0] >= VECTORIZE_MIN_ROWS:
+        _ema_vectorized(prices, start, alpha, out)
+    else:
+        _ema_loop(prices, start, alpha, out)
+
+
+def _run_wilder(values, period, out) -> None:
+    if NUMBA_AVAILABLE:
+        _wilder_loop_jit(values, period, out)
+    elif values.shape[0] >= VECTORIZE_MIN_ROWS:
+        _wilder_vectorized(values, period, out)
+    else:
+        _wilder_loop(values, period, out)
+
+
+def _row_means(values: np.ndarray, stop: int) -> np.ndarray:
+    """Mean of ``values[r, :stop]`` per row (same summation as a 1-D ``np.mean``)."""
+    return np.array([np.mean(row[:stop]) for row in values])
+
+
+# ==================== 指标 ====================
+
+def sma(prices, period: int) -> np.ndarray:
+    """Simple moving average; the first ``period - 1`` values are NaN."""
+    prices, was_1d = _as_2d(prices)
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[1] >= period:
+        windows = sliding_window_view(prices, period, axis=1)
+        out[:, period - 1:] = windows @ (np.ones(period) / period)
+    return _restore(out, was_1d)
+
+
+def ema(prices, period: int) -> np.ndarray:
+    """Exponential moving average with ``alpha = 2 / (period + 1)``.
+
+    Each row is seeded with the SMA of its first ``period`` consecutive valid
+    values. Later NaN inputs give NaN and the chain continues from the last
+    valid EMA.
+    """
+    prices, was_1d = _as_2d(prices)
+    n_rows, n_bars = prices.shape
+    out = np.full(prices.shape, np.nan)
+    if n_bars < period or n_rows == 0:
+        return _restore(out, was_1d)
+
+    full_windows = sliding_window_view(~np.isnan(prices), period, axis=1).all(axis=-1)
+    has_start = full_windows.any(axis=1)
+    start = np.where(has_start, full_windows.argmax(axis=1) + period - 1, n_bars).astype(np.int64)
+    for r in np.flatnonzero(has_start):
+        s = start[r]
+        out[r, s] = np.mean(prices[r, s - period + 1:s + 1])
+
+    _run_ema(prices, start, 2 / (period + 1), out)
+    return _restore(out, was_1d)
+
+
+def macd(
+    prices,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+) -> Dict[str, np.ndarray]:
+    """MACD line, signal line (EMA of the MACD line) and histogram."""
+    prices, was_1d = _as_2d(prices)
+    macd_line = ema(prices, fast_period) - ema(prices, slow_period)
+    signal_line = ema(macd_line, signal_period)
+    histogram = np.where(
+        ~np.isnan(macd_line) & ~np.isnan(signal_line),
+        macd_line - signal_line,
+        np.nan,
+    )
+    return {
+        "macd": _restore(macd_line, was_1d),
+        "signal": _restore(signal_line, was_1d),
+        "histogram": _restore(histogram, was_1d),
+    }
+
+
+def rsi(prices, period: int = 14) -> np.ndarray:
+    """Wilder RSI; the first value is at index ``period + 1``."""
+    prices, was_1d = _as_2d(prices)
+    n_bars = prices.shape[1]
+    out = np.full(prices.shape, np.nan)
+    if n_bars < period + 1:
+        return _restore(out, was_1d)
+
+    deltas = np.diff(prices, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    avg_gain = np.full(gains.shape, np.nan)
+    avg_loss = np.full(losses.shape, np.nan)
+    avg_gain[:, period - 1] = _row_means(gains, period)
+    avg_loss[:, period - 1] = _row_means(losses, period)
+    _run_wilder(gains, period, avg_gain)
+    _run_wilder(losses, period, avg_loss)
+
+    ag, al = avg_gain[:, period:], avg_loss[:, period:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, period + 1:] = np.where(al == 0, 100.0, 100 - (100 / (1 + ag / al)))
+    return _restore(out, was_1d)
+
+
+def bollinger_bands(prices, period: int = 20, num_std: float = 2) -> Dict[str, np.ndarray]:
+    """Bollinger bands around the SMA using the population standard deviation."""
+    prices, was_1d = _as_2d(prices)
+    middle = sma(prices, period)
+    std = np.full(prices.shape, np.nan)
+    if prices.shape[1] >= period:
+        std[:, period - 1:] = sliding_window_view(prices, period, axis=1).std(axis=-1)
+    return {
+        "upper": _restore(middle + num_std * std, was_1d),
+        "middle": _restore(middle, was_1d),
+        "lower": _restore(middle - num_std * std, was_1d),
+    }
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range; the first bar is ``high - low``."""
+    high, was_1d = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    tr = high - low
+    prev_close = close[:, :-1]
+    hc = np.abs(high[:, 1:] - prev_close)
+    lc = np.abs(low[:, 1:] - prev_close)
+    # 取三者最大值，仅在严格更大时替换（NaN 不覆盖已有值）
+    body = tr[:, 1:]
+    body = np.where(hc > body, hc, body)
+    body = np.where(lc > body, lc, body)
+    tr[:, 1:] = body
+    return _restore(tr, was_1d)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing; the first value is at ``period - 1``."""
+    tr, was_1d = _as_2d(true_range(high, low, close))
+    out = np.full(tr.shape, np.nan)
+    if tr.shape[1] >= period:
+        out[:, period - 1] = _row_means(tr, period)
+        _run_wilder(tr, period, out)
+    return _restore(out, was_1d)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume starting from the first bar's volume."""
+    close, was_1d = _as_2d(close)
+    volume, _ = _as_2d(volume)
+    if close.shape[1] == 0:
+        return _restore(np.zeros(close.shape), was_1d)
+    diff = np.diff(close, axis=1)
+    signed = np.where(diff > 0, volume[:, 1:], np.where(diff < 0, -volume[:, 1:], 0.0))
+    out = np.cumsum(np.concatenate([volume[:, :1], signed], axis=1), axis=1)
+    return _restore(out, was_1d)
+
+
+def kdj(high, low, close, period: int = 9, signal_period: int = 3) -> Dict[str, np.ndarray]:
+    """KDJ stochastic oscillator (K = raw stochastic, D = SMA of K, J = 3K - 2D)."""
+    high, was_1d = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    k = np.full(close.shape, np.nan)
+    if close.shape[1] >= period:
+        highest = sliding_window_view(high, period, axis=1).max(axis=-1)
+        lowest = sliding_window_view(low, period, axis=1).min(axis=-1)
+        span = highest - lowest
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k[:, period - 1:] = np.where(
+                span != 0, (close[:, period - 1:] - lowest) / span * 100, 50.0
+            )
+    d = sma(k, signal_period)
+    j = 3 * k - 2 * d
+    return {"k": _restore(k, was_1d), "d": _restore(d, was_1d), "j": _restore(j, was_1d)}
+
+
+def volume_ratio(volume, period: int = 5) -> np.ndarray:
+    """Volume divided by its SMA (1.0 where the average is zero)."""
+    volume, was_1d = _as_2d(volume)
+    avg_volume = sma(volume, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(avg_volume != 0, volume / avg_volume, 1.0)
+    return _restore(out, was_1d)
+
+
+def vwap(high, low, close, volume) -> np.ndarray:
+    """Cumulative volume-weighted average of the typical price."""
+    high, was_1d = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    volume, _ = _as_2d(volume)
+    typical_price = (high + low + close) / 3
+    cum_volume = np.cumsum(volume, axis=1)
+    cum_pv = np.cumsum(typical_price * volume, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(cum_volume != 0, cum_pv / cum_volume, typical_price)
+    return _restore(out, was_1d)
+
+
+__all__ = [
+    "NUMBA_AVAILABLE",
+    "atr",
+    "bollinger_bands",
+    "ema",
+    "kdj",
+    "macd",
+    "obv",
+    "rsi",
+    "sma",
+    "true_range",
+    "volume_ratio",
+    "vwap",
+]
@@ -0,0 +1,132 @@
+"""Technical indicators over a 2-D (symbols × time) panel.
+
+Every function takes aligned matrices of shape ``(n_symbols, n_bars)`` (a 1-D
+series is treated as a single row) and computes along axis 1 through
+:mod:`~longport_quant.features.kernels`, so the recursive indicators (EMA,
+RSI, ATR) run once for all symbols instead of once per symbol. Results are
+identical to :class:`~longport_quant.features.technical_indicators.TechnicalIndicators`
+row for row, since both use the same kernels.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from longport_quant.features import kernels
+
+
+def _as_panel(values) -> np.ndarray:
+    panel = np.asarray(values, dtype=float)
+    if panel.ndim == 1:
+        panel = panel[np.newaxis, :]
+    if panel.ndim != 2:
+        raise ValueError(f"expected a (symbols, bars) matrix, got shape {panel.shape}")
+    return panel
+
+
+def stack_panel(
+    series: Mapping[str, Sequence[float]],
+    symbols: Optional[Sequence[str]] = None,
+) -> Tuple[list, np.ndarray]:
+    """Stack equal-length per-symbol series into a panel.
+
+    Returns ``(symbols, matrix)`` with rows in ``symbols`` order.
+    """
+    symbols = list(symbols if symbols is not None else series)
+    if not symbols:
+        return symbols, np.empty((0, 0))
+    matrix = np.vstack([np.asarray(series[s], dtype=float) for s in symbols])
+    return symbols, matrix
+
+
+def sma(prices, period: int) -> np.ndarray:
+    """Simple moving average per row."""
+    return kernels.sma(_as_panel(prices), period)
+
+
+def ema(prices, period: int) -> np.ndarray:
+    """Exponential moving average per row (SMA-seeded, NaN gaps skipped)."""
+    return kernels.ema(_as_panel(prices), period)
+
+
+def macd(
+    prices,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+) -> Dict[str, np.ndarray]:
+    """MACD line, signal and histogram per row."""
+    return kernels.macd(_as_panel(prices), fast_period, slow_period, signal_period)
+
+
+def rsi(prices, period: int = 14) -> np.ndarray:
+    """Wilder RSI per row."""
+    return kernels.rsi(_as_panel(prices), period)
+
+
+def bollinger_bands(prices, period: int = 20, num_std: float = 2) -> Dict[str, np.ndarray]:
+    """Bollinger bands per row."""
+    return kernels.bollinger_bands(_as_panel(prices), period, num_std)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing per row."""
+    return kernels.atr(_as_panel(high), _as_panel(low), _as_panel(close), period)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume per row."""
+    return kernels.obv(_as_panel(close), _as_panel(volume))
+
+
+def calculate_panel_indicators(
+    close,
+    high=None,
+    low=None,
+    volume=None,
+) -> Dict[str, np.ndarray]:
+    """Indicator matrices for a whole panel, keyed like ``calculate_all_indicators`` columns.
+
+    Computes SMA(5/10/20/50), EMA(5/10/20), MACD, RSI(14) and, when the
+    inputs are given, Bollinger bands, ATR(14) and OBV.
+    """
+    close = _as_panel(close)
+    result: Dict[str, np.ndarray] = {}
+
+    for period in (5, 10, 20, 50):
+        result[f"sma_{period}"] = sma(close, period)
+    for period in (5, 10, 20):
+        result[f"ema_{period}"] = ema(close, period)
+
+    macd_result = macd(close)
+    result["macd"] = macd_result["macd"]
+    result["macd_signal"] = macd_result["signal"]
+    result["macd_histogram"] = macd_result["histogram"]
+    result["rsi_14"] = rsi(close, 14)
+
+    if high is not None and low is not None:
+        bb = bollinger_bands(close)
+        result["bb_upper"] = bb["upper"]
+        result["bb_middle"] = bb["middle"]
+        result["bb_lower"] = bb["lower"]
+        result["atr_14"] = atr(high, low, close)
+
+    if volume is not None:
+        result["obv"] = obv(close, volume)
+
+    return result
+
+
+__all__ = [
+    "atr",
+    "bollinger_bands",
+    "calculate_panel_indicators",
+    "ema",
+    "macd",
+    "obv",
+    "rsi",
+    "sma",
+    "stack_panel",
+]
@@ -0,0 +1,558 @@
+"""Incremental (streaming) technical indicators.
+
+Each indicator keeps just enough state to fold in one new value in O(1) and
+reproduces the batch functions in
+:mod:`longport_quant.features.technical_indicators` for the same input series.
+
+``update`` commits a completed bar; ``peek`` evaluates a still-forming bar
+(for example today's daily bar built from realtime quotes) without touching
+the committed state, so it can be called on every tick.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def _isnan(value: float) -> bool:
+    return value != value
+
+
+class StreamingSMA:
+    """Simple moving average over a rolling window (matches ``TechnicalIndicators.sma``)."""
+
+    __slots__ = ("period", "_window", "_sum", "_nan_count")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._window: deque[float] = deque()
+        self._sum = 0.0
+        self._nan_count = 0
+
+    def _next(self, value: float) -> Tuple[float, int, int]:
+        total, nan_count, size = self._sum, self._nan_count, len(self._window)
+        if size == self.period:
+            dropped = self._window[0]
+            if _isnan(dropped):
+                nan_count -= 1
+            else:
+                total -= dropped
+            size -= 1
+        if _isnan(value):
+            nan_count += 1
+        else:
+            total += value
+        return total, nan_count, size + 1
+
+    def _value(self, total: float, nan_count: int, size: int) -> float:
+        if size < self.period or nan_count:
+            return NAN
+        return total / self.period
+
+    def update(self, value: float) -> float:
+        total, nan_count, size = self._next(value)
+        if len(self._window) == self.period:
+            self._window.popleft()
+        self._window.append(value)
+        self._sum, self._nan_count = total, nan_count
+        return self._value(total, nan_count, size)
+
+    def peek(self, value: float) -> float:
+        return self._value(*self._next(value))
+
+    @property
+    def value(self) -> float:
+        return self._value(self._sum, self._nan_count, len(self._window))
+
+
+class StreamingStd:
+    """Rolling population standard deviation (``np.std`` over the last *period* values).
+
+    Mean and sum of squared deviations are maintained with a sliding Welford
+    update; a NaN inside the window yields NaN until it drops out.
+    """
+
+    __slots__ = ("period", "_window", "_mean", "_m2", "_nan_count")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._window: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._nan_count = 0
+
+    def _recompute(self, values: Iterable[float]) -> Tuple[float, float]:
+        arr = np.fromiter(values, dtype=float)
+        if not len(arr):
+            return 0.0, 0.0
+        mean = float(arr.mean())
+        return mean, float(((arr - mean) ** 2).sum())
+
+    def _next(self, value: float) -> Tuple[float, float, int, int]:
+        mean, m2, nan_count, size = self._mean, self._m2, self._nan_count, len(self._window)
+        dropped = self._window[0] if size == self.period else None
+        if dropped is not None and _isnan(dropped):
+            nan_count -= 1
+        if _isnan(value):
+            nan_count += 1
+        new_size = size if dropped is not None else size + 1
+
+        if nan_count:
+            return mean, m2, nan_count, new_size
+
+        if self._nan_count or (dropped is not None and _isnan(dropped)):
+            # The window just became NaN-free: rebuild from scratch
+            values = list(self._window)[1 if dropped is not None else 0:] + [value]
+            mean, m2 = self._recompute(values)
+            return mean, m2, nan_count, new_size
+
+        if dropped is None:
+            delta = value - mean
+            mean += delta / new_size
+            m2 += delta * (value - mean)
+        else:
+            old_mean = mean
+            mean = old_mean + (value - dropped) / new_size
+            m2 += (value - dropped) * (value - mean + dropped - old_mean)
+        return mean, max(m2, 0.0), nan_count, new_size
+
+    def _value(self, m2: float, nan_count: int, size: int) -> float:
+        if size < self.period or nan_count:
+            return NAN
+        return math.sqrt(m2 / self.period)
+
+    def update(self, value: float) -> float:
+        mean, m2, nan_count, size = self._next(value)
+        if len(self._window) == self.period:
+            self._window.popleft()
+        self._window.append(value)
+        self._mean, self._m2, self._nan_count = mean, m2, nan_count
+        return self._value(m2, nan_count, size)
+
+    def peek(self, value: float) -> float:
+        _, m2, nan_count, size = self._next(value)
+        return self._value(m2, nan_count, size)
+
+
+class StreamingEMA:
+    """Exponential moving average seeded with an SMA (matches ``TechnicalIndicators.ema``).
+
+    As in the batch version the EMA starts after ``period`` consecutive valid
+    values; NaN inputs afterwards yield NaN without breaking the chain.
+    """
+
+    __slots__ = ("period", "alpha", "_seed_sum", "_seed_count", "_ema")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self._seed_sum = 0.0
+        self._seed_count = 0
+        self._ema = NAN
+
+    def _next(self, value: float) -> Tuple[float, float, int, float]:
+        """Return ``(ema_state, seed_sum, seed_count, output)``."""
+        if not _isnan(self._ema):
+            if _isnan(value):
+                return self._ema, 0.0, 0, NAN
+            ema = self.alpha * value + (1 - self.alpha) * self._ema
+            return ema, 0.0, 0, ema
+
+        if _isnan(value):
+            return NAN, 0.0, 0, NAN
+        seed_sum, seed_count = self._seed_sum + value, self._seed_count + 1
+        if seed_count < self.period:
+            return NAN, seed_sum, seed_count, NAN
+        ema = seed_sum / self.period
+        return ema, 0.0, 0, ema
+
+    def update(self, value: float) -> float:
+        self._ema, self._seed_sum, self._seed_count, output = self._next(value)
+        return output
+
+    def peek(self, value: float) -> float:
+        return self._next(value)[3]
+
+    @property
+    def value(self) -> float:
+        return self._ema
+
+
+class StreamingRSI:
+    """Wilder-smoothed RSI (matches ``TechnicalIndicators.rsi``)."""
+
+    __slots__ = ("period", "_prev", "_count", "_gain", "_loss", "_value")
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self._prev = NAN
+        self._count = 0  # number of prices seen
+        self._gain = 0.0  # seed sum, then Wilder average
+        self._loss = 0.0
+        self._value = NAN
+
+    def _next(self, value: float) -> Tuple[int, float, float, float]:
+        """Return ``(count, gain, loss, rsi)``."""
+        count = self._count + 1
+        if count == 1:
+            return count, 0.0, 0.0, NAN
+
+        delta = value - self._prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        deltas = count - 1
+
+        if deltas < self.period:
+            return count, self._gain + gain, self._loss + loss, NAN
+        if deltas == self.period:
+            return (
+                count,
+                (self._gain + gain) / self.period,
+                (self._loss + loss) / self.period,
+                NAN,
+            )
+
+        avg_gain = (self._gain * (self.period - 1) + gain) / self.period
+        avg_loss = (self._loss * (self.period - 1) + loss) / self.period
+        if avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return count, avg_gain, avg_loss, rsi
+
+    def update(self, value: float) -> float:
+        self._count, self._gain, self._loss, self._value = self._next(value)
+        self._prev = value
+        return self._value
+
+    def peek(self, value: float) -> float:
+        return self._next(value)[3]
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class StreamingATR:
+    """Average True Range with Wilder smoothing (matches ``TechnicalIndicators.atr``)."""
+
+    __slots__ = ("period", "_prev_close", "_count", "_tr_sum", "_atr")
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self._prev_close = NAN
+        self._count = 0
+        self._tr_sum = 0.0
+        self._atr = NAN
+
+    def _next(self, high: float, low: float, close: float) -> Tuple[int, float, float, float]:
+        """Return ``(count, tr_sum, atr_state, output)``."""
+        count = self._count + 1
+        if count == 1:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+        if count < self.period:
+            return count, self._tr_sum + tr, NAN, NAN
+        if count == self.period:
+            atr = (self._tr_sum + tr) / self.period
+            return count, 0.0, atr, atr
+        atr = (self._atr * (self.period - 1) + tr) / self.period
+        return count, 0.0, atr, atr
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self._count, self._tr_sum, self._atr, output = self._next(high, low, close)
+        self._prev_close = close
+        return output
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        return self._next(high, low, close)[3]
+
+    @property
+    def value(self) -> float:
+        return self._atr
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram (matches ``TechnicalIndicators.macd``)."""
+
+    __slots__ = ("_fast", "_slow", "_signal", "_last")
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        self._fast = StreamingEMA(fast_period)
+        self._slow = StreamingEMA(slow_period)
+        self._signal = StreamingEMA(signal_period)
+        self._last: Tuple[float, float, float] = (NAN, NAN, NAN)
+
+    @staticmethod
+    def _combine(macd_line: float, signal_line: float) -> Tuple[float, float, float]:
+        if _isnan(macd_line) or _isnan(signal_line):
+            return macd_line, signal_line, NAN
+        return macd_line, signal_line, macd_line - signal_line
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        macd_line = self._fast.update(value) - self._slow.update(value)
+        signal_line = self._signal.update(macd_line)
+        self._last = self._combine(macd_line, signal_line)
+        return self._last
+
+    def peek(self, value: float) -> Tuple[float, float, float]:
+        macd_line = self._fast.peek(value) - self._slow.peek(value)
+        return self._combine(macd_line, self._signal.peek(macd_line))
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        return self._last
+
+
+@dataclass(frozen=True)
+class StreamingBar:
+    """A single OHLCV bar fed into :class:`StreamingIndicators`."""
+
+    close: float
+    high: float = NAN
+    low: float = NAN
+    volume: float = NAN
+    open: float = NAN
+    timestamp: Optional[Union[date, datetime, np.datetime64]] = None
+
+
+BarLike = Union[StreamingBar, Dict[str, Any], Any]
+
+
+def _coerce_bar(bar: BarLike) -> StreamingBar:
+    if isinstance(bar, StreamingBar):
+        return bar
+
+    def _get(name: str) -> Any:
+        if isinstance(bar, dict):
+            return bar.get(name)
+        return getattr(bar, name, None)
+
+    def _num(name: str) -> float:
+        value = _get(name)
+        return NAN if value is None else float(value)
+
+    close = _num("close")
+    if _isnan(close):
+        close = _num("last_done")
+    high, low = _num("high"), _num("low")
+    return StreamingBar(
+        close=close,
+        high=close if _isnan(high) else high,
+        low=close if _isnan(low) else low,
+        volume=_num("volume"),
+        open=_num("open"),
+        timestamp=_get("timestamp") if _get("timestamp") is not None else _get("trade_date"),
+    )
+
+
+class StreamingIndicators:
+    """Stateful per-symbol indicator set used on the realtime path.
+
+    Produces the same keys as the signal generator's indicator snapshot
+    (``rsi``, ``bb_*``, ``macd*``, ``sma_20``, ``sma_50``, ``volume_sma``,
+    ``atr``), including the ``prev_macd_*`` values of the previous bar.
+    With ``history > 0`` the snapshots of the last ``history`` committed
+    bars are kept as well (see :meth:`history`).
+    """
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        bb_period: int = 20,
+        bb_std: float = 2,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+        sma_periods: Tuple[int, ...] = (20, 50),
+        volume_period: int = 20,
+        atr_period: int = 14,
+        history: int = 0,
+    ) -> None:
+        self._config = {
+            "rsi_period": rsi_period,
+            "bb_period": bb_period,
+            "bb_std": bb_std,
+            "macd_fast": macd_fast,
+            "macd_slow": macd_slow,
+            "macd_signal": macd_signal,
+            "sma_periods": tuple(sma_periods),
+            "volume_period": volume_period,
+            "atr_period": atr_period,
+        }
+        self._history_size = max(0, int(history))
+        self.reset()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Indicator periods this engine was built with."""
+        return dict(self._config)
+
+    def reset(self) -> None:
+        """Drop all state, e.g. before replaying a re-seeded history."""
+        cfg = self._config
+        self._rsi = StreamingRSI(cfg["rsi_period"])
+        self._bb_mid = StreamingSMA(cfg["bb_period"])
+        self._bb_std = StreamingStd(cfg["bb_period"])
+        self._bb_k = cfg["bb_std"]
+        self._macd = StreamingMACD(cfg["macd_fast"], cfg["macd_slow"], cfg["macd_signal"])
+        self._smas = {period: StreamingSMA(period) for period in cfg["sma_periods"]}
+        self._volume_sma = StreamingSMA(cfg["volume_period"])
+        self._atr = StreamingATR(cfg["atr_period"])
+        self.bars_seen = 0
+        self.last_timestamp: Optional[Any] = None
+        self._snapshot: Dict[str, float] = self._empty_snapshot()
+        self._history: deque[Tuple[Any, Dict[str, float]]] = deque(maxlen=self._history_size or None)
+
+    def _empty_snapshot(self) -> Dict[str, float]:
+        snapshot = {
+            "rsi": NAN,
+            "bb_upper": NAN,
+            "bb_middle": NAN,
+            "bb_lower": NAN,
+            "macd": NAN,
+            "macd_line": NAN,
+            "prev_macd_line": 0,
+            "macd_signal": NAN,
+            "macd_histogram": NAN,
+            "prev_macd_histogram": 0,
+            "volume_sma": NAN,
+            "atr": NAN,
+        }
+        for period in self._config["sma_periods"]:
+            snapshot[f"sma_{period}"] = NAN
+        return snapshot
+
+    def _build(
+        self,
+        rsi: float,
+        mid: float,
+        std: float,
+        macd: Tuple[float, float, float],
+        smas: Dict[int, float],
+        volume_sma: float,
+        atr: float,
+        bars_seen: int,
+    ) -> Dict[str, float]:
+        macd_line, signal_line, histogram = macd
+        prev_line, _, prev_hist = self._macd.value
+        snapshot = {
+            "rsi": rsi,
+            "bb_upper": mid + self._bb_k * std,
+            "bb_middle": mid,
+            "bb_lower": mid - self._bb_k * std,
+            "macd": macd_line,
+            "macd_line": macd_line,
+            "prev_macd_line": prev_line if bars_seen > 1 else 0,
+            "macd_signal": signal_line,
+            "macd_histogram": histogram,
+            "prev_macd_histogram": prev_hist if bars_seen > 1 else 0,
+            "volume_sma": volume_sma,
+            "atr": atr,
+        }
+        for period, value in smas.items():
+            snapshot[f"sma_{period}"] = value
+        return snapshot
+
+    def update(self, bar: BarLike) -> Dict[str, float]:
+        """Commit a completed bar and return the indicator snapshot at that bar."""
+        bar = _coerce_bar(bar)
+        peeked = self.peek(bar)
+
+        self._rsi.update(bar.close)
+        self._bb_mid.update(bar.close)
+        self._bb_std.update(bar.close)
+        self._macd.update(bar.close)
+        for sma in self._smas.values():
+            sma.update(bar.close)
+        self._volume_sma.update(bar.volume)
+        self._atr.update(bar.high, bar.low, bar.close)
+
+        self.bars_seen += 1
+        self.last_timestamp = bar.timestamp
+        self._snapshot = peeked
+        if self._history_size:
+            self._history.append((bar.timestamp, peeked))
+        return dict(peeked)
+
+    def peek(self, bar: BarLike) -> Dict[str, float]:
+        """Return the snapshot as if *bar* were committed, leaving the state untouched."""
+        bar = _coerce_bar(bar)
+        return self._build(
+            rsi=self._rsi.peek(bar.close),
+            mid=self._bb_mid.peek(bar.close),
+            std=self._bb_std.peek(bar.close),
+            macd=self._macd.peek(bar.close),
+            smas={period: sma.peek(bar.close) for period, sma in self._smas.items()},
+            volume_sma=self._volume_sma.peek(bar.volume),
+            atr=self._atr.peek(bar.high, bar.low, bar.close),
+            bars_seen=self.bars_seen + 1,
+        )
+
+    def update_many(
+        self,
+        close: Iterable[float],
+        high: Optional[Iterable[float]] = None,
+        low: Optional[Iterable[float]] = None,
+        volume: Optional[Iterable[float]] = None,
+        timestamps: Optional[Iterable[Any]] = None,
+    ) -> Dict[str, float]:
+        """Replay a history of bars (e.g. when priming from the database)."""
+        closes = np.asarray(list(close), dtype=float)
+        n = len(closes)
+        highs = np.asarray(list(high), dtype=float) if high is not None else closes
+        lows = np.asarray(list(low), dtype=float) if low is not None else closes
+        volumes = np.asarray(list(volume), dtype=float) if volume is not None else np.full(n, NAN)
+        stamps = list(timestamps) if timestamps is not None else [None] * n
+
+        for i in range(n):
+            self.update(StreamingBar(
+                close=closes[i],
+                high=highs[i],
+                low=lows[i],
+                volume=volumes[i],
+                timestamp=stamps[i],
+            ))
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Indicator values at the last committed bar."""
+        return dict(self._snapshot)
+
+    def history(self, limit: Optional[int] = None) -> List[Tuple[Any, Dict[str, float]]]:
+        """``(timestamp, snapshot)`` of the last committed bars, oldest first.
+
+        Holds at most ``history`` bars (the constructor argument); empty when
+        history is disabled.
+        """
+        rows = list(self._history)
+        if limit is not None:
+            rows = rows[-limit:] if limit > 0 else []
+        return [(timestamp, dict(snapshot)) for timestamp, snapshot in rows]
+
+    @property
+    def ready(self) -> bool:
+        """Whether the slowest default indicator (MACD signal) has a value."""
+        return not _isnan(self._snapshot["macd_signal"])
+
+
+__all__ = [
+    "StreamingATR",
+    "StreamingBar",
+    "StreamingEMA",
+    "StreamingIndicators",
+    "StreamingMACD",
+    "StreamingRSI",
+    "StreamingSMA",
+    "StreamingStd",
+]
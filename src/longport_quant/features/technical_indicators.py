@@ -10,12 +10,7 @@ import numpy as np
 import pandas as pd
 from loguru import logger
 
-try:
-    import talib
-    TALIB_AVAILABLE = True
-except ImportError:
-    TALIB_AVAILABLE = False
-    logger.warning("TA-Lib not available, falling back to numpy implementations")
+from longport_quant.features import kernels
 
 
 @dataclass
@@ -58,6 +53,14 @@ def _ensure_dataframe(data: Union[pd.DataFrame, Sequence[Dict[str, Any]]]) -> pd
     raise TypeError(f"Unsupported data type for indicator calculation: {type(data)!r}")
 
 
+def _to_array(values: Union[List[float], np.ndarray, pd.Series]) -> np.ndarray:
+    """Series/list/array -> float ndarray for the indicator kernels."""
+
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    return np.asarray(values, dtype=float)
+
+
 def _coerce_numeric_columns(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
     """Coerce selected columns to numeric values in-place."""
 
@@ -139,7 +142,7 @@ def _filter_indicator_columns(
 
 
 class TechnicalIndicators:
-    """Technical indicators calculation engine."""
+    """Technical indicators calculation engine (thin wrappers over :mod:`kernels`)."""
 
     @staticmethod
     def sma(prices: Union[List[float], np.ndarray, pd.Series], period: int) -> np.ndarray:
@@ -153,23 +156,16 @@ class TechnicalIndicators:
         Returns:
             Array of SMA values
         """
-        if isinstance(prices, list):
-            prices = np.array(prices, dtype=float)
-        elif isinstance(prices, pd.Series):
-            prices = prices.values
-
-        if len(prices) < period:
-            return np.full(len(prices), np.nan)
-
-        sma = np.full(len(prices), np.nan)
-        sma[period-1:] = np.convolve(prices, np.ones(period)/period, mode='valid')
-        return sma
+        return kernels.sma(_to_array(prices), period)
 
     @staticmethod
     def ema(prices: Union[List[float], np.ndarray, pd.Series], period: int) -> np.ndarray:
         """
         Exponential Moving Average.
 
+        Seeded with the SMA of the first ``period`` consecutive valid values;
+        NaN inputs are skipped without breaking the EMA chain.
+
         Args:
             prices: Price series
             period: Number of periods
@@ -177,60 +173,7 @@ class TechnicalIndicators:
         Returns:
             Array of EMA values
         """
-        if isinstance(prices, list):
-            prices = np.array(prices, dtype=float)
-        elif isinstance(prices, pd.Series):
-            prices = prices.values
-
-        if len(prices) < period:
-            return np.full(len(prices), np.nan)
-
-        # Use TA-Lib if available (faster and more accurate)
-        if TALIB_AVAILABLE:
-            try:
-                return talib.EMA(prices, timeperiod=period)
-            except Exception as e:
-                logger.debug(f"TA-Lib EMA failed, falling back to numpy: {e}")
-
-        # Fallback to numpy implementation
-        alpha = 2 / (period + 1)
-        ema = np.full(len(prices), np.nan)
-
-        # Find first valid index with enough non-NaN values for initial SMA
-        valid_data = ~np.isnan(prices)
-        if valid_data.sum() < period:
-            return ema  # Not enough valid data
-
-        # Find starting index where we have 'period' consecutive valid values
-        start_idx = None
-        for i in range(len(prices) - period + 1):
-            if all(valid_data[i:i+period]):
-                start_idx = i + period - 1
-                break
-
-        if start_idx is None:
-            return ema  # Cannot find enough consecutive valid values
-
-        # Initialize with SMA of first 'period' valid values
-        ema[start_idx] = np.mean(prices[start_idx-period+1:start_idx+1])
-
-        # Calculate EMA for remaining values
-        for i in range(start_idx + 1, len(prices)):
-            if np.isnan(prices[i]):
-                continue  # Skip NaN values but keep EMA chain
-            if np.isnan(ema[i-1]):
-                # If previous EMA is NaN, try to find last valid EMA
-                last_valid = start_idx
-                for j in range(i-1, start_idx, -1):
-                    if not np.isnan(ema[j]):
-                        last_valid = j
-                        break
-                if not np.isnan(ema[last_valid]):
-                    ema[i] = alpha * prices[i] + (1 - alpha) * ema[last_valid]
-            else:
-                ema[i] = alpha * prices[i] + (1 - alpha) * ema[i-1]
-
-        return ema
+        return kernels.ema(_to_array(prices), period)
 
     @staticmethod
     def macd(prices: Union[List[float], np.ndarray, pd.Series],
@@ -249,38 +192,12 @@ class TechnicalIndicators:
         Returns:
             Dictionary with 'macd', 'signal', and 'histogram' arrays
         """
-        if isinstance(prices, list):
-            prices = np.array(prices, dtype=float)
-        elif isinstance(prices, pd.Series):
-            prices = prices.values
-
-        # Calculate EMAs
-        ema_fast = TechnicalIndicators.ema(prices, fast_period)
-        ema_slow = TechnicalIndicators.ema(prices, slow_period)
-
-        # MACD line
-        macd_line = ema_fast - ema_slow
-
-        # Signal line (EMA of MACD) - calculate on the full macd_line to preserve length
-        signal_line = TechnicalIndicators.ema(macd_line, signal_period)
-
-        # Histogram
-        histogram = np.where(
-            ~np.isnan(macd_line) & ~np.isnan(signal_line),
-            macd_line - signal_line,
-            np.nan
-        )
-
-        return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
-        }
+        return kernels.macd(_to_array(prices), fast_period, slow_period, signal_period)
 
     @staticmethod
     def rsi(prices: Union[List[float], np.ndarray, pd.Series], period: int = 14) -> np.ndarray:
         """
-        Relative Strength Index.
+        Relative Strength Index (Wilder smoothing).
 
         Args:
             prices: Price series
@@ -289,40 +206,7 @@ class TechnicalIndicators:
         Returns:
             Array of RSI values
         """
-        if isinstance(prices, list):
-            prices = np.array(prices, dtype=float)
-        elif isinstance(prices, pd.Series):
-            prices = prices.values
-
-        if len(prices) < period + 1:
-            return np.full(len(prices), np.nan)
-
-        # Calculate price changes
-        deltas = np.diff(prices)
-
-        # Separate gains and losses
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        # Initialize RSI array
-        rsi = np.full(len(prices), np.nan)
-
-        # Calculate initial averages
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-
-        # Calculate RSI
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-            if avg_loss == 0:
-                rsi[i + 1] = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi[i + 1] = 100 - (100 / (1 + rs))
-
-        return rsi
+        return kernels.rsi(_to_array(prices), period)
 
     @staticmethod
     def kdj(high: Union[List[float], np.ndarray],
@@ -343,33 +227,7 @@ class TechnicalIndicators:
         Returns:
             Dictionary with 'k', 'd', and 'j' arrays
         """
-        # Convert to numpy arrays
-        high = np.array(high, dtype=float)
-        low = np.array(low, dtype=float)
-        close = np.array(close, dtype=float)
-
-        n = len(close)
-        k = np.full(n, np.nan)
-        d = np.full(n, np.nan)
-        j = np.full(n, np.nan)
-
-        # Calculate K values
-        for i in range(period - 1, n):
-            highest = np.max(high[i - period + 1:i + 1])
-            lowest = np.min(low[i - period + 1:i + 1])
-
-            if highest != lowest:
-                k[i] = (close[i] - lowest) / (highest - lowest) * 100
-            else:
-                k[i] = 50
-
-        # Calculate D values (SMA of K)
-        d = TechnicalIndicators.sma(k, signal_period)
-
-        # Calculate J values
-        j = 3 * k - 2 * d
-
-        return {'k': k, 'd': d, 'j': j}
+        return kernels.kdj(_to_array(high), _to_array(low), _to_array(close), period, signal_period)
 
     @staticmethod
     def bollinger_bands(prices: Union[List[float], np.ndarray, pd.Series],
@@ -386,28 +244,7 @@ class TechnicalIndicators:
         Returns:
             Dictionary with 'upper', 'middle', and 'lower' bands
         """
-        if isinstance(prices, list):
-            prices = np.array(prices, dtype=float)
-        elif isinstance(prices, pd.Series):
-            prices = prices.values
-
-        # Calculate middle band (SMA)
-        middle = TechnicalIndicators.sma(prices, period)
-
-        # Calculate standard deviation
-        std = np.full(len(prices), np.nan)
-        for i in range(period - 1, len(prices)):
-            std[i] = np.std(prices[i - period + 1:i + 1])
-
-        # Calculate bands
-        upper = middle + num_std * std
-        lower = middle - num_std * std
-
-        return {
-            'upper': upper,
-            'middle': middle,
-            'lower': lower
-        }
+        return kernels.bollinger_bands(_to_array(prices), period, num_std)
 
     @staticmethod
     def atr(high: Union[List[float], np.ndarray],
@@ -426,31 +263,7 @@ class TechnicalIndicators:
         Returns:
             Array of ATR values
         """
-        high = np.array(high, dtype=float)
-        low = np.array(low, dtype=float)
-        close = np.array(close, dtype=float)
-
-        n = len(close)
-        tr = np.zeros(n)
-
-        # Calculate True Range
-        for i in range(1, n):
-            hl = high[i] - low[i]
-            hc = abs(high[i] - close[i - 1])
-            lc = abs(low[i] - close[i - 1])
-            tr[i] = max(hl, hc, lc)
-
-        # First TR is simply High - Low
-        tr[0] = high[0] - low[0]
-
-        # Calculate ATR using EMA
-        atr = np.full(n, np.nan)
-        atr[period - 1] = np.mean(tr[:period])
-
-        for i in range(period, n):
-            atr[i] = (atr[i - 1] * (period - 1) + tr[i]) / period
-
-        return atr
+        return kernels.atr(_to_array(high), _to_array(low), _to_array(close), period)
 
     @staticmethod
     def obv(close: Union[List[float], np.ndarray],
@@ -465,21 +278,7 @@ class TechnicalIndicators:
         Returns:
             Array of OBV values
         """
-        close = np.array(close, dtype=float)
-        volume = np.array(volume, dtype=float)
-
-        obv = np.zeros(len(close))
-        obv[0] = volume[0]
-
-        for i in range(1, len(close)):
-            if close[i] > close[i - 1]:
-                obv[i] = obv[i - 1] + volume[i]
-            elif close[i] < close[i - 1]:
-                obv[i] = obv[i - 1] - volume[i]
-            else:
-                obv[i] = obv[i - 1]
-
-        return obv
+        return kernels.obv(_to_array(close), _to_array(volume))
 
     @staticmethod
     def volume_ratio(volume: Union[List[float], np.ndarray],
@@ -494,17 +293,7 @@ class TechnicalIndicators:
         Returns:
             Array of volume ratio values
         """
-        volume = np.array(volume, dtype=float)
-        avg_volume = TechnicalIndicators.sma(volume, period)
-
-        # Avoid division by zero
-        volume_ratio = np.where(
-            avg_volume != 0,
-            volume / avg_volume,
-            1.0
-        )
-
-        return volume_ratio
+        return kernels.volume_ratio(_to_array(volume), period)
 
     @staticmethod
     def vwap(high: Union[List[float], np.ndarray],
@@ -523,22 +312,7 @@ class TechnicalIndicators:
         Returns:
             Array of VWAP values
         """
-        high = np.array(high, dtype=float)
-        low = np.array(low, dtype=float)
-        close = np.array(close, dtype=float)
-        volume = np.array(volume, dtype=float)
-
-        # Typical price
-        typical_price = (high + low + close) / 3
-
-        # Cumulative values
-        cum_volume = np.cumsum(volume)
-        cum_pv = np.cumsum(typical_price * volume)
-
-        # VWAP
-        vwap = np.where(cum_volume != 0, cum_pv / cum_volume, typical_price)
-
-        return vwap
+        return kernels.vwap(_to_array(high), _to_array(low), _to_array(close), _to_array(volume))
 
     @staticmethod
     def calculate_all_indicators(
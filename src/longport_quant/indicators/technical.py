@@ -6,6 +6,15 @@ import numpy as np
 from typing import List, Tuple
 from dataclasses import dataclass
 
+from longport_quant.features import kernels
+
+
+def _last(values: np.ndarray, default: float) -> float:
+    """最新一个指标值（NaN时返回默认值）"""
+    if len(values) == 0 or np.isnan(values[-1]):
+        return default
+    return float(values[-1])
+
 
 @dataclass
 class RSISignal:
@@ -54,24 +63,8 @@ class TechnicalIndicators:
         if len(prices) < period + 1:
             return 50.0  # 数据不足，返回中性值
 
-        # 计算价格变化
-        deltas = np.diff(prices)
-
-        # 分离上涨和下跌
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        # 计算平均涨跌幅
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-
-        if avg_loss == 0:
-            return 100.0
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return float(rsi)
+        # Wilder平滑，与 features.kernels 一致
+        return _last(kernels.rsi(prices, period), 50.0)
 
     @staticmethod
     def analyze_rsi(
@@ -134,17 +127,12 @@ class TechnicalIndicators:
             current = prices[-1] if prices else 100.0
             return (current * 1.05, current, current * 0.95)
 
-        # 计算中轨（简单移动平均）
-        middle = np.mean(prices[-period:])
-
-        # 计算标准差
-        std = np.std(prices[-period:])
-
-        # 计算上下轨
-        upper = middle + (std_dev * std)
-        lower = middle - (std_dev * std)
-
-        return (float(upper), float(middle), float(lower))
+        bands = kernels.bollinger_bands(prices[-period:], period, std_dev)
+        return (
+            _last(bands["upper"], 0.0),
+            _last(bands["middle"], 0.0),
+            _last(bands["lower"], 0.0),
+        )
 
     @staticmethod
     def analyze_bollinger_bands(
@@ -221,29 +209,13 @@ class TechnicalIndicators:
         if len(prices) < slow_period:
             return (0.0, 0.0, 0.0)
 
-        prices_array = np.array(prices)
-
-        # 计算EMA
-        def ema(data, period):
-            weights = np.exp(np.linspace(-1., 0., period))
-            weights /= weights.sum()
-            ema_values = np.convolve(data, weights, mode='valid')
-            return ema_values[-1] if len(ema_values) > 0 else data[-1]
-
-        # 快线和慢线
-        ema_fast = ema(prices_array, fast_period)
-        ema_slow = ema(prices_array, slow_period)
-
-        # MACD线
-        macd_line = ema_fast - ema_slow
-
-        # 简化：信号线使用固定值（实际应该是MACD的EMA）
-        signal_line = macd_line * 0.8  # 简化计算
-
-        # 柱状图
+        result = kernels.macd(prices, fast_period, slow_period, signal_period)
+        macd_line = _last(result["macd"], 0.0)
+        # 数据不足以计算信号线时，信号线取MACD线本身（柱状图为0）
+        signal_line = _last(result["signal"], macd_line)
         histogram = macd_line - signal_line
 
-        return (float(macd_line), float(signal_line), float(histogram))
+        return (macd_line, signal_line, histogram)
 
     @staticmethod
     def analyze_macd(
@@ -300,7 +272,7 @@ class TechnicalIndicators:
         """计算简单移动平均线"""
         if len(prices) < period:
             return prices[-1] if prices else 0.0
-        return float(np.mean(prices[-period:]))
+        return _last(kernels.sma(prices[-period:], period), float(prices[-1]))
 
     @staticmethod
     def calculate_ema(prices: List[float], period: int) -> float:
@@ -308,11 +280,7 @@ class TechnicalIndicators:
         if len(prices) < period:
             return prices[-1] if prices else 0.0
 
-        prices_array = np.array(prices[-period:])
-        weights = np.exp(np.linspace(-1., 0., period))
-        weights /= weights.sum()
-
-        return float(np.sum(prices_array * weights))
+        return _last(kernels.ema(prices, period), float(prices[-1]))
 
 
 __all__ = [
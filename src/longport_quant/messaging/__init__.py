@@ -1,5 +1,6 @@
 """消息队列模块 - 用于解耦信号生成和订单执行"""
 
+from .outbox import PostTradeOutbox
 from .signal_queue import SignalQueue
 
-__all__ = ["SignalQueue"]
+__all__ = ["PostTradeOutbox", "SignalQueue"]
@@ -0,0 +1,333 @@
+"""成交后任务出库箱（outbox）- 把备份条件单、止损记录和通知移出下单关键路径
+
+下单成功后执行器只需把一个任务写入Redis（一次往返），由后台worker按步骤完成：
+
+- 每个任务包含有序的步骤列表（如 backup_stop / backup_profit / notify ...），
+  每完成一步就把进度写回Redis，重试时只执行尚未完成的步骤；
+- 步骤抛出异常时任务进入延迟队列按退避重试，超过最大次数进入死信队列；
+- worker 取任务使用 BLMOVE 移入 processing 列表，进程崩溃后由 recover() 放回待处理队列；
+- 任务完成后把下单各阶段耗时（含出库箱排队与各步骤耗时）写入一个定长列表，供排查延迟。
+
+存储结构（key 默认 trading:outbox）：
+
+    {key}:jobs        HASH  job_id -> 任务JSON（步骤进度、结果、重试次数）
+    {key}:pending     LIST  待处理 job_id（LPUSH 入队，worker 从右侧取）
+    {key}:processing  LIST  处理中 job_id
+    {key}:delayed     ZSET  job_id -> 下次重试时间
+    {key}:dead        LIST  超过重试次数的 job_id（任务数据保留在 jobs 中）
+    {key}:timings     LIST  已完成任务的阶段耗时（最新在前）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis 为必需依赖
+    aioredis = None
+
+
+StepHandler = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+
+class PostTradeOutbox:
+    """Redis持久化的成交后任务队列（至少执行一次，按步骤记录进度）"""
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        key: str = "trading:outbox",
+        max_attempts: int = 5,
+        retry_delay: float = 5.0,
+        block_timeout: float = 1.0,
+        timings_maxlen: int = 1000,
+    ):
+        """
+        初始化出库箱
+
+        Args:
+            redis_url: Redis连接URL
+            key: Redis键前缀
+            max_attempts: 单个任务最多执行次数（超过后进入死信队列）
+            retry_delay: 重试基础延迟（秒），第n次重试延迟 n * retry_delay
+            block_timeout: worker 阻塞等待新任务的超时（秒），也是停止时的最长等待
+            timings_maxlen: 保留的阶段耗时记录条数
+        """
+        self.redis_url = redis_url
+        self.key = key
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.block_timeout = block_timeout
+        self.timings_maxlen = timings_maxlen
+
+        self.jobs_key = f"{key}:jobs"
+        self.pending_key = f"{key}:pending"
+        self.processing_key = f"{key}:processing"
+        self.delayed_key = f"{key}:delayed"
+        self.dead_key = f"{key}:dead"
+        self.timings_key = f"{key}:timings"
+
+        self._handlers: Dict[str, StepHandler] = {}
+        self._redis = None
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"completed": 0, "retried": 0, "dead": 0}
+
+    async def _get_redis(self):
+        """获取Redis连接（懒加载）"""
+        if self._redis is None:
+            self._redis = await aioredis.from_url(
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True
+            )
+        return self._redis
+
+    async def close(self):
+        """停止worker并关闭Redis连接"""
+        await self.stop()
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    def register(self, step: str, handler: StepHandler):
+        """注册步骤处理函数：handler(data, results)，返回值记入 results[step]"""
+        self._handlers[step] = handler
+
+    async def enqueue(
+        self,
+        steps: Iterable[str],
+        data: Dict[str, Any],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """
+        写入一个任务（一次往返）
+
+        Returns:
+            str: job_id
+        """
+        job = self._new_job(steps, data, timings)
+        redis = await self._get_redis()
+        pipe = redis.pipeline(transaction=True)
+        pipe.hset(self.jobs_key, job["id"], self._dumps(job))
+        pipe.lpush(self.pending_key, job["id"])
+        await pipe.execute()
+        return job["id"]
+
+    async def run_inline(
+        self,
+        steps: Iterable[str],
+        data: Dict[str, Any],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> List[str]:
+        """
+        不经过Redis直接执行全部步骤（Redis不可用时的降级路径，不重试）
+
+        Returns:
+            List[str]: 失败的步骤
+        """
+        job = self._new_job(steps, data, timings)
+        failed = await self._run_steps(job)
+        self._log_timings(job)
+        return failed
+
+    async def recover(self) -> int:
+        """把 processing 中遗留的任务（上次进程退出时未完成）放回待处理队列"""
+        redis = await self._get_redis()
+        recovered = 0
+        # 从最新的一端取出、放到待处理队列的出队端：最早的任务最先被重新处理
+        while await redis.lmove(self.processing_key, self.pending_key, "LEFT", "RIGHT"):
+            recovered += 1
+        if recovered:
+            logger.warning(f"♻️ 出库箱恢复了 {recovered} 个未完成的成交后任务")
+        return recovered
+
+    def start(self):
+        """启动后台worker"""
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """停止后台worker（等待当前任务的当前步骤完成，最长约 block_timeout）"""
+        self._running = False
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self):
+        """worker主循环（由 start() 启动，stop() 后在 block_timeout 内退出）"""
+        while self._running:
+            try:
+                await self.promote_due()
+                await self.run_once(self.block_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 出库箱worker出错: {e}")
+                await asyncio.sleep(self.block_timeout)
+
+    async def promote_due(self) -> int:
+        """把到期的重试任务移回待处理队列"""
+        redis = await self._get_redis()
+        due = await redis.zrangebyscore(self.delayed_key, "-inf", time.time())
+        if not due:
+            return 0
+        pipe = redis.pipeline(transaction=True)
+        for job_id in due:
+            pipe.zrem(self.delayed_key, job_id)
+            pipe.lpush(self.pending_key, job_id)
+        await pipe.execute()
+        return len(due)
+
+    async def run_once(self, timeout: float = 0) -> bool:
+        """
+        取出并处理一个任务
+
+        Returns:
+            bool: 是否处理了任务
+        """
+        redis = await self._get_redis()
+        if timeout > 0:
+            job_id = await redis.blmove(self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT")
+        else:
+            job_id = await redis.lmove(self.pending_key, self.processing_key, "RIGHT", "LEFT")
+        if not job_id:
+            return False
+
+        raw = await redis.hget(self.jobs_key, job_id)
+        if raw is None:
+            await redis.lrem(self.processing_key, 1, job_id)
+            return True
+
+        job = json.loads(raw)
+        job["attempts"] += 1
+        job["timings"].setdefault("outbox_wait", round((time.time() - job["enqueued_at"]) * 1000, 1))
+
+        failed = await self._run_steps(job, checkpoint=lambda: redis.hset(self.jobs_key, job_id, self._dumps(job)))
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.lrem(self.processing_key, 1, job_id)
+        if not failed:
+            pipe.hdel(self.jobs_key, job_id)
+            pipe.lpush(self.timings_key, self._dumps({
+                "id": job_id,
+                "symbol": job["data"].get("symbol"),
+                "order_id": job["data"].get("order_id"),
+                "timings": job["timings"],
+            }))
+            pipe.ltrim(self.timings_key, 0, self.timings_maxlen - 1)
+            self.stats["completed"] += 1
+            self._log_timings(job)
+        elif job["attempts"] >= self.max_attempts:
+            pipe.hset(self.jobs_key, job_id, self._dumps(job))
+            pipe.lpush(self.dead_key, job_id)
+            self.stats["dead"] += 1
+            logger.error(
+                f"❌ 成交后任务失败{job['attempts']}次，移入死信队列: "
+                f"{job['data'].get('symbol')} 未完成步骤={failed} ({self.dead_key})"
+            )
+        else:
+            delay = self.retry_delay * job["attempts"]
+            pipe.hset(self.jobs_key, job_id, self._dumps(job))
+            pipe.zadd(self.delayed_key, {job_id: time.time() + delay})
+            self.stats["retried"] += 1
+            logger.warning(
+                f"⚠️ 成交后任务部分失败，{delay:.0f}秒后重试: "
+                f"{job['data'].get('symbol')} 未完成步骤={failed}"
+            )
+        await pipe.execute()
+        return True
+
+    async def get_stats(self) -> Dict[str, int]:
+        """队列深度与处理计数"""
+        redis = await self._get_redis()
+        pipe = redis.pipeline(transaction=False)
+        pipe.llen(self.pending_key)
+        pipe.llen(self.processing_key)
+        pipe.zcard(self.delayed_key)
+        pipe.llen(self.dead_key)
+        pending, processing, delayed, dead_total = await pipe.execute()
+        return {
+            **self.stats,
+            "pending": pending,
+            "processing": processing,
+            "delayed": delayed,
+            "dead_total": dead_total,
+        }
+
+    async def recent_timings(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近完成任务的阶段耗时（最新在前）"""
+        redis = await self._get_redis()
+        return [json.loads(item) for item in await redis.lrange(self.timings_key, 0, limit - 1)]
+
+    def _new_job(
+        self,
+        steps: Iterable[str],
+        data: Dict[str, Any],
+        timings: Optional[Dict[str, float]],
+    ) -> Dict[str, Any]:
+        return {
+            "id": uuid.uuid4().hex,
+            "steps": list(steps),
+            "done": [],
+            "results": {},
+            "data": data,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+            "timings": dict(timings or {}),
+        }
+
+    async def _run_steps(self, job: Dict[str, Any], checkpoint=None) -> List[str]:
+        """按顺序执行未完成的步骤；单步失败不影响后续步骤，返回失败的步骤"""
+        failed = []
+        for step in job["steps"]:
+            if step in job["done"]:
+                continue
+            handler = self._handlers.get(step)
+            if handler is None:
+                logger.error(f"❌ 出库箱未注册步骤: {step}")
+                failed.append(step)
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = await handler(job["data"], job["results"])
+            except Exception as e:
+                logger.warning(f"⚠️ 成交后步骤失败 {job['data'].get('symbol')}/{step}: {e}")
+                failed.append(step)
+                continue
+            finally:
+                job["timings"][f"post.{step}"] = round((time.perf_counter() - start) * 1000, 1)
+
+            job["done"].append(step)
+            if result is not None:
+                job["results"][step] = result
+            if checkpoint is not None:
+                try:
+                    await checkpoint()
+                except Exception as e:
+                    logger.debug(f"保存成交后任务进度失败: {e}")
+        return failed
+
+    @staticmethod
+    def _log_timings(job: Dict[str, Any]):
+        timings = job["timings"]
+        logger.info(
+            f"⏱️ {job['data'].get('symbol')} 订单阶段耗时: "
+            + ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items())
+        )
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str, ensure_ascii=False)
+
+
+__all__ = ["PostTradeOutbox"]
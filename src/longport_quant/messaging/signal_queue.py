@@ -2,9 +2,10 @@
 
 import json
 import time
-from typing import Dict, List, Optional
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 from loguru import logger
 
 try:
@@ -13,6 +14,331 @@ except ImportError:
     logger.warning("redis.asyncio not available, falling back to redis")
     import redis
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from redis.crc import key_slot
+
+
+# ---------------------------------------------------------------------------
+# 存储结构
+#
+#   {queue_key}                  ZSET 主队列，成员为 signal_id，score = -priority
+#   {processing_key}             ZSET 处理中队列，成员为 signal_id，score = 开始处理时间
+#   {ns}:sig:{signal_id}         HASH 信号数据：payload（序列化后的完整信号）
+#                                     + symbol / type / queued_at / retry_after（供Lua读取）
+#   {failed_key}                 ZSET 失败队列，成员仍为完整JSON（只做归档）
+#
+# 二级索引（Lua脚本维护，保证与ZSET原子同步），对主队列（{ns}:main）/ 处理中队列
+# （{ns}:processing）分别维护：
+#   {index}:idx:{symbol}         SET  该标的的全部signal_id
+#   {index}:idx:{symbol}:{type}  SET  该标的 + 信号类型的signal_id
+#   {index}:symbols              HASH 标的 -> 成员数量（用于 get_pending_symbols）
+# 主队列额外维护：
+#   {ns}:delayed                 ZSET signal_id -> retry_after（延迟信号）
+#
+# ns 为带哈希标签的命名空间：queue_key 已含 {tag} 时为 queue_key 本身，否则为 "{queue_key}"。
+# 未带标签的 queue_key 与 "{queue_key}:..." 落在同一个slot，因此主队列、信号HASH与全部
+# 索引始终同slot；处理中队列需自行配置同一标签（如 {trading:signals}:processing）。
+#
+# 所有脚本使用相同的KEYS布局（脚本内只拼接这些前缀下的key）：
+#   KEYS[1] 信号HASH前缀   KEYS[2] 主队列      KEYS[3] 主队列索引前缀   KEYS[4] 延迟ZSET
+#   KEYS[5] 处理中队列     KEYS[6] 处理中队列索引前缀                   KEYS[7..] 脚本额外的key
+# ARGV 中的 zset 参数为 'main' / 'processing'
+# ---------------------------------------------------------------------------
+_LUA_INDEX_LIB = """
+local sig_prefix, main, delayed, processing = KEYS[1], KEYS[2], KEYS[4], KEYS[5]
+local zsets = {main = main, processing = processing}
+local index_prefix = {[main] = KEYS[3], [processing] = KEYS[6]}
+
+local function index_key(zset, symbol, stype)
+    local key = index_prefix[zset] .. ':idx:' .. symbol
+    if stype and stype ~= '' then
+        key = key .. ':' .. stype
+    end
+    return key
+end
+
+local function signal_meta(member)
+    local meta = redis.call('HMGET', sig_prefix .. member, 'symbol', 'type', 'retry_after')
+    return meta[1] or '', meta[2] or '', meta[3] and tonumber(meta[3]) or nil
+end
+
+local function index_add(zset, member)
+    local symbol, stype, retry_after = signal_meta(member)
+    redis.call('SADD', index_key(zset, symbol, stype), member)
+    if redis.call('SADD', index_key(zset, symbol), member) == 1 then
+        redis.call('HINCRBY', index_prefix[zset] .. ':symbols', symbol, 1)
+    end
+    if zset == main and retry_after then
+        redis.call('ZADD', delayed, retry_after, member)
+    end
+end
+
+-- known_symbol / known_type：信号HASH已过期时，调用方已知的标的和类型
+local function index_remove(zset, member, known_symbol, known_type)
+    local symbol, stype = signal_meta(member)
+    if symbol == '' then
+        symbol, stype = known_symbol or '', known_type or ''
+    end
+    if stype ~= '' then
+        redis.call('SREM', index_key(zset, symbol, stype), member)
+    end
+    if redis.call('SREM', index_key(zset, symbol), member) == 1 then
+        if redis.call('HINCRBY', index_prefix[zset] .. ':symbols', symbol, -1) <= 0 then
+            redis.call('HDEL', index_prefix[zset] .. ':symbols', symbol)
+        end
+    end
+    if zset == main then
+        redis.call('ZREM', delayed, member)
+    end
+end
+
+-- 标的（及类型）是否有真正待处理的信号：处理中，或在主队列且不在延迟中
+-- 只遍历该索引的成员；顺带清理被外部直接删除的陈旧索引
+local function pending_in(symbol, stype, now)
+    local processing_index = index_key(processing, symbol, stype)
+    for _, member in ipairs(redis.call('SMEMBERS', processing_index)) do
+        if redis.call('ZSCORE', processing, member) then
+            return 1
+        end
+        index_remove(processing, member, symbol, stype)
+        redis.call('SREM', processing_index, member)
+    end
+    local main_index = index_key(main, symbol, stype)
+    for _, member in ipairs(redis.call('SMEMBERS', main_index)) do
+        if redis.call('ZSCORE', main, member) then
+            local retry_after = redis.call('ZSCORE', delayed, member)
+            if not retry_after or tonumber(retry_after) <= now then
+                return 1
+            end
+        else
+            index_remove(main, member, symbol, stype)
+            redis.call('SREM', main_index, member)
+        end
+    end
+    return 0
+end
+"""
+
+_LUA_SCRIPTS = {
+    # ARGV: signal_id, score, ttl, field, value, ...
+    'publish': """
+local signal_id = ARGV[1]
+local sig_key = sig_prefix .. signal_id
+if redis.call('ZSCORE', main, signal_id) then
+    index_remove(main, signal_id)
+end
+redis.call('DEL', sig_key)
+redis.call('HSET', sig_key, unpack(ARGV, 4))
+redis.call('EXPIRE', sig_key, ARGV[3])
+local added = redis.call('ZADD', main, ARGV[2], signal_id)
+index_add(main, signal_id)
+return added
+""",
+    # ARGV: zset, signal_id, drop_payload(0/1)
+    'zrem': """
+local zset = zsets[ARGV[1]]
+local removed = redis.call('ZREM', zset, ARGV[2])
+index_remove(zset, ARGV[2])
+if ARGV[3] == '1' then
+    redis.call('DEL', sig_prefix .. ARGV[2])
+end
+return removed
+""",
+    # ARGV: signal_id, payload  去掉retry_after，保持原score
+    'wake': """
+if not redis.call('ZSCORE', main, ARGV[1]) then
+    return 0
+end
+redis.call('HSET', sig_prefix .. ARGV[1], 'payload', ARGV[2])
+redis.call('HDEL', sig_prefix .. ARGV[1], 'retry_after')
+redis.call('ZREM', delayed, ARGV[1])
+return 1
+""",
+    # ARGV: zset, symbol, type(空表示任意类型)  删除该标的（及类型）的全部信号
+    'remove_indexed': """
+local zset = zsets[ARGV[1]]
+local index = index_key(zset, ARGV[2], ARGV[3])
+local removed = 0
+for _, member in ipairs(redis.call('SMEMBERS', index)) do
+    removed = removed + redis.call('ZREM', zset, member)
+    index_remove(zset, member, ARGV[2], ARGV[3])
+    redis.call('SREM', index, member)
+    redis.call('DEL', sig_prefix .. member)
+end
+return removed
+""",
+    # ARGV: now, symbol, type(空表示任意类型)
+    'has_pending': """
+return pending_in(ARGV[2], ARGV[3], tonumber(ARGV[1]))
+""",
+    # KEYS[7..]: [positions], [twap_key, ...（每个状态标的一个）]
+    # ARGV: now, pair_count, has_positions(0/1), has_twap(0/1), symbol, type, ..., state_symbol, ...
+    # 准入检查：一次往返返回每个 (标的, 类型) 的待处理标记（类型为空表示任意类型），
+    # 以及每个状态标的的 TWAP 执行标记和持仓标记
+    'admission': """
+local now = tonumber(ARGV[1])
+local pair_end = 4 + tonumber(ARGV[2]) * 2
+local positions = ARGV[3] == '1' and KEYS[7] or nil
+local twap_offset = ARGV[3] == '1' and 7 or 6
+local result = {}
+for i = 5, pair_end, 2 do
+    table.insert(result, pending_in(ARGV[i], ARGV[i + 1], now))
+end
+for i = pair_end + 1, #ARGV do
+    local twap_key = ARGV[4] == '1' and KEYS[twap_offset + i - pair_end] or nil
+    table.insert(result, twap_key and redis.call('EXISTS', twap_key) or 0)
+    table.insert(result, positions and redis.call('SISMEMBER', positions, ARGV[i]) or 0)
+end
+return result
+""",
+    # ARGV: now, expire_before(ISO时间), max_delay_seconds, scan_limit
+    # 一次往返完成：丢弃过期信号、跳过未到retry_after的信号、
+    # 将第一个可用信号移入processing，并返回其payload和最近的唤醒时间
+    'consume': """
+local now = tonumber(ARGV[1])
+local expire_before = ARGV[2]
+local max_delay = tonumber(ARGV[3])
+local winner, winner_score, payload = '', '', ''
+local dropped = {}
+
+local entries = redis.call('ZRANGE', main, 0, tonumber(ARGV[4]) - 1, 'WITHSCORES')
+for i = 1, #entries, 2 do
+    local member = entries[i]
+    local meta = redis.call('HMGET', sig_prefix .. member, 'payload', 'queued_at', 'retry_after', 'symbol')
+    local queued_at = meta[2]
+    local retry_after = meta[3] and tonumber(meta[3]) or nil
+
+    local reason = nil
+    local is_delayed = false
+    if not meta[1] then
+        reason = 'missing'
+    elseif queued_at and queued_at ~= '' then
+        if not string.match(queued_at, '^%d%d%d%d%-%d%d%-%d%dT%d%d:%d%d:%d%d') then
+            reason = 'invalid'
+        elseif queued_at < expire_before then
+            reason = 'expired'
+        end
+    end
+    if not reason and retry_after and now < retry_after then
+        if retry_after - now > max_delay then
+            reason = 'over_delay'
+        else
+            is_delayed = true
+        end
+    end
+
+    if reason then
+        redis.call('ZREM', main, member)
+        index_remove(main, member)
+        redis.call('DEL', sig_prefix .. member)
+        table.insert(dropped, reason)
+        table.insert(dropped, meta[4] or '')
+        table.insert(dropped, meta[3] or '')
+    elseif not is_delayed then
+        redis.call('ZREM', main, member)
+        index_remove(main, member)
+        redis.call('ZADD', processing, ARGV[1], member)
+        index_add(processing, member)
+        winner, winner_score, payload = member, entries[i + 1], meta[1]
+        break
+    end
+end
+
+local next_wake = redis.call('ZRANGEBYSCORE', delayed, '(' .. ARGV[1], '+inf', 'WITHSCORES', 'LIMIT', 0, 1)
+local result = {winner, winner_score, payload, next_wake[2] or ''}
+for _, value in ipairs(dropped) do
+    table.insert(result, value)
+end
+return result
+""",
+    # 校验标的计数：以索引集合中仍在队列里的成员为准修正 :symbols，返回待处理的标的
+    # （成员被外部直接删除、或信号HASH已过期时计数会漂移）
+    'pending_symbols': """
+local symbols = {}
+for _, zset in ipairs({main, processing}) do
+    local counts = index_prefix[zset] .. ':symbols'
+    for _, symbol in ipairs(redis.call('HKEYS', counts)) do
+        local index = index_key(zset, symbol)
+        local live = 0
+        for _, member in ipairs(redis.call('SMEMBERS', index)) do
+            if redis.call('ZSCORE', zset, member) then
+                live = live + 1
+            else
+                local _, stype = signal_meta(member)
+                if stype ~= '' then
+                    redis.call('SREM', index_key(zset, symbol, stype), member)
+                end
+                redis.call('SREM', index, member)
+            end
+        end
+        if live > 0 then
+            redis.call('HSET', counts, symbol, live)
+            symbols[symbol] = true
+        else
+            redis.call('HDEL', counts, symbol)
+        end
+    end
+end
+local result = {}
+for symbol in pairs(symbols) do
+    table.insert(result, symbol)
+end
+return result
+""",
+    # ARGV: zset  为已有成员补建索引（幂等）
+    'reindex': """
+local zset = zsets[ARGV[1]]
+local members = redis.call('ZRANGE', zset, 0, -1)
+for _, member in ipairs(members) do
+    index_add(zset, member)
+end
+return #members
+""",
+    # ARGV: zset, old_member(JSON), signal_id, ttl, field, value, ...
+    # 旧结构迁移：JSON成员 -> signal_id成员 + 信号HASH（保持原score）
+    'migrate': """
+local zset = zsets[ARGV[1]]
+local score = redis.call('ZSCORE', zset, ARGV[2])
+if not score then
+    return 0
+end
+local sig_key = sig_prefix .. ARGV[3]
+redis.call('ZREM', zset, ARGV[2])
+redis.call('DEL', sig_key)
+redis.call('HSET', sig_key, unpack(ARGV, 5))
+redis.call('EXPIRE', sig_key, ARGV[4])
+redis.call('ZADD', zset, score, ARGV[3])
+return 1
+""",
+}
+
+# 存储结构版本（结构变化时递增，触发自动迁移和索引重建）
+INDEX_VERSION = "3"
+
+
+def _hash_tagged(key: str) -> str:
+    """带哈希标签的key命名空间：已含 {tag} 时原样返回，否则整体作为标签"""
+    start = key.find('{')
+    if start != -1 and key.find('}', start + 2) != -1:
+        return key
+    return f"{{{key}}}"
+
+# 信号HASH的兜底过期时间（防止异常中断后遗留孤儿数据，需大于最大延迟时间）
+PAYLOAD_TTL_SECONDS = 7 * 24 * 3600
+
+
+def _json_default(obj):
+    """将Decimal等特殊类型转换为JSON可序列化的格式"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
 
 class SignalQueue:
     """
@@ -21,13 +347,14 @@ class SignalQueue:
     使用Redis ZSET实现优先级队列：
     - key: trading:signals (主队列)
     - score: -priority (负数，越大越优先)
-    - value: JSON序列化的信号数据
+    - value: 稳定的signal_id，信号数据保存在独立的HASH中
 
     特性：
     - 优先级队列（高分信号优先执行）
     - 持久化（Redis AOF）
     - 原子操作（避免竞争）
     - 支持重试机制
+    - 二级索引（按标的/类型去重、延迟信号ZSET），去重检查单次往返
     """
 
     def __init__(
@@ -36,7 +363,10 @@ class SignalQueue:
         queue_key: str = "trading:signals",
         processing_key: str = "trading:signals:processing",
         failed_key: str = "trading:signals:failed",
-        max_retries: int = 3
+        max_retries: int = 3,
+        consume_scan_limit: int = 100,
+        zombie_check_interval: float = 60.0,
+        payload_codec: str = "json"
     ):
         """
         初始化信号队列
@@ -47,20 +377,50 @@ class SignalQueue:
             processing_key: 处理中队列key
             failed_key: 失败队列key
             max_retries: 最大重试次数
+            consume_scan_limit: 单次消费最多检查的信号数量（跳过延迟信号）
+            zombie_check_interval: 自动恢复僵尸信号的最小间隔（秒）
+            payload_codec: 信号数据编码 ('json' 或 'orjson')
+                orjson 更快，但会把 NaN 编码为 null；两种编码可互相读取
         """
         self.redis_url = redis_url
         self.queue_key = queue_key
         self.processing_key = processing_key
         self.failed_key = failed_key
         self.max_retries = max_retries
+        self.consume_scan_limit = consume_scan_limit
+        self.zombie_check_interval = zombie_check_interval
+
+        if payload_codec == "orjson" and orjson is None:
+            logger.warning("⚠️ orjson未安装，信号数据改用json编码")
+            payload_codec = "json"
+        self.payload_codec = payload_codec
+
+        # 信号HASH、延迟信号索引（score = retry_after）和二级索引都在同一个哈希标签下
+        self.key_namespace = _hash_tagged(queue_key)
+        self.signal_key_prefix = f"{self.key_namespace}:sig:"
+        self.delayed_key = f"{self.key_namespace}:delayed"
+        self._index_prefix = {
+            'main': f"{self.key_namespace}:main",
+            'processing': f"{self.key_namespace}:processing",
+        }
+        self._index_version_key = f"{queue_key}:index_version"
+        if key_slot(processing_key.encode()) != key_slot(queue_key.encode()):
+            logger.debug(
+                f"信号队列 {queue_key} 与处理中队列 {processing_key} 不在同一个slot，"
+                f"Redis Cluster 下需使用相同的哈希标签"
+            )
 
         # 连接会在第一次使用时创建
         self._redis = None
+        self._scripts: Dict[str, object] = {}
+        self._indexes_ready = False
 
         # 日志限流：记录上次输出空队列日志的时间
         self._last_empty_log_time = 0
         # 最近一次仅遇到延迟信号时的最短等待提示（秒）
         self._last_delay_hint: Optional[float] = None
+        # 上次自动恢复僵尸信号的时间
+        self._last_zombie_check = 0.0
 
     async def _get_redis(self):
         """获取Redis连接（懒加载）"""
@@ -70,6 +430,17 @@ class SignalQueue:
                 encoding="utf-8",
                 decode_responses=True
             )
+
+        if not self._indexes_ready:
+            # 首次连接时检查存储版本，旧队列自动迁移并补建索引
+            self._indexes_ready = True
+            try:
+                version = await self._redis.get(self._index_version_key)
+                if version != INDEX_VERSION:
+                    await self.rebuild_indexes()
+            except Exception as e:
+                logger.warning(f"⚠️ 检查信号队列索引失败: {e}")
+
         return self._redis
 
     async def close(self):
@@ -77,6 +448,156 @@ class SignalQueue:
         if self._redis:
             await self._redis.close()
             self._redis = None
+            self._scripts = {}
+            self._indexes_ready = False
+
+    async def _run_script(self, name: str, keys: List[str], args: Optional[List] = None):
+        """执行Lua脚本（EVALSHA，脚本缺失时自动回退EVAL）"""
+        redis = await self._get_redis()
+        script = self._scripts.get(name)
+        if script is None:
+            script = redis.register_script(_LUA_INDEX_LIB + _LUA_SCRIPTS[name])
+            self._scripts[name] = script
+        return await script(keys=keys, args=args or [])
+
+    def _script_keys(self, *extra_keys: str) -> List[str]:
+        """Lua脚本的KEYS（固定布局，见文件开头说明）"""
+        return [
+            self.signal_key_prefix,
+            self.queue_key,
+            self._index_prefix['main'],
+            self.delayed_key,
+            self.processing_key,
+            self._index_prefix['processing'],
+            *extra_keys,
+        ]
+
+    def _zset_name(self, zset_key: str) -> str:
+        return 'main' if zset_key == self.queue_key else 'processing'
+
+    async def _zrem(self, zset_key: str, signal_id: str, drop_payload: bool = False) -> int:
+        """ZREM并同步更新索引，drop_payload=True时同时删除信号数据"""
+        return await self._run_script(
+            'zrem', self._script_keys(), [self._zset_name(zset_key), signal_id, int(drop_payload)]
+        )
+
+    def _signal_fields(self, signal: Dict, payload: str) -> List:
+        """信号HASH字段（payload + Lua脚本需要读取的元数据）"""
+        fields = [
+            'payload', payload,
+            'symbol', signal.get('symbol') or '',
+            'type', signal.get('type') or '',
+            'queued_at', signal.get('queued_at') or '',
+        ]
+        if signal.get('retry_after') is not None:
+            fields += ['retry_after', float(signal['retry_after'])]
+        return fields
+
+    async def _load_signals(self, signal_ids: List[str]) -> List[Optional[Dict]]:
+        """批量读取信号数据（一次往返），缺失的返回None"""
+        if not signal_ids:
+            return []
+
+        redis = await self._get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for signal_id in signal_ids:
+            pipe.hget(f"{self.signal_key_prefix}{signal_id}", 'payload')
+        payloads = await pipe.execute()
+
+        signals = []
+        for payload in payloads:
+            try:
+                signals.append(self._deserialize_signal(payload) if payload else None)
+            except Exception as e:
+                logger.warning(f"⚠️ 解析信号数据失败: {e}")
+                signals.append(None)
+        return signals
+
+    async def rebuild_indexes(self) -> int:
+        """
+        迁移旧结构并重建二级索引
+
+        旧版本直接以JSON作为ZSET成员，这里会为其分配signal_id、写入信号HASH；
+        也可用于修复被外部直接修改的队列。
+
+        Returns:
+            int: 重建索引的信号数量
+        """
+        try:
+            redis = await self._get_redis()
+
+            migrated = 0
+            for zset_key in (self.queue_key, self.processing_key):
+                migrated += await self._migrate_legacy_members(zset_key)
+            if migrated:
+                logger.info(f"🔧 已迁移 {migrated} 个旧格式信号")
+
+            await self._migrate_legacy_payloads()
+
+            # 删除全部索引（含旧版本未带哈希标签的索引key）后按当前成员重建
+            legacy_prefixes = (self.queue_key, self.processing_key)
+            stale_keys = [self.delayed_key, f"{self.queue_key}:delayed"]
+            for prefix in (*self._index_prefix.values(), *legacy_prefixes):
+                stale_keys.append(f"{prefix}:symbols")
+                async for key in redis.scan_iter(match=f"{prefix}:idx:*", count=500):
+                    stale_keys.append(key)
+            await redis.delete(*stale_keys)
+
+            count = 0
+            for zset in self._index_prefix:
+                count += await self._run_script('reindex', self._script_keys(), [zset])
+
+            await redis.set(self._index_version_key, INDEX_VERSION)
+            logger.info(f"🔧 信号队列索引已重建: {count} 个信号")
+            return count
+
+        except Exception as e:
+            logger.error(f"❌ 重建信号队列索引失败: {e}")
+            return 0
+
+    async def _migrate_legacy_members(self, zset_key: str) -> int:
+        """将旧格式（JSON成员）迁移为 signal_id + 信号HASH"""
+        redis = await self._get_redis()
+        migrated = 0
+
+        for member in await redis.zrange(zset_key, 0, -1):
+            if not member.startswith('{'):
+                continue
+            try:
+                signal = self._deserialize_signal(member)
+            except Exception as e:
+                logger.warning(f"⚠️ 无法解析旧格式信号，直接删除: {e}")
+                await redis.zrem(zset_key, member)
+                continue
+
+            signal_id = signal.get('signal_id') or uuid.uuid4().hex
+            signal['signal_id'] = signal_id
+            payload = self._serialize_signal(signal)
+            migrated += await self._run_script(
+                'migrate',
+                self._script_keys(),
+                [self._zset_name(zset_key), member, signal_id, PAYLOAD_TTL_SECONDS,
+                 *self._signal_fields(signal, payload)]
+            )
+
+        return migrated
+
+    async def _migrate_legacy_payloads(self) -> int:
+        """将旧版本（未带哈希标签）的信号HASH重命名到当前前缀下"""
+        legacy_prefix = f"{self.queue_key}:sig:"
+        if legacy_prefix == self.signal_key_prefix:
+            return 0
+
+        redis = await self._get_redis()
+        moved = 0
+        for zset_key in (self.queue_key, self.processing_key):
+            for signal_id in await redis.zrange(zset_key, 0, -1):
+                if await redis.exists(f"{legacy_prefix}{signal_id}"):
+                    await redis.rename(f"{legacy_prefix}{signal_id}", f"{self.signal_key_prefix}{signal_id}")
+                    moved += 1
+        if moved:
+            logger.info(f"🔧 已迁移 {moved} 个信号数据到 {self.signal_key_prefix}")
+        return moved
 
     def _serialize_signal(self, signal: Dict) -> str:
         """
@@ -84,17 +605,25 @@ class SignalQueue:
 
         将Decimal等特殊类型转换为JSON可序列化的格式
         """
-        def decimal_default(obj):
-            if isinstance(obj, Decimal):
-                return float(obj)
-            elif isinstance(obj, datetime):
-                return obj.isoformat()
-            raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-
-        return json.dumps(signal, default=decimal_default, ensure_ascii=False)
+        if self.payload_codec == "orjson":
+            try:
+                return orjson.dumps(
+                    signal,
+                    default=_json_default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                ).decode()
+            except TypeError:
+                pass  # orjson不支持的类型，回退json
+
+        return json.dumps(signal, default=_json_default, ensure_ascii=False)
 
     def _deserialize_signal(self, signal_json: str) -> Dict:
         """反序列化信号数据"""
+        if orjson is not None:
+            try:
+                return orjson.loads(signal_json)
+            except ValueError:
+                pass  # json编码的NaN等，回退json
         return json.loads(signal_json)
 
     async def publish_signal(
@@ -118,12 +647,14 @@ class SignalQueue:
             bool: 是否成功发布
         """
         try:
-            redis = await self._get_redis()
-
             # 添加元数据
             signal['queued_at'] = datetime.now().isoformat()
             signal['retry_count'] = signal.get('retry_count', 0)
 
+            # 稳定ID：重试/延迟重新入队时保持不变
+            signal_id = signal.get('signal_id') or uuid.uuid4().hex
+            signal['signal_id'] = signal_id
+
             # 确定优先级（使用负数，因为ZSET按score升序排列）
             if priority is None:
                 priority = signal.get('score', 0)
@@ -132,19 +663,18 @@ class SignalQueue:
             score = -priority + (time.time() % 1) * 0.00001
 
             # 序列化信号
-            signal_json = self._serialize_signal(signal)
+            payload = self._serialize_signal(signal)
 
-            # 使用ZADD添加到有序集合
-            result = await redis.zadd(
-                self.queue_key,
-                {signal_json: score},
-                nx=False  # 允许更新已存在的信号
+            # 写入信号HASH + ZADD + 索引（一次往返）
+            result = await self._run_script(
+                'publish',
+                self._script_keys(),
+                [signal_id, score, PAYLOAD_TTL_SECONDS, *self._signal_fields(signal, payload)]
             )
 
             logger.debug(
                 f"✅ 信号已发布到队列: {signal['symbol']}, "
-                f"优先级={priority}, score={score:.6f}, "
-                f"队列长度={await self.get_queue_size()}"
+                f"优先级={priority}, score={score:.6f}"
             )
 
             return result is not None
@@ -179,9 +709,15 @@ class SignalQueue:
             if not processing_signals:
                 return 0
 
+            signals = await self._load_signals([signal_id for signal_id, _ in processing_signals])
+
             recovered_count = 0
-            for signal_json, score in processing_signals:
-                signal = self._deserialize_signal(signal_json)
+            for (signal_id, score), signal in zip(processing_signals, signals, strict=True):
+                if signal is None:
+                    # 信号数据已丢失，无法恢复
+                    await self._zrem(self.processing_key, signal_id, drop_payload=True)
+                    continue
+
                 symbol = signal.get('symbol', 'N/A')
 
                 # 计算已经处理的时间
@@ -193,7 +729,7 @@ class SignalQueue:
                 )
 
                 # 从processing队列移除
-                await redis.zrem(self.processing_key, signal_json)
+                await self._zrem(self.processing_key, signal_id)
 
                 # 重新发布到主队列（保持原优先级）
                 original_priority = signal.get('score', 0)
@@ -210,6 +746,42 @@ class SignalQueue:
             logger.error(f"❌ 恢复僵尸信号失败: {e}")
             return 0
 
+    async def requeue_processing_signals(self, priority_penalty: int = 0) -> int:
+        """
+        将处理中队列的全部信号移回主队列（维护工具的恢复模式）
+
+        信号保持原signal_id，索引与信号数据同步更新；数据已丢失的信号直接清理。
+
+        Args:
+            priority_penalty: 重新入队时降低的优先级
+
+        Returns:
+            int: 移回主队列的信号数量
+        """
+        try:
+            redis = await self._get_redis()
+            signal_ids = await redis.zrange(self.processing_key, 0, -1)
+            signals = await self._load_signals(signal_ids)
+
+            moved = 0
+            for signal_id, signal in zip(signal_ids, signals, strict=True):
+                if signal is None:
+                    await self._zrem(self.processing_key, signal_id, drop_payload=True)
+                    continue
+
+                signal['signal_id'] = signal_id
+                await self._zrem(self.processing_key, signal_id)
+                await self.publish_signal(signal, priority=signal.get('score', 0) - priority_penalty)
+                moved += 1
+
+            if moved:
+                logger.info(f"✅ 已将 {moved} 个处理中信号移回主队列")
+            return moved
+
+        except Exception as e:
+            logger.error(f"❌ 移回处理中信号失败: {e}")
+            return 0
+
     async def consume_signal(
         self,
         timeout: Optional[float] = None,
@@ -220,9 +792,12 @@ class SignalQueue:
         """
         从队列消费一个信号（优先级最高的）
 
+        过期丢弃、延迟跳过、移入processing队列在同一个Lua脚本中完成（单次往返），
+        多个执行器并发消费时不会重复取到同一个信号。
+
         Args:
             timeout: 超时时间（秒），None表示立即返回
-            auto_recover: 是否自动恢复僵尸信号
+            auto_recover: 是否自动恢复僵尸信号（按zombie_check_interval限频）
             signal_ttl_seconds: 信号过期时间（秒），超过此时间的信号将被丢弃
             max_delay_seconds: 延迟信号最大等待时间（秒），超过此时间的延迟信号将被丢弃
 
@@ -230,167 +805,94 @@ class SignalQueue:
             Dict: 信号数据，如果队列为空返回None
         """
         try:
-            redis = await self._get_redis()
-
-            # 自动恢复僵尸信号（每次消费前检查）
-            if auto_recover:
+            # 自动恢复僵尸信号（限频，避免每次消费都扫描processing队列）
+            now = time.time()
+            if auto_recover and now - self._last_zombie_check >= self.zombie_check_interval:
+                self._last_zombie_check = now
                 await self.recover_zombie_signals(timeout_seconds=300)
 
-            # 🔥 尝试多次获取可用信号（避免单个信号的无限循环）
-            max_attempts = 10  # 最多尝试10次
-            skipped_signals = []  # 记录被跳过的信号
-
-            min_wait_seconds: Optional[float] = None
-
-            for attempt in range(max_attempts):
-                # 使用ZPOPMIN获取最高优先级（最低负分）的信号
-                # 因为score是负数，最小的score（如-65）对应最高的优先级（65）
-                result = await redis.zpopmin(self.queue_key, count=1)
+            now = time.time()
+            expire_before = (datetime.now() - timedelta(seconds=signal_ttl_seconds)).isoformat()
+            result = await self._run_script(
+                'consume',
+                self._script_keys(),
+                [now, expire_before, max_delay_seconds, self.consume_scan_limit]
+            )
 
-                if not result:
-                    # 队列为空，将之前跳过的信号放回
-                    for sig_json, sig_score in skipped_signals:
-                        await redis.zadd(self.queue_key, {sig_json: sig_score})
+            signal_id, score, payload, next_wake = result[:4]
+            self._log_dropped_signals(result[4:], now, signal_ttl_seconds, max_delay_seconds)
+
+            if not signal_id:
+                # 🔥 暂无可处理信号，记录最近的唤醒时间供调用方休眠
+                if next_wake:
+                    self._last_delay_hint = max(0.0, float(next_wake) - now)
+                    # 日志限流：最多每30秒记录一次，避免刷屏
+                    if now - self._last_empty_log_time >= 30:
+                        logger.debug(
+                            f"⏰ 队列中的信号都未到重试时间，"
+                            f"最短还需等待{self._last_delay_hint:.0f}秒"
+                        )
+                        self._last_empty_log_time = now
+                else:
                     self._last_delay_hint = None
-                    return None
-
-                signal_json, score = result[0]
-                signal = self._deserialize_signal(signal_json)
+                return None
 
-                # 🔥 检查信号是否已过期（基于queued_at时间）
-                queued_at_str = signal.get('queued_at')
-                if queued_at_str:
-                    try:
-                        queued_at = datetime.fromisoformat(queued_at_str)
-                        signal_age = (datetime.now() - queued_at).total_seconds()
-
-                        if signal_age > signal_ttl_seconds:
-                            logger.warning(
-                                f"⏰ 信号已过期（{signal_age/60:.1f}分钟 > {signal_ttl_seconds/60:.1f}分钟）: "
-                                f"{signal.get('symbol')}，直接丢弃"
-                            )
-                            # 不放回队列，直接丢弃，继续获取下一个
-                            continue
-                    except Exception as e:
-                        logger.warning(f"⚠️ 解析信号时间失败: {e}，跳过此信号")
-                        continue
-
-                # 检查是否需要延迟处理
-                if 'retry_after' in signal:
-                    if time.time() < signal['retry_after']:
-                        # 🔥 新增：检查信号总存在时间（防止信号长期停留）
-                        if queued_at_str:
-                            try:
-                                queued_at = datetime.fromisoformat(queued_at_str)
-                                total_age = (datetime.now() - queued_at).total_seconds()
-
-                                # 如果信号总存在时间超过TTL，直接丢弃（即使还在延迟期）
-                                if total_age > signal_ttl_seconds:
-                                    logger.warning(
-                                        f"⏰ 延迟信号已存在过久（{total_age/60:.1f}分钟 > {signal_ttl_seconds/60:.1f}分钟），直接丢弃: "
-                                        f"{signal.get('symbol')} (retry_after还剩{(signal['retry_after']-time.time())/60:.1f}分钟)"
-                                    )
-                                    continue
-                            except Exception as e:
-                                logger.warning(f"⚠️ 解析延迟信号时间失败: {e}")
-
-                        # 🔥 检查剩余延迟时间是否超过最大等待时间
-                        delay_duration = signal['retry_after'] - time.time()
-
-                        if delay_duration > max_delay_seconds:
-                            logger.warning(
-                                f"⏰ 延迟信号超过最大等待时间（{delay_duration/60:.1f}分钟 > {max_delay_seconds/60:.1f}分钟），直接丢弃: "
-                                f"{signal.get('symbol')}"
-                            )
-                            # 不放回队列，直接丢弃
-                            continue
-
-                        # 未到重试时间，记录并继续尝试下一个
-                        skipped_signals.append((signal_json, score))
-                        wait_seconds = max(0.0, signal['retry_after'] - time.time())
-                        if min_wait_seconds is None or wait_seconds < min_wait_seconds:
-                            min_wait_seconds = wait_seconds
-
-                        # 只在第一次遇到时记录日志（避免刷屏）
-                        if len(skipped_signals) == 1:
-                            retry_in = signal['retry_after'] - time.time()
-                            logger.debug(
-                                f"⏰ 信号未到重试时间，尝试获取其他信号: {signal.get('symbol')} "
-                                f"(还需等待{retry_in:.0f}秒)"
-                            )
-                        continue
-
-                # 找到可用信号，将之前跳过的信号放回队列
-                for sig_json, sig_score in skipped_signals:
-                    await redis.zadd(self.queue_key, {sig_json: sig_score})
-
-                # 保存原始JSON（用于后续删除）
-                # ⚠️ 重要：必须使用原始JSON，因为signal对象会被修改
-                signal['_original_json'] = signal_json
+            signal = self._deserialize_signal(payload)
+            signal['signal_id'] = signal_id
 
-                # 添加处理时间戳
-                signal['processing_started_at'] = datetime.now().isoformat()
+            # 添加处理时间戳
+            signal['processing_started_at'] = datetime.now().isoformat()
 
-                # 移到处理中队列（用于监控和恢复）
-                # ⚠️ 使用原始JSON，而非修改后的signal
-                await redis.zadd(
-                    self.processing_key,
-                    {signal_json: time.time()}
-                )
-
-                logger.debug(
-                    f"📥 从队列消费信号: {signal['symbol']}, "
-                    f"优先级={-score:.0f}, "
-                    f"剩余队列长度={await self.get_queue_size()}"
-                )
-
-                self._last_delay_hint = None
-                return signal
-
-            # 🔥 所有信号都未到重试时间，将它们放回队列
-            for sig_json, sig_score in skipped_signals:
-                await redis.zadd(self.queue_key, {sig_json: sig_score})
-
-            if skipped_signals:
-                # 日志限流：最多每30秒记录一次，避免刷屏
-                current_time = time.time()
-                if current_time - self._last_empty_log_time >= 30:
-                    logger.debug(
-                        f"⏰ 队列中所有信号({len(skipped_signals)}个)都未到重试时间，暂无可处理信号"
-                    )
-                    self._last_empty_log_time = current_time
-
-                if min_wait_seconds is not None:
-                    self._last_delay_hint = max(0.0, min_wait_seconds)
-                else:
-                    self._last_delay_hint = None
-            else:
-                self._last_delay_hint = None
+            logger.debug(
+                f"📥 从队列消费信号: {signal['symbol']}, "
+                f"优先级={-float(score):.0f}"
+            )
 
-            return None
+            self._last_delay_hint = None
+            return signal
 
         except Exception as e:
             logger.error(f"❌ 消费信号失败: {e}")
             return None
 
+    def _log_dropped_signals(
+        self,
+        dropped: List[str],
+        now: float,
+        signal_ttl_seconds: int,
+        max_delay_seconds: int
+    ):
+        """记录消费脚本丢弃的信号（reason, symbol, retry_after 三个一组）"""
+        for reason, symbol, retry_after in zip(dropped[::3], dropped[1::3], dropped[2::3], strict=True):
+            if reason == 'expired':
+                logger.warning(
+                    f"⏰ 信号已过期（> {signal_ttl_seconds/60:.1f}分钟）: "
+                    f"{symbol}，直接丢弃"
+                )
+            elif reason == 'over_delay':
+                delay_duration = float(retry_after) - now
+                logger.warning(
+                    f"⏰ 延迟信号超过最大等待时间（{delay_duration/60:.1f}分钟 > {max_delay_seconds/60:.1f}分钟），直接丢弃: "
+                    f"{symbol}"
+                )
+            elif reason == 'missing':
+                logger.warning(f"⚠️ 信号数据已丢失，跳过此信号: {symbol or 'N/A'}")
+            else:
+                logger.warning(f"⚠️ 解析信号时间失败: {symbol}，跳过此信号")
+
     async def mark_signal_completed(self, signal: Dict) -> bool:
         """
         标记信号处理完成
 
-        从processing队列中移除
+        从processing队列中移除，并删除信号数据
         """
         try:
-            redis = await self._get_redis()
+            signal_id = signal.get('signal_id')
+            if signal_id is None:
+                logger.warning(f"⚠️ 信号缺少signal_id，无法从processing队列删除: {signal.get('symbol')}")
+                return False
 
-            # ⚠️ 使用原始JSON删除，而非序列化修改后的signal
-            # signal对象可能被添加了processing_started_at等字段
-            signal_json = signal.get('_original_json')
-            if signal_json is None:
-                # 降级方案：如果没有原始JSON，使用序列化
-                logger.warning(f"⚠️ 信号缺少_original_json，使用降级方案")
-                signal_json = self._serialize_signal(signal)
-
-            result = await redis.zrem(self.processing_key, signal_json)
+            result = await self._zrem(self.processing_key, signal_id, drop_payload=True)
 
             if result > 0:
                 logger.debug(f"✅ 信号处理完成: {signal['symbol']}")
@@ -426,23 +928,22 @@ class SignalQueue:
         try:
             redis = await self._get_redis()
 
-            # ⚠️ 使用原始JSON删除
-            original_json = signal.get('_original_json')
-            if original_json is None:
-                logger.warning(f"⚠️ 信号缺少_original_json，使用降级方案")
-                original_json = self._serialize_signal(signal)
-
-            # 从processing队列移除
-            await redis.zrem(self.processing_key, original_json)
-
             # 增加重试计数
             retry_count = signal.get('retry_count', 0) + 1
             signal['retry_count'] = retry_count
             signal['last_error'] = error_message
             signal['failed_at'] = datetime.now().isoformat()
+            will_retry = retry and retry_count < self.max_retries
+
+            # 从processing队列移除（不再重试时同时删除信号数据）
+            signal_id = signal.get('signal_id')
+            if signal_id:
+                await self._zrem(self.processing_key, signal_id, drop_payload=not will_retry)
+            else:
+                logger.warning(f"⚠️ 信号缺少signal_id，无法从processing队列删除: {signal.get('symbol')}")
 
-            if retry and retry_count < self.max_retries:
-                # 重新入队（降低优先级）
+            if will_retry:
+                # 重新入队（降低优先级，保持signal_id不变）
                 original_priority = signal.get('score', 0)
                 new_priority = original_priority - (retry_count * 10)  # 每次重试降低10分
 
@@ -504,34 +1005,26 @@ class SignalQueue:
             bool: 是否成功重新入队
         """
         try:
-            redis = await self._get_redis()
-
             # 🔥 限制最大延迟时间（防止过长延迟）
             delay_minutes = min(delay_minutes, max_delay_minutes)
 
-            # ⚠️ 使用原始JSON从processing队列删除
-            original_json = signal.get('_original_json')
-            if original_json:
+            # 从processing队列删除（信号数据保留，随后以同一signal_id重新发布）
+            signal_id = signal.get('signal_id')
+            if signal_id:
                 try:
-                    await redis.zrem(self.processing_key, original_json)
+                    await self._zrem(self.processing_key, signal_id)
                 except:
                     pass
 
-            # 🔥 删除主队列中该标的的旧信号（防止重复）
+            # 🔥 删除主队列中该标的的旧信号（防止重复，通过索引定位）
             symbol = signal.get('symbol')
             signal_type = signal.get('type')
             if symbol:
-                # 获取主队列中的所有信号
-                all_signals = await redis.zrange(self.queue_key, 0, -1)
-                for sig_json in all_signals:
-                    try:
-                        sig = self._deserialize_signal(sig_json)
-                        # 如果是同一标的且同一类型，删除
-                        if sig.get('symbol') == symbol and sig.get('type') == signal_type:
-                            await redis.zrem(self.queue_key, sig_json)
-                            logger.debug(f"🗑️ 删除旧信号: {symbol} {signal_type}")
-                    except:
-                        pass
+                removed = await self._run_script(
+                    'remove_indexed', self._script_keys(), ['main', symbol, signal_type or '']
+                )
+                if removed:
+                    logger.debug(f"🗑️ 删除旧信号: {symbol} {signal_type} x{removed}")
 
             # 设置重试时间戳
             signal['retry_after'] = time.time() + (delay_minutes * 60)
@@ -594,13 +1087,46 @@ class SignalQueue:
             # ZRANGE获取score最大的一个（因为用负数，最大=-最低）
             result = await redis.zrange(self.queue_key, -1, -1, withscores=True)
             if result:
-                signal_json, score = result[0]
+                signal_id, score = result[0]
                 return -score  # 转回正数
             return 0
         except Exception as e:
             logger.error(f"❌ 获取队列最低分数失败: {e}")
             return 0
 
+    async def peek_signal(self) -> Optional[Dict]:
+        """
+        查看下一个可消费的信号（不移出队列，跳过未到重试时间的延迟信号）
+
+        供执行器在普通通道已满时判断队首是否为止损等紧急信号。
+
+        Returns:
+            Dict: 信号数据（含queue_priority），没有可消费信号返回None
+        """
+        try:
+            redis = await self._get_redis()
+            entries = await redis.zrange(
+                self.queue_key, 0, self.consume_scan_limit - 1, withscores=True
+            )
+            if not entries:
+                return None
+
+            retry_after = await redis.zmscore(self.delayed_key, [member for member, _ in entries])
+            now = time.time()
+            for (signal_id, score), retry_at in zip(entries, retry_after, strict=True):
+                if retry_at is not None and retry_at > now:
+                    continue
+                signal = (await self._load_signals([signal_id]))[0]
+                if signal is None:
+                    continue
+                signal['signal_id'] = signal_id
+                signal['queue_priority'] = -score
+                return signal
+            return None
+        except Exception as e:
+            logger.error(f"❌ 查看队首信号失败: {e}")
+            return None
+
     async def get_all_signals(self, limit: int = 100) -> List[Dict]:
         """
         获取队列中所有信号（用于监控）
@@ -623,8 +1149,10 @@ class SignalQueue:
             )
 
             signals = []
-            for signal_json, score in results:
-                signal = self._deserialize_signal(signal_json)
+            loaded = await self._load_signals([signal_id for signal_id, _ in results])
+            for (_signal_id, score), signal in zip(results, loaded, strict=True):
+                if signal is None:
+                    continue
                 signal['queue_priority'] = -score
                 signals.append(signal)
 
@@ -634,6 +1162,31 @@ class SignalQueue:
             logger.error(f"❌ 获取所有信号失败: {e}")
             return []
 
+    async def get_processing_signals(self) -> List[Dict]:
+        """
+        获取处理中队列的信号（用于监控和手动恢复）
+
+        Returns:
+            List[Dict]: 信号列表，附带 processing_since（开始处理时间戳）
+        """
+        try:
+            redis = await self._get_redis()
+            results = await redis.zrange(self.processing_key, 0, -1, withscores=True)
+
+            signals = []
+            loaded = await self._load_signals([signal_id for signal_id, _ in results])
+            for (_signal_id, started_at), signal in zip(results, loaded, strict=True):
+                if signal is None:
+                    continue
+                signal['processing_since'] = started_at
+                signals.append(signal)
+
+            return signals
+
+        except Exception as e:
+            logger.error(f"❌ 获取处理中信号失败: {e}")
+            return []
+
     async def clear_queue(self, queue_type: str = "main") -> int:
         """
         清空队列（危险操作，仅用于测试或维护）
@@ -649,10 +1202,14 @@ class SignalQueue:
             count = 0
 
             if queue_type in ('main', 'all'):
+                await self._delete_payloads(self.queue_key)
                 count += await redis.delete(self.queue_key)
+                await self._delete_indexes('main', self.delayed_key)
 
             if queue_type in ('processing', 'all'):
+                await self._delete_payloads(self.processing_key)
                 count += await redis.delete(self.processing_key)
+                await self._delete_indexes('processing')
 
             if queue_type in ('failed', 'all'):
                 count += await redis.delete(self.failed_key)
@@ -664,6 +1221,22 @@ class SignalQueue:
             logger.error(f"❌ 清空队列失败: {e}")
             return 0
 
+    async def _delete_payloads(self, zset_key: str):
+        """删除某个ZSET中全部信号的数据HASH"""
+        redis = await self._get_redis()
+        signal_ids = await redis.zrange(zset_key, 0, -1)
+        for i in range(0, len(signal_ids), 500):
+            await redis.delete(*(f"{self.signal_key_prefix}{signal_id}" for signal_id in signal_ids[i:i + 500]))
+
+    async def _delete_indexes(self, zset: str, *extra_keys: str):
+        """删除主队列（'main'）或处理中队列（'processing'）的全部索引key"""
+        redis = await self._get_redis()
+        prefix = self._index_prefix[zset]
+        keys = [f"{prefix}:symbols", *extra_keys]
+        async for key in redis.scan_iter(match=f"{prefix}:idx:*", count=500):
+            keys.append(key)
+        await redis.delete(*keys)
+
     async def get_stats(self) -> Dict:
         """
         获取队列统计信息
@@ -693,39 +1266,67 @@ class SignalQueue:
             bool: 是否存在真正待处理的信号
         """
         try:
-            redis = await self._get_redis()
-
-            # 检查主队列
-            main_signals = await redis.zrange(self.queue_key, 0, -1)
-            for signal_json in main_signals:
-                signal = self._deserialize_signal(signal_json)
-                if signal.get('symbol') == symbol:
-                    if signal_type is None or signal.get('type') == signal_type:
-                        # 🔥 关键修复：排除延迟信号
-                        retry_after = signal.get('retry_after')
-                        if retry_after and time.time() < retry_after:
-                            # 这是延迟信号，不应阻止新信号生成
-                            logger.debug(
-                                f"  排除延迟信号: {symbol} "
-                                f"(还需等待{int(retry_after - time.time())}秒)"
-                            )
-                            continue
-                        return True
-
-            # 检查处理中队列
-            processing_signals = await redis.zrange(self.processing_key, 0, -1)
-            for signal_json in processing_signals:
-                signal = self._deserialize_signal(signal_json)
-                if signal.get('symbol') == symbol:
-                    if signal_type is None or signal.get('type') == signal_type:
-                        return True
-
-            return False
+            # 🔥 通过 (标的, 类型) 索引在一次往返内完成检查，
+            # 主队列中的延迟信号（retry_after未到）由延迟索引排除
+            result = await self._run_script(
+                'has_pending', self._script_keys(), [time.time(), symbol, signal_type or '']
+            )
+            return bool(result)
 
         except Exception as e:
             logger.error(f"❌ 检查待处理信号失败: {e}")
             return False
 
+    async def check_admission(
+        self,
+        pending: Iterable[Tuple[str, Optional[str]]],
+        symbols: Sequence[str] = (),
+        positions_key: Optional[str] = None,
+        twap_key_prefix: Optional[str] = None,
+    ) -> Dict:
+        """
+        批量准入检查：一次Lua调用完成全部待处理信号 / TWAP / 持仓检查
+
+        Args:
+            pending: 需要检查待处理信号的 (标的, 信号类型) 列表，类型为None表示任意类型
+            symbols: 需要检查TWAP执行和持仓状态的标的
+            positions_key: 持仓标的SET的key（RedisPositionManager.positions_key）
+            twap_key_prefix: TWAP执行标记的key前缀（后接标的代码）
+
+        Returns:
+            Dict: {'pending': {(标的, 类型): bool}, 'twap': set, 'positions': set}
+            检查失败时全部视为False（与 has_pending_signal 一致，允许继续）
+        """
+        pairs = list(dict.fromkeys((symbol, signal_type) for symbol, signal_type in pending))
+        symbols = list(dict.fromkeys(symbols))
+        state = {'pending': dict.fromkeys(pairs, False), 'twap': set(), 'positions': set()}
+        if not pairs and not symbols:
+            return state
+
+        extra_keys = [positions_key] if positions_key else []
+        if twap_key_prefix:
+            extra_keys.extend(f"{twap_key_prefix}{symbol}" for symbol in symbols)
+        args = [time.time(), len(pairs), int(bool(positions_key)), int(bool(twap_key_prefix))]
+        for symbol, signal_type in pairs:
+            args.extend((symbol, signal_type or ''))
+        args.extend(symbols)
+
+        try:
+            flags = await self._run_script('admission', self._script_keys(*extra_keys), args)
+        except Exception as e:
+            logger.error(f"❌ 批量准入检查失败: {e}")
+            return state
+
+        for pair, flag in zip(pairs, flags[:len(pairs)], strict=True):
+            state['pending'][pair] = bool(flag)
+        state_flags = flags[len(pairs):]
+        for symbol, twap, held in zip(symbols, state_flags[0::2], state_flags[1::2], strict=True):
+            if twap:
+                state['twap'].add(symbol)
+            if held:
+                state['positions'].add(symbol)
+        return state
+
     async def get_pending_symbols(self) -> set:
         """
         获取队列中所有待处理的标的代码（用于快速去重）
@@ -734,22 +1335,8 @@ class SignalQueue:
             set: 标的代码集合
         """
         try:
-            redis = await self._get_redis()
-            symbols = set()
-
-            # 主队列
-            main_signals = await redis.zrange(self.queue_key, 0, -1)
-            for signal_json in main_signals:
-                signal = self._deserialize_signal(signal_json)
-                symbols.add(signal.get('symbol'))
-
-            # 处理中队列
-            processing_signals = await redis.zrange(self.processing_key, 0, -1)
-            for signal_json in processing_signals:
-                signal = self._deserialize_signal(signal_json)
-                symbols.add(signal.get('symbol'))
-
-            return symbols
+            # 主队列 + 处理中队列的标的计数，按索引集合校验后返回（一次往返）
+            return set(await self._run_script('pending_symbols', self._script_keys()))
 
         except Exception as e:
             logger.error(f"❌ 获取待处理标的失败: {e}")
@@ -767,22 +1354,12 @@ class SignalQueue:
         """
         try:
             redis = await self._get_redis()
-            count = 0
-
-            # 遍历主队列中的所有信号
-            signals = await redis.zrange(self.queue_key, 0, -1)
-            for signal_json in signals:
-                signal = self._deserialize_signal(signal_json)
 
-                # 如果指定了账号，则过滤
-                if account and signal.get('account') != account:
-                    continue
+            if not account:
+                # 延迟索引按retry_after排序，直接计数
+                return await redis.zcount(self.delayed_key, f"({time.time()}", '+inf')
 
-                # 检查是否有retry_after字段
-                if 'retry_after' in signal and signal['retry_after'] > time.time():
-                    count += 1
-
-            return count
+            return len(await self.get_delayed_signals(account))
 
         except Exception as e:
             logger.error(f"❌ 统计延迟信号失败: {e}")
@@ -804,35 +1381,35 @@ class SignalQueue:
             redis = await self._get_redis()
             woken_count = 0
 
-            # 遍历主队列中的所有信号
-            signals = await redis.zrange(self.queue_key, 0, -1, withscores=True)
+            # 只遍历延迟索引中的信号（均带有retry_after字段）
+            signal_ids = await redis.zrange(self.delayed_key, 0, -1)
+            signals = await self._load_signals(signal_ids)
 
-            for signal_json, score in signals:
-                signal = self._deserialize_signal(signal_json)
+            for signal_id, signal in zip(signal_ids, signals, strict=True):
+                if signal is None:
+                    continue
 
                 # 如果指定了账号，则过滤
                 if account and signal.get('account') != account:
                     continue
 
-                # 检查是否有retry_after字段
-                if 'retry_after' in signal:
-                    # 移除retry_after字段
-                    del signal['retry_after']
-
-                    # 重新序列化并更新Redis
-                    new_signal_json = self._serialize_signal(signal)
+                # 移除retry_after字段
+                signal.pop('retry_after', None)
 
-                    # 原子操作：删除旧信号，添加新信号
-                    pipe = redis.pipeline()
-                    pipe.zrem(self.queue_key, signal_json)
-                    pipe.zadd(self.queue_key, {new_signal_json: score})
-                    await pipe.execute()
+                # 原子操作：更新信号数据，移出延迟索引（score保持不变）
+                woken = await self._run_script(
+                    'wake',
+                    self._script_keys(),
+                    [signal_id, self._serialize_signal(signal)]
+                )
+                if not woken:
+                    continue
 
-                    woken_count += 1
-                    logger.debug(
-                        f"⏰ 唤醒延迟信号: {signal.get('symbol')} "
-                        f"(账号={signal.get('account', 'N/A')})"
-                    )
+                woken_count += 1
+                logger.debug(
+                    f"⏰ 唤醒延迟信号: {signal.get('symbol')} "
+                    f"(账号={signal.get('account', 'N/A')})"
+                )
 
             if woken_count > 0:
                 logger.info(f"✅ 已唤醒{woken_count}个延迟信号（账号={account or '全部'}）")
@@ -857,18 +1434,17 @@ class SignalQueue:
             redis = await self._get_redis()
             delayed_signals = []
 
-            # 遍历主队列中的所有信号
-            signals = await redis.zrange(self.queue_key, 0, -1)
-            for signal_json in signals:
-                signal = self._deserialize_signal(signal_json)
+            # 只读取延迟索引中仍在延迟期的信号
+            signal_ids = await redis.zrangebyscore(self.delayed_key, f"({time.time()}", '+inf')
+            for signal in await self._load_signals(signal_ids):
+                if signal is None:
+                    continue
 
                 # 如果指定了账号，则过滤
                 if account and signal.get('account') != account:
                     continue
 
-                # 检查是否有retry_after字段且仍在延迟中
-                if 'retry_after' in signal and signal['retry_after'] > time.time():
-                    delayed_signals.append(signal)
+                delayed_signals.append(signal)
 
             return delayed_signals
 
@@ -922,9 +1498,10 @@ class SignalQueue:
                 if score < min_score:
                     continue
 
-                # 添加失败时间信息
+                # 添加失败时间信息（失败队列成员仍为JSON，保留原文用于删除）
                 signal['failed_at'] = failed_timestamp
                 signal['failed_age'] = age
+                signal['_original_json'] = signal_json
                 failed_signals.append(signal)
 
             return failed_signals
@@ -0,0 +1,277 @@
+"""
+账户快照服务 - 使用Redis在进程间共享账户余额与持仓
+
+signal_generator、order_executor、rebalancer 各自轮询账户会成倍消耗券商API配额。
+本模块让所有进程共享同一份账户快照：
+
+架构：
+- {prefix}:{account_id}:account:snapshot  STRING 最近一次账户快照（JSON，含版本号与获取时间）
+- {prefix}:{account_id}:account:version   STRING 版本号，订单变化时 INCR 使所有进程的快照失效
+- {prefix}:{account_id}:account:refresh   STRING 刷新锁（SET NX PX），同一时刻仅一个进程请求券商API
+- 键按账号隔离，多账号共用一个Redis时互不覆盖
+- 进程内 single-flight：并发的协程共享同一次刷新
+- Redis不可用时退化为进程内TTL缓存；券商API失败时降级返回旧快照
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+from loguru import logger
+
+
+# 持仓中以Decimal返回的字段（反序列化时还原）
+_DECIMAL_POSITION_FIELDS = ("quantity", "available_quantity")
+
+
+def encode_account(account: Dict[str, Any]) -> Dict[str, Any]:
+    """账户字典 -> 可JSON序列化（Decimal 与枚举转为字符串）"""
+    return json.loads(json.dumps(account, default=str))
+
+
+def decode_account(account: Dict[str, Any]) -> Dict[str, Any]:
+    """还原持仓数量的Decimal类型（与 LongportTradingClient.get_account 一致）"""
+    for position in account.get("positions", []):
+        for field in _DECIMAL_POSITION_FIELDS:
+            value = position.get(field)
+            if value is not None and not isinstance(value, Decimal):
+                position[field] = Decimal(str(value))
+    return account
+
+
+class AccountSnapshotService:
+    """
+    跨进程共享的账户快照（余额 + 持仓）
+
+    用法：
+        snapshot = AccountSnapshotService(
+            trade_client, redis_url=settings.redis_url, account_id=settings.account_id
+        )
+        account = await snapshot.get()
+        snapshot.attach(order_tracker)   # 订单推送时失效
+    """
+
+    def __init__(
+        self,
+        trade_client,
+        redis_url: Optional[str] = None,
+        account_id: Optional[str] = None,
+        key_prefix: str = "trading",
+        ttl: float = 15.0,
+        lock_timeout: float = 10.0,
+    ):
+        """
+        Args:
+            trade_client: LongportTradingClient（需提供 fetch_account）
+            redis_url: Redis连接URL（为空时仅使用进程内缓存）
+            account_id: 账号ID，快照键按账号隔离（为空时使用 default）
+            key_prefix: Redis键前缀（与 RedisPositionManager 一致）
+            ttl: 快照有效期（秒）
+            lock_timeout: 刷新锁超时（秒），其他进程最多等待这么久
+        """
+        self.trade_client = trade_client
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+
+        self.account_id = account_id or "default"
+
+        prefix = f"{key_prefix}:{self.account_id}:account"
+        self.snapshot_key = f"{prefix}:snapshot"
+        self.version_key = f"{prefix}:version"
+        self.lock_key = f"{prefix}:refresh"
+
+        self._redis: Optional[redis.Redis] = None
+        self._local: Optional[Dict[str, Any]] = None  # 最近一次快照 {account, version, fetched_at}
+        self._local_version = 0  # 无Redis时的本地版本号
+        self._inflight: Optional[asyncio.Future] = None
+        self._pending_invalidations: set = set()
+        self._stats = {"hits": 0, "fetches": 0, "waits": 0, "stale": 0, "invalidations": 0}
+
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        if self.redis_url and self._redis is None:
+            self._redis = await redis.from_url(
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True
+            )
+        return self._redis
+
+    async def close(self):
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    # ==================== 读取 ====================
+
+    async def get(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        获取账户信息（字段与 LongportTradingClient.get_account 相同）
+
+        Args:
+            force_refresh: 忽略缓存，强制请求券商API
+
+        Raises:
+            券商API失败且没有任何旧快照时抛出异常
+        """
+        if not force_refresh:
+            snapshot = await self._read_fresh()
+            if snapshot is not None:
+                self._stats["hits"] += 1
+                return snapshot["account"]
+
+        # 进程内 single-flight：并发调用共享同一次刷新
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh(force_refresh))
+        try:
+            return await asyncio.shield(self._inflight)
+        except Exception as e:
+            if self._local is not None:
+                self._stats["stale"] += 1
+                logger.warning(f"⚠️ 刷新账户信息失败，降级使用旧快照: {e}")
+                return self._local["account"]
+            raise
+
+    @property
+    def served_version(self) -> Optional[int]:
+        """最近一次返回的快照版本号（尚未读取过时为 None）"""
+        return self._local.get("version") if self._local else None
+
+    async def invalidate(self) -> Optional[int]:
+        """
+        使所有进程的账户快照失效（下次读取时刷新）
+
+        Returns:
+            失效后的版本号：此后读到的该版本（或更新）快照都是失效之后获取的；
+            Redis不可用时返回 None
+        """
+        self._stats["invalidations"] += 1
+        self._local_version += 1
+        try:
+            client = await self._get_redis()
+            if client is None:
+                return self._local_version
+            return int(await client.incr(self.version_key))
+        except Exception as e:
+            logger.debug(f"账户快照失效通知失败: {e}")
+            # 至少让本进程的快照失效
+            self._local = None
+            return None
+
+    def attach(self, order_tracker) -> None:
+        """订单状态变化（提交/成交/撤单）时使快照失效"""
+        order_tracker.add_listener(self._on_order_changed)
+
+    def _on_order_changed(self, state) -> None:
+        task = asyncio.ensure_future(self.invalidate())
+        self._pending_invalidations.add(task)
+        task.add_done_callback(self._pending_invalidations.discard)
+
+    # ==================== 内部 ====================
+
+    async def _current_version(self, client) -> int:
+        if client is None:
+            return self._local_version
+        return int(await client.get(self.version_key) or 0)
+
+    def _is_fresh(self, snapshot: Optional[Dict[str, Any]], version: int) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.get("version") == version
+            and time.time() - float(snapshot.get("fetched_at", 0)) < self.ttl
+        )
+
+    async def _read_fresh(self) -> Optional[Dict[str, Any]]:
+        """读取仍然有效的快照（一次往返：快照 + 版本号）"""
+        try:
+            client = await self._get_redis()
+        except Exception as e:
+            logger.debug(f"连接Redis失败，使用进程内账户缓存: {e}")
+            client = None
+
+        if client is None:
+            return self._local if self._is_fresh(self._local, self._local_version) else None
+
+        try:
+            raw, version = await client.mget(self.snapshot_key, self.version_key)
+        except Exception as e:
+            # Redis异常时按TTL使用进程内快照，避免每次都请求券商API
+            logger.debug(f"读取账户快照失败: {e}")
+            local = self._local
+            return local if self._is_fresh(local, local and local.get("version")) else None
+
+        version = int(version or 0)
+        if self._is_fresh(self._local, version):
+            return self._local
+        if raw:
+            snapshot = json.loads(raw)
+            if self._is_fresh(snapshot, version):
+                snapshot["account"] = decode_account(snapshot["account"])
+                self._local = snapshot
+                return snapshot
+        return None
+
+    async def _refresh(self, force: bool) -> Dict[str, Any]:
+        try:
+            client = await self._get_redis()
+        except Exception:
+            client = None
+        if client is None:
+            return await self._fetch(None, self._local_version)
+
+        token = uuid.uuid4().hex
+        try:
+            acquired = await client.set(self.lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+        except Exception as e:
+            logger.debug(f"获取账户刷新锁失败: {e}")
+            return await self._fetch(None, self._local_version)
+
+        if not acquired and not force:
+            # 其他进程正在刷新：等待其写入快照
+            self._stats["waits"] += 1
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+                snapshot = await self._read_fresh()
+                if snapshot is not None:
+                    return snapshot["account"]
+                try:
+                    if not await client.exists(self.lock_key):
+                        break
+                except Exception:
+                    break
+
+        try:
+            version = await self._current_version(client)
+            return await self._fetch(client, version)
+        finally:
+            if acquired:
+                try:
+                    # 只释放自己持有的锁
+                    if await client.get(self.lock_key) == token:
+                        await client.delete(self.lock_key)
+                except Exception:
+                    pass
+
+    async def _fetch(self, client, version: int) -> Dict[str, Any]:
+        """请求券商API并写入快照（version 为请求前读取的版本号）"""
+        self._stats["fetches"] += 1
+        account = await self.trade_client.fetch_account()
+        snapshot = {"account": account, "version": version, "fetched_at": time.time()}
+        self._local = snapshot
+
+        if client is not None:
+            try:
+                payload = {**snapshot, "account": encode_account(account)}
+                await client.set(self.snapshot_key, json.dumps(payload), px=int(self.ttl * 1000))
+            except Exception as e:
+                logger.debug(f"写入账户快照失败: {e}")
+        logger.debug(f"🔄 账户快照已刷新（版本{version}）")
+        return account
@@ -0,0 +1,122 @@
+"""Binary COPY helpers with staging-table merges for asyncpg connections."""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, AsyncIterable, Iterable, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+Records = Union[Iterable[Tuple[Any, ...]], AsyncIterable[Tuple[Any, ...]]]
+
+
+async def get_driver_connection(session: AsyncSession):
+    """Return the asyncpg connection behind ``session``.
+
+    The session's transaction is begun first, so everything executed on the
+    returned connection commits or rolls back together with the session.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
+
+
+def quote_ident(name: str) -> str:
+    """Quote a (possibly schema-qualified) SQL identifier."""
+    return ".".join('"' + part.replace('"', '""') + '"' for part in name.split("."))
+
+
+def staging_table_name(table: str, columns: Sequence[str]) -> str:
+    """Stable per-connection temp table name for ``table`` and a column set."""
+    digest = zlib.crc32(",".join(columns).encode()) & 0xFFFFFFFF
+    return f"_stage_{table.replace('.', '_')}_{digest:08x}"
+
+
+def build_merge_sql(
+    table: str,
+    stage: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    """``INSERT ... SELECT`` from the staging table with ``ON CONFLICT`` handling.
+
+    Rows are de-duplicated on the conflict key first (the last copied row
+    wins, by physical order in the freshly truncated staging table), since a
+    single ``ON CONFLICT DO UPDATE`` may not touch the same target row twice.
+    ``update_columns=None`` updates every non-key column; an empty sequence
+    turns the merge into ``DO NOTHING``.
+    """
+    cols = ", ".join(quote_ident(c) for c in columns)
+    keys = ", ".join(quote_ident(c) for c in conflict_columns)
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_columns]
+
+    if update_columns:
+        assignments = ", ".join(f"{quote_ident(c)} = EXCLUDED.{quote_ident(c)}" for c in update_columns)
+        action = f"DO UPDATE SET {assignments}"
+    else:
+        action = "DO NOTHING"
+
+    return (
+        f"INSERT INTO {quote_ident(table)} ({cols}) "
+        f"SELECT DISTINCT ON ({keys}) {cols} FROM {quote_ident(stage)} "
+        f"ORDER BY {keys}, ctid DESC "
+        f"ON CONFLICT ({keys}) {action}"
+    )
+
+
+async def copy_records(
+    conn,
+    table: str,
+    columns: Sequence[str],
+    records: Records,
+    conflict_columns: Sequence[str] = (),
+    update_columns: Optional[Sequence[str]] = None,
+) -> int:
+    """Bulk load ``records`` into ``table`` with binary COPY.
+
+    Without ``conflict_columns`` the rows are copied straight into the target
+    table. Otherwise they are copied into a temporary staging table (created
+    once per connection, emptied on commit) and merged with a single
+    set-based ``INSERT ... ON CONFLICT``.
+
+    Args:
+        conn: asyncpg connection, normally inside a transaction
+        table: Target table (optionally ``schema.table``)
+        columns: Column names, in the order of each record tuple
+        records: Iterable or async iterable of tuples; consumed as a stream
+        conflict_columns: Unique key to merge on
+        update_columns: Columns refreshed on conflict (see :func:`build_merge_sql`)
+
+    Returns:
+        Number of rows written (inserted or updated)
+    """
+    schema, _, name = table.rpartition(".")
+    if not conflict_columns:
+        status = await conn.copy_records_to_table(
+            name, records=records, columns=list(columns), schema_name=schema or None
+        )
+        return _row_count(status)
+
+    stage = staging_table_name(table, columns)
+    cols = ", ".join(quote_ident(c) for c in columns)
+    await conn.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {quote_ident(stage)} ON COMMIT DELETE ROWS AS "
+        f"SELECT {cols} FROM {quote_ident(table)} WITH NO DATA"
+    )
+    # 同一事务内多次调用时清掉上一批
+    await conn.execute(f"TRUNCATE {quote_ident(stage)}")
+    await conn.copy_records_to_table(stage, records=records, columns=list(columns))
+
+    status = await conn.execute(build_merge_sql(table, stage, columns, conflict_columns, update_columns))
+    return _row_count(status)
+
+
+def _row_count(status: Optional[str]) -> int:
+    """Parse the row count from a command tag such as ``INSERT 0 42`` or ``COPY 42``."""
+    try:
+        return int(str(status).rsplit(" ", 1)[-1])
+    except (TypeError, ValueError):
+        return 0
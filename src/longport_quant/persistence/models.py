@@ -15,7 +15,7 @@ from sqlalchemy import (
     TIMESTAMP,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import DeclarativeBase, declared_attr
 
@@ -233,6 +233,27 @@ class StrategyFeature(Base):
     meta_data = Column(JSONB, name="metadata")  # Rename to avoid conflict with SQLAlchemy's metadata
 
 
+class StrategyFeatureSchema(Base):
+    """Ordered feature names shared by every packed row with the same hash."""
+
+    __tablename__ = "strategy_feature_schemas"
+
+    schema_hash = Column(String(16), primary_key=True)
+    feature_names = Column(ARRAY(String(64)), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class StrategyFeatureFrame(Base):
+    """All features of one (symbol, timestamp) packed into a float array."""
+
+    __tablename__ = "strategy_feature_frames"
+
+    symbol = Column(String(32), primary_key=True)
+    timestamp = Column(TIMESTAMP(timezone=True), primary_key=True)
+    schema_hash = Column(String(16), nullable=False)
+    feature_values = Column(ARRAY(DOUBLE_PRECISION), nullable=False)
+
+
 class TradeTick(Base):
     __tablename__ = "trade_ticks"
 
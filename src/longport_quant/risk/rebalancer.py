@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+from contextlib import nullcontext
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
@@ -12,9 +13,10 @@ from loguru import logger
 from longport import openapi
 
 from longport_quant.config import get_settings
-from longport_quant.data.quote_client import QuoteDataClient
+from longport_quant.data.market_gateway import open_quote_client
 from longport_quant.execution.client import LongportTradingClient
 from longport_quant.messaging.signal_queue import SignalQueue
+from longport_quant.persistence.account_snapshot import AccountSnapshotService
 from longport_quant.risk.regime import RegimeClassifier
 from longport_quant.utils import LotSizeHelper
 from longport_quant.utils.market_hours import MarketHours
@@ -31,9 +33,11 @@ class RebalancePlanItem:
 
 
 class RegimeRebalancer:
-    def __init__(self, account_id: str | None = None) -> None:
+    def __init__(self, account_id: str | None = None, quote_client=None) -> None:
         self.settings = get_settings(account_id=account_id)
         self.account_id = account_id or "default"
+        # 可注入调用方已有的行情客户端，避免每次 run_once 新建行情连接
+        self.quote_client = quote_client
         self.signal_queue = SignalQueue(
             redis_url=self.settings.redis_url,
             queue_key=self.settings.signal_queue_key,
@@ -50,7 +54,8 @@ class RegimeRebalancer:
         Returns:
             (regime_label, plan_items)
         """
-        async with QuoteDataClient(self.settings) as quote, LongportTradingClient(self.settings) as trade:
+        quote_cm = nullcontext(self.quote_client) if self.quote_client is not None else open_quote_client(self.settings)
+        async with quote_cm as quote, LongportTradingClient(self.settings) as trade:
             # 1) 判别 Regime 与日内风格 → 计算最终 reserve
             res = await self.regime.classify(quote)
             regime = res.regime
@@ -74,8 +79,17 @@ class RegimeRebalancer:
                 except Exception as e:
                     logger.debug(f"日内风格微调失败（忽略）: {e}")
 
-            # 2) 拉取账户与持仓
-            account = await trade.get_account()
+            # 2) 拉取账户与持仓（优先使用跨进程共享的账户快照）
+            snapshot = AccountSnapshotService(
+                trade,
+                redis_url=self.settings.redis_url,
+                account_id=self.account_id,
+                ttl=float(getattr(self.settings, 'account_snapshot_ttl', 15.0)),
+            )
+            try:
+                account = await snapshot.get()
+            finally:
+                await snapshot.close()
             positions: List[Dict] = account.get("positions", [])
             if not positions:
                 logger.info("无持仓，无需去杠杆")
@@ -486,8 +486,8 @@ class ScheduledTaskManager:
             logger.error(f"Failed to sync minute K-lines: {e}")
             raise
 
-    async def _calculate_features(self):
-        """Calculate technical features."""
+    async def _calculate_features(self, full_recompute: bool = False):
+        """Calculate technical features (appends new bars unless ``full_recompute``)."""
         try:
             # Get watchlist symbols
             from longport_quant.data.watchlist import WatchlistLoader
@@ -498,7 +498,8 @@ class ScheduledTaskManager:
             results = await self.feature_engine.calculate_batch_features(
                 symbols=symbols,
                 start_date=datetime.now().date() - timedelta(days=30),
-                end_date=datetime.now().date()
+                end_date=datetime.now().date(),
+                full_recompute=full_recompute
             )
 
             successful = sum(1 for df in results.values() if not df.empty)
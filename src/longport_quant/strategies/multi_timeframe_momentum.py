@@ -5,10 +5,12 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 from longport_quant.common.types import Signal
+from longport_quant.features import kernels
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.strategy.enhanced_base import (
     EnhancedStrategyBase,
@@ -192,17 +194,11 @@ class MultiTimeframeMomentumStrategy(EnhancedStrategyBase):
         return momentum * tf_weight
 
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calculate RSI indicator."""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        if loss.iloc[-1] == 0:
-            return 100
-
-        rs = gain.iloc[-1] / loss.iloc[-1]
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate RSI indicator (Wilder)."""
+        rsi = kernels.rsi(prices.to_numpy(dtype=float), period)
+        if len(rsi) == 0 or np.isnan(rsi[-1]):
+            return 50
+        return float(rsi[-1])
 
     def _check_timeframe_alignment(self, momentum_scores: Dict[TimeFrame, float]) -> float:
         """Check if momentum is aligned across timeframes."""
@@ -244,10 +240,13 @@ class MultiTimeframeMomentumStrategy(EnhancedStrategyBase):
             tf_name = tf.value
 
             if len(data) >= 20:
+                close = data["close"].to_numpy(dtype=float)
+                volume = data["volume"].to_numpy(dtype=float)
+
                 # Moving averages
-                features[f"sma20_{tf_name}"] = data["close"].rolling(20).mean().iloc[-1]
+                features[f"sma20_{tf_name}"] = kernels.sma(close, 20)[-1]
                 features[f"sma50_{tf_name}"] = (
-                    data["close"].rolling(50).mean().iloc[-1]
+                    kernels.sma(close, 50)[-1]
                     if len(data) >= 50 else 0
                 )
 
@@ -255,9 +254,9 @@ class MultiTimeframeMomentumStrategy(EnhancedStrategyBase):
                 features[f"volatility_{tf_name}"] = data["close"].pct_change().std() * 100
 
                 # Volume
+                avg_volume = kernels.sma(volume, 20)[-1]
                 features[f"volume_ratio_{tf_name}"] = (
-                    data["volume"].iloc[-1] / data["volume"].rolling(20).mean().iloc[-1]
-                    if data["volume"].rolling(20).mean().iloc[-1] > 0 else 1
+                    volume[-1] / avg_volume if avg_volume > 0 else 1
                 )
 
         # Get cached momentum
@@ -271,11 +270,12 @@ class MultiTimeframeMomentumStrategy(EnhancedStrategyBase):
         """Calculate position size based on volatility."""
         # Calculate ATR
         if len(data) >= 14:
-            high_low = data["high"] - data["low"]
-            high_close = abs(data["high"] - data["close"].shift())
-            low_close = abs(data["low"] - data["close"].shift())
-            tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = tr.rolling(14).mean().iloc[-1]
+            atr = kernels.atr(
+                data["high"].to_numpy(dtype=float),
+                data["low"].to_numpy(dtype=float),
+                data["close"].to_numpy(dtype=float),
+                14,
+            )[-1]
 
             # Volatility-based sizing
             volatility = atr / current_price
@@ -12,12 +12,13 @@ import pandas as pd
 from loguru import logger
 
 from longport_quant.common.types import Signal
+from longport_quant.features.feature_store import FeatureStore
+from longport_quant.features.streaming_indicators import StreamingIndicators
 from longport_quant.persistence.db import DatabaseSessionManager
 from longport_quant.persistence.models import (
     CalcIndicator,
     KlineDaily,
     KlineMinute,
-    StrategyFeature,
 )
 from sqlalchemy import and_, func, select
 
@@ -267,36 +268,11 @@ class DataAccessMixin:
         feature_names: List[str],
         limit: int = 100,
     ) -> pd.DataFrame:
-        """Get strategy features."""
-        async with self._db.session() as session:
-            stmt = (
-                select(StrategyFeature)
-                .where(
-                    and_(
-                        StrategyFeature.symbol == symbol,
-                        StrategyFeature.feature_name.in_(feature_names),
-                    )
-                )
-                .order_by(StrategyFeature.timestamp.desc())
-                .limit(limit * len(feature_names))
-            )
-            result = await session.execute(stmt)
-            features = result.scalars().all()
-
-            if features:
-                # Pivot to wide format
-                data = {}
-                for feat in features:
-                    timestamp = feat.timestamp
-                    if timestamp not in data:
-                        data[timestamp] = {"timestamp": timestamp}
-                    data[timestamp][feat.feature_name] = float(feat.value)
-
-                df = pd.DataFrame(list(data.values()))
-                df.sort_values("timestamp", inplace=True)
-                return df
-
-        return pd.DataFrame()
+        """Get strategy features (latest ``limit`` bars, oldest first)."""
+        df = await FeatureStore(self._db).read(symbol, feature_names, limit=limit)
+        if df.empty:
+            return pd.DataFrame()
+        return df.rename_axis("timestamp").reset_index()
 
     async def get_multi_timeframe_data(
         self,
@@ -334,6 +310,7 @@ class EnhancedStrategyBase(ABC, DataAccessMixin):
         self._signal_dispatcher = signal_dispatcher
         self._cached_data: Dict[str, Dict[TimeFrame, pd.DataFrame]] = {}
         self._last_update: Dict[str, datetime] = {}
+        self._indicator_streams: Dict[Tuple[str, TimeFrame], StreamingIndicators] = {}
 
     @property
     def parameters(self) -> StrategyParameters:
@@ -363,6 +340,7 @@ class EnhancedStrategyBase(ABC, DataAccessMixin):
         logger.info(f"Stopping strategy: {self._params.name}")
         self._cached_data.clear()
         self._last_update.clear()
+        self._indicator_streams.clear()
 
     async def _cache_symbol_data(self, symbol: str) -> None:
         """Cache historical data for a symbol."""
@@ -372,11 +350,90 @@ class EnhancedStrategyBase(ABC, DataAccessMixin):
             )
             self._cached_data[symbol] = data
             self._last_update[symbol] = datetime.now()
+            for timeframe, df in data.items():
+                self._prime_indicator_stream(symbol, timeframe, df)
             logger.debug(f"Cached data for {symbol}: {len(data)} timeframes")
 
         except Exception as e:
             logger.error(f"Error caching data for {symbol}: {e}")
 
+    def indicator_stream(
+        self, symbol: str, timeframe: TimeFrame = TimeFrame.D1
+    ) -> StreamingIndicators:
+        """Get (or create) the incremental indicator engine for a symbol/timeframe."""
+        key = (symbol, timeframe)
+        stream = self._indicator_streams.get(key)
+        if stream is None or stream.config != self._indicator_config():
+            stream = StreamingIndicators(
+                history=self._params.get_lookback(timeframe),
+                **self._indicator_config(),
+            )
+            self._indicator_streams[key] = stream
+        return stream
+
+    def _indicator_config(self) -> Dict[str, Any]:
+        """Indicator periods for the streaming engine, overridden by the strategy's custom params."""
+        config = StreamingIndicators().config
+        for name in config:
+            value = self._params.get_param(name)
+            if value is not None:
+                config[name] = tuple(value) if name == "sma_periods" else value
+        return config
+
+    def _prime_indicator_stream(
+        self, symbol: str, timeframe: TimeFrame, data: pd.DataFrame
+    ) -> None:
+        """Replay cached bars into the indicator engine."""
+        if data is None or data.empty or "close" not in data:
+            return
+
+        stream = self.indicator_stream(symbol, timeframe)
+        stream.reset()
+        stream.update_many(
+            data["close"].to_numpy(dtype=float),
+            data["high"].to_numpy(dtype=float) if "high" in data else None,
+            data["low"].to_numpy(dtype=float) if "low" in data else None,
+            data["volume"].to_numpy(dtype=float) if "volume" in data else None,
+            data["timestamp"].tolist() if "timestamp" in data else None,
+        )
+
+    def update_indicators(
+        self, symbol: str, bar: Any, timeframe: TimeFrame = TimeFrame.D1
+    ) -> Dict[str, float]:
+        """Commit a completed bar to the indicator engine and return the new values."""
+        return self.indicator_stream(symbol, timeframe).update(bar)
+
+    def peek_indicators(
+        self, symbol: str, bar: Any, timeframe: TimeFrame = TimeFrame.D1
+    ) -> Dict[str, float]:
+        """Evaluate indicators for a still-forming bar without committing it."""
+        return self.indicator_stream(symbol, timeframe).peek(bar)
+
+    async def get_indicators(
+        self,
+        symbol: str,
+        indicator_names: List[str],
+        timeframe: TimeFrame = TimeFrame.D1,
+        limit: int = 100,
+    ) -> pd.DataFrame:
+        """Get indicators, served from the incremental engine when it covers the request.
+
+        The engine's history is used only if it was built with the strategy's
+        current periods and holds at least ``limit`` bars; otherwise the stored
+        indicators are read as before.
+        """
+        stream = self._indicator_streams.get((symbol, timeframe))
+        if stream is not None and stream.config == self._indicator_config():
+            rows = stream.history(limit)
+            lookup = {name: name.lower() for name in indicator_names}
+            if rows and len(rows) >= limit and all(key in rows[-1][1] for key in lookup.values()):
+                return pd.DataFrame([
+                    {"timestamp": timestamp, **{name: snapshot[key] for name, key in lookup.items()}}
+                    for timestamp, snapshot in rows
+                ])
+
+        return await super().get_indicators(symbol, indicator_names, timeframe, limit)
+
     async def get_cached_data(
         self, symbol: str, timeframe: TimeFrame
     ) -> Optional[pd.DataFrame]:
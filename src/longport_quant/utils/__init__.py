@@ -1,14 +1,27 @@
 """Utility helpers."""
 
 from .clock import utc_now
+from .concurrency import gather_bounded, gather_or_cancel, run_cpu
 from .events import EventBus
-from .progress import ProgressTracker
+from .progress import ProgressTracker, StageTimer
+from .rate_limit import AsyncTokenBucket, get_api_rate_limiter
+from .sdk_executor import Priority, SdkExecutor, get_sdk_executor, sdk_call
 from .trading import LotSizeHelper, calculate_order_quantity_simple
 
 __all__ = [
     "EventBus",
     "utc_now",
     "ProgressTracker",
+    "StageTimer",
+    "AsyncTokenBucket",
+    "get_api_rate_limiter",
+    "Priority",
+    "SdkExecutor",
+    "get_sdk_executor",
+    "sdk_call",
+    "gather_bounded",
+    "gather_or_cancel",
+    "run_cpu",
     "LotSizeHelper",
     "calculate_order_quantity_simple",
 ]
@@ -0,0 +1,73 @@
+"""Bounded-concurrency helpers for per-symbol async pipelines."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def gather_bounded(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limit: int,
+) -> List[Any]:
+    """Run ``func(item)`` for every item with at most ``limit`` in flight.
+
+    Results are returned in input order. An exception raised for one item is
+    returned in its slot instead of cancelling the others (like
+    ``asyncio.gather(..., return_exceptions=True)``).
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(_run(item) for item in items), return_exceptions=True)
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> List[Any]:
+    """Run independent awaitables concurrently and return their results in order.
+
+    Unlike ``asyncio.gather``, the first failure cancels the remaining
+    awaitables (and waits for them) before it is re-raised.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for indicator math and other CPU-bound work."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        workers = min(8, os.cpu_count() or 1)
+        _cpu_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+    return _cpu_executor
+
+
+async def run_cpu(func: Callable[..., R], *args: Any) -> R:
+    """Run ``func(*args)`` on the shared CPU pool without blocking the event loop.
+
+    NumPy releases the GIL inside its vectorised kernels, so indicator
+    calculations for different symbols overlap on the pool's threads.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), func, *args)
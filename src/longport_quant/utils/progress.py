@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import timedelta
 from time import perf_counter
-from typing import Optional
+from typing import Dict, Iterator, Optional
 
 from loguru import logger
 
@@ -129,3 +130,28 @@ class ProgressTracker:
             f"{_format_duration(snapshot.elapsed_seconds)}"
         )
 
+
+class StageTimer:
+    """Wall-clock duration (ms) of each named stage of one operation."""
+
+    def __init__(self) -> None:
+        self._start = perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + (perf_counter() - start) * 1000, 1)
+
+    @property
+    def total_ms(self) -> float:
+        return round((perf_counter() - self._start) * 1000, 1)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**self.stages, "total": self.total_ms}
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.as_dict().items())
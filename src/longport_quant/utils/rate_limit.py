@@ -0,0 +1,98 @@
+"""Async token bucket shared by everything that calls the LongPort OpenAPI."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import yaml
+from loguru import logger
+
+
+DEFAULT_API_LIMITS_PATH = Path("configs/api_limits.yml")
+
+
+class AsyncTokenBucket:
+    """Token bucket rate limiter for asyncio code.
+
+    Callers reserve tokens up front: when the bucket is empty the balance goes
+    negative and each caller sleeps until its own reservation is covered. This
+    keeps callers in FIFO order without holding a lock (so one instance can be
+    shared across event loops), and a cancelled waiter gives its tokens back.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens that can be taken right now (negative while callers are queued)."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``, sleeping until they are available. Returns the wait in seconds."""
+        self._refill()
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return 0.0
+
+        wait = -self._tokens / self.rate
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._tokens += tokens
+            raise
+        return wait
+
+
+def load_api_limits(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Load ``configs/api_limits.yml`` (empty dict when missing or invalid)."""
+    path = Path(path or DEFAULT_API_LIMITS_PATH)
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"⚠️ 读取API限制配置失败 {path}: {e}")
+        return {}
+
+
+_api_limiter: Optional[AsyncTokenBucket] = None
+_api_limiter_loaded = False
+
+
+def get_api_rate_limiter() -> Optional[AsyncTokenBucket]:
+    """Process-wide limiter built from the ``rate_limit`` section of the API limits.
+
+    Returns ``None`` when rate limiting is disabled in the config.
+    """
+    global _api_limiter, _api_limiter_loaded
+    if not _api_limiter_loaded:
+        config = load_api_limits().get("rate_limit") or {}
+        if config.get("enabled", True):
+            rate = float(config.get("max_calls_per_second", 8))
+            window = float(config.get("window_seconds", 1))
+            _api_limiter = AsyncTokenBucket(rate=rate / window, capacity=rate)
+            logger.debug(f"API限流: {rate:g} 次 / {window:g}s")
+        _api_limiter_loaded = True
+    return _api_limiter
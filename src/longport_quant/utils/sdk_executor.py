@@ -0,0 +1,398 @@
+"""Dedicated, prioritised executor for blocking LongPort SDK calls.
+
+Every ``QuoteContext``/``TradeContext`` call runs on a private thread pool
+instead of the default ``asyncio.to_thread`` pool shared with DB drivers and
+file I/O. Calls wait for a worker slot in priority order
+(order placement > other trading > realtime quote > history > reference
+data, FIFO within a class), so a burst of history fetches cannot hold up
+``submit_order`` or ``order_detail``, and ``order_detail`` polls or account
+queries cannot hold up ``submit_order``/``cancel_order``.
+
+Before taking a slot a call draws from token buckets configured in the
+``sdk_executor`` section of ``configs/api_limits.yml``: one per quota group
+(``trade``/``quote``), plus an optional one per endpoint. Tokens are handed
+out in the same priority order as slots, so a backlog of low-priority calls
+cannot push a trading call more than one token interval back.
+
+Endpoints are named ``"<context>.<method>"``, e.g. ``"trade.submit_order"``
+or ``"quote.history_candlesticks_by_date"``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from .rate_limit import AsyncTokenBucket, load_api_limits
+
+R = TypeVar("R")
+
+
+class Priority(IntEnum):
+    """Scheduling class of an SDK call (lower runs first)."""
+
+    ORDER = 0
+    TRADING = 1
+    REALTIME = 2
+    HISTORY = 3
+    REFERENCE = 4
+
+
+# 接口 → (优先级, 配额组)；配额组为 None 的调用不消耗令牌（本地回调设置等）
+ENDPOINTS: Dict[str, Tuple[Priority, Optional[str]]] = {
+    # 交易
+    "trade.connect": (Priority.TRADING, None),
+    "trade.submit_order": (Priority.ORDER, "trade"),
+    "trade.cancel_order": (Priority.ORDER, "trade"),
+    "trade.replace_order": (Priority.ORDER, "trade"),
+    "trade.order_detail": (Priority.TRADING, "trade"),
+    "trade.today_orders": (Priority.TRADING, "trade"),
+    "trade.today_executions": (Priority.TRADING, "trade"),
+    "trade.account_balance": (Priority.TRADING, "trade"),
+    "trade.stock_positions": (Priority.TRADING, "trade"),
+    "trade.fund_positions": (Priority.TRADING, "trade"),
+    "trade.margin_ratio": (Priority.TRADING, "trade"),
+    "trade.estimate_max_purchase_quantity": (Priority.TRADING, "trade"),
+    "trade.subscribe": (Priority.TRADING, "trade"),
+    "trade.unsubscribe": (Priority.TRADING, "trade"),
+    "trade.set_on_order_changed": (Priority.TRADING, None),
+    "trade.history_orders": (Priority.HISTORY, "trade"),
+    "trade.history_executions": (Priority.HISTORY, "trade"),
+    "trade.cash_flow": (Priority.HISTORY, "trade"),
+    # 实时行情
+    "quote.connect": (Priority.REALTIME, None),
+    "quote.realtime_quote": (Priority.REALTIME, "quote"),
+    "quote.quote": (Priority.REALTIME, "quote"),
+    "quote.option_quote": (Priority.REALTIME, "quote"),
+    "quote.warrant_quote": (Priority.REALTIME, "quote"),
+    "quote.realtime_depth": (Priority.REALTIME, "quote"),
+    "quote.realtime_brokers": (Priority.REALTIME, "quote"),
+    "quote.realtime_trades": (Priority.REALTIME, "quote"),
+    "quote.intraday": (Priority.REALTIME, "quote"),
+    "quote.candlesticks": (Priority.REALTIME, "quote"),
+    "quote.calc_indexes": (Priority.REALTIME, "quote"),
+    "quote.capital_flow": (Priority.REALTIME, "quote"),
+    "quote.capital_distribution": (Priority.REALTIME, "quote"),
+    "quote.market_temperature": (Priority.REALTIME, "quote"),
+    "quote.subscribe": (Priority.REALTIME, "quote"),
+    "quote.unsubscribe": (Priority.REALTIME, "quote"),
+    "quote.subscriptions": (Priority.REALTIME, "quote"),
+    "quote.subscribe_candlesticks": (Priority.REALTIME, "quote"),
+    "quote.unsubscribe_candlesticks": (Priority.REALTIME, "quote"),
+    "quote.set_on_quote": (Priority.REALTIME, None),
+    "quote.set_on_depth": (Priority.REALTIME, None),
+    "quote.set_on_brokers": (Priority.REALTIME, None),
+    "quote.set_on_trades": (Priority.REALTIME, None),
+    "quote.set_on_candlestick": (Priority.REALTIME, None),
+    # 历史数据
+    "quote.history_candlesticks_by_date": (Priority.HISTORY, "quote"),
+    "quote.history_candlesticks_by_offset": (Priority.HISTORY, "quote"),
+    "quote.history_market_temperature": (Priority.HISTORY, "quote"),
+}
+
+
+def endpoint_info(endpoint: str) -> Tuple[Priority, Optional[str]]:
+    """Priority and quota group of ``endpoint`` (unlisted quote/trade calls are reference data)."""
+    info = ENDPOINTS.get(endpoint)
+    if info is not None:
+        return info
+    group = endpoint.split(".", 1)[0]
+    return Priority.REFERENCE, group if group in ("quote", "trade") else None
+
+
+class PrioritySemaphore:
+    """Semaphore whose waiters are admitted lowest-priority-value first, FIFO within a priority.
+
+    State is guarded by a thread lock and waiters are woken through their own
+    loop, so one instance can serve several event loops.
+    """
+
+    def __init__(self, value: int) -> None:
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: List[list] = []  # [priority, seq, future, state]
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for w in self._waiters if w[3] == "waiting")
+
+    async def acquire(self, priority: int) -> None:
+        with self._lock:
+            # release() 先唤醒等待者再归还计数，所以有空余槽位时不会有人在排队
+            if self._value > 0:
+                self._value -= 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            waiter = [int(priority), next(self._seq), future, "waiting"]
+            heapq.heappush(self._waiters, waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter[3] == "granted"
+                waiter[3] = "cancelled"
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)
+                if waiter[3] != "waiting":
+                    continue
+                waiter[3] = "granted"
+                future = waiter[2]
+                future.get_loop().call_soon_threadsafe(_wake, future)
+                return
+            self._value += 1
+
+
+class PriorityTokenBucket(AsyncTokenBucket):
+    """Token bucket whose waiters are served lowest-priority-value first, FIFO within a priority.
+
+    Unlike :class:`AsyncTokenBucket` nobody reserves tokens ahead: only the
+    head of the wait queue sleeps until the next token is due, and it takes
+    the token only if it is still the head by then. Tokens are never taken by
+    a cancelled waiter.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(rate, capacity, clock)
+        self._lock = threading.Lock()
+        self._waiters: List[list] = []  # [priority, seq, future]
+        self._seq = itertools.count()
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, tokens: float = 1.0, priority: int = Priority.REFERENCE) -> float:
+        """Take ``tokens`` after every higher-priority waiter. Returns the wait in seconds."""
+        loop = asyncio.get_running_loop()
+        started = self._clock()
+        waiter = [int(priority), next(self._seq), None]
+        timer = None
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+        try:
+            while True:
+                with self._lock:
+                    self._refill()
+                    head = self._waiters[0] is waiter
+                    if head and self._tokens >= tokens:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= tokens
+                        self._wake_head()
+                        return self._clock() - started
+                    waiter[2] = future = loop.create_future()
+                    delay = (tokens - self._tokens) / self.rate if head else None
+                # 队首等到下一个令牌到期；其余等待者等前面的人拿到令牌或退出后被唤醒
+                if delay is not None:
+                    timer = loop.call_later(delay, _wake, future)
+                await future
+                if timer is not None:
+                    timer.cancel()
+                    timer = None
+        except BaseException:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                if waiter in self._waiters:
+                    was_head = self._waiters[0] is waiter
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    if was_head:
+                        self._wake_head()
+            raise
+
+    def _wake_head(self) -> None:
+        # 调用方持有 self._lock
+        if self._waiters and self._waiters[0][2] is not None:
+            future = self._waiters[0][2]
+            future.get_loop().call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _new_stats() -> Dict[str, float]:
+    return {"calls": 0, "errors": 0, "queued": 0, "running": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+
+class SdkExecutor:
+    """Bounded SDK thread pool with priority admission and per-endpoint rate limits."""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        group_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        endpoint_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sdk")
+        self._slots = PrioritySemaphore(self.max_workers)
+        self._clock = clock
+        self._group_buckets = {
+            name: self._make_bucket(spec) for name, spec in (group_limits or {}).items() if spec
+        }
+        self._endpoint_buckets = {
+            name: self._make_bucket(spec) for name, spec in (endpoint_limits or {}).items() if spec
+        }
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _make_bucket(spec: Dict[str, float]) -> PriorityTokenBucket:
+        rate = float(spec["rate"])
+        return PriorityTokenBucket(rate=rate, capacity=float(spec.get("burst", rate)))
+
+    async def run(
+        self,
+        endpoint: str,
+        func: Callable[..., R],
+        *args: Any,
+        priority: Optional[Priority] = None,
+        **kwargs: Any,
+    ) -> R:
+        """Run ``func(*args, **kwargs)`` on the SDK pool once quota and a worker slot are free."""
+        default_priority, group = endpoint_info(endpoint)
+        priority = default_priority if priority is None else priority
+        queued_at = self._clock()
+        self._update(endpoint, priority, queued=1)
+
+        try:
+            for bucket in (self._group_buckets.get(group), self._endpoint_buckets.get(endpoint)):
+                if bucket is not None:
+                    await bucket.acquire(priority=priority)
+            await self._slots.acquire(priority)
+        except BaseException:
+            self._update(endpoint, priority, queued=-1)
+            raise
+
+        wait = self._clock() - queued_at
+        self._update(endpoint, priority, queued=-1, running=1, calls=1, wait=wait)
+
+        context = contextvars.copy_context()
+        try:
+            future = self._pool.submit(context.run, func, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            self._update(endpoint, priority, running=-1, errors=1)
+            raise
+
+        def _done(f) -> None:
+            # 线程执行完才归还槽位（调用方被取消时也一样）
+            self._slots.release()
+            self._update(endpoint, priority, running=-1, errors=int(f.exception() is not None))
+
+        future.add_done_callback(_done)
+        return await asyncio.wrap_future(future)
+
+    def _update(
+        self, endpoint: str, priority: Priority, wait: Optional[float] = None, **deltas: int
+    ) -> None:
+        with self._stats_lock:
+            for key in (endpoint, f"priority.{priority.name.lower()}"):
+                stats = self._stats.setdefault(key, _new_stats())
+                for name, delta in deltas.items():
+                    stats[name] += delta
+                if wait is not None:
+                    stats["wait_total"] += wait
+                    stats["wait_max"] = max(stats["wait_max"], wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls and wait times per endpoint and per priority class.
+
+        ``queued`` counts calls waiting for tokens or a worker slot; ``wait_avg``
+        is the mean time (s) from submission to start of execution.
+        """
+        with self._stats_lock:
+            stats = {key: dict(values) for key, values in self._stats.items()}
+        for values in stats.values():
+            values["wait_avg"] = values["wait_total"] / values["calls"] if values["calls"] else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "slot_waiters": self._slots.waiting,
+            "tokens": {
+                name: round(bucket.available, 3)
+                for name, bucket in {**self._group_buckets, **self._endpoint_buckets}.items()
+            },
+            "endpoints": stats,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_sdk_executor: Optional[SdkExecutor] = None
+_sdk_executor_loaded = False
+_sdk_executor_lock = threading.Lock()
+
+
+def get_sdk_executor() -> Optional[SdkExecutor]:
+    """Process-wide executor built from the ``sdk_executor`` section of the API limits.
+
+    Returns ``None`` when the section disables it (calls then use ``asyncio.to_thread``).
+    """
+    global _sdk_executor, _sdk_executor_loaded
+    with _sdk_executor_lock:
+        if not _sdk_executor_loaded:
+            config = load_api_limits().get("sdk_executor") or {}
+            if config.get("enabled", True):
+                workers = config.get("max_workers") or min(8, (os.cpu_count() or 1) + 4)
+                _sdk_executor = SdkExecutor(
+                    max_workers=workers,
+                    group_limits=config.get("quotas"),
+                    endpoint_limits=config.get("endpoints"),
+                )
+                quotas = list(config.get("quotas") or {})
+                logger.debug(f"SDK执行器: {workers} 线程, 配额组 {quotas}")
+            _sdk_executor_loaded = True
+    return _sdk_executor
+
+
+async def sdk_call(endpoint: str, func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """Run a blocking SDK call through the shared :class:`SdkExecutor`."""
+    executor = get_sdk_executor()
+    if executor is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return await executor.run(endpoint, func, *args, **kwargs)
+
+
+__all__ = [
+    "ENDPOINTS",
+    "Priority",
+    "PrioritySemaphore",
+    "PriorityTokenBucket",
+    "SdkExecutor",
+    "endpoint_info",
+    "get_sdk_executor",
+    "sdk_call",
+]
@@ -13,8 +13,14 @@ if TYPE_CHECKING:
 class LotSizeHelper:
     """Helper class for managing lot size information and calculating valid order quantities."""
 
-    def __init__(self):
+    def __init__(self, reference=None):
+        """
+        Args:
+            reference: Optional SecurityReferenceService; when set, lot sizes come
+                from its shared (Redis/DB-backed) cache instead of per-symbol API calls
+        """
         self._lot_size_cache = {}
+        self.reference = reference
 
     async def get_lot_size(self, symbol: str, quote_client: QuoteDataClient) -> int:
         """
@@ -31,6 +37,11 @@ class LotSizeHelper:
         if symbol in self._lot_size_cache:
             return self._lot_size_cache[symbol]
 
+        if self.reference is not None:
+            lot_size = await self.reference.lot_size(symbol)
+            self._lot_size_cache[symbol] = lot_size
+            return lot_size
+
         try:
             # Fetch static info from API
             static_info = await quote_client.get_static_info([symbol])
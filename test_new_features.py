@@ -14,7 +14,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from longport_quant.config import get_settings
-from longport_quant.features.technical_indicators import TechnicalIndicators, TALIB_AVAILABLE
+from longport_quant.features.kernels import NUMBA_AVAILABLE
+from longport_quant.features.technical_indicators import TechnicalIndicators
 import numpy as np
 
 
@@ -47,7 +48,7 @@ def test_talib_integration():
         macd_result = TechnicalIndicators.macd(closes)
         print(f"✅ MACD 计算成功: MACD = {macd_result['macd'][-1]:.2f}, Signal = {macd_result['signal'][-1]:.2f}")
 
-        print(f"\n🎉 TA-Lib 状态: {'已启用' if TALIB_AVAILABLE else '未安装（使用 numpy 降级）'}")
+        print(f"\n🎉 指标内核: {'numba 加速' if NUMBA_AVAILABLE else 'numpy 向量化'}")
 
         return True
     except Exception as e:
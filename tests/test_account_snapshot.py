@@ -0,0 +1,220 @@
+"""Unit tests for the shared account snapshot and concurrent account fetch."""
+
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from longport_quant.execution.client import LongportTradingClient
+from longport_quant.persistence.account_snapshot import AccountSnapshotService
+
+
+class FakeTradeClient:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    async def fetch_account(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        return {
+            "account_id": "",
+            "cash": {"USD": 1000.0 + self.calls},
+            "buy_power": {"USD": 2000.0},
+            "net_assets": {"USD": 5000.0},
+            "remaining_finance": {},
+            "positions": [{"symbol": "AAPL.US", "quantity": Decimal("10"),
+                           "available_quantity": Decimal("10"), "cost_price": 150.0,
+                           "currency": "USD", "market": "Market.US"}],
+            "position_count": 1,
+        }
+
+
+def make_service(client, server, **kwargs):
+    service = AccountSnapshotService(client, redis_url="redis://fake", key_prefix="test", **kwargs)
+    service._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return service
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+class TestAccountSnapshot:
+    @pytest.mark.asyncio
+    async def test_snapshot_is_shared_between_processes(self, server):
+        executor_client, generator_client = FakeTradeClient(), FakeTradeClient()
+        executor = make_service(executor_client, server)
+        generator = make_service(generator_client, server)
+
+        first = await executor.get()
+        second = await generator.get()
+
+        assert executor_client.calls == 1
+        assert generator_client.calls == 0
+        assert second["cash"] == first["cash"]
+        assert second["positions"][0]["quantity"] == Decimal("10")
+
+    @pytest.mark.asyncio
+    async def test_accounts_do_not_share_snapshot(self, server):
+        paper_client, live_client = FakeTradeClient(), FakeTradeClient()
+        paper = make_service(paper_client, server, account_id="paper_001")
+        live = make_service(live_client, server, account_id="live_001")
+        live_client.calls = 10
+
+        assert (await paper.get())["cash"]["USD"] == 1001.0
+        assert (await live.get())["cash"]["USD"] == 1011.0
+        assert paper_client.calls == 1 and live_client.calls == 11
+
+        await paper.invalidate()
+        await live.get()
+        assert live_client.calls == 11
+        assert paper.snapshot_key != live.snapshot_key
+
+    @pytest.mark.asyncio
+    async def test_invalidate_returns_version_of_later_snapshots(self, server):
+        client = FakeTradeClient()
+        executor = make_service(client, server)
+        generator = make_service(client, server)
+        await executor.get()
+        assert executor.served_version == 0
+
+        version = await generator.invalidate()
+        assert version == 1
+        assert executor.served_version < version
+
+        await executor.get()
+        assert executor.served_version == version
+        assert client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_refresh_everywhere(self, server):
+        client = FakeTradeClient()
+        executor = make_service(client, server)
+        generator = make_service(client, server)
+        await executor.get()
+
+        await executor.invalidate()
+        account = await generator.get()
+
+        assert client.calls == 2
+        assert account["cash"]["USD"] == 1002.0
+        assert (await executor.get())["cash"]["USD"] == 1002.0
+        assert client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self, server):
+        client = FakeTradeClient(delay=0.05)
+        service = make_service(client, server)
+
+        results = await asyncio.gather(*(service.get() for _ in range(10)))
+
+        assert client.calls == 1
+        assert all(r is results[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_other_process_waits_for_refresh_in_flight(self, server):
+        slow, other = FakeTradeClient(delay=0.2), FakeTradeClient()
+        first = make_service(slow, server)
+        second = make_service(other, server)
+
+        results = await asyncio.gather(first.get(), second.get())
+
+        assert slow.calls == 1 and other.calls == 0
+        assert results[1]["cash"] == results[0]["cash"]
+
+    @pytest.mark.asyncio
+    async def test_failure_degrades_to_stale_snapshot(self, server):
+        client = FakeTradeClient()
+        service = make_service(client, server)
+        await service.get()
+
+        client.fail = True
+        account = await service.get(force_refresh=True)
+        assert account["cash"]["USD"] == 1001.0
+        assert service.get_stats()["stale"] == 1
+
+        with pytest.raises(ConnectionError):
+            await make_service(client, fakeredis.FakeServer()).get()
+
+    @pytest.mark.asyncio
+    async def test_without_redis_uses_local_ttl(self):
+        client = FakeTradeClient()
+        service = AccountSnapshotService(client, redis_url=None, ttl=60)
+
+        await service.get()
+        await service.get()
+        assert client.calls == 1
+
+        await service.invalidate()
+        await service.get()
+        assert client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_order_push_invalidates(self, server):
+        listeners = []
+        tracker = SimpleNamespace(add_listener=listeners.append)
+        client = FakeTradeClient()
+        service = make_service(client, server)
+        service.attach(tracker)
+        await service.get()
+
+        listeners[0](SimpleNamespace(order_id="1", status="Filled"))
+        await asyncio.gather(*service._pending_invalidations)
+        await service.get()
+
+        assert client.calls == 2
+
+
+class TestFetchAccount:
+    @pytest.mark.asyncio
+    async def test_currencies_are_fetched_concurrently_and_reused(self):
+        client = LongportTradingClient(settings=None, config=object())
+        calls = []
+        in_flight = 0
+        peak = 0
+
+        def balance(currency):
+            return SimpleNamespace(
+                buy_power=Decimal("100"), net_assets=Decimal("1000"),
+                remaining_finance_amount=Decimal("0"),
+                cash_infos=[SimpleNamespace(currency=c, available_cash=Decimal("50"),
+                                            withdraw_cash=Decimal("50"), frozen_cash=Decimal("0"))
+                            for c in ("HKD", "USD")],
+            )
+
+        async def account_balance(currency=None):
+            nonlocal in_flight, peak
+            calls.append(currency)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [balance(currency)]
+
+        async def stock_positions():
+            await asyncio.sleep(0.01)
+            position = SimpleNamespace(symbol="700.HK", quantity=Decimal("100"),
+                                       available_quantity=Decimal("100"), cost_price=Decimal("300"),
+                                       currency="HKD", market="Market.HK")
+            return SimpleNamespace(channels=[SimpleNamespace(positions=[position])])
+
+        client.account_balance = account_balance
+        client.stock_positions = stock_positions
+
+        account = await client.fetch_account()
+        assert calls == [None, "HKD", "USD"]
+        assert peak == 2
+        assert account["cash"] == {"HKD": 50.0, "USD": 50.0}
+        assert account["positions"][0]["quantity"] == Decimal("100")
+
+        calls.clear()
+        await client.fetch_account()
+        assert calls == ["HKD", "USD"]
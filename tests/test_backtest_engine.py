@@ -0,0 +1,136 @@
+"""Unit tests for the backtest engine and its vectorized price panels."""
+
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from longport_quant.backtest.engine import BacktestConfig, BacktestEngine
+from longport_quant.backtest.panel import PricePanel
+
+
+START = date(2023, 1, 2)
+
+
+def make_frame(days: int, seed: int, skip_every: int = 0) -> pd.DataFrame:
+    """Random-walk daily bars on weekdays, optionally with missing sessions."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(START, periods=days)
+    if skip_every:
+        dates = dates[np.arange(len(dates)) % skip_every != 1]
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({
+        "open": close * 0.995,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.integers(1_000, 10_000, len(dates)),
+    }, index=pd.DatetimeIndex(dates, name="timestamp"))
+
+
+class CrossoverStrategy:
+    """Minimal duck-typed strategy: 5/20 SMA crossover on the supplied closes."""
+
+    name = "test_crossover"
+
+    def __init__(self):
+        self.seen_lengths = []
+
+    async def generate_signals(self, symbol, market_data):
+        close = np.asarray(market_data["close"], dtype=float)
+        self.seen_lengths.append(len(close))
+        fast_now, slow_now = close[-5:].mean(), close[-20:].mean()
+        fast_prev, slow_prev = close[-6:-1].mean(), close[-21:-1].mean()
+        price = float(close[-1])
+        if fast_prev <= slow_prev and fast_now > slow_now:
+            side = "BUY"
+        elif fast_prev >= slow_prev and fast_now < slow_now:
+            side = "SELL"
+        else:
+            return []
+        return [SimpleNamespace(symbol=symbol, signal_type=side,
+                                stop_loss=price * 0.9, take_profit=price * 1.2)]
+
+
+def make_engine(frames):
+    engine = BacktestEngine(MagicMock())
+
+    async def load(symbols, config):
+        engine._price_cache.update({s: frames[s] for s in symbols if s in frames})
+
+    engine._load_historical_data = AsyncMock(side_effect=load)
+    return engine
+
+
+def make_config(vectorized, days=120):
+    return BacktestConfig(start_date=START, end_date=START + timedelta(days=days),
+                          max_positions=3, vectorized=vectorized)
+
+
+class TestPricePanel:
+    """Panel windows must match the legacy per-day masks exactly."""
+
+    def test_window_matches_legacy_mask_and_is_a_view(self):
+        frames = {"AAPL.US": make_frame(60, 1), "TSLA.US": make_frame(60, 2, skip_every=3)}
+        days = [d.date() for d in pd.bdate_range(START, periods=70)]
+        engine = make_engine(frames)
+        engine._price_cache.update(frames)
+        panel = PricePanel.from_frames(frames, list(frames), days)
+
+        for day in days[::7]:
+            for symbol in frames:
+                legacy = engine._get_market_data_until(symbol, day)
+                window = panel.window(symbol, day)
+                assert np.array_equal(window["close"], legacy["close"])
+                assert np.array_equal(window["volume"], legacy["volume"])
+                assert window["close"].base is not None
+                assert np.shares_memory(window["close"], panel.fields["close"])
+                assert panel.close_asof(symbol, day) == engine._get_current_price(symbol, day)
+
+    def test_views_are_read_only_and_unknown_symbols_miss(self):
+        frames = {"AAPL.US": make_frame(30, 1)}
+        panel = PricePanel.from_frames(frames, ["AAPL.US", "MISSING.US"], [START + timedelta(days=10)])
+
+        window = panel.window("AAPL.US", START + timedelta(days=10))
+        with pytest.raises(ValueError):
+            window["close"][0] = 0.0
+        assert "MISSING.US" not in panel
+        assert panel.window("MISSING.US", START) is None
+        # Date before the first bar and a weekend outside the trading days
+        assert panel.close_asof("AAPL.US", START - timedelta(days=1)) == 0.0
+        assert panel.bar_count("AAPL.US", date(2023, 1, 8)) == 5
+
+
+class TestVectorizedBacktest:
+    """The vectorized mode is a drop-in replacement for the row-based loop."""
+
+    @pytest.mark.asyncio
+    async def test_vectorized_and_legacy_modes_agree(self):
+        frames = {f"S{i}.US": make_frame(120, i, skip_every=5 if i % 2 else 0) for i in range(6)}
+        symbols = list(frames)
+
+        legacy_strategy, fast_strategy = CrossoverStrategy(), CrossoverStrategy()
+        legacy = await make_engine(frames).run_backtest(legacy_strategy, symbols, make_config(False))
+        fast = await make_engine(frames).run_backtest(fast_strategy, symbols, make_config(True))
+
+        assert fast_strategy.seen_lengths == legacy_strategy.seen_lengths
+        assert min(fast_strategy.seen_lengths) >= BacktestEngine.MIN_BARS
+        assert fast.total_trades == legacy.total_trades > 0
+        assert fast.final_capital == pytest.approx(legacy.final_capital)
+        pd.testing.assert_frame_equal(fast.equity_curve, legacy.equity_curve)
+
+    @pytest.mark.asyncio
+    async def test_large_universe_runs_quickly(self):
+        frames = {f"S{i}.US": make_frame(260, i) for i in range(200)}
+        engine = make_engine(frames)
+
+        start = time.perf_counter()
+        result = await engine.run_backtest(CrossoverStrategy(), list(frames), make_config(True, days=365))
+        elapsed = time.perf_counter() - start
+
+        assert len(result.equity_curve) == len(pd.bdate_range(START, START + timedelta(days=365)))
+        assert elapsed < 30
@@ -0,0 +1,140 @@
+"""Unit tests for the parallel parameter sweep runner."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from longport_quant.backtest.engine import BacktestConfig
+from longport_quant.backtest.panel import PricePanel, SharedPricePanel, attach_shared_panel
+from longport_quant.backtest.sweep import (
+    ParameterSweepRunner,
+    expand_grid,
+    walk_forward_windows,
+)
+from longport_quant.backtest.strategies import SWEEP_PRESETS
+
+
+START = date(2022, 1, 3)
+
+
+def make_panel(n_symbols=4, days=400):
+    frames = {}
+    for i in range(n_symbols):
+        rng = np.random.default_rng(i)
+        dates = pd.bdate_range(START, periods=days)
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        frames[f"S{i}.US"] = pd.DataFrame({
+            "open": close, "high": close * 1.01, "low": close * 0.99,
+            "close": close, "volume": np.full(days, 1000),
+        }, index=dates)
+    return PricePanel.from_frames(frames, list(frames), [])
+
+
+class SmaCrossover:
+    """Parameterised duck-typed strategy (module level so workers can unpickle it)."""
+
+    name = "sma_crossover"
+
+    def __init__(self, fast_period=5, slow_period=20):
+        if fast_period >= slow_period:
+            raise ValueError("Fast period must be less than slow period")
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+
+    async def generate_signals(self, symbol, market_data):
+        close = market_data["close"]
+        if len(close) <= self.slow_period:
+            return []
+        fast = close[-self.fast_period:].mean() - close[-self.slow_period:].mean()
+        prev = close[-self.fast_period - 1:-1].mean() - close[-self.slow_period - 1:-1].mean()
+        if prev <= 0 < fast:
+            side = "BUY"
+        elif prev >= 0 > fast:
+            side = "SELL"
+        else:
+            return []
+        return [SimpleNamespace(symbol=symbol, signal_type=side, stop_loss=None, take_profit=None)]
+
+
+def make_config():
+    return BacktestConfig(start_date=START, end_date=START + timedelta(days=540), max_positions=3)
+
+
+GRID = {"fast_period": [5, 10, 30], "slow_period": [20, 40]}
+
+
+class TestSweepHelpers:
+    def test_expand_grid(self):
+        combos = expand_grid(GRID)
+        assert len(combos) == 6
+        assert {"fast_period": 10, "slow_period": 40} in combos
+        assert expand_grid({}) == [{}]
+
+    def test_walk_forward_windows_are_back_to_back(self):
+        windows = walk_forward_windows(START, START + timedelta(days=400), train_days=180, test_days=90)
+
+        assert len(windows) == 2
+        assert windows[0].train_start == START
+        assert windows[0].test_start == windows[0].train_end + timedelta(days=1)
+        assert windows[1].test_start == windows[0].test_end + timedelta(days=1)
+        assert all(w.test_end <= START + timedelta(days=400) for w in windows)
+
+    def test_shared_panel_round_trip(self):
+        panel = make_panel()
+        day = START + timedelta(days=100)
+
+        with SharedPricePanel(panel) as shared:
+            shm, attached = attach_shared_panel(shared.handle, [day])
+            assert attached.symbols == panel.symbols
+            for symbol in panel.symbols:
+                np.testing.assert_array_equal(attached.window(symbol, day)["close"],
+                                              panel.with_trading_days([day]).window(symbol, day)["close"])
+            del attached
+            shm.close()
+
+
+class TestParameterSweepRunner:
+    def test_inline_sweep_ranks_and_records_invalid_params(self):
+        runner = ParameterSweepRunner(max_workers=1)
+        report = runner.run(make_panel(), SmaCrossover, GRID, [f"S{i}.US" for i in range(4)], make_config())
+
+        assert len(report.results) == 6
+        # fast_period=30 >= slow_period=20 is rejected by the strategy
+        assert report.results["error"].notna().sum() == 1
+        assert len(report.ranking) == 5
+        assert list(report.ranking["rank"]) == [1, 2, 3, 4, 5]
+        assert report.ranking["sharpe_ratio"].is_monotonic_decreasing
+        assert report.results["total_trades"].dropna().sum() > 0
+
+    def test_process_pool_matches_inline_run(self):
+        symbols = [f"S{i}.US" for i in range(4)]
+        windows = walk_forward_windows(START, START + timedelta(days=540), train_days=270, test_days=90)
+        panel = make_panel()
+
+        inline = ParameterSweepRunner(max_workers=1).run(panel, SmaCrossover, GRID, symbols, make_config(), windows)
+        pooled = ParameterSweepRunner(max_workers=2).run(panel, SmaCrossover, GRID, symbols, make_config(), windows)
+
+        key = ["phase", "window", "params"]
+        a = inline.results.sort_values(key).reset_index(drop=True)
+        b = pooled.results.sort_values(key).reset_index(drop=True)
+        pd.testing.assert_frame_equal(a, b)
+
+        assert set(pooled.results["phase"]) == {"train", "test"}
+        assert len(pooled.selections) == len(windows)
+        assert pooled.ranking.iloc[0]["params"] == inline.ranking.iloc[0]["params"]
+
+
+@pytest.mark.parametrize("preset", sorted(SWEEP_PRESETS))
+def test_sweep_presets_run_end_to_end(preset):
+    strategy_cls, grid = SWEEP_PRESETS[preset]
+    report = ParameterSweepRunner(max_workers=1).run(
+        make_panel(), strategy_cls, grid, [f"S{i}.US" for i in range(4)], make_config()
+    )
+
+    assert len(report.results) == len(expand_grid(grid))
+    assert report.results["error"].isna().all()
+    assert report.results["total_trades"].sum() > 0
+    assert len(report.ranking) == len(report.results)
@@ -0,0 +1,133 @@
+"""Unit tests for the in-memory daily bar store."""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from longport_quant.data.bar_store import DailyBarStore
+
+
+def make_candles(days: int, start: date = date(2024, 1, 1)):
+    """Create simple candle-like objects with increasing closes."""
+    candles = []
+    for i in range(days):
+        close = 100.0 + i
+        candles.append(SimpleNamespace(
+            timestamp=datetime.combine(start + timedelta(days=i), datetime.min.time()),
+            open=close - 0.5,
+            high=close + 1.0,
+            low=close - 1.0,
+            close=close,
+            volume=1000 + i,
+        ))
+    return candles
+
+
+def make_quote(last_done, trade_date, high=None, low=None, volume=5000):
+    return SimpleNamespace(
+        last_done=last_done,
+        open=last_done,
+        high=high if high is not None else last_done,
+        low=low if low is not None else last_done,
+        volume=volume,
+        timestamp=datetime.combine(trade_date, datetime.min.time()).replace(hour=12),
+    )
+
+
+class TestDailyBarStore:
+    """Test suite for DailyBarStore."""
+
+    def test_seed_keeps_latest_bars_in_order(self):
+        store = DailyBarStore(capacity=40, min_bars=30)
+        store.seed("TEST.SG", make_candles(60))
+
+        bars = store.get_bars("TEST.SG")
+        assert len(bars) == 40
+        assert bars.close[0] == 120.0
+        assert bars.close[-1] == 159.0
+        assert np.all(np.diff(bars.dates.astype(int)) > 0)
+
+    def test_insufficient_history_is_not_served(self):
+        store = DailyBarStore(min_bars=30)
+        store.seed("TEST.SG", make_candles(10))
+
+        assert store.get_bars("TEST.SG") is None
+        assert "TEST.SG" not in store
+
+    def test_quote_updates_current_bar_in_place(self):
+        store = DailyBarStore(capacity=50, min_bars=30)
+        candles = make_candles(40)
+        store.seed("TEST.SG", candles)
+        last_day = candles[-1].timestamp.date()
+
+        assert store.update_from_quote("TEST.SG", make_quote(200.0, last_day, volume=9999))
+
+        bars = store.get_bars("TEST.SG")
+        assert len(bars) == 40
+        assert bars.close[-1] == 200.0
+        assert bars.high[-1] == 200.0
+        assert bars.low[-1] == candles[-1].low
+        assert bars.volume[-1] == 9999
+
+    def test_quote_for_new_day_appends_and_rolls(self):
+        store = DailyBarStore(capacity=30, min_bars=30)
+        candles = make_candles(30)
+        store.seed("TEST.SG", candles)
+        next_day = candles[-1].timestamp.date()
+
+        for i in range(1, 75):
+            store.update_from_quote("TEST.SG", make_quote(500.0 + i, next_day + timedelta(days=i)))
+
+        bars = store.get_bars("TEST.SG")
+        assert len(bars) == 30
+        assert bars.close[-1] == 574.0
+        assert bars.close[0] == 545.0
+        assert np.all(np.diff(bars.close) == 1.0)
+
+    def test_stale_quote_is_ignored(self):
+        store = DailyBarStore(min_bars=30)
+        candles = make_candles(40)
+        store.seed("TEST.SG", candles)
+
+        assert not store.update_from_quote("TEST.SG", make_quote(1.0, date(2023, 1, 1)))
+        assert store.get_bars("TEST.SG").close[-1] == candles[-1].close
+
+    def test_quote_for_unknown_symbol_is_ignored(self):
+        store = DailyBarStore()
+        assert not store.update_from_quote("TEST.SG", make_quote(1.0, date.today()))
+
+    @pytest.mark.asyncio
+    async def test_ensure_warms_once_from_db_and_api(self):
+        db_candles = make_candles(60, start=date.today() - timedelta(days=70))
+        api_candles = make_candles(3, start=date.today() - timedelta(days=2))
+
+        kline_service = MagicMock()
+        kline_service.load_daily_klines = AsyncMock(return_value={"TEST.SG": db_candles})
+        kline_service.sync_daily_klines = AsyncMock()
+        quote_client = MagicMock()
+        quote_client.get_history_candles = AsyncMock(return_value=api_candles)
+
+        store = DailyBarStore(kline_service, quote_client)
+
+        first = await store.ensure("TEST.SG")
+        second = await store.ensure("TEST.SG")
+
+        assert first is not None and second is not None
+        assert len(second) == 63
+        kline_service.load_daily_klines.assert_awaited_once()
+        quote_client.get_history_candles.assert_awaited_once()
+        kline_service.sync_daily_klines.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_ensure_failure_is_backed_off(self):
+        quote_client = MagicMock()
+        quote_client.get_history_candles = AsyncMock(side_effect=RuntimeError("boom"))
+
+        store = DailyBarStore(quote_client=quote_client, retry_after=60)
+
+        assert await store.ensure("TEST.SG") is None
+        assert await store.ensure("TEST.SG") is None
+        quote_client.get_history_candles.assert_awaited_once()
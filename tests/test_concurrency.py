@@ -0,0 +1,75 @@
+"""Unit tests for bounded-concurrency helpers."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from longport_quant.utils.concurrency import gather_bounded, gather_or_cancel, run_cpu
+
+
+class TestGatherBounded:
+    @pytest.mark.asyncio
+    async def test_limit_and_order(self):
+        in_flight = 0
+        peak = 0
+
+        async def work(i):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * (5 - i % 5))
+            in_flight -= 1
+            return i * 2
+
+        results = await gather_bounded(range(20), work, limit=4)
+
+        assert results == [i * 2 for i in range(20)]
+        assert peak == 4
+
+    @pytest.mark.asyncio
+    async def test_exceptions_stay_in_their_slot(self):
+        async def work(i):
+            if i == 1:
+                raise ValueError("bad symbol")
+            return i
+
+        results = await gather_bounded([0, 1, 2], work, limit=2)
+
+        assert results[0] == 0 and results[2] == 2
+        assert isinstance(results[1], ValueError)
+        assert await gather_bounded([], work, limit=2) == []
+
+
+class TestGatherOrCancel:
+    @pytest.mark.asyncio
+    async def test_results_in_order_and_failure_cancels_the_rest(self):
+        async def value(v, delay):
+            await asyncio.sleep(delay)
+            return v
+
+        assert await gather_or_cancel(value("a", 0.02), value("b", 0)) == ["a", "b"]
+
+        slow = asyncio.ensure_future(value("slow", 5))
+
+        async def fail():
+            raise ValueError("account unavailable")
+
+        with pytest.raises(ValueError):
+            await gather_or_cancel(slow, fail())
+        assert slow.cancelled()
+
+
+class TestRunCpu:
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop_thread(self):
+        loop_thread = threading.get_ident()
+
+        def compute(values):
+            return threading.get_ident(), float(np.mean(values))
+
+        thread, mean = await run_cpu(compute, np.arange(10.0))
+
+        assert thread != loop_thread
+        assert mean == 4.5
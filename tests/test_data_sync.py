@@ -203,6 +203,70 @@ class TestKlineDataService:
                 assert result["symbols_failed"] == 0
                 mock_batch.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_optimized_sync_fetches_concurrently_and_streams_writes(
+        self, kline_service, mock_quote_client, sample_candle
+    ):
+        """Fetches overlap up to the limit and writes start before all fetches finish."""
+        sample_candle.change_val = "1.00"
+        symbols = [f"{i}.HK" for i in range(8)]
+        in_flight = 0
+        peak = 0
+        events = []
+
+        async def fetch(symbol, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 if symbol != "7.HK" else 0.05)
+            in_flight -= 1
+            events.append(("fetch", symbol))
+            return [sample_candle] * 5
+
+        async def write(table_name, records, conflict_columns):
+            events.append(("write", len(records)))
+            return {"processed": len(records)}
+
+        mock_quote_client.get_history_candles = AsyncMock(side_effect=fetch)
+        kline_service.batch_config.chunk_size = 10
+
+        with patch("longport_quant.data.kline_sync.get_api_rate_limiter", return_value=None), \
+                patch.object(kline_service, "_get_last_daily_sync_dates",
+                             AsyncMock(return_value={"0.HK": date(2024, 1, 31)})) as watermarks, \
+                patch.object(kline_service.batch_service, "bulk_insert_klines_optimized",
+                             AsyncMock(side_effect=write)):
+            result = await kline_service.sync_daily_klines_optimized(
+                symbols=symbols,
+                end_date=date(2024, 1, 31),
+                max_concurrency=3,
+            )
+
+        watermarks.assert_awaited_once_with(symbols)
+        assert mock_quote_client.get_history_candles.await_count == 7  # 0.HK already up to date
+        assert peak == 3
+        assert result["processed"] == 35
+        assert result["symbols_failed"] == 0
+        # The first chunk is written while the slow fetch is still running
+        assert events.index(("write", 10)) < events.index(("fetch", "7.HK"))
+
+    @pytest.mark.asyncio
+    async def test_optimized_sync_takes_a_rate_limit_token_per_request(
+        self, kline_service, mock_quote_client, sample_candle
+    ):
+        """Every history request goes through the shared token bucket."""
+        limiter = MagicMock()
+        limiter.acquire = AsyncMock(return_value=0.0)
+        mock_quote_client.get_history_candles = AsyncMock(side_effect=[Exception("limit"), []])
+
+        with patch("longport_quant.data.kline_sync.get_api_rate_limiter", return_value=limiter):
+            result = await kline_service.sync_minute_klines_optimized(
+                symbols=["700.HK", "9988.HK"], max_concurrency=2
+            )
+
+        assert limiter.acquire.await_count == 2
+        assert result["total"] == 0
+        assert result["symbols_failed"] == 1
+
 
 class TestBatchInsertService:
     """Test suite for BatchInsertService."""
@@ -337,6 +401,116 @@ class TestBatchInsertService:
         assert batch_service._stats["total_errors"] == 0
 
 
+class FakeCopyConnection:
+    """Stand-in for the asyncpg connection used by the COPY path."""
+
+    def __init__(self, fail: bool = False, merged: int = None):
+        self.fail = fail
+        self.merged = merged
+        self.statements: List[str] = []
+        self.copied: List[tuple] = []
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+        if sql.startswith("INSERT"):
+            count = len(self.copied) if self.merged is None else self.merged
+            return f"INSERT 0 {count}"
+        return "OK"
+
+    async def copy_records_to_table(self, table, records, columns, schema_name=None):
+        if hasattr(records, "__aiter__"):
+            rows = [row async for row in records]
+        else:
+            rows = list(records)
+        if self.fail:
+            raise ConnectionError("COPY failed")
+        self.copied.extend(rows)
+        return f"COPY {len(rows)}"
+
+
+class TestBatchInsertCopy:
+    """Test suite for the streaming binary COPY path."""
+
+    @pytest.fixture
+    def copy_conn(self):
+        return FakeCopyConnection()
+
+    @pytest.fixture
+    def mock_db(self, copy_conn):
+        session = MagicMock()
+        session.begin.return_value.__aenter__ = AsyncMock()
+        session.begin.return_value.__aexit__ = AsyncMock(return_value=False)
+        raw = MagicMock(driver_connection=copy_conn)
+        session.connection = AsyncMock(return_value=MagicMock(get_raw_connection=AsyncMock(return_value=raw)))
+
+        db = MagicMock(spec=DatabaseSessionManager)
+        db.session = MagicMock()
+        db.session.return_value.__aenter__ = AsyncMock(return_value=session)
+        db.session.return_value.__aexit__ = AsyncMock(return_value=False)
+        return db
+
+    @staticmethod
+    def kline_records(count: int):
+        for i in range(count):
+            yield {
+                "symbol": "700.HK",
+                "trade_date": date(2024, 1, 1) + timedelta(days=i),
+                "close": 100.0 + i,
+            }
+
+    @pytest.mark.asyncio
+    async def test_generator_is_streamed_and_merged_on_conflict_columns(self, mock_db, copy_conn):
+        service = BatchInsertService(mock_db, BatchConfig(use_copy_from=True))
+
+        await service.bulk_insert_klines_optimized(
+            "kline_daily", self.kline_records(3), ["symbol", "trade_date"]
+        )
+
+        assert copy_conn.copied[0] == ("700.HK", date(2024, 1, 1), 100.0)
+        assert len(copy_conn.copied) == 3
+        merge = copy_conn.statements[-1]
+        assert 'ON CONFLICT ("symbol", "trade_date") DO UPDATE SET "close" = EXCLUDED."close"' in merge
+        assert service.get_statistics()["total_inserted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_async_generator_with_ignore_counts_skipped(self, mock_db, copy_conn):
+        copy_conn.merged = 1
+        service = BatchInsertService(mock_db, BatchConfig(use_copy_from=True, conflict_action="ignore"))
+
+        async def records():
+            for record in self.kline_records(3):
+                yield record
+
+        result = await service._bulk_copy_from("kline_daily", records(), ["symbol", "trade_date"])
+
+        assert result == {"processed": 3, "written": 1}
+        assert copy_conn.statements[-1].endswith("DO NOTHING")
+        assert service.get_statistics()["total_skipped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_copy_falls_back_with_caller_conflict_columns(self, mock_db, copy_conn):
+        copy_conn.fail = True
+        service = BatchInsertService(mock_db, BatchConfig(use_copy_from=True))
+        records = list(self.kline_records(2))
+
+        with patch.object(service, "_batch_insert_on_conflict",
+                          AsyncMock(return_value={"processed": 2})) as fallback:
+            result = await service._bulk_copy_from("kline_minute", records, ["symbol", "timestamp"])
+
+        fallback.assert_awaited_once_with("kline_minute", records, ["symbol", "timestamp"])
+        assert result == {"processed": 2}
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_is_reported_not_replayed(self, mock_db, copy_conn):
+        copy_conn.fail = True
+        service = BatchInsertService(mock_db, BatchConfig(use_copy_from=True))
+
+        result = await service._bulk_copy_from("kline_daily", self.kline_records(4), ["symbol", "trade_date"])
+
+        assert result == {"processed": 0, "errors": 4}
+        assert service.get_statistics()["total_errors"] == 4
+
+
 class TestOptimizedSync:
     """Integration tests for optimized sync functionality."""
 
@@ -0,0 +1,163 @@
+"""Watermark-based incremental feature computation in FeatureEngine."""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from longport_quant.features.feature_engine import FeatureConfig, FeatureEngine
+from longport_quant.features.feature_store import normalize_features
+
+
+class MemoryFeatureStore:
+    """In-memory stand-in for FeatureStore (same normalisation and upsert semantics)."""
+
+    def __init__(self):
+        self.frame = None
+        self.writes = []
+
+    async def write(self, symbol, features):
+        features = normalize_features(features)
+        self.writes.append(len(features))
+        self.frame = features if self.frame is None else features.combine_first(self.frame)
+        return len(features)
+
+    async def last_timestamp(self, symbol):
+        return None if self.frame is None else self.frame.index.max().to_pydatetime()
+
+    async def read(self, symbol, columns=None, start=None, end=None, limit=None):
+        frame = self.frame
+        if start is not None:
+            frame = frame[frame.index >= start]
+        if end is not None:
+            frame = frame[frame.index <= end]
+        return frame if columns is None else frame[list(columns)]
+
+
+def make_bars(n_bars, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    return pd.DataFrame(
+        {
+            "open": close * (1 + rng.normal(0, 0.005, n_bars)),
+            "high": close * (1 + rng.uniform(0.001, 0.02, n_bars)),
+            "low": close * (1 - rng.uniform(0.001, 0.02, n_bars)),
+            "close": close,
+            "volume": rng.integers(10_000, 1_000_000, n_bars).astype(float),
+        },
+        index=pd.date_range("2022-01-03", periods=n_bars, freq="D").date,
+    )
+
+
+class RecordingDb:
+    """Session stand-in that records statements and returns queued kline rows."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.results.pop(0)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def kline_rows(bars):
+    return [
+        SimpleNamespace(timestamp=ts, open=row.open, high=row.high, low=row.low, close=row.close, volume=row.volume)
+        for ts, row in zip(bars.index, bars.itertuples())
+    ]
+
+
+def make_engine(bars, store=None):
+    engine = FeatureEngine(db=None, config=FeatureConfig(calculate_microstructure=False, cache_enabled=False))
+    engine.store = store or MemoryFeatureStore()
+    engine.loads = []
+
+    async def load_market_data(symbol, start_date, end_date, frequency):
+        engine.loads.append(("full", len(bars)))
+        return bars
+
+    async def load_recent_market_data(symbol, frequency, watermark, end_date, lookback):
+        after = bars.index > watermark.date()
+        if not after.any():
+            return None
+        first_new = int(np.argmax(after))
+        window = bars.iloc[max(0, first_new - lookback):]
+        engine.loads.append(("recent", len(window)))
+        return window
+
+    engine._load_market_data = load_market_data
+    engine._load_recent_market_data = load_recent_market_data
+    return engine
+
+
+class TestIncrementalFeatures:
+    @pytest.mark.asyncio
+    async def test_appends_only_new_bars_matching_full_recompute(self):
+        history = make_bars(420)
+        store = MemoryFeatureStore()
+
+        await make_engine(history.iloc[:400], store).calculate_features("700.HK")
+        assert store.writes == [400]
+
+        engine = make_engine(history, store)
+        result = await engine.calculate_features("700.HK")
+        assert store.writes == [400, 20]
+        assert engine.loads == [("recent", 300 + 20)]
+        assert len(result) == 420
+
+        full = normalize_features(
+            await make_engine(history).calculate_features("700.HK", full_recompute=True)
+        )
+        new_rows = result.iloc[-20:]
+        np.testing.assert_allclose(new_rows.to_numpy(), full.iloc[-20:][new_rows.columns].to_numpy(),
+                                   rtol=1e-6, atol=1e-9, equal_nan=True)
+        # 累计类特征（OBV/ADL）从已存储值续接
+        np.testing.assert_allclose(new_rows["obv"], full["obv"].iloc[-20:], rtol=1e-12)
+        np.testing.assert_allclose(new_rows["adl"], full["adl"].iloc[-20:], rtol=1e-12)
+
+    @pytest.mark.asyncio
+    async def test_no_new_bars_and_full_recompute_flag(self):
+        bars = make_bars(320)
+        store = MemoryFeatureStore()
+        await make_engine(bars, store).calculate_features("700.HK")
+
+        engine = make_engine(bars, store)
+        await engine.calculate_features("700.HK")
+        assert store.writes == [320]
+        assert engine.loads == []
+
+        await engine.calculate_features("700.HK", full_recompute=True)
+        assert engine.loads == [("full", 320)]
+        assert store.writes == [320, 320]
+
+    @pytest.mark.asyncio
+    async def test_minute_bars_after_existing_watermark(self):
+        bars = make_bars(330)
+        bars.index = pd.date_range("2024-05-02 01:30", periods=330, freq="min")
+        store = MemoryFeatureStore()
+        await make_engine(bars.iloc[:320], store).calculate_features("700.HK", data_frequency="minute")
+        watermark = await store.last_timestamp("700.HK")
+        assert watermark.tzinfo is not None
+
+        engine = FeatureEngine(db=None, config=FeatureConfig(calculate_microstructure=False, cache_enabled=False))
+        engine.store = store
+        lookback = engine.config.lookback_bars
+        engine.db = RecordingDb(kline_rows(bars.iloc[320:]), kline_rows(bars.iloc[320 - lookback:320].iloc[::-1]))
+        result = await engine.calculate_features("700.HK", data_frequency="minute")
+
+        # kline_minute.timestamp 是无时区列：查询参数必须是无时区的UTC时间
+        for stmt in engine.db.statements:
+            params = [v for v in stmt.compile().params.values() if isinstance(v, datetime)]
+            assert params == [datetime(2024, 5, 2, 6, 49)]
+            assert params[0].tzinfo is None
+        assert store.writes == [320, 10]
+        assert len(result) == 330
@@ -0,0 +1,117 @@
+"""Unit tests for the columnar strategy feature store."""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from longport_quant.features.feature_store import FeatureStore, normalize_features, schema_hash
+from longport_quant.persistence.models import StrategyFeatureFrame
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+        return f"INSERT 0 {len(self.copies[-1][2])}" if sql.startswith("INSERT") else "OK"
+
+    async def copy_records_to_table(self, table, records, columns, schema_name=None):
+        self.copies.append((table, tuple(columns), list(records)))
+        return f"COPY {len(self.copies[-1][2])}"
+
+
+class FakeDatabase:
+    def __init__(self, last_timestamp=None):
+        self.conn = FakeConnection()
+        self.executed = []
+        self.last_timestamp = last_timestamp
+
+    @asynccontextmanager
+    async def session(self):
+        raw = SimpleNamespace(driver_connection=self.conn)
+
+        async def get_raw_connection():
+            return raw
+
+        async def connection():
+            return SimpleNamespace(get_raw_connection=get_raw_connection)
+
+        async def execute(stmt):
+            self.executed.append(stmt)
+            return SimpleNamespace(scalar=lambda: self.last_timestamp)
+
+        async def commit():
+            pass
+
+        yield SimpleNamespace(connection=connection, execute=execute, commit=commit)
+
+
+@pytest.fixture
+def features():
+    index = [date(2024, 1, d) for d in (2, 3, 4, 5)]
+    return pd.DataFrame(
+        {"return_1d": [np.nan, 0.01, -0.02, 0.03], "rsi_14": [np.nan, 55.0, 48.0, np.nan]},
+        index=index,
+    )
+
+
+class TestFeatureStore:
+    @pytest.mark.asyncio
+    async def test_write_packs_one_row_per_bar(self, features):
+        db = FakeDatabase()
+        store = FeatureStore(db)
+
+        assert await store.write("700.HK", features) == 3
+        table, columns, rows = db.conn.copies[0]
+        assert columns == ("symbol", "timestamp", "schema_hash", "feature_values")
+        assert table.startswith("_stage_strategy_feature_frames")
+        # 全NaN的第一根K线不写入；部分缺失保留为NaN
+        assert [r[1] for r in rows] == [
+            datetime(2024, 1, d, tzinfo=timezone.utc) for d in (3, 4, 5)
+        ]
+        assert rows[0][2] == schema_hash(["return_1d", "rsi_14"])
+        assert rows[0][3] == [0.01, 55.0]
+        assert np.isnan(rows[2][3][1])
+        assert 'ON CONFLICT ("symbol", "timestamp") DO UPDATE' in db.conn.statements[-1]
+
+        # 同一schema只登记一次
+        await store.write("9988.HK", features)
+        schema_inserts = [s for s in db.executed if "strategy_feature_schemas" in str(s)]
+        assert len(schema_inserts) == 1
+
+    @pytest.mark.asyncio
+    async def test_append_only_writes_new_bars(self, features):
+        db = FakeDatabase(last_timestamp=datetime(2024, 1, 4, tzinfo=timezone.utc))
+        store = FeatureStore(db)
+
+        assert await store.append("700.HK", features) == 1
+        assert [r[1].day for r in db.conn.copies[0][2]] == [5]
+
+        db.last_timestamp = datetime(2024, 1, 5, tzinfo=timezone.utc)
+        assert await store.append("700.HK", features) == 0
+        assert len(db.conn.copies) == 1
+
+    def test_projection_selects_array_elements(self):
+        names = ("return_1d", "rsi_14", "macd")
+        stmt = FeatureStore.projection_query(
+            "abc", names, ["macd", "missing", "return_1d"],
+            [StrategyFeatureFrame.symbol == "700.HK"], limit=10,
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert sql.count("feature_values[") == 2
+        assert "LIMIT" in sql
+        assert FeatureStore.projection_query("abc", names, ["missing"], []) is None
+
+    def test_normalize_features(self):
+        frame = pd.DataFrame({1: ["1.5", "x"]}, index=[datetime(2024, 1, 2), datetime(2024, 1, 2)])
+        normalized = normalize_features(frame)
+        assert list(normalized.columns) == ["1"]
+        assert len(normalized) == 1 and np.isnan(normalized.iloc[0, 0])
+        assert str(normalized.index.tz) == "UTC"
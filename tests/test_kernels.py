@@ -0,0 +1,159 @@
+"""Golden values and backend equivalence for the shared indicator kernels."""
+
+import numpy as np
+import pytest
+
+from longport_quant.features import kernels
+from longport_quant.features.technical_indicators import TechnicalIndicators
+from longport_quant.indicators.technical import TechnicalIndicators as LegacyIndicators
+
+
+# 金标准数值来自重构前的 TechnicalIndicators NumPy 实现
+GOLDEN = {
+    "sma20": (19, [123.8218189758661, 124.50431819215972, 125.15882050864498]),
+    "ema12": (11, [122.54184918176708, 124.25098995093187, 126.18033252739949]),
+    "rsi14": (15, [67.01107041018781, 70.69821749897406, 73.446329519325]),
+    "macd": (25, [2.2185917721444923, 2.9404727804414534, 3.7230598363549205]),
+    "signal": (33, [2.194652791360383, 2.3438167891765973, 2.6196653986122618]),
+    "histogram": (33, [0.023938980784109276, 0.5966559912648561, 1.1033944377426588]),
+    "bb_upper": (19, [134.38152749330573, 135.7314513091979, 137.58468903365528]),
+    "bb_lower": (19, [113.26211045842645, 113.27718507512154, 112.73295198363468]),
+    "atr14": (13, [4.831122534038982, 4.862590368761734, 4.901800538107972]),
+    "obv": (0, [6900.0, 8100.0, 9400.0]),
+    "k": (8, [87.28236004581255, 92.55281748582726, 91.10584912599012]),
+    "d": (10, [80.59029695044343, 88.05119108492585, 90.3136755525433]),
+    "j": (10, [100.66648623655081, 101.55607028763006, 92.69019627288375]),
+}
+
+
+@pytest.fixture
+def series():
+    i = np.arange(60)
+    close = 100 + 10 * np.sin(i / 3) + 0.5 * i
+    high = close + 1.5 + np.abs(np.cos(i))
+    low = close - 1.5 - np.abs(np.sin(i))
+    volume = (1000 + 100 * (i % 7)).astype(float)
+    return close, high, low, volume
+
+
+def compute_all(close, high, low, volume):
+    macd = kernels.macd(close)
+    bands = kernels.bollinger_bands(close, 20, 2)
+    kdj = kernels.kdj(high, low, close)
+    return {
+        "sma20": kernels.sma(close, 20),
+        "ema12": kernels.ema(close, 12),
+        "rsi14": kernels.rsi(close, 14),
+        "macd": macd["macd"],
+        "signal": macd["signal"],
+        "histogram": macd["histogram"],
+        "bb_upper": bands["upper"],
+        "bb_lower": bands["lower"],
+        "atr14": kernels.atr(high, low, close, 14),
+        "obv": kernels.obv(close, volume),
+        "k": kdj["k"],
+        "d": kdj["d"],
+        "j": kdj["j"],
+    }
+
+
+def first_valid(values):
+    return int(np.flatnonzero(~np.isnan(values))[0])
+
+
+class TestKernelGoldenValues:
+    def test_golden_values(self, series):
+        for name, values in compute_all(*series).items():
+            start, tail = GOLDEN[name]
+            assert first_valid(values) == start, name
+            np.testing.assert_allclose(values[-3:], tail, rtol=1e-12, err_msg=name)
+
+    def test_volume_ratio_and_vwap(self, series):
+        close, high, low, volume = series
+        assert kernels.volume_ratio(volume)[-1] == pytest.approx(1.0483870967741935, rel=1e-12)
+        assert kernels.vwap(high, low, close, volume)[-1] == pytest.approx(114.99552289579925, rel=1e-12)
+
+    def test_ema_skips_gaps(self, series):
+        close = series[0].copy()
+        close[[3, 30, 31]] = np.nan
+        result = kernels.ema(close, 12)
+
+        assert first_valid(result) == 15
+        assert result[29] == pytest.approx(114.99054022027272, rel=1e-12)
+        assert np.isnan(result[30])
+        assert result[32] == pytest.approx(113.68984825278751, rel=1e-12)
+        assert result[-1] == pytest.approx(126.19883282977322, rel=1e-12)
+
+    def test_short_input_is_all_nan(self):
+        short = np.arange(5, dtype=float)
+        assert np.isnan(kernels.ema(short, 12)).all()
+        assert np.isnan(kernels.rsi(short, 14)).all()
+        assert np.isnan(kernels.atr(short, short, short, 14)).all()
+
+
+class TestKernelBackends:
+    @pytest.fixture
+    def panel(self, series):
+        rng = np.random.default_rng(3)
+        close = series[0] * rng.uniform(0.5, 1.5, (12, 1))
+        close[2, :20] = np.nan
+        close[5, [40, 41]] = np.nan
+        high = close + 1.0
+        low = close - 1.0
+        return close, high, low
+
+    def test_panel_rows_match_single_series(self, panel):
+        close, high, low = panel
+        for row in range(len(close)):
+            np.testing.assert_array_equal(kernels.ema(close, 10)[row], kernels.ema(close[row], 10))
+            np.testing.assert_array_equal(kernels.rsi(close, 14)[row], kernels.rsi(close[row], 14))
+            np.testing.assert_array_equal(
+                kernels.atr(high, low, close)[row], kernels.atr(high[row], low[row], close[row])
+            )
+
+    @pytest.mark.parametrize("numba_enabled", [False, True])
+    def test_backends_agree(self, monkeypatch, panel, numba_enabled):
+        if numba_enabled and not kernels.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        close, high, low = panel
+        monkeypatch.setattr(kernels, "NUMBA_AVAILABLE", numba_enabled)
+
+        results = {}
+        for min_rows in (1, 10_000):  # 逐时间向量化 / 逐行循环
+            monkeypatch.setattr(kernels, "VECTORIZE_MIN_ROWS", min_rows)
+            results[min_rows] = (
+                kernels.ema(close, 10),
+                kernels.rsi(close, 14),
+                kernels.atr(high, low, close, 14),
+            )
+        for vectorized, looped in zip(results[1], results[10_000]):
+            np.testing.assert_array_equal(vectorized, looped)
+
+    def test_numba_matches_numpy(self, monkeypatch, panel):
+        if not kernels.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        close, high, low = panel
+        compiled = (kernels.ema(close, 10), kernels.rsi(close, 14), kernels.atr(high, low, close))
+        monkeypatch.setattr(kernels, "NUMBA_AVAILABLE", False)
+        numpy_only = (kernels.ema(close, 10), kernels.rsi(close, 14), kernels.atr(high, low, close))
+        for a, b in zip(compiled, numpy_only):
+            np.testing.assert_allclose(a, b, rtol=1e-12, equal_nan=True)
+
+
+class TestCallersUseKernels:
+    def test_technical_indicators_delegate(self, series):
+        close, high, low, volume = series
+        np.testing.assert_array_equal(TechnicalIndicators.ema(list(close), 12), kernels.ema(close, 12))
+        np.testing.assert_array_equal(TechnicalIndicators.rsi(close, 14), kernels.rsi(close, 14))
+        np.testing.assert_array_equal(
+            TechnicalIndicators.kdj(high, low, close)["j"], kernels.kdj(high, low, close)["j"]
+        )
+
+    def test_legacy_indicators_match_latest_value(self, series):
+        close = list(series[0])
+        assert LegacyIndicators.calculate_rsi(close) == pytest.approx(GOLDEN["rsi14"][1][-1], rel=1e-12)
+        macd, signal, histogram = LegacyIndicators.calculate_macd(close)
+        assert (macd, signal) == pytest.approx((GOLDEN["macd"][1][-1], GOLDEN["signal"][1][-1]), rel=1e-12)
+        upper, _, lower = LegacyIndicators.calculate_bollinger_bands(close)
+        assert (upper, lower) == pytest.approx((GOLDEN["bb_upper"][1][-1], GOLDEN["bb_lower"][1][-1]), rel=1e-12)
+        assert LegacyIndicators.calculate_rsi(close[:5]) == 50.0
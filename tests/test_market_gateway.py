@@ -0,0 +1,259 @@
+"""Unit tests for the Redis-backed market-data gateway and its drop-in client."""
+
+import asyncio
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from longport import openapi
+
+from longport_quant.data.enhanced_market_data import (
+    DataType,
+    EnhancedMarketDataService,
+    MarketDataConfig,
+)
+from longport_quant.data.market_gateway import (
+    GatewayError,
+    GatewayQuoteClient,
+    MarketDataGateway,
+    from_wire,
+    to_wire,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class FakeUpstream:
+    """QuoteDataClient stand-in owned by the gateway."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_history_candles(self, symbol, period, adjust_type, start=None, end=None):
+        self.calls.append(("get_history_candles", symbol, period, adjust_type, start))
+        return [
+            SimpleNamespace(
+                close=Decimal("320.4"), volume=1200, timestamp=datetime(2024, 5, 2, 16, 0)
+            )
+        ]
+
+    async def get_realtime_quote(self, symbols):
+        self.calls.append(("get_realtime_quote", list(symbols)))
+        return [
+            SimpleNamespace(
+                symbol=s, last_done=Decimal("80.1"), trade_status=openapi.TradeStatus.Normal
+            )
+            for s in symbols
+        ]
+
+
+class FakeService:
+    def __init__(self):
+        self.added = []
+
+    async def add_symbols(self, symbols):
+        self.added.extend(symbols)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_gateway(server):
+    settings = SimpleNamespace(redis_url="redis://fake")
+    gateway = MarketDataGateway(settings, prefix="test:gw")
+    gateway._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    gateway.quote_client = FakeUpstream()
+    gateway.service = FakeService()
+    gateway._running = True
+    return gateway
+
+
+def make_client(server, timeout=2):
+    client = GatewayQuoteClient(
+        SimpleNamespace(redis_url="redis://fake"), prefix="test:gw", timeout=timeout
+    )
+    client._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return client
+
+
+QUOTE = {
+    "symbol": "700.HK", "last_price": 320.4, "prev_close": 318.0, "open": 319.0,
+    "high": 321.0, "low": 317.5, "volume": 150000, "turnover": 4.8e7,
+    "trade_status": "TradeStatus.Normal", "timestamp": datetime(2024, 5, 2, 10, 30),
+}
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+class TestWireFormat:
+    def test_round_trip(self):
+        value = {
+            "price": Decimal("1.25"),
+            "at": datetime(2024, 5, 2, 9, 30),
+            "period": openapi.Period.Day,
+            "bar": SimpleNamespace(close=Decimal("3.5"), volume=10),
+        }
+        restored = from_wire(json.loads(json.dumps(to_wire(value))))
+        assert restored["price"] == Decimal("1.25")
+        assert restored["at"] == datetime(2024, 5, 2, 9, 30)
+        assert restored["period"] == openapi.Period.Day
+        assert restored["bar"].close == Decimal("3.5") and restored["bar"].volume == 10
+
+
+class TestMarketGateway:
+    @pytest.mark.asyncio
+    async def test_rpc_forwards_to_upstream(self, server):
+        gateway = make_gateway(server)
+        client = make_client(server)
+        rpc = asyncio.create_task(gateway._rpc_loop())
+        try:
+            day, no_adjust = openapi.Period.Day, openapi.AdjustType.NoAdjust
+            bars = await client.get_history_candles(
+                "700.HK", day, no_adjust, start=datetime(2024, 5, 1).date()
+            )
+            assert bars[0].close == Decimal("320.4")
+            assert bars[0].timestamp == datetime(2024, 5, 2, 16, 0)
+            _, symbol, period, adjust, start = gateway.quote_client.calls[0]
+            assert (symbol, period, adjust) == ("700.HK", day, no_adjust)
+            assert start == datetime(2024, 5, 1).date()
+
+            with pytest.raises(GatewayError, match="AttributeError"):
+                await client.get_depth("700.HK")  # 上游未实现 → 错误回传
+        finally:
+            gateway._running = False
+            rpc.cancel()
+            await asyncio.gather(rpc, return_exceptions=True)
+            await client.close()
+
+        with pytest.raises(AttributeError):
+            _ = client.create_watchlist_group
+
+    @pytest.mark.asyncio
+    async def test_unanswered_request_times_out(self, server):
+        client = make_client(server, timeout=1)
+        with pytest.raises(GatewayError, match="未在"):
+            await client.get_static_info(["700.HK"])
+
+    @pytest.mark.asyncio
+    async def test_quotes_served_from_snapshot(self, server):
+        gateway = make_gateway(server)
+        client = make_client(server)
+        await gateway.publish(DataType.QUOTE, QUOTE)
+        rpc = asyncio.create_task(gateway._rpc_loop())
+        try:
+            # 网关未存活（无心跳）时不使用快照
+            await client.get_realtime_quote(["700.HK"])
+            assert gateway.quote_client.calls == [("get_realtime_quote", ["700.HK"])]
+
+            await gateway._heartbeat()
+            quotes = await client.get_realtime_quote(["700.HK", "9988.HK"])
+            assert [q.symbol for q in quotes] == ["700.HK", "9988.HK"]
+            assert quotes[0].last_done == Decimal("320.4")
+            assert quotes[0].timestamp == datetime(2024, 5, 2, 10, 30)
+            assert quotes[1].last_done == Decimal("80.1")
+            assert gateway.quote_client.calls[-1] == ("get_realtime_quote", ["9988.HK"])
+        finally:
+            gateway._running = False
+            rpc.cancel()
+            await asyncio.gather(rpc, return_exceptions=True)
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_push_fan_out_and_symbol_sync(self, server):
+        gateway = make_gateway(server)
+        await gateway._heartbeat()
+        await gateway.publish(DataType.DEPTH, {
+            "symbol": "700.HK", "bid_prices": [320.2, 320.0], "bid_sizes": [300, 500],
+            "ask_prices": [320.4], "ask_sizes": [100], "timestamp": datetime.now(),
+        })
+
+        client = make_client(server)
+        quotes, depths = [], []
+        await client.set_on_quote(lambda symbol, event: quotes.append((symbol, event)))
+        await client.set_on_depth(lambda symbol, event: depths.append((symbol, event)))
+        await client.subscribe(
+            ["700.HK"], [openapi.SubType.Quote, openapi.SubType.Depth], is_first_push=True
+        )
+        try:
+            # is_first_push 立即下发快照
+            assert depths[0][0] == "700.HK"
+            bids = [(level.price, level.volume) for level in depths[0][1].bids]
+            assert bids == [(Decimal("320.2"), 300), (Decimal("320.0"), 500)]
+
+            assert await gateway.sync_symbols() == ["700.HK"]
+            assert gateway.service.added == ["700.HK"]
+            assert await gateway.sync_symbols() == []
+
+            await gateway.publish(DataType.QUOTE, {**QUOTE, "symbol": "9988.HK"})  # 未订阅
+            await gateway.publish(DataType.QUOTE, QUOTE)
+            await wait_for(lambda: quotes)
+            assert [s for s, _ in quotes] == ["700.HK"]
+            assert quotes[0][1].last_done == Decimal("320.4")
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_prev_close_seeded_for_push_quotes(self, server, monkeypatch):
+        monkeypatch.setattr(
+            "longport_quant.data.enhanced_market_data.WatchlistLoader", lambda: None
+        )
+        gateway = make_gateway(server)
+        await gateway._heartbeat()
+        seeded = []
+
+        async def static_quote(symbols):
+            seeded.append(list(symbols))
+            return [
+                SimpleNamespace(
+                    symbol=s, prev_close=Decimal("318.0"), timestamp=datetime(2024, 5, 2, 9, 30)
+                )
+                for s in symbols
+            ]
+
+        gateway.quote_client.get_realtime_quote = static_quote
+        service = EnhancedMarketDataService(
+            SimpleNamespace(), None, MarketDataConfig(persist_to_db=False, require_watchlist=False)
+        )
+        service.subscribe(DataType.QUOTE, gateway._publisher(DataType.QUOTE))
+        service._running = True
+        service._loop = asyncio.get_running_loop()
+
+        # openapi.PushQuote 的全部字段：没有 prev_close / previous_close
+        push = SimpleNamespace(
+            last_done=Decimal("321.0"), open=Decimal("319.0"),
+            high=Decimal("321.5"), low=Decimal("317.5"),
+            timestamp=datetime(2024, 5, 2, 10, 31), volume=160000, turnover=Decimal("51000000"),
+            trade_status=openapi.TradeStatus.Normal, trade_session=None,
+            current_volume=100, current_turnover=Decimal("32100"),
+        )
+        client = make_client(server, timeout=1)
+        await client.subscribe(["700.HK"], [openapi.SubType.Quote])
+        try:
+            assert await gateway.sync_symbols() == ["700.HK"]
+            assert seeded == [["700.HK"]]
+
+            service._handle_quote("700.HK", push)
+            await wait_for(lambda: gateway._stats["published"] == 1)
+            # 来自快照（未启动RPC循环，走RPC会超时），昨收价与 SecurityQuote 一致
+            [quote] = await client.get_realtime_quote(["700.HK"])
+            assert quote.last_done == Decimal("321.0")
+            assert quote.prev_close == Decimal("318.0")
+
+            # 跨日后旧昨收价不再使用，网关后台重新获取
+            next_day = SimpleNamespace(**{**vars(push), "timestamp": datetime(2024, 5, 3, 9, 31)})
+            service._handle_quote("700.HK", next_day)
+            await wait_for(lambda: len(seeded) == 2)
+            raw = await gateway._redis.hget(gateway.keys.snapshot[DataType.QUOTE], "700.HK")
+            snapshot = json.loads(raw)
+            assert snapshot["prev_close"] is None
+        finally:
+            await client.close()
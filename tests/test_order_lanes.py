@@ -0,0 +1,207 @@
+"""Unit tests for the order executor's execution lanes, symbol locks and buying-power ledger."""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from longport_quant.execution.lanes import BuyingPowerLedger, SignalLanes, is_urgent_signal
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def make_signal(symbol, signal_type="BUY", score=60):
+    return {"symbol": symbol, "type": signal_type, "score": score}
+
+
+class TestSignalLanes:
+    @pytest.mark.asyncio
+    async def test_stop_loss_not_blocked_by_slow_buy(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(signal):
+            if signal["type"] == "BUY":
+                await release.wait()  # 模拟长时间TWAP
+            done.append(signal["symbol"])
+
+        lanes = SignalLanes(handler, workers=1, fast_workers=1)
+        lanes.start()
+        try:
+            buy = lanes.submit(make_signal("700.HK"))
+            await asyncio.sleep(0)
+            assert lanes.normal_saturated
+
+            stop = lanes.submit(make_signal("AAPL.US", "STOP_LOSS", 100))
+            await asyncio.wait_for(stop, 1)
+            assert done == ["AAPL.US"]
+
+            release.set()
+            await buy
+            assert lanes.get_stats()["normal"]["completed"] == 1
+        finally:
+            await lanes.stop()
+
+    @pytest.mark.asyncio
+    async def test_same_symbol_runs_serially_across_lanes(self):
+        running, overlaps = set(), []
+
+        async def handler(signal):
+            symbol = signal["symbol"]
+            if symbol in running:
+                overlaps.append(symbol)
+            running.add(symbol)
+            await asyncio.sleep(0.02)
+            running.discard(symbol)
+            return signal["type"]
+
+        lanes = SignalLanes(handler, workers=3, fast_workers=1)
+        lanes.start()
+        try:
+            futures = [
+                lanes.submit(make_signal("700.HK")),
+                lanes.submit(make_signal("700.HK", "URGENT_SELL", 95)),
+                lanes.submit(make_signal("9988.HK")),
+                lanes.submit(make_signal("700.HK", "SELL", 70)),
+            ]
+            assert await asyncio.gather(*futures) == ["BUY", "URGENT_SELL", "BUY", "SELL"]
+            assert overlaps == []
+            assert not lanes.locks._locks  # 无人使用的锁已回收
+        finally:
+            await lanes.stop()
+
+    @pytest.mark.asyncio
+    async def test_higher_score_picked_first_and_errors_returned(self):
+        order = []
+
+        async def handler(signal):
+            order.append(signal["symbol"])
+            if signal["symbol"] == "BAD.US":
+                raise RuntimeError("boom")
+
+        lanes = SignalLanes(handler, workers=1)
+        futures = [lanes.submit(make_signal(s, score=score))
+                   for s, score in (("A.US", 50), ("BAD.US", 90), ("C.US", 70))]
+        lanes.start()
+        try:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            assert order == ["BAD.US", "C.US", "A.US"]
+            assert isinstance(results[1], RuntimeError)
+            assert lanes.get_stats()["normal"]["failed"] == 1
+        finally:
+            await lanes.stop()
+
+    def test_urgent_classification(self):
+        assert is_urgent_signal(make_signal("700.HK", "HARD_STOP_LOSS", 100))
+        assert not is_urgent_signal(make_signal("700.HK", "SELL", 95))
+        assert is_urgent_signal(make_signal("700.HK", "TAKE_PROFIT", 999), stop_loss_priority=999)
+
+
+class TestBuyingPowerLedger:
+    def test_concurrent_reservations_cannot_overspend(self):
+        ledger = BuyingPowerLedger()
+        assert ledger.reserve("a", "HKD", 60_000, capacity=100_000)
+        assert not ledger.reserve("b", "HKD", 50_000, capacity=100_000)
+        assert ledger.reserve("b", "HKD", 40_000, capacity=100_000)
+        assert ledger.reserve("c", "USD", 5_000, capacity=8_000)
+        assert ledger.snapshot() == {"HKD": 100_000, "USD": 5_000}
+
+        assert ledger.release("a") == 60_000
+        assert ledger.release("a") is None
+        assert ledger.reserved("HKD") == 40_000
+
+    def test_apply_deducts_reserved_funds(self):
+        ledger = BuyingPowerLedger()
+        account = {
+            "cash": {"HKD": 100_000.0, "USD": 2_000.0},
+            "buy_power": {"HKD": 150_000.0},
+            "remaining_finance": {"HKD": 50_000.0},
+            "net_assets": {"HKD": 300_000.0},
+        }
+        assert ledger.apply(account) is account
+
+        ledger.reserve("a", "HKD", 30_000, capacity=150_000)
+        adjusted = ledger.apply(account)
+        assert adjusted["cash"] == {"HKD": 70_000.0, "USD": 2_000.0}
+        assert adjusted["buy_power"]["HKD"] == 120_000.0
+        assert adjusted["remaining_finance"]["HKD"] == 20_000.0
+        assert adjusted["net_assets"]["HKD"] == 300_000.0
+        assert account["cash"]["HKD"] == 100_000.0
+
+    def test_submitted_buy_held_until_newer_snapshot(self):
+        now = [0.0]
+        ledger = BuyingPowerLedger(hold_ttl=30, clock=lambda: now[0])
+        ledger.reserve("a", "HKD", 60_000, capacity=100_000)
+        ledger.reserve("b", "HKD", 20_000, capacity=100_000)
+        ledger.hold("a", version=7)
+        ledger.hold("missing", version=7)
+
+        # 失效之前获取的快照还没有反映这笔订单
+        ledger.observe(6)
+        assert ledger.reserved("HKD") == 80_000
+        assert not ledger.reserve("c", "HKD", 30_000, capacity=100_000)
+
+        ledger.observe(7)
+        assert ledger.reserved("HKD") == 20_000
+        # 未提交（仍在执行中）的预留不受快照版本影响
+        ledger.observe(100)
+        assert ledger.snapshot() == {"HKD": 20_000}
+
+    def test_hold_expires_after_ttl(self):
+        now = [0.0]
+        ledger = BuyingPowerLedger(hold_ttl=30, clock=lambda: now[0])
+        ledger.reserve("a", "USD", 5_000, capacity=8_000)
+        ledger.hold("a", version=None)
+        ledger.observe(10)
+
+        now[0] = 29.0
+        assert ledger.reserved("USD") == 5_000
+        now[0] = 30.0
+        assert ledger.reserved("USD") == 0
+        assert ledger.apply({"cash": {"USD": 8_000.0}}) == {"cash": {"USD": 8_000.0}}
+
+    def test_pending_excludes_submitted_buys(self):
+        ledger = BuyingPowerLedger()
+        ledger.reserve("a", "HKD", 60_000, capacity=100_000)
+        ledger.reserve("b", "HKD", 20_000, capacity=100_000)
+        ledger.hold("a", version=3)
+        assert ledger.reserved("HKD") == 80_000
+        assert ledger.pending("HKD") == 20_000
+
+
+def make_executor(ledger, cash_max_qty, cash):
+    from scripts.order_executor import OrderExecutor
+
+    async def estimate_max_purchase_quantity(**kwargs):
+        return SimpleNamespace(cash_max_qty=cash_max_qty, margin_max_qty=None)
+
+    async def account_balance():
+        return {"cash": {"HKD": cash}}
+
+    executor = OrderExecutor.__new__(OrderExecutor)
+    executor.buying_power = ledger
+    executor.trade_client = SimpleNamespace(
+        estimate_max_purchase_quantity=estimate_max_purchase_quantity,
+        account_balance=account_balance,
+    )
+    return executor
+
+
+class TestLiveEstimatesAfterSubmit:
+    @pytest.mark.asyncio
+    async def test_submitted_buy_not_deducted_twice(self):
+        ledger = BuyingPowerLedger()
+        # 已提交的买单：券商预估与实时余额都已包含它
+        ledger.reserve("submitted", "HKD", 50_000, capacity=200_000)
+        ledger.hold("submitted", version=5)
+        executor = make_executor(ledger, cash_max_qty=1_000, cash=100_000.0)
+
+        assert await executor._estimate_available_quantity("700.HK", 100.0, 100) == 1_000
+        assert await executor._fallback_cash_estimate("700.HK", 100.0, 100) == 500
+
+        # 尚未提交的并发买单仍然扣减
+        ledger.reserve("in-flight", "HKD", 30_000, capacity=200_000)
+        assert await executor._estimate_available_quantity("700.HK", 100.0, 100) == 700
+        assert await executor._fallback_cash_estimate("700.HK", 100.0, 100) == 300
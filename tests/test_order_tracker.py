@@ -0,0 +1,157 @@
+"""Unit tests for push-driven order tracking."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from longport_quant.execution.order_tracker import OrderTracker, status_name
+from longport_quant.execution.smart_router import SmartOrderRouter
+
+
+class FakeTradeContext:
+    """Delivers order pushes from a foreign thread, like the SDK."""
+
+    def __init__(self):
+        self.callback = None
+        self.subscribed = []
+        self.details = {}
+        self.detail_calls = 0
+
+    def set_on_order_changed(self, callback):
+        self.callback = callback
+
+    def subscribe(self, topics):
+        self.subscribed.extend(topics)
+
+    def unsubscribe(self, topics):
+        self.subscribed.clear()
+
+    def order_detail(self, order_id):
+        self.detail_calls += 1
+        return self.details[order_id]
+
+    def push(self, order_id, status, executed=0, price=0.0, quantity=100):
+        event = SimpleNamespace(
+            order_id=order_id, symbol="AAPL.US", status=f"OrderStatus.{status}",
+            submitted_quantity=quantity, executed_quantity=executed,
+            executed_price=price, msg="",
+        )
+        thread = threading.Thread(target=self.callback, args=(event,))
+        thread.start()
+        thread.join()
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def ctx():
+    return FakeTradeContext()
+
+
+class TestOrderTracker:
+    def test_status_name(self):
+        assert status_name("OrderStatus.PartialFilled") == "PartialFilled"
+        assert status_name("Filled") == "Filled"
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_woken_by_pushes(self, ctx):
+        tracker = OrderTracker(ctx)
+        assert await tracker.start()
+        assert ctx.subscribed
+
+        partial = asyncio.create_task(tracker.wait("1", lambda s: s.executed_quantity > 0, timeout=1))
+        final = [asyncio.create_task(tracker.wait_for_terminal("1", timeout=1)) for _ in range(3)]
+        await settle()
+
+        ctx.push("1", "PartialFilled", executed=40, price=10.0)
+        state = await partial
+        assert state.status == "PartialFilled" and state.is_partially_filled
+        assert not any(task.done() for task in final)
+
+        ctx.push("1", "Filled", executed=100, price=10.5)
+        states = await asyncio.gather(*final)
+        assert all(s.is_filled and s.executed_quantity == 100 for s in states)
+        assert tracker.get_stats()["waiters"] == 0
+        assert ctx.detail_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_push_before_wait_is_not_lost(self, ctx):
+        tracker = OrderTracker(ctx)
+        await tracker.start()
+
+        ctx.push("2", "Rejected")
+        await settle()
+
+        state = await tracker.wait_for_terminal("2", timeout=0.1)
+        assert state.status == "Rejected" and state.is_terminal
+
+    @pytest.mark.asyncio
+    async def test_reconcile_covers_missing_push(self, ctx):
+        tracker = OrderTracker(ctx)
+        await tracker.start()
+        ctx.details["3"] = SimpleNamespace(
+            order_id="3", symbol="AAPL.US", status="OrderStatus.Canceled",
+            quantity=100, executed_quantity=0, executed_price=None, msg="",
+        )
+
+        async def reconcile(order_id):
+            return ctx.order_detail(order_id)
+
+        state = await tracker.wait_for_terminal("3", timeout=1, reconcile=reconcile, reconcile_interval=0.05)
+        assert state.status == "Canceled"
+        assert ctx.detail_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_terminal_orders_are_evicted(self, ctx):
+        tracker = OrderTracker(ctx, max_orders=2)
+        await tracker.start()
+        for order_id in ("a", "b", "c"):
+            ctx.push(order_id, "Filled", executed=1, price=1.0)
+        ctx.push("d", "New")
+        await settle()
+
+        assert tracker.get("a") is None and tracker.get("b") is None
+        assert [s.order_id for s in tracker.live_orders()] == ["d"]
+
+
+class TestRouterWaitForFill:
+    @pytest.mark.asyncio
+    async def test_fill_comes_from_push_without_polling(self, ctx):
+        tracker = OrderTracker(ctx)
+        await tracker.start()
+        router = SmartOrderRouter(ctx, db=None, order_tracker=tracker)
+
+        waiter = asyncio.create_task(router._wait_for_fill("9", timeout=5))
+        await settle()
+        ctx.push("9", "Filled", executed=100, price=12.5)
+
+        assert await waiter == (100, 12.5)
+        assert ctx.detail_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_then_cancel_keeps_executed_quantity(self, ctx):
+        tracker = OrderTracker(ctx)
+        await tracker.start()
+        router = SmartOrderRouter(ctx, db=None, order_tracker=tracker)
+
+        ctx.push("10", "PartialFilled", executed=30, price=9.0)
+        ctx.push("10", "PartialWithdrawal", executed=30, price=9.0)
+        await settle()
+
+        assert await router._wait_for_fill("10", timeout=1) == (30, 9.0)
+
+    @pytest.mark.asyncio
+    async def test_polling_keeps_partial_fill_after_cancel(self, ctx):
+        router = SmartOrderRouter(ctx, db=None)
+        ctx.details["11"] = SimpleNamespace(
+            order_id="11", symbol="AAPL.US", side="Buy", order_type="LO", status="OrderStatus.Canceled",
+            quantity=100, price=9.1, executed_quantity=40, executed_price=9.05, msg="",
+        )
+
+        assert await router._poll_for_fill("11", timeout=5) == (40, 9.05)
+        assert ctx.detail_calls == 1
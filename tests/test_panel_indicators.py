@@ -0,0 +1,87 @@
+"""Panel (symbols × time) indicators must match the per-symbol implementations."""
+
+import numpy as np
+import pytest
+
+from longport_quant.features import panel_indicators as panel
+from longport_quant.features.technical_indicators import TechnicalIndicators
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(7)
+    n_symbols, n_bars = 12, 120
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, n_bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    volume = rng.integers(1_000, 100_000, close.shape).astype(float)
+
+    close[3, :40] = np.nan       # 上市较晚的标的
+    close[5, [60, 61, 90]] = np.nan  # 停牌缺口
+    close[7, 50] = close[7, 49]  # 平盘（OBV不变）
+    return close, high, low, volume
+
+
+def assert_rows_match(actual, expected_fn):
+    for row in range(len(actual)):
+        np.testing.assert_allclose(
+            actual[row], expected_fn(row), rtol=1e-12, atol=1e-12, equal_nan=True
+        )
+
+
+class TestPanelIndicators:
+    def test_moving_averages(self, ohlcv):
+        close, *_ = ohlcv
+        for period in (5, 20, 50):
+            assert_rows_match(
+                panel.sma(close, period),
+                lambda r, period=period: TechnicalIndicators.sma(close[r], period),
+            )
+            assert_rows_match(
+                panel.ema(close, period),
+                lambda r, period=period: TechnicalIndicators.ema(close[r], period),
+            )
+
+    def test_macd_and_rsi(self, ohlcv):
+        close, *_ = ohlcv
+        result = panel.macd(close)
+        for key in ("macd", "signal", "histogram"):
+            assert_rows_match(
+                result[key], lambda r, key=key: TechnicalIndicators.macd(close[r])[key]
+            )
+        assert_rows_match(panel.rsi(close, 14), lambda r: TechnicalIndicators.rsi(close[r], 14))
+
+    def test_bands_atr_obv(self, ohlcv):
+        close, high, low, volume = ohlcv
+        bands = panel.bollinger_bands(close, 20, 2)
+        for key in ("upper", "middle", "lower"):
+            assert_rows_match(
+                bands[key],
+                lambda r, key=key: TechnicalIndicators.bollinger_bands(close[r], 20, 2)[key],
+            )
+        assert_rows_match(
+            panel.atr(high, low, close),
+            lambda r: TechnicalIndicators.atr(high[r], low[r], close[r]),
+        )
+        np.testing.assert_array_equal(
+            panel.obv(close, volume),
+            np.vstack([TechnicalIndicators.obv(close[r], volume[r]) for r in range(len(close))]),
+        )
+
+    def test_short_history_and_single_series(self):
+        short = np.arange(10, dtype=float)
+        assert np.isnan(panel.ema(short, 20)).all()
+        assert np.isnan(panel.rsi(short, 14)).all()
+        assert panel.sma(short, 3).shape == (1, 10)
+
+        series = {"A.US": [1, 2, 3], "B.US": [4, 5, 6]}
+        symbols, matrix = panel.stack_panel(series, ["B.US", "A.US"])
+        assert symbols == ["B.US", "A.US"]
+        assert matrix[0].tolist() == [4, 5, 6]
+
+    def test_calculate_panel_indicators_keys(self, ohlcv):
+        close, high, low, volume = ohlcv
+        result = panel.calculate_panel_indicators(close, high, low, volume)
+        expected = {"sma_50", "ema_20", "macd_signal", "rsi_14", "bb_lower", "atr_14", "obv"}
+        assert expected <= set(result)
+        assert all(matrix.shape == close.shape for matrix in result.values())
@@ -0,0 +1,186 @@
+"""Unit tests for the COPY-based market data persistence queue."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from longport_quant.data.enhanced_market_data import DataType, PersistenceQueue
+from longport_quant.persistence.bulk_copy import build_merge_sql, copy_records, staging_table_name
+
+
+class FakeConnection:
+    """Records the statements and COPY payloads sent to asyncpg."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.statements = []
+        self.copies = []
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+        return "INSERT 0 1" if sql.startswith("INSERT") else "OK"
+
+    async def copy_records_to_table(self, table, records, columns, schema_name=None):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        rows = list(records)
+        self.copies.append((table, tuple(columns), rows))
+        return f"COPY {len(rows)}"
+
+
+class FakeDatabase:
+    def __init__(self, conn):
+        self.conn = conn
+        self.commits = 0
+
+    @asynccontextmanager
+    async def session(self):
+        raw = SimpleNamespace(driver_connection=self.conn)
+
+        async def get_raw_connection():
+            return raw
+
+        async def connection():
+            return SimpleNamespace(get_raw_connection=get_raw_connection)
+
+        async def commit():
+            self.commits += 1
+
+        yield SimpleNamespace(connection=connection, commit=commit)
+
+
+def quote(symbol, price=10.0, ts=None):
+    return {"symbol": symbol, "last_price": price, "volume": 100,
+            "timestamp": ts or datetime(2024, 1, 2, 9, 30)}
+
+
+class TestBulkCopy:
+    def test_merge_sql_deduplicates_and_updates_non_key_columns(self):
+        sql = build_merge_sql("realtime_quotes", "_stage", ["symbol", "timestamp", "last_done"],
+                              ["symbol", "timestamp"])
+
+        assert 'SELECT DISTINCT ON ("symbol", "timestamp")' in sql
+        assert 'ORDER BY "symbol", "timestamp", ctid DESC' in sql
+        assert 'DO UPDATE SET "last_done" = EXCLUDED."last_done"' in sql
+        assert "DO NOTHING" in build_merge_sql("t", "s", ["a", "b"], ["a"], update_columns=[])
+
+    @pytest.mark.asyncio
+    async def test_copy_without_key_goes_straight_to_table(self):
+        conn = FakeConnection()
+        count = await copy_records(conn, "public.trade_ticks", ["symbol"], iter([("A",), ("B",)]))
+
+        assert count == 2
+        assert conn.copies == [("trade_ticks", ("symbol",), [("A",), ("B",)])]
+        assert conn.statements == []
+
+    @pytest.mark.asyncio
+    async def test_copy_with_key_stages_then_merges(self):
+        conn = FakeConnection()
+        await copy_records(conn, "kline_daily", ["symbol", "trade_date", "close"], [("A", 1, 2)],
+                           conflict_columns=["symbol", "trade_date"])
+
+        stage = staging_table_name("kline_daily", ["symbol", "trade_date", "close"])
+        assert conn.statements[0].startswith(
+            f'CREATE TEMP TABLE IF NOT EXISTS "{stage}" ON COMMIT DELETE ROWS'
+        )
+        assert conn.statements[1] == f'TRUNCATE "{stage}"'
+        assert conn.copies[0][0] == stage
+        assert conn.statements[2].startswith('INSERT INTO "kline_daily"')
+
+
+class TestPersistenceQueue:
+    @pytest.mark.asyncio
+    async def test_flush_drains_backlog_in_copy_batches(self):
+        conn = FakeConnection()
+        db = FakeDatabase(conn)
+        queue = PersistenceQueue(db, batch_size=100, max_batch_size=1000)
+
+        for i in range(2500):
+            await queue.enqueue(DataType.QUOTE, quote(f"S{i}.US"))
+        await queue._flush_all()
+
+        assert [len(rows) for _, _, rows in conn.copies] == [1000, 1000, 500]
+        assert db.commits == 3
+        stats = queue.get_stats()["quote"]
+        assert stats["persisted"] == 2500
+        assert stats["pending"] == 0
+        assert stats["dropped"] == 0
+
+        row = conn.copies[0][2][0]
+        assert row[0] == "S0.US"
+        assert row[2] == Decimal("10.0")
+
+    @pytest.mark.asyncio
+    async def test_flush_takes_turns_between_queues(self):
+        conn = FakeConnection()
+        queue = PersistenceQueue(FakeDatabase(conn), batch_size=10, max_batch_size=100)
+
+        for i in range(300):
+            await queue.enqueue(DataType.QUOTE, quote(f"S{i}.US"))
+        for i in range(150):
+            await queue.enqueue(DataType.TRADE, {"symbol": "AAPL.US", "price": i, "volume": 1})
+        await queue._flush_all()
+
+        # Quote backlog does not hold trades back until it is fully drained
+        tables = [(table, len(rows)) for table, _, rows in conn.copies]
+        assert [size for _, size in tables] == [100, 100, 100, 50, 100]
+        assert tables[0][0] != tables[1][0]
+        assert queue.get_stats()["trade"]["persisted"] == 150
+
+    @pytest.mark.asyncio
+    async def test_depth_levels_are_flattened(self):
+        conn = FakeConnection()
+        queue = PersistenceQueue(FakeDatabase(conn))
+
+        await queue.enqueue(DataType.DEPTH, {
+            "symbol": "AAPL.US", "timestamp": datetime(2024, 1, 2),
+            "bid_prices": [10.0, 9.9], "bid_sizes": [100, 200],
+            "ask_prices": [10.1], "ask_sizes": [300],
+        })
+        await queue._flush_all()
+
+        rows = conn.copies[0][2]
+        assert [(r[2], r[3]) for r in rows] == [(1, "BID"), (2, "BID"), (1, "ASK")]
+        conflict = 'ON CONFLICT ("symbol", "timestamp", "position", "side")'
+        assert any(conflict in s for s in conn.statements)
+
+    @pytest.mark.asyncio
+    async def test_overflow_and_failures_are_counted(self):
+        conn = FakeConnection(fail=True)
+        queue = PersistenceQueue(FakeDatabase(conn), queue_size=10)
+
+        for i in range(15):
+            await queue.enqueue(DataType.TRADE, {"symbol": "AAPL.US", "price": i, "volume": 1})
+        await queue._flush_all()
+
+        stats = queue.get_stats()["trade"]
+        assert stats["enqueued"] == 15
+        assert stats["dropped"] == 5
+        assert stats["failed_batches"] == 1
+        # Failed batch is put back in order for the next flush
+        assert stats["pending"] == 10
+        assert queue._queues["trade"][0][1]["price"] == 5
+
+        conn.fail = False
+        await queue._flush_all()
+        assert queue.get_stats()["trade"]["persisted"] == 10
+
+    @pytest.mark.asyncio
+    async def test_full_batch_wakes_flush_loop_early(self):
+        conn = FakeConnection()
+        queue = PersistenceQueue(FakeDatabase(conn), batch_size=10, flush_interval=60)
+        await queue.start()
+        try:
+            for i in range(10):
+                await queue.enqueue(DataType.QUOTE, quote(f"S{i}.US"))
+            for _ in range(50):
+                if conn.copies:
+                    break
+                await asyncio.sleep(0.01)
+            assert sum(len(rows) for _, _, rows in conn.copies) == 10
+        finally:
+            await queue.stop()
@@ -0,0 +1,240 @@
+"""Unit tests for the post-trade outbox and the stage timer."""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from longport_quant.messaging.outbox import PostTradeOutbox
+from longport_quant.utils import StageTimer
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def outbox():
+    box = PostTradeOutbox(key="test:outbox", max_attempts=2, retry_delay=0.01, block_timeout=0.05)
+    box._redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return box
+
+
+class TestPostTradeOutbox:
+    @pytest.mark.asyncio
+    async def test_steps_run_in_order_and_share_results(self, outbox):
+        calls = []
+
+        async def position(data, results):
+            calls.append("position")
+            return {"qty": data["quantity"]}
+
+        async def notify(data, results):
+            calls.append("notify")
+            assert results["position"] == {"qty": 100}
+
+        outbox.register("position", position)
+        outbox.register("notify", notify)
+
+        await outbox.enqueue(["position", "notify"], {"symbol": "700.HK", "quantity": 100}, timings={"submit": 12.5})
+        assert await outbox.run_once() is True
+        assert await outbox.run_once() is False
+
+        assert calls == ["position", "notify"]
+        stats = await outbox.get_stats()
+        assert stats["completed"] == 1 and stats["pending"] == 0 and stats["processing"] == 0
+        assert not await outbox._redis.hlen(outbox.jobs_key)
+
+        [record] = await outbox.recent_timings()
+        assert record["symbol"] == "700.HK"
+        assert record["timings"]["submit"] == 12.5
+        assert {"outbox_wait", "post.position", "post.notify"} <= set(record["timings"])
+
+    @pytest.mark.asyncio
+    async def test_retry_runs_only_unfinished_steps(self, outbox):
+        calls = []
+        flaky = {"fail": True}
+
+        async def position(data, results):
+            calls.append("position")
+
+        async def record(data, results):
+            calls.append("order_record")
+            if flaky["fail"]:
+                raise RuntimeError("db down")
+
+        async def notify(data, results):
+            calls.append("notify")
+
+        outbox.register("position", position)
+        outbox.register("order_record", record)
+        outbox.register("notify", notify)
+
+        await outbox.enqueue(["position", "order_record", "notify"], {"symbol": "AAPL.US"})
+        await outbox.run_once()
+        # A failed step does not hold up the steps after it
+        assert calls == ["position", "order_record", "notify"]
+        assert (await outbox.get_stats())["delayed"] == 1
+
+        flaky["fail"] = False
+        await asyncio.sleep(0.02)
+        assert await outbox.promote_due() == 1
+        await outbox.run_once()
+
+        assert calls == ["position", "order_record", "notify", "order_record"]
+        stats = await outbox.get_stats()
+        assert stats["retried"] == 1 and stats["completed"] == 1 and stats["delayed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self, outbox):
+        async def broken(data, results):
+            raise RuntimeError("boom")
+
+        outbox.register("notify", broken)
+        job_id = await outbox.enqueue(["notify"], {"symbol": "TSLA.US"})
+
+        await outbox.run_once()
+        await outbox._redis.zadd(outbox.delayed_key, {job_id: time.time() - 1})
+        await outbox.promote_due()
+        await outbox.run_once()
+
+        stats = await outbox.get_stats()
+        assert stats["dead_total"] == 1 and stats["delayed"] == 0 and stats["pending"] == 0
+        assert await outbox._redis.lrange(outbox.dead_key, 0, -1) == [job_id]
+        assert await outbox._redis.hexists(outbox.jobs_key, job_id)
+
+    @pytest.mark.asyncio
+    async def test_recover_requeues_interrupted_jobs(self, outbox):
+        first = await outbox.enqueue(["notify"], {"symbol": "A.US"})
+        second = await outbox.enqueue(["notify"], {"symbol": "B.US"})
+        # Simulate a worker that took both jobs and then died
+        redis = outbox._redis
+        await redis.lmove(outbox.pending_key, outbox.processing_key, "RIGHT", "LEFT")
+        await redis.lmove(outbox.pending_key, outbox.processing_key, "RIGHT", "LEFT")
+
+        assert await outbox.recover() == 2
+        assert await redis.llen(outbox.processing_key) == 0
+
+        seen = []
+
+        async def notify(data, results):
+            seen.append(data["symbol"])
+
+        outbox.register("notify", notify)
+        while await outbox.run_once():
+            pass
+        assert seen == ["A.US", "B.US"]
+        assert first != second
+
+    @pytest.mark.asyncio
+    async def test_background_worker_drains_queue(self, outbox):
+        done = asyncio.Event()
+
+        async def notify(data, results):
+            done.set()
+
+        outbox.register("notify", notify)
+        outbox.start()
+        try:
+            await outbox.enqueue(["notify"], {"symbol": "700.HK"})
+            await asyncio.wait_for(done.wait(), 1)
+        finally:
+            await outbox.stop()
+        assert outbox._task is None
+
+    @pytest.mark.asyncio
+    async def test_run_inline_reports_failed_steps(self, outbox):
+        async def ok(data, results):
+            return "ok"
+
+        async def broken(data, results):
+            raise RuntimeError("boom")
+
+        outbox.register("position", ok)
+        outbox.register("notify", broken)
+        assert await outbox.run_inline(["position", "notify", "missing"], {"symbol": "700.HK"}) == ["notify", "missing"]
+
+
+
+def make_executor(calls, outbox=None):
+    from scripts.order_executor import OrderExecutor
+
+    async def add_position(**kwargs):
+        calls.append("position")
+        return True
+
+    async def save_order(**kwargs):
+        calls.append("order_record")
+        raise RuntimeError("db down")
+
+    executor = OrderExecutor.__new__(OrderExecutor)
+    executor.account_id = "paper_001"
+    executor.settings = SimpleNamespace(
+        redis_url="redis://fake", post_trade_outbox_enabled=outbox is not None,
+        post_trade_outbox_max_attempts=2,
+    )
+    executor.outbox = outbox
+    executor._inline_post_trade = None
+    executor.position_manager = SimpleNamespace(add_position=add_position)
+    executor.order_manager = SimpleNamespace(save_order=save_order)
+    return executor
+
+
+FILL = {"symbol": "700.HK", "order_id": "1", "child_orders": [], "filled_quantity": 100,
+        "average_price": 320.0, "status": "Filled"}
+
+
+class TestOrderExecutorPostTrade:
+    @pytest.mark.asyncio
+    async def test_fill_is_recorded_inline_and_rest_is_enqueued(self, outbox):
+        calls = []
+        executor = make_executor(calls, outbox)
+        # 订单记录失败只记录错误，不影响持仓更新
+        await executor._record_fill(dict(FILL))
+        assert sorted(calls) == ["order_record", "position"]
+
+        await executor._submit_post_trade(dict(FILL))
+        [job_id] = await outbox._redis.lrange(outbox.pending_key, 0, -1)
+        job = json.loads(await outbox._redis.hget(outbox.jobs_key, job_id))
+        assert job["steps"] == ["backup_stop", "backup_profit", "stop_record", "notify"]
+
+    @pytest.mark.asyncio
+    async def test_inline_fallback_builds_outbox_once(self):
+        executor = make_executor([])
+        built, ran = [], []
+
+        async def run_inline(steps, data, timings=None):
+            ran.append(data["symbol"])
+
+        def build():
+            box = PostTradeOutbox(key="test:outbox")
+            box.run_inline = run_inline
+            built.append(box)
+            return box
+
+        executor._build_post_trade_outbox = build
+        await executor._submit_post_trade(dict(FILL))
+        await executor._submit_post_trade(dict(FILL))
+
+        assert len(built) == 1
+        assert ran == ["700.HK", "700.HK"]
+
+def test_stage_timer_accumulates_stages():
+    timer = StageTimer()
+    with timer.stage("lookups"):
+        time.sleep(0.001)
+    with timer.stage("lookups"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.stage("submit"):
+            raise ValueError("failed stages are still timed")
+
+    timings = timer.as_dict()
+    assert list(timings) == ["lookups", "submit", "total"]
+    assert timings["lookups"] >= 1.0
+    assert timings["total"] == pytest.approx(timings["lookups"] + timings["submit"], abs=0.2)
+    assert "lookups=" in timer.summary()
@@ -0,0 +1,183 @@
+"""Unit tests for request coalescing and TTL caching in QuoteDataClient."""
+
+import asyncio
+import threading
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from longport import openapi
+
+from longport_quant.data.quote_cache import QuoteBatcher, SingleFlightCache
+from longport_quant.data.quote_client import QuoteDataClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeQuoteContext:
+    """Synchronous SDK stand-in; each call blocks briefly like a network round trip."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+        threading.Event().wait(0.05)
+
+    def realtime_quote(self, symbols):
+        self._record("realtime_quote", tuple(symbols))
+        return [SimpleNamespace(symbol=s, last_done=100) for s in symbols if s != "DELISTED.HK"]
+
+    def candlesticks(self, symbol, period, count, adjust_type):
+        self._record("candlesticks", symbol, str(period), count)
+        return [SimpleNamespace(close=i) for i in range(count)]
+
+    def history_candlesticks_by_date(self, symbol, period, adjust_type, start, end):
+        self._record("history_candlesticks_by_date", symbol, start, end)
+        return [SimpleNamespace(close=1)]
+
+
+def make_client(**cache_config):
+    client = QuoteDataClient(SimpleNamespace(), cache_config=cache_config)
+    client._ctx = FakeQuoteContext()
+    return client
+
+
+class TestSingleFlightCache:
+    @pytest.mark.asyncio
+    async def test_coalesces_and_expires(self):
+        clock = FakeClock()
+        cache = SingleFlightCache(ttls={"bars": 5}, clock=clock)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [1, 2, 3]
+
+        results = await asyncio.gather(*(cache.get_or_fetch("bars", "700.HK", fetch) for _ in range(5)))
+        assert results == [[1, 2, 3]] * 5 and len(calls) == 1
+        results[0].append(4)  # 调用方修改返回值不影响缓存
+
+        assert await cache.get_or_fetch("bars", "700.HK", fetch) == [1, 2, 3]
+        clock.now += 6
+        await cache.get_or_fetch("bars", "700.HK", fetch)
+        assert len(calls) == 2
+        assert dict(cache.stats["bars"]) == {"hits": 1, "misses": 2, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_but_not_cached(self):
+        cache = SingleFlightCache(ttls={"bars": 60})
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("rate limited")
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("bars", "k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results) and len(calls) == 1
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("bars", "k", fail)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_follower_retries_when_leader_cancelled(self):
+        cache = SingleFlightCache(ttls={"bars": 60})
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "ok"
+
+        leader = asyncio.create_task(cache.get_or_fetch("bars", "k", slow))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_fetch("bars", "k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "ok"
+
+
+class TestQuoteBatcher:
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self):
+        requests = []
+
+        async def fetch(symbols):
+            requests.append(list(symbols))
+            return [SimpleNamespace(symbol=s) for s in symbols]
+
+        batcher = QuoteBatcher(fetch, ttl=1.0, max_batch=3)
+        results = await asyncio.gather(
+            batcher.get(["700.HK", "9988.HK"]),
+            batcher.get(["9988.HK", "3690.HK", "1810.HK"]),
+        )
+        assert [q.symbol for q in results[1]] == ["9988.HK", "3690.HK", "1810.HK"]
+        assert requests == [["700.HK", "9988.HK", "3690.HK"], ["1810.HK"]]
+        assert batcher.stats == {"hits": 0, "misses": 4, "coalesced": 1, "requests": 2}
+
+
+class TestQuoteDataClientCache:
+    @pytest.mark.asyncio
+    async def test_realtime_quotes_batched_and_cached(self):
+        client = make_client()
+        results = await asyncio.gather(
+            client.get_realtime_quote(["700.HK", "9988.HK"]),
+            client.get_realtime_quote(["700.HK"]),
+            client.get_realtime_quote(["DELISTED.HK", "3690.HK"]),
+        )
+        assert [[q.symbol for q in r] for r in results] == [["700.HK", "9988.HK"], ["700.HK"], ["3690.HK"]]
+        assert client._ctx.calls == [("realtime_quote", ("700.HK", "9988.HK", "DELISTED.HK", "3690.HK"))]
+
+        await client.get_realtime_quote(["9988.HK"])
+        assert len(client._ctx.calls) == 1
+        assert client.cache_stats()["realtime_quote"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_candle_requests_coalesced(self):
+        client = make_client()
+        day, adjust = openapi.Period.Day, openapi.AdjustType.NoAdjust
+        await asyncio.gather(
+            client.get_candlesticks("700.HK", day, 60, adjust),
+            client.get_candlesticks("700.HK", day, 60, adjust),
+            client.get_candlesticks("700.HK", day, 20, adjust),
+        )
+        assert sorted(c[3] for c in client._ctx.calls) == [20, 60]
+        assert client.cache_stats()["candlesticks"] == {"hits": 0, "misses": 2, "coalesced": 1}
+
+    @pytest.mark.asyncio
+    async def test_history_requests_keyed_by_date(self):
+        client = make_client()
+        day, adjust = openapi.Period.Day, openapi.AdjustType.NoAdjust
+        start = datetime(2024, 1, 2, 9, 30)
+        await asyncio.gather(
+            client.get_history_candles("700.HK", day, adjust, start, datetime(2024, 5, 2, 10, 0, 0, 1)),
+            client.get_history_candles("700.HK", day, adjust, start, datetime(2024, 5, 2, 10, 0, 0, 2)),
+        )
+        await client.get_history_candles("700.HK", day, adjust, start, datetime(2024, 5, 2, 10, 0, 0, 3))
+        assert client._ctx.calls == [
+            ("history_candlesticks_by_date", "700.HK", date(2024, 1, 2), date(2024, 5, 2))
+        ]
+        assert client.cache_stats()["history_candles"] == {"hits": 1, "misses": 1, "coalesced": 1}
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_calls_sdk_every_time(self):
+        client = make_client(enabled=False)
+        day, adjust = openapi.Period.Day, openapi.AdjustType.NoAdjust
+        for _ in range(2):
+            await client.get_candlesticks("700.HK", day, 5, adjust)
+            await client.get_realtime_quote(["700.HK"])
+        assert len(client._ctx.calls) == 4
@@ -0,0 +1,73 @@
+"""Unit tests for the async token bucket rate limiter."""
+
+import asyncio
+
+import pytest
+
+from longport_quant.utils.rate_limit import AsyncTokenBucket, load_api_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAsyncTokenBucket:
+    @pytest.mark.asyncio
+    async def test_burst_up_to_capacity_then_waits(self, monkeypatch):
+        clock = FakeClock()
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        bucket = AsyncTokenBucket(rate=8, clock=clock)
+
+        waits = [await bucket.acquire() for _ in range(10)]
+
+        assert waits[:8] == [0.0] * 8
+        assert waits[8] == pytest.approx(1 / 8)
+        assert waits[9] == pytest.approx(1 / 8)
+        assert sum(sleeps) == pytest.approx(0.25)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_are_spaced_by_rate(self):
+        bucket = AsyncTokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+
+        # 1 immediate + 5 spaced 20ms apart
+        assert loop.time() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_returns_its_tokens(self):
+        clock = FakeClock()
+        bucket = AsyncTokenBucket(rate=1, capacity=1, clock=clock)
+        await bucket.acquire()
+
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        assert bucket.available == pytest.approx(-1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert bucket.available == pytest.approx(0)
+
+    def test_invalid_rate_rejected(self):
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=0)
+
+    def test_api_limits_config_is_loaded(self, tmp_path):
+        assert load_api_limits(tmp_path / "missing.yml") == {}
+
+        path = tmp_path / "limits.yml"
+        path.write_text("rate_limit:\n  enabled: true\n  max_calls_per_second: 5\n")
+        assert load_api_limits(path)["rate_limit"]["max_calls_per_second"] == 5
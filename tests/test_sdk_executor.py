@@ -0,0 +1,174 @@
+"""Unit tests for the prioritised, rate-limited SDK executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from longport_quant.utils.sdk_executor import Priority, SdkExecutor, endpoint_info
+
+
+def blocker():
+    """A blocking SDK call that holds its worker until released."""
+    started, release = threading.Event(), threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        return "blocked"
+
+    return call, started, release
+
+
+class TestSdkExecutor:
+    def test_endpoint_classes(self):
+        assert endpoint_info("trade.submit_order") == (Priority.ORDER, "trade")
+        assert endpoint_info("trade.order_detail") == (Priority.TRADING, "trade")
+        assert endpoint_info("trade.history_orders") == (Priority.HISTORY, "trade")
+        assert endpoint_info("quote.history_candlesticks_by_date") == (Priority.HISTORY, "quote")
+        assert endpoint_info("quote.static_info") == (Priority.REFERENCE, "quote")
+        assert endpoint_info("quote.set_on_quote")[1] is None
+
+    @pytest.mark.asyncio
+    async def test_trading_calls_jump_the_queue(self):
+        executor = SdkExecutor(max_workers=1)
+        call, started, release = blocker()
+        order = []
+
+        first = asyncio.create_task(executor.run("quote.history_candlesticks_by_date", call))
+        await asyncio.to_thread(started.wait, 5)
+
+        queued = [
+            asyncio.create_task(executor.run(endpoint, order.append, endpoint))
+            for endpoint in (
+                "quote.static_info",
+                "quote.history_candlesticks_by_date",
+                "quote.realtime_quote",
+                "trade.submit_order",
+            )
+        ]
+        await asyncio.sleep(0.05)
+        stats = executor.get_stats()
+        assert stats["slot_waiters"] == 4
+        assert stats["endpoints"]["priority.reference"]["queued"] == 1
+
+        release.set()
+        assert await first == "blocked"
+        await asyncio.gather(*queued)
+        assert order == [
+            "trade.submit_order",
+            "quote.realtime_quote",
+            "quote.history_candlesticks_by_date",
+            "quote.static_info",
+        ]
+
+        stats = executor.get_stats()["endpoints"]
+        assert stats["trade.submit_order"]["calls"] == 1
+        submit = stats["trade.submit_order"]
+        assert submit["queued"] == 0 and submit["running"] == 0
+        assert stats["quote.static_info"]["wait_max"] > 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_quota_groups_are_independent(self):
+        executor = SdkExecutor(
+            max_workers=4,
+            group_limits={"quote": {"rate": 20, "burst": 1}},
+            endpoint_limits={"trade.order_detail": {"rate": 1000, "burst": 5}},
+        )
+        loop = asyncio.get_running_loop()
+        done_at = {}
+
+        async def call(endpoint, tag):
+            await executor.run(endpoint, lambda: None)
+            done_at[tag] = loop.time()
+
+        start = loop.time()
+        await asyncio.gather(
+            *(call("quote.candlesticks", f"q{i}") for i in range(3)),
+            call("trade.order_detail", "t"),
+        )
+        # 行情配额耗尽（每次间隔50ms）不影响交易接口
+        assert done_at["q2"] - start >= 0.09
+        assert done_at["t"] - start < 0.05
+        assert executor.get_stats()["endpoints"]["quote.candlesticks"]["wait_max"] >= 0.09
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_low_priority_flood_does_not_hold_back_tokens(self):
+        executor = SdkExecutor(max_workers=8, group_limits={"quote": {"rate": 20, "burst": 1}})
+        loop = asyncio.get_running_loop()
+
+        flood = [
+            asyncio.create_task(executor.run("quote.history_candlesticks_by_date", lambda: None))
+            for _ in range(20)
+        ]
+        await asyncio.sleep(0.01)
+        assert executor._group_buckets["quote"].waiting == 19
+
+        start = loop.time()
+        await executor.run("quote.realtime_quote", lambda: None)
+        # 最多等一个令牌间隔（50ms），而不是排在20个历史请求之后（~1s）
+        assert loop.time() - start < 0.08
+        assert sum(task.done() for task in flood) <= 2
+
+        for task in flood:
+            task.cancel()
+        await asyncio.gather(*flood, return_exceptions=True)
+        assert executor._group_buckets["quote"].waiting == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_token_waiters_are_served_by_priority(self):
+        executor = SdkExecutor(max_workers=8, group_limits={"quote": {"rate": 50, "burst": 1}})
+        order = []
+
+        await executor.run("quote.static_info", lambda: None)  # 耗尽令牌
+        endpoints = ["quote.static_info", "quote.history_candlesticks_by_date",
+                     "quote.realtime_quote"]
+        await asyncio.gather(*(executor.run(e, order.append, e) for e in endpoints))
+        assert order == endpoints[::-1]
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        executor = SdkExecutor(max_workers=1)
+        call, started, release = blocker()
+
+        first = asyncio.create_task(executor.run("quote.realtime_quote", call))
+        await asyncio.to_thread(started.wait, 5)
+        waiter = asyncio.create_task(executor.run("quote.realtime_quote", lambda: "late"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        release.set()
+        await first
+        assert await asyncio.wait_for(executor.run("trade.submit_order", lambda: "ok"), 1) == "ok"
+        assert executor.get_stats()["endpoints"]["quote.realtime_quote"]["queued"] == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_counted(self):
+        executor = SdkExecutor(max_workers=2)
+
+        def fail():
+            raise ValueError("bad symbol")
+
+        with pytest.raises(ValueError):
+            await executor.run("quote.static_info", fail)
+        await asyncio.sleep(0)
+        assert executor.get_stats()["endpoints"]["quote.static_info"]["errors"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_orders_take_trade_tokens_before_polls(self):
+        executor = SdkExecutor(max_workers=8, group_limits={"trade": {"rate": 50, "burst": 1}})
+        order = []
+
+        await executor.run("trade.order_detail", lambda: None)  # 耗尽令牌
+        endpoints = ["trade.order_detail", "trade.account_balance", "trade.submit_order"]
+        await asyncio.gather(*(executor.run(e, order.append, e) for e in endpoints))
+        assert order[0] == "trade.submit_order"
+        executor.shutdown()
@@ -0,0 +1,95 @@
+"""Unit tests for the shared security reference data cache."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from longport_quant.data.security_reference import SecurityReferenceService
+from longport_quant.execution.smart_router import SmartOrderRouter
+from longport_quant.utils import LotSizeHelper
+
+
+LOTS = {"700.HK": 100, "9988.HK": 100, "1398.HK": 1000, "AAPL.US": 1}
+
+
+class FakeQuoteClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get_static_info(self, symbols):
+        self.calls.append(list(symbols))
+        return [
+            SimpleNamespace(symbol=s, lot_size=LOTS[s], name_cn=f"名称{s}", name_en=s,
+                            exchange="SEHK", currency="HKD", board="HKEquity")
+            for s in symbols if s in LOTS
+        ]
+
+
+def make_service(quote, server, **kwargs):
+    service = SecurityReferenceService(quote_client=quote, redis_url="redis://fake", **kwargs)
+    service._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return service
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+class TestSecurityReference:
+    @pytest.mark.asyncio
+    async def test_preload_is_one_batched_call(self, server):
+        quote = FakeQuoteClient()
+        service = make_service(quote, server, batch_size=2)
+
+        await service.preload(list(LOTS))
+        assert quote.calls == [["700.HK", "9988.HK"], ["1398.HK", "AAPL.US"]]
+
+        lots = await service.lot_sizes(["1398.HK", "AAPL.US", "UNKNOWN.HK"])
+        assert lots == {"1398.HK": 1000, "AAPL.US": 1, "UNKNOWN.HK": 100}
+        assert await service.name_cn("700.HK") == "名称700.HK"
+        assert quote.calls[-1] == ["UNKNOWN.HK"]
+
+        # 未知标的在 miss_ttl 内不再请求API
+        assert await service.lot_size("UNKNOWN.HK") == 100
+        assert len(quote.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_other_process_reads_from_redis(self, server):
+        generator_quote, executor_quote = FakeQuoteClient(), FakeQuoteClient()
+        await make_service(generator_quote, server).preload(list(LOTS))
+
+        executor = make_service(executor_quote, server)
+        assert await executor.preload() == len(LOTS)
+        assert executor.cached_lot_size("1398.HK") == 1000
+        assert await executor.lot_size("1398.HK") == 1000
+        assert executor_quote.calls == []
+
+    @pytest.mark.asyncio
+    async def test_misses_are_batched_and_refresh_is_background(self, server):
+        quote = FakeQuoteClient()
+        service = make_service(quote, server, max_age=60)
+
+        refs = await service.get_many(["700.HK", "1398.HK", "700.HK"])
+        assert set(refs) == {"700.HK", "1398.HK"}
+        assert quote.calls == [["700.HK", "1398.HK"]]
+
+        assert await service.refresh_stale() == 0
+        old = service._refs["700.HK"]
+        service._refs["700.HK"] = type(old)(**{**old.__dict__, "updated_at": time.time() - 120})
+        assert await service.refresh_stale() == 1
+        assert quote.calls[-1] == ["700.HK"]
+
+    @pytest.mark.asyncio
+    async def test_router_and_helper_use_shared_cache(self, server):
+        quote = FakeQuoteClient()
+        service = make_service(quote, server)
+        await service.preload(["1398.HK"])
+
+        router = SmartOrderRouter(None, db=None, quote_client=quote, security_ref=service)
+        assert await router._validate_and_adjust_quantity("1398.HK", 2500) == 2000
+        assert await LotSizeHelper(reference=service).get_lot_size("1398.HK", quote) == 1000
+        assert len(quote.calls) == 1
@@ -0,0 +1,357 @@
+"""Unit tests for the Redis signal queue and its secondary indexes."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from longport_quant.messaging.signal_queue import SignalQueue
+
+
+@pytest.fixture
+def queue():
+    q = SignalQueue(queue_key="test:signals",
+                    processing_key="test:signals:processing",
+                    failed_key="test:signals:failed")
+    q._redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return q
+
+
+def make_signal(symbol, signal_type="BUY", score=60, **extra):
+    return {"symbol": symbol, "type": signal_type, "score": score, "price": 10.0, **extra}
+
+
+class TestSignalQueueIndexes:
+    """Dedup checks must be served from the indexes and stay in sync."""
+
+    @pytest.mark.asyncio
+    async def test_publish_indexes_symbol_and_type(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+        await queue.publish_signal(make_signal("TSLA.US", "SELL"))
+
+        assert await queue.has_pending_signal("AAPL.US")
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+        assert not await queue.has_pending_signal("AAPL.US", "SELL")
+        assert await queue.has_pending_signal("TSLA.US", "SELL")
+        assert await queue.get_pending_symbols() == {"AAPL.US", "TSLA.US"}
+
+    @pytest.mark.asyncio
+    async def test_consume_and_complete_keep_indexes_in_sync(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+
+        signal = await queue.consume_signal()
+        assert signal["symbol"] == "AAPL.US"
+        # Still pending while in the processing queue
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+
+        await queue.mark_signal_completed(signal)
+        assert not await queue.has_pending_signal("AAPL.US")
+        assert await queue.get_pending_symbols() == set()
+
+    @pytest.mark.asyncio
+    async def test_delayed_signals_do_not_block_dedup(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+        signal = await queue.consume_signal()
+        await queue.requeue_with_delay(signal, delay_minutes=5)
+
+        assert not await queue.has_pending_signal("AAPL.US", "BUY")
+        assert await queue.count_delayed_signals() == 1
+        assert [s["symbol"] for s in await queue.get_delayed_signals()] == ["AAPL.US"]
+
+        assert await queue.wake_up_delayed_signals() == 1
+        assert await queue.count_delayed_signals() == 0
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+
+    @pytest.mark.asyncio
+    async def test_requeue_replaces_same_symbol_and_type(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US", score=50))
+        await queue.publish_signal(make_signal("AAPL.US", "SELL"))
+        signal = await queue.consume_signal()  # higher score first
+        assert signal["type"] == "SELL"
+        await queue.publish_signal(make_signal("AAPL.US", "SELL", score=40))
+
+        await queue.requeue_with_delay(signal, delay_minutes=5)
+
+        assert await queue.get_queue_size() == 2
+        assert await queue.count_delayed_signals() == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_retry_and_final_failure(self, queue):
+        queue.max_retries = 2
+        await queue.publish_signal(make_signal("AAPL.US"))
+
+        signal = await queue.consume_signal()
+        await queue.mark_signal_failed(signal, "boom")
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+
+        signal = await queue.consume_signal()
+        await queue.mark_signal_failed(signal, "boom again")
+        assert not await queue.has_pending_signal("AAPL.US")
+        assert await queue.get_failed_size() == 1
+
+    @pytest.mark.asyncio
+    async def test_signal_id_is_stable_across_retries(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+
+        first = await queue.consume_signal()
+        first["note"] = "mutated while processing"
+        await queue.mark_signal_failed(first, "boom")
+        second = await queue.consume_signal()
+
+        assert second["signal_id"] == first["signal_id"]
+        assert second["note"] == "mutated while processing"
+        assert await queue.mark_signal_completed(second)
+        assert await queue.get_processing_size() == 0
+        assert not await queue._redis.exists(queue.signal_key_prefix + first["signal_id"])
+
+    @pytest.mark.asyncio
+    async def test_rebuild_indexes_migrates_existing_queue(self, queue):
+        redis = queue._redis
+        now = time.time()
+        await redis.zadd(queue.queue_key, {
+            queue._serialize_signal(make_signal("AAPL.US")): -60,
+            queue._serialize_signal(make_signal("TSLA.US", retry_after=now + 600)): -50,
+        })
+        await redis.zadd(queue.processing_key, {
+            queue._serialize_signal(make_signal("NVDA.US", "SELL")): now,
+        })
+
+        assert await queue.rebuild_indexes() == 3
+
+        # Legacy JSON members are migrated to ids with payload hashes
+        members = await redis.zrange(queue.queue_key, 0, -1)
+        assert not any(m.startswith("{") for m in members)
+        assert [s["symbol"] for s in await queue.get_all_signals()] == ["AAPL.US", "TSLA.US"]
+        assert (await queue.get_processing_signals())[0]["symbol"] == "NVDA.US"
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+        assert not await queue.has_pending_signal("TSLA.US")
+        assert await queue.has_pending_signal("NVDA.US", "SELL")
+        assert await queue.count_delayed_signals() == 1
+        assert await queue.get_pending_symbols() == {"AAPL.US", "TSLA.US", "NVDA.US"}
+
+    @pytest.mark.asyncio
+    async def test_stale_index_entries_are_pruned(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+        # Removed behind the queue's back
+        await queue._redis.delete(queue.queue_key)
+
+        assert not await queue.has_pending_signal("AAPL.US")
+        assert await queue.get_pending_symbols() == set()
+
+    @pytest.mark.asyncio
+    async def test_requeue_processing_keeps_payloads_and_indexes(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US", score=70))
+        await queue.publish_signal(make_signal("TSLA.US", "SELL", score=60))
+        first = await queue.consume_signal()
+        second = await queue.consume_signal()
+        await queue._redis.delete(queue.signal_key_prefix + second["signal_id"])  # payload lost
+
+        assert await queue.requeue_processing_signals(priority_penalty=20) == 1
+
+        assert await queue.get_processing_size() == 0
+        assert await queue.get_pending_symbols() == {"AAPL.US"}
+        [signal] = await queue.get_all_signals()
+        assert signal["signal_id"] == first["signal_id"]
+        assert signal["queue_priority"] == pytest.approx(50, abs=0.01)
+        assert (await queue.consume_signal())["symbol"] == "AAPL.US"
+
+    @pytest.mark.asyncio
+    async def test_clear_queue_drops_indexes(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US", retry_after=time.time() + 600))
+        await queue.publish_signal(make_signal("TSLA.US"))
+        await queue.consume_signal()
+        await queue.clear_queue("all")
+
+        assert await queue.get_pending_symbols() == set()
+        assert await queue.count_delayed_signals() == 0
+        assert [key async for key in queue._redis.scan_iter(match="*")] == [queue._index_version_key]
+
+
+class TestSignalQueueKeyLayout:
+    """Every key the scripts touch lives in the queue's hash slot."""
+
+    @pytest.mark.asyncio
+    async def test_derived_keys_share_queue_slot(self, queue):
+        from redis.crc import key_slot
+
+        await queue.publish_signal(make_signal("AAPL.US"))
+        await queue.publish_signal(make_signal("TSLA.US", retry_after=time.time() + 600))
+        await queue.consume_signal()
+        await queue.check_admission([("AAPL.US", "BUY")], symbols=["AAPL.US"])
+
+        slot = key_slot(queue.queue_key.encode())
+        keys = [key async for key in queue._redis.scan_iter(match="*")]
+        derived = [k for k in keys if k not in (queue.queue_key, queue.processing_key, queue._index_version_key)]
+        assert any(":idx:" in k for k in derived) and any(":sig:" in k for k in derived)
+        assert {key_slot(k.encode()) for k in derived} == {slot}
+
+    @pytest.mark.asyncio
+    async def test_pending_symbols_heal_after_external_removal(self, queue):
+        first = make_signal("AAPL.US")
+        await queue.publish_signal(first)
+        await queue.publish_signal(make_signal("TSLA.US"))
+        # Removed / expired behind the queue's back
+        await queue._redis.zrem(queue.queue_key, first["signal_id"])
+        await queue._redis.delete(queue.signal_key_prefix + first["signal_id"])
+
+        assert await queue.get_pending_symbols() == {"TSLA.US"}
+        assert await queue._redis.hgetall(queue._index_prefix["main"] + ":symbols") == {"TSLA.US": "1"}
+
+    @pytest.mark.asyncio
+    async def test_upgrade_moves_untagged_payloads(self, queue):
+        redis = queue._redis
+        await redis.zadd(queue.queue_key, {"legacy-id": -60})
+        await redis.hset(f"{queue.queue_key}:sig:legacy-id", mapping={
+            "payload": queue._serialize_signal(make_signal("AAPL.US", signal_id="legacy-id")),
+            "symbol": "AAPL.US", "type": "BUY", "queued_at": "",
+        })
+        await redis.sadd(f"{queue.queue_key}:idx:AAPL.US", "legacy-id")
+        await redis.set(queue._index_version_key, "2")
+
+        assert await queue.has_pending_signal("AAPL.US", "BUY")
+        assert not await redis.exists(f"{queue.queue_key}:idx:AAPL.US")
+        assert (await queue.consume_signal())["signal_id"] == "legacy-id"
+
+
+class TestSignalQueueAdmission:
+    """Batch admission check answers every gate in one script call."""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_checks(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US"))
+        await queue.publish_signal(make_signal("TSLA.US", "SELL"))
+        await queue.publish_signal(make_signal("NVDA.US", retry_after=time.time() + 600))
+        await queue.publish_signal(make_signal("META.US", "STOP_LOSS"))
+        await queue.consume_signal()  # META/STOP_LOSS now processing
+
+        pairs = [(symbol, signal_type)
+                 for symbol in ("AAPL.US", "TSLA.US", "NVDA.US", "META.US", "AMD.US")
+                 for signal_type in ("BUY", "SELL", "STOP_LOSS", None)]
+        state = await queue.check_admission(pairs)
+
+        for symbol, signal_type in pairs:
+            expected = await queue.has_pending_signal(symbol, signal_type)
+            assert state["pending"][(symbol, signal_type)] == expected, (symbol, signal_type)
+        assert state["pending"][("META.US", "STOP_LOSS")]
+        assert not state["pending"][("NVDA.US", "BUY")]
+
+    @pytest.mark.asyncio
+    async def test_twap_and_position_flags(self, queue):
+        redis = queue._redis
+        await redis.sadd("test:positions", "AAPL.US", "TSLA.US")
+        await redis.set("test:twap:TSLA.US", "1")
+
+        state = await queue.check_admission(
+            [("AAPL.US", "BUY")], symbols=["AAPL.US", "TSLA.US", "AMD.US"],
+            positions_key="test:positions", twap_key_prefix="test:twap:",
+        )
+
+        assert state["pending"] == {("AAPL.US", "BUY"): False}
+        assert state["positions"] == {"AAPL.US", "TSLA.US"}
+        assert state["twap"] == {"TSLA.US"}
+
+    @pytest.mark.asyncio
+    async def test_single_round_trip_and_fail_open(self, queue):
+        await queue._get_redis()  # index version check on first use
+        calls = []
+        original = queue._run_script
+
+        async def counting(name, keys, args=None):
+            calls.append(name)
+            return await original(name, keys, args)
+
+        queue._run_script = counting
+        pairs = [(f"S{i}.US", t) for i in range(200) for t in ("BUY", "SELL")]
+        state = await queue.check_admission(pairs, symbols=[f"S{i}.US" for i in range(200)])
+        assert calls == ["admission"]
+        assert not any(state["pending"].values())
+
+        async def broken(name, keys, args=None):
+            raise ConnectionError("redis down")
+
+        queue._run_script = broken
+        state = await queue.check_admission([("AAPL.US", "BUY")], symbols=["AAPL.US"])
+        assert state == {"pending": {("AAPL.US", "BUY"): False}, "twap": set(), "positions": set()}
+
+
+class TestSignalQueueConsume:
+    """The Lua consume path must pick, skip and drop in a single call."""
+
+    @pytest.mark.asyncio
+    async def test_highest_priority_first_and_delayed_skipped(self, queue):
+        now = time.time()
+        await queue.publish_signal(make_signal("AAPL.US", score=90, retry_after=now + 120))
+        await queue.publish_signal(make_signal("TSLA.US", score=50))
+
+        signal = await queue.consume_signal()
+
+        assert signal["symbol"] == "TSLA.US"
+        assert signal["signal_id"]
+        assert await queue.get_queue_size() == 1
+        assert await queue.get_processing_size() == 1
+
+    @pytest.mark.asyncio
+    async def test_peek_matches_next_consumed_signal(self, queue):
+        assert await queue.peek_signal() is None
+        await queue.publish_signal(make_signal("AAPL.US", "STOP_LOSS", score=100, retry_after=time.time() + 120))
+        await queue.publish_signal(make_signal("TSLA.US", "URGENT_SELL", score=95))
+        await queue.publish_signal(make_signal("NVDA.US", score=80))
+
+        head = await queue.peek_signal()
+        assert head["symbol"] == "TSLA.US" and head["queue_priority"] == pytest.approx(95, abs=0.01)
+        assert await queue.get_queue_size() == 3
+        assert (await queue.consume_signal())["signal_id"] == head["signal_id"]
+
+    @pytest.mark.asyncio
+    async def test_only_delayed_signals_sets_wake_up_hint(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US", retry_after=time.time() + 120))
+
+        assert await queue.consume_signal() is None
+        assert 100 < queue._last_delay_hint <= 120
+        assert await queue.get_queue_size() == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_and_over_delayed_signals_are_dropped(self, queue):
+        await queue.publish_signal(make_signal("AAPL.US", score=90))
+        await queue.publish_signal(make_signal("TSLA.US", score=95, retry_after=time.time() + 7200))
+        stale = make_signal("NVDA.US", score=99)
+        await queue.publish_signal(stale)
+        # Age the signal past the TTL behind the queue's back
+        await queue._redis.hset(queue.signal_key_prefix + stale["signal_id"], "queued_at",
+                                (datetime.now() - timedelta(hours=2)).isoformat())
+
+        signal = await queue.consume_signal(signal_ttl_seconds=3600, max_delay_seconds=1800)
+
+        assert signal["symbol"] == "AAPL.US"
+        assert await queue.get_queue_size() == 0
+        assert await queue.get_pending_symbols() == {"AAPL.US"}
+        assert queue._last_delay_hint is None
+        assert not await queue._redis.exists(queue.signal_key_prefix + stale["signal_id"])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_consumers_never_share_a_signal(self, queue):
+        for i in range(20):
+            await queue.publish_signal(make_signal(f"S{i}.US", score=i))
+
+        results = await asyncio.gather(*(queue.consume_signal() for _ in range(25)))
+        symbols = [s["symbol"] for s in results if s]
+
+        assert len(symbols) == 20
+        assert len(set(symbols)) == 20
+        assert await queue.get_processing_size() == 20
+
+    @pytest.mark.asyncio
+    async def test_orjson_codec_round_trip(self, queue):
+        pytest.importorskip("orjson")
+        from decimal import Decimal
+
+        queue.payload_codec = "orjson"
+        await queue.publish_signal(make_signal("AAPL.US", price=Decimal("10.5"), created=datetime(2024, 1, 2, 3, 4, 5)))
+
+        signal = await queue.consume_signal()
+        assert signal["price"] == 10.5
+        assert signal["created"] == "2024-01-02T03:04:05"
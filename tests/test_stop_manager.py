@@ -0,0 +1,194 @@
+"""Unit tests for the StopLossManager in-process stop cache."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from longport_quant.persistence import stop_manager as stop_module
+from longport_quant.persistence.stop_manager import STOP_CHANGES_CHANNEL, StopLossManager
+
+
+def stop_row(symbol, stop_loss=90.0, take_profit=120.0):
+    return {
+        "symbol": symbol, "entry_price": 100.0, "stop_loss": stop_loss,
+        "take_profit": take_profit, "atr": None, "quantity": 10,
+        "backup_stop_loss_order_id": None, "backup_take_profit_order_id": None,
+    }
+
+
+class FakeConnection:
+    """Just enough of an asyncpg connection for StopLossManager."""
+
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql, *args):
+        self.db.statements.append(sql.split()[0])
+        if "pg_notify" in sql:
+            self.db.notifications.append(args)
+        return "OK"
+
+    async def fetch(self, sql, *args):
+        self.db.queries += 1
+        rows = [dict(row) for row in self.db.rows.values()]
+        if self.db.during_fetch:
+            await self.db.during_fetch()
+        return rows
+
+    async def fetchrow(self, sql, *args):
+        self.db.queries += 1
+        row = self.db.rows.get(args[0])
+        return dict(row) if row else None
+
+
+class FakePool:
+    def __init__(self, db):
+        self.db = db
+        self._closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self.db)
+
+    async def close(self):
+        self._closed = True
+
+
+class FakeListener:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeDatabase:
+    def __init__(self, rows=()):
+        self.rows = {row["symbol"]: row for row in rows}
+        self.statements = []
+        self.notifications = []
+        self.queries = 0
+        self.listener = None
+        self.during_fetch = None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase([stop_row("AAPL.US"), stop_row("700.HK", 300.0, 400.0)])
+
+    async def create_pool(*args, **kwargs):
+        return FakePool(db)
+
+    async def connect(*args, **kwargs):
+        db.listener = FakeListener()
+        return db.listener
+
+    monkeypatch.setattr(stop_module.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(stop_module.asyncpg, "connect", connect)
+    return db
+
+
+class TestStopCache:
+    @pytest.mark.asyncio
+    async def test_reads_are_served_from_memory_after_bulk_load(self, db):
+        manager = StopLossManager()
+        assert await manager.start_cache()
+        loaded_with = db.queries
+
+        for _ in range(100):
+            stops = await manager.get_position_stops("", "AAPL.US")
+        assert stops["stop_loss"] == 90.0
+        assert await manager.get_position_stops("", "TSLA.US") is None
+        assert db.queries == loaded_with
+        assert STOP_CHANGES_CHANNEL in db.listener.listeners
+
+    @pytest.mark.asyncio
+    async def test_own_writes_update_cache_and_notify(self, db):
+        manager = StopLossManager()
+        await manager.start_cache()
+
+        await manager.set_position_stops("", "TSLA.US", stop_loss=180.0, take_profit=260.0)
+        assert (await manager.get_position_stops("", "TSLA.US"))["take_profit"] == 260.0
+
+        await manager.update_stop_status("AAPL.US", "stopped_out", exit_price=89.0, pnl=-110.0)
+        assert await manager.get_position_stops("", "AAPL.US") is None
+
+        assert [n[1].split(":")[1] for n in db.notifications] == ["TSLA.US", "AAPL.US"]
+
+        # 自己发出的通知不触发回源
+        queries = db.queries
+        for channel, payload in db.notifications:
+            db.listener.listeners[STOP_CHANGES_CHANNEL](db.listener, 1, channel, payload)
+        await asyncio.sleep(0)
+        assert db.queries == queries
+
+    @pytest.mark.asyncio
+    async def test_foreign_notification_refreshes_symbol(self, db):
+        manager = StopLossManager()
+        await manager.start_cache()
+        notify = db.listener.listeners[STOP_CHANGES_CHANNEL]
+
+        db.rows["AAPL.US"] = stop_row("AAPL.US", stop_loss=95.0)
+        del db.rows["700.HK"]
+        notify(db.listener, 1, STOP_CHANGES_CHANNEL, "other:AAPL.US")
+        notify(db.listener, 1, STOP_CHANGES_CHANNEL, "other:700.HK")
+        await asyncio.gather(*manager._refresh_tasks)
+
+        assert (await manager.get_position_stops("", "AAPL.US"))["stop_loss"] == 95.0
+        assert await manager.get_position_stops("", "700.HK") is None
+
+    @pytest.mark.asyncio
+    async def test_change_during_bulk_load_is_not_overwritten(self, db):
+        manager = StopLossManager()
+
+        async def concurrent_update():
+            # 快照已读出，另一进程随后提交并通知
+            db.rows["AAPL.US"] = stop_row("AAPL.US", stop_loss=97.0)
+            db.listener.listeners[STOP_CHANGES_CHANNEL](
+                db.listener, 1, STOP_CHANGES_CHANNEL, "other:AAPL.US"
+            )
+            await asyncio.sleep(0)
+
+        db.during_fetch = concurrent_update
+        assert await manager.start_cache()
+        await asyncio.gather(*manager._refresh_tasks)
+
+        assert (await manager.get_position_stops("", "AAPL.US"))["stop_loss"] == 97.0
+
+    @pytest.mark.asyncio
+    async def test_lost_listener_falls_back_to_database(self, db):
+        manager = StopLossManager()
+        manager.CACHE_RETRY_INTERVAL = 3600
+        await manager.start_cache()
+        manager._cache_retry_at = float("inf")
+
+        db.listener.on_terminate(db.listener)
+        assert not manager.cache_ready
+
+        db.rows["AAPL.US"] = stop_row("AAPL.US", stop_loss=80.0)
+        queries = db.queries
+        assert (await manager.get_position_stops("", "AAPL.US"))["stop_loss"] == 80.0
+        assert db.queries == queries + 1
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_reads_database(self, db):
+        manager = StopLossManager()
+        assert (await manager.get_position_stops("", "AAPL.US"))["stop_loss"] == 90.0
+        assert db.queries == 1
+        assert db.listener is None
@@ -0,0 +1,165 @@
+"""Unit tests for incremental (streaming) indicators."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from longport_quant.features.streaming_indicators import (
+    StreamingBar,
+    StreamingEMA,
+    StreamingIndicators,
+    StreamingSMA,
+)
+from longport_quant.features.technical_indicators import TechnicalIndicators
+from longport_quant.strategy.enhanced_base import (
+    DataAccessMixin,
+    EnhancedStrategyBase,
+    StrategyParameters,
+    TimeFrame,
+)
+
+
+@pytest.fixture
+def ohlcv():
+    """Random-walk OHLCV arrays."""
+    rng = np.random.default_rng(42)
+    n = 150
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    volume = rng.uniform(1e6, 5e6, n)
+    return close, high, low, volume
+
+
+def assert_close(actual, expected):
+    if np.isnan(expected):
+        assert np.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+class TestStreamingIndicators:
+    """Streaming values must match the batch implementations bar by bar."""
+
+    def test_matches_batch_functions(self, ohlcv):
+        close, high, low, volume = ohlcv
+        stream = StreamingIndicators()
+
+        rsi = TechnicalIndicators.rsi(close, 14)
+        bb = TechnicalIndicators.bollinger_bands(close, 20, 2)
+        macd = TechnicalIndicators.macd(close, 12, 26, 9)
+        sma_50 = TechnicalIndicators.sma(close, 50)
+        volume_sma = TechnicalIndicators.sma(volume, 20)
+        atr = TechnicalIndicators.atr(high, low, close, 14)
+
+        for i in range(len(close)):
+            snap = stream.update(StreamingBar(close=close[i], high=high[i], low=low[i], volume=volume[i]))
+            assert_close(snap["rsi"], rsi[i])
+            assert_close(snap["bb_upper"], bb["upper"][i])
+            assert_close(snap["bb_lower"], bb["lower"][i])
+            assert_close(snap["macd"], macd["macd"][i])
+            assert_close(snap["macd_signal"], macd["signal"][i])
+            assert_close(snap["macd_histogram"], macd["histogram"][i])
+            assert_close(snap["sma_50"], sma_50[i])
+            assert_close(snap["volume_sma"], volume_sma[i])
+            if i >= 13:
+                assert_close(snap["atr"], atr[i])
+
+        assert stream.ready
+
+    def test_peek_does_not_mutate_state(self, ohlcv):
+        close, high, low, volume = ohlcv
+        stream = StreamingIndicators()
+        stream.update_many(close[:-1], high[:-1], low[:-1], volume[:-1])
+        before = stream.snapshot()
+
+        partial = StreamingBar(close=close[-1], high=high[-1], low=low[-1], volume=volume[-1])
+        peeked = stream.peek(partial)
+        assert stream.peek(partial) == peeked
+        assert stream.snapshot() == before
+
+        assert_close(peeked["rsi"], TechnicalIndicators.rsi(close, 14)[-1])
+        assert peeked["prev_macd_histogram"] == pytest.approx(before["macd_histogram"])
+        assert stream.update(partial) == peeked
+
+    def test_ema_skips_nan_like_batch(self):
+        values = np.array([np.nan, 1.0, 2.0, 3.0, np.nan, 5.0, 6.0, 7.0])
+        ema = StreamingEMA(3)
+        streamed = [ema.update(v) for v in values]
+        expected = TechnicalIndicators.ema(values, 3)
+        for actual, exp in zip(streamed, expected, strict=True):
+            assert_close(actual, exp)
+
+    def test_sma_with_nan_in_window(self):
+        values = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0])
+        sma = StreamingSMA(3)
+        streamed = [sma.update(v) for v in values]
+        expected = TechnicalIndicators.sma(values, 3)
+        for actual, exp in zip(streamed, expected, strict=True):
+            assert_close(actual, exp)
+
+
+class TestStrategyIndicatorHistory:
+    """EnhancedStrategyBase.get_indicators keeps its history-DataFrame contract."""
+
+    @staticmethod
+    def make_strategy(**custom_params):
+        class Strategy(EnhancedStrategyBase):
+            async def on_quote(self, quote):
+                pass
+
+            async def analyze(self, symbol):
+                return None
+
+            @classmethod
+            async def create(cls, db, parameters=None, **kwargs):
+                return cls(db, parameters, **kwargs)
+
+        params = StrategyParameters(
+            name="test",
+            lookback_periods={TimeFrame.D1: 60},
+            custom_params=custom_params,
+        )
+        return Strategy(db=None, parameters=params)
+
+    @staticmethod
+    def frame(ohlcv):
+        close, high, low, volume = ohlcv
+        return pd.DataFrame({
+            "timestamp": pd.date_range("2024-01-01", periods=len(close), freq="D"),
+            "close": close, "high": high, "low": low, "volume": volume,
+        })
+
+    @pytest.mark.asyncio
+    async def test_history_rows_use_strategy_periods(self, ohlcv):
+        close = ohlcv[0]
+        strategy = self.make_strategy(rsi_period=7, sma_periods=(5, 30))
+        strategy._prime_indicator_stream("700.HK", TimeFrame.D1, self.frame(ohlcv))
+
+        df = await strategy.get_indicators("700.HK", ["RSI", "SMA_5"], TimeFrame.D1, limit=30)
+
+        assert len(df) == 30
+        assert df["timestamp"].is_monotonic_increasing
+        rsi = TechnicalIndicators.rsi(close, 7)
+        sma_5 = TechnicalIndicators.sma(close, 5)
+        for offset in (-1, -2, -30):
+            assert_close(df["RSI"].iloc[offset], rsi[offset])
+            assert_close(df["SMA_5"].iloc[offset], sma_5[offset])
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_history_does_not_cover_request(self, ohlcv, monkeypatch):
+        fallback = []
+
+        async def stored(self, symbol, indicator_names, timeframe, limit=100):
+            fallback.append(limit)
+            return pd.DataFrame()
+
+        monkeypatch.setattr(DataAccessMixin, "get_indicators", stored)
+        strategy = self.make_strategy()
+        strategy._prime_indicator_stream("700.HK", TimeFrame.D1, self.frame(ohlcv))
+
+        assert len(await strategy.get_indicators("700.HK", ["RSI"], TimeFrame.D1, limit=60)) == 60
+        await strategy.get_indicators("700.HK", ["RSI"], TimeFrame.D1, limit=100)  # > 60 bars kept
+        strategy.update_parameters({"rsi_period": 21})  # engine built with stale periods
+        await strategy.get_indicators("700.HK", ["RSI"], TimeFrame.D1, limit=10)
+        assert fallback == [100, 10]